@@ -24,10 +24,19 @@ from ni.measurementlink.discovery.v1.client import DiscoveryClient
 from ni.measurementlink.sessionmanagement.v1.client import PinMapContext
 from ni_measurement_plugin_sdk_service.measurement import WrongMessageTypeWarning
 from ni_measurement_plugin_sdk_service.measurement.client_support import (
+    CallStats,
+    LoadBalancingPolicy,
+    MeasurementPriority,
     ParameterMetadata,
+    create_call_metadata,
     create_file_descriptor,
+    create_grpc_channel_pool,
     deserialize_parameters,
+    get_call_stats,
+    get_service_channel,
+    read_shared_memory_outputs,
     serialize_parameters,
+    start_span,
 )
 from ni.measurementlink.pinmap.v1.client import PinMapClient
 
@@ -85,6 +94,8 @@ class NonStreamingDataMeasurementClient:
         pin_map_client: PinMapClient | None = None,
         grpc_channel: grpc.Channel | None = None,
         grpc_channel_pool: GrpcChannelPool | None = None,
+        priority: MeasurementPriority | None = None,
+        load_balancing_policy: LoadBalancingPolicy | None = None,
     ):
         """Initialize the Measurement Plug-In Client.
 
@@ -96,6 +107,11 @@ class NonStreamingDataMeasurementClient:
             grpc_channel: An optional gRPC channel targeting a measurement service.
 
             grpc_channel_pool: An optional gRPC channel pool.
+
+            priority: An optional scheduling priority for measurement calls.
+
+            load_balancing_policy: An optional policy for distributing measurement
+                calls across the registered replicas of the measurement service.
         """
         self._initialization_lock = threading.RLock()
         self._service_class = "ni.tests.NonStreamingDataMeasurement_Python"
@@ -103,10 +119,14 @@ class NonStreamingDataMeasurementClient:
         self._grpc_channel_pool = grpc_channel_pool
         self._discovery_client = discovery_client
         self._pin_map_client = pin_map_client
+        self._priority = priority
+        self._load_balancing_policy = load_balancing_policy
         self._stub: v2_measurement_service_pb2_grpc.MeasurementServiceStub | None = None
+        self._resolve_service = grpc_channel is None
         self._measure_response: None | (
             grpc._CallIterator[v2_measurement_service_pb2.MeasureResponse]
         ) = None
+        self._last_call_stats: CallStats | None = None
         self._configuration_metadata = {
             1: ParameterMetadata(
                 display_name="Float In",
@@ -463,6 +483,24 @@ class NonStreamingDataMeasurementClient:
             )
         self._pin_map_context = val
 
+    @property
+    def priority(self) -> MeasurementPriority | None:
+        """The scheduling priority for measurement calls."""
+        return self._priority
+
+    @priority.setter
+    def priority(self, val: MeasurementPriority | None) -> None:
+        self._priority = val
+
+    @property
+    def last_call_stats(self) -> CallStats | None:
+        """The server-side cost of the last completed measurement call.
+
+        This is None until a measurement call completes, or if the measurement service
+        does not return call statistics.
+        """
+        return self._last_call_stats
+
     @property
     def sites(self) -> list[int] | None:
         """The sites where the measurement must be executed."""
@@ -480,13 +518,13 @@ class NonStreamingDataMeasurementClient:
         if self._stub is None:
             with self._initialization_lock:
                 if self._stub is None:
-                    service_location = self._get_discovery_client().resolve_service(
+                    channel = get_service_channel(
+                        self._get_discovery_client(),
+                        self._get_grpc_channel_pool(),
                         provided_interface=_V2_MEASUREMENT_SERVICE_INTERFACE,
                         service_class=self._service_class,
                         version=self._version,
-                    )
-                    channel = self._get_grpc_channel_pool().get_channel(
-                        service_location.insecure_address
+                        load_balancing_policy=self._load_balancing_policy,
                     )
                     self._stub = v2_measurement_service_pb2_grpc.MeasurementServiceStub(channel)
         return self._stub
@@ -504,7 +542,7 @@ class NonStreamingDataMeasurementClient:
         if self._grpc_channel_pool is None:
             with self._initialization_lock:
                 if self._grpc_channel_pool is None:
-                    self._grpc_channel_pool = GrpcChannelPool()
+                    self._grpc_channel_pool = create_grpc_channel_pool()
         return self._grpc_channel_pool
 
     def _get_pin_map_client(self) -> PinMapClient:
@@ -544,20 +582,21 @@ class NonStreamingDataMeasurementClient:
     def _deserialize_response(
         self, response: v2_measurement_service_pb2.MeasureResponse
     ) -> Outputs:
-        self._validate_response(response)
+        outputs = read_shared_memory_outputs(response.outputs)
+        self._validate_outputs(outputs)
         return Outputs._make(
             deserialize_parameters(
                 self._output_metadata,
-                response.outputs.value,
+                outputs.value,
                 f"{self._service_class}.Outputs",
             )
         )
 
-    def _validate_response(self, response: v2_measurement_service_pb2.MeasureResponse) -> None:
+    def _validate_outputs(self, outputs: any_pb2.Any) -> None:
         expected_type = (
             "type.googleapis.com/" + "ni.tests.NonStreamingDataMeasurement_Python.Outputs"
         )
-        actual_type = response.outputs.type_url
+        actual_type = outputs.type_url
         if actual_type != expected_type:
             warnings.warn(
                 f"Wrong message type. Expected {expected_type!r} but got {actual_type!r}",
@@ -673,11 +712,29 @@ class NonStreamingDataMeasurementClient:
                 raise RuntimeError(
                     "A measurement is currently in progress. To make concurrent measurement requests, please create a new client instance."
                 )
+            self._last_call_stats = None
+            span = start_span("Measure", kind="client", service_class=self._service_class)
             request = self._create_measure_request(parameter_values)
-            self._measure_response = self._get_stub().Measure(request)
+            self._measure_response = self._start_measure(request, span.traceparent)
         try:
-            for response in self._measure_response:
-                yield self._deserialize_response(response)
+            can_retry = self._resolve_service
+            while True:
+                try:
+                    for response in self._measure_response:
+                        can_retry = False
+                        yield self._deserialize_response(response)
+                    break
+                except grpc.RpcError as e:
+                    if not can_retry or e.code() != grpc.StatusCode.UNAVAILABLE:
+                        raise
+                    # The measurement service may have been replaced by a new instance, so
+                    # resolve it again and retry the call once.
+                    _logger.debug("The measurement service is unavailable. Resolving it again.")
+                    can_retry = False
+                    with self._initialization_lock:
+                        self._stub = None
+                        self._measure_response = self._start_measure(request, span.traceparent)
+            self._last_call_stats = get_call_stats(self._measure_response)
         except grpc.RpcError as e:
             if e.code() == grpc.StatusCode.CANCELLED:
                 _logger.debug("The measurement is canceled.")
@@ -685,6 +742,20 @@ class NonStreamingDataMeasurementClient:
         finally:
             with self._initialization_lock:
                 self._measure_response = None
+            span.end()
+
+    def _start_measure(
+        self, request: v2_measurement_service_pb2.MeasureRequest, traceparent: str
+    ) -> grpc._CallIterator[v2_measurement_service_pb2.MeasureResponse]:
+        return self._get_stub().Measure(
+            request,
+            metadata=create_call_metadata(
+                priority=self._priority,
+                accept_shared_memory=True,
+                traceparent=traceparent,
+                request_call_stats=True,
+            ),
+        )
 
     def cancel(self) -> bool:
         """Cancels the active measurement call."""
@@ -3,3 +3,6 @@
 ENUM_VALUES_KEY = "ni/enum.values"
 TYPE_SPECIALIZATION_KEY = "ni/type_specialization"
 SERVICE_PROGRAMMINGLANGUAGE_KEY = "ni/service.programminglanguage"
+SERVICE_UNIX_SOCKET_PATH_KEY = "ni/service.unix_socket_path"
+SERVICE_ADDRESS_KEY = "ni/service.address"
+SERVICE_CONTROL_TOKEN_PATH_KEY = "ni/service.control_token_path"
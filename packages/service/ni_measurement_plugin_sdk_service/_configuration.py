@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import sys
+from collections.abc import Mapping
 from typing import TYPE_CHECKING, Any, Callable, NamedTuple, TypeVar
 
 from decouple import AutoConfig, Undefined, undefined
@@ -109,3 +110,273 @@ NISWITCH_MULTIPLEXER_OPTIONS = NISwitchOptions("niswitch_multiplexer").update_fr
 # ----------------------------------------------------------------------
 USE_GRPC_DEVICE_SERVER: bool = _config(f"{_PREFIX}_USE_GRPC_DEVICE_SERVER", default=True, cast=bool)
 GRPC_DEVICE_SERVER_ADDRESS: str = _config(f"{_PREFIX}_GRPC_DEVICE_SERVER_ADDRESS", default="")
+
+
+# ----------------------------------------------------------------------
+# Measurement Service Admission Control
+# ----------------------------------------------------------------------
+MAX_CONCURRENT_MEASUREMENTS: int = _config(
+    f"{_PREFIX}_MAX_CONCURRENT_MEASUREMENTS", default=0, cast=int
+)
+MAX_QUEUED_MEASUREMENTS: int = _config(f"{_PREFIX}_MAX_QUEUED_MEASUREMENTS", default=0, cast=int)
+MEASUREMENT_QUEUE_TIMEOUT: float = _config(
+    f"{_PREFIX}_MEASUREMENT_QUEUE_TIMEOUT", default=-1.0, cast=float
+)
+MEASUREMENT_PRIORITY_AGING_INTERVAL: float = _config(
+    f"{_PREFIX}_MEASUREMENT_PRIORITY_AGING_INTERVAL", default=10.0, cast=float
+)
+
+
+# ----------------------------------------------------------------------
+# Measurement Service Transport
+# ----------------------------------------------------------------------
+SERVICE_BIND_ADDRESS: str = _config(f"{_PREFIX}_SERVICE_BIND_ADDRESS", default="[::1]")
+SERVICE_BIND_PORT: int = _config(f"{_PREFIX}_SERVICE_BIND_PORT", default=0, cast=int)
+SERVICE_PORT_FILE: str = _config(f"{_PREFIX}_SERVICE_PORT_FILE", default="")
+SERVICE_ADVERTISED_HOST: str = _config(f"{_PREFIX}_SERVICE_ADVERTISED_HOST", default="")
+SERVICE_ADVERTISED_PORT: int = _config(f"{_PREFIX}_SERVICE_ADVERTISED_PORT", default=0, cast=int)
+SERVICE_REUSE_PORT: bool = _config(f"{_PREFIX}_SERVICE_REUSE_PORT", default=False, cast=bool)
+USE_UNIX_SOCKET: bool = _config(f"{_PREFIX}_USE_UNIX_SOCKET", default=False, cast=bool)
+UNIX_SOCKET_DIRECTORY: str = _config(f"{_PREFIX}_UNIX_SOCKET_DIRECTORY", default="")
+UNIX_SOCKET_ONLY: bool = _config(f"{_PREFIX}_UNIX_SOCKET_ONLY", default=False, cast=bool)
+SHARED_MEMORY_THRESHOLD: int = _config(f"{_PREFIX}_SHARED_MEMORY_THRESHOLD", default=0, cast=int)
+SHARED_MEMORY_LIFETIME: float = _config(
+    f"{_PREFIX}_SHARED_MEMORY_LIFETIME", default=60.0, cast=float
+)
+HEALTH_SERVICE_ENABLED: bool = _config(
+    f"{_PREFIX}_HEALTH_SERVICE_ENABLED", default=False, cast=bool
+)
+HEALTH_SERVICE_MAX_WATCHERS: int = _config(
+    f"{_PREFIX}_HEALTH_SERVICE_MAX_WATCHERS", default=2, cast=int
+)
+SERVICE_HANDOVER: bool = _config(f"{_PREFIX}_SERVICE_HANDOVER", default=False, cast=bool)
+SERVICE_DRAIN_TIMEOUT: float = _config(f"{_PREFIX}_SERVICE_DRAIN_TIMEOUT", default=30.0, cast=float)
+METRICS_ENABLED: bool = _config(f"{_PREFIX}_METRICS_ENABLED", default=False, cast=bool)
+METRICS_PORT: int = _config(f"{_PREFIX}_METRICS_PORT", default=0, cast=int)
+TRACE_FILE: str = _config(f"{_PREFIX}_TRACE_FILE", default="")
+TRACE_FORMAT: str = _config(f"{_PREFIX}_TRACE_FORMAT", default="jsonl")
+
+
+# ----------------------------------------------------------------------
+# Measurement Service Sessions
+# ----------------------------------------------------------------------
+RESERVATION_CACHE_ENABLED: bool = _config(
+    f"{_PREFIX}_RESERVATION_CACHE_ENABLED", default=False, cast=bool
+)
+RESERVATION_CACHE_HOLD_TIME: float = _config(
+    f"{_PREFIX}_RESERVATION_CACHE_HOLD_TIME", default=1.0, cast=float
+)
+SESSION_POOL_ENABLED: bool = _config(f"{_PREFIX}_SESSION_POOL_ENABLED", default=False, cast=bool)
+SESSION_POOL_IDLE_TIMEOUT: float = _config(
+    f"{_PREFIX}_SESSION_POOL_IDLE_TIMEOUT", default=300.0, cast=float
+)
+
+
+# ----------------------------------------------------------------------
+# Measurement Service Diagnostics
+# ----------------------------------------------------------------------
+class ProfilingOptions(NamedTuple):
+    """Options for profiling measure functions."""
+
+    sample_rate: float = 0.0
+    """The fraction of measure calls to profile, from 0.0 to 1.0."""
+
+    slow_call_threshold: float = 0.0
+    """Keep the profile of every measure call that takes longer than this many seconds.
+
+    A value of 0 disables slow-call profiling. Every call is profiled, so use the
+    sampling profiler to keep the overhead low.
+    """
+
+    profiler: str = "cprofile"
+    """The profiler to use: "cprofile" or "sampling"."""
+
+    directory: str = ""
+    """The directory to write profiles to. The default is a subdirectory of the
+    temporary directory."""
+
+    def update_from_service_config(self, service: Mapping[str, Any]) -> Self:
+        """Read options from the "profiling" object in a .serviceconfig service."""
+        profiling = service.get("profiling", {})
+        return self._replace(
+            sample_rate=float(profiling.get("sampleRate", self.sample_rate)),
+            slow_call_threshold=float(profiling.get("slowCallThreshold", self.slow_call_threshold)),
+            profiler=str(profiling.get("profiler", self.profiler)),
+            directory=str(profiling.get("directory", self.directory)),
+        )
+
+    def update_from_config(self) -> Self:
+        """Read options from the configuration file and return a new options object."""
+        return self._replace(
+            sample_rate=_config(
+                f"{_PREFIX}_PROFILE_SAMPLE_RATE", default=self.sample_rate, cast=float
+            ),
+            slow_call_threshold=_config(
+                f"{_PREFIX}_PROFILE_SLOW_CALL_THRESHOLD",
+                default=self.slow_call_threshold,
+                cast=float,
+            ),
+            profiler=_config(f"{_PREFIX}_PROFILER", default=self.profiler),
+            directory=_config(f"{_PREFIX}_PROFILE_DIRECTORY", default=self.directory),
+        )
+
+
+PROFILING_SERVICE_ENABLED: bool = _config(
+    f"{_PREFIX}_PROFILING_SERVICE_ENABLED", default=False, cast=bool
+)
+MEMORY_TRACKING_ENABLED: bool = _config(
+    f"{_PREFIX}_MEMORY_TRACKING_ENABLED", default=False, cast=bool
+)
+MEMORY_TRACKING_TOP_ALLOCATIONS: int = _config(
+    f"{_PREFIX}_MEMORY_TRACKING_TOP_ALLOCATIONS", default=10, cast=int
+)
+GC_MANAGEMENT_ENABLED: bool = _config(f"{_PREFIX}_GC_MANAGEMENT_ENABLED", default=False, cast=bool)
+GC_FULL_COLLECTION_INTERVAL: float = _config(
+    f"{_PREFIX}_GC_FULL_COLLECTION_INTERVAL", default=60.0, cast=float
+)
+GC_MAX_DEFERRAL: float = _config(f"{_PREFIX}_GC_MAX_DEFERRAL", default=10.0, cast=float)
+DRIVER_INSTRUMENTATION_ENABLED: bool = _config(
+    f"{_PREFIX}_DRIVER_INSTRUMENTATION_ENABLED", default=False, cast=bool
+)
+RESERVATION_TELEMETRY_ENABLED: bool = _config(
+    f"{_PREFIX}_RESERVATION_TELEMETRY_ENABLED", default=False, cast=bool
+)
+
+
+_HTTP2_MAX_WINDOW_SIZE = 2**31 - 1
+_HTTP2_MIN_FRAME_SIZE = 2**14
+_HTTP2_MAX_FRAME_SIZE = 2**24 - 1
+
+
+class GrpcTransportOptions(NamedTuple):
+    """gRPC HTTP/2 transport options for measurement services and clients.
+
+    A value of 0 uses the gRPC default.
+    """
+
+    stream_lookahead_bytes: int = 0
+    """The HTTP/2 flow-control window for each stream, in bytes."""
+
+    bdp_probe: bool = True
+    """Specifies whether to adjust the flow-control window based on bandwidth-delay product."""
+
+    max_frame_size: int = 0
+    """The maximum HTTP/2 frame size, in bytes."""
+
+    write_buffer_size: int = 0
+    """The size of the HTTP/2 write buffer, in bytes."""
+
+    keepalive_time_ms: int = 0
+    """The interval between keepalive pings, in milliseconds."""
+
+    keepalive_timeout_ms: int = 0
+    """The time to wait for a keepalive ping acknowledgement, in milliseconds."""
+
+    keepalive_permit_without_calls: bool = False
+    """Specifies whether to send keepalive pings when there are no active calls."""
+
+    min_ping_interval_without_data_ms: int = 0
+    """The minimum interval between pings that the service accepts, in milliseconds."""
+
+    max_concurrent_streams: int = 0
+    """The maximum number of concurrent streams that the service allows per connection."""
+
+    max_concurrent_rpcs: int = 0
+    """The maximum number of concurrent RPCs that the service accepts."""
+
+    def update_from_config(self) -> Self:
+        """Read options from the configuration file and return a new options object."""
+        prefix = f"{_PREFIX}_GRPC"
+        return self._replace(
+            stream_lookahead_bytes=_config(
+                f"{prefix}_STREAM_LOOKAHEAD_BYTES", default=self.stream_lookahead_bytes, cast=int
+            ),
+            bdp_probe=_config(f"{prefix}_BDP_PROBE", default=self.bdp_probe, cast=bool),
+            max_frame_size=_config(
+                f"{prefix}_MAX_FRAME_SIZE", default=self.max_frame_size, cast=int
+            ),
+            write_buffer_size=_config(
+                f"{prefix}_WRITE_BUFFER_SIZE", default=self.write_buffer_size, cast=int
+            ),
+            keepalive_time_ms=_config(
+                f"{prefix}_KEEPALIVE_TIME_MS", default=self.keepalive_time_ms, cast=int
+            ),
+            keepalive_timeout_ms=_config(
+                f"{prefix}_KEEPALIVE_TIMEOUT_MS", default=self.keepalive_timeout_ms, cast=int
+            ),
+            keepalive_permit_without_calls=_config(
+                f"{prefix}_KEEPALIVE_PERMIT_WITHOUT_CALLS",
+                default=self.keepalive_permit_without_calls,
+                cast=bool,
+            ),
+            min_ping_interval_without_data_ms=_config(
+                f"{prefix}_MIN_PING_INTERVAL_WITHOUT_DATA_MS",
+                default=self.min_ping_interval_without_data_ms,
+                cast=int,
+            ),
+            max_concurrent_streams=_config(
+                f"{prefix}_MAX_CONCURRENT_STREAMS", default=self.max_concurrent_streams, cast=int
+            ),
+            max_concurrent_rpcs=_config(
+                f"{prefix}_MAX_CONCURRENT_RPCS", default=self.max_concurrent_rpcs, cast=int
+            ),
+        )
+
+    def validate(self) -> None:
+        """Raise ValueError if any option is out of range."""
+        for name, value in self._asdict().items():
+            if not isinstance(value, bool) and value < 0:
+                raise ValueError(f"The gRPC option {name} must not be negative: {value}")
+        if self.stream_lookahead_bytes > _HTTP2_MAX_WINDOW_SIZE:
+            raise ValueError(
+                f"The gRPC option stream_lookahead_bytes must not exceed {_HTTP2_MAX_WINDOW_SIZE}: "
+                f"{self.stream_lookahead_bytes}"
+            )
+        if self.max_frame_size and not (
+            _HTTP2_MIN_FRAME_SIZE <= self.max_frame_size <= _HTTP2_MAX_FRAME_SIZE
+        ):
+            raise ValueError(
+                f"The gRPC option max_frame_size must be between {_HTTP2_MIN_FRAME_SIZE} and "
+                f"{_HTTP2_MAX_FRAME_SIZE}: {self.max_frame_size}"
+            )
+
+    def to_client_options(self) -> list[tuple[str, int]]:
+        """Convert options to a list of gRPC channel arguments for clients."""
+        self.validate()
+        return self._to_common_options()
+
+    def to_server_options(self) -> list[tuple[str, int]]:
+        """Convert options to a list of gRPC channel arguments for services."""
+        self.validate()
+        options = self._to_common_options()
+        if self.min_ping_interval_without_data_ms:
+            options.append(
+                (
+                    "grpc.http2.min_ping_interval_without_data_ms",
+                    self.min_ping_interval_without_data_ms,
+                )
+            )
+        if self.max_concurrent_streams:
+            options.append(("grpc.max_concurrent_streams", self.max_concurrent_streams))
+        return options
+
+    def _to_common_options(self) -> list[tuple[str, int]]:
+        options: list[tuple[str, int]] = []
+        if self.stream_lookahead_bytes:
+            options.append(("grpc.http2.lookahead_bytes", self.stream_lookahead_bytes))
+        if not self.bdp_probe:
+            options.append(("grpc.http2.bdp_probe", 0))
+        if self.max_frame_size:
+            options.append(("grpc.http2.max_frame_size", self.max_frame_size))
+        if self.write_buffer_size:
+            options.append(("grpc.http2.write_buffer_size", self.write_buffer_size))
+        if self.keepalive_time_ms:
+            options.append(("grpc.keepalive_time_ms", self.keepalive_time_ms))
+        if self.keepalive_timeout_ms:
+            options.append(("grpc.keepalive_timeout_ms", self.keepalive_timeout_ms))
+        if self.keepalive_permit_without_calls:
+            options.append(("grpc.keepalive_permit_without_calls", 1))
+        return options
+
+
+GRPC_TRANSPORT_OPTIONS = GrpcTransportOptions().update_from_config()
@@ -0,0 +1,12 @@
+"""Constants for gRPC metadata keys."""
+
+PRIORITY_KEY = "ni-measurement-priority"
+RETRY_PUSHBACK_MS_KEY = "grpc-retry-pushback-ms"
+ACCEPT_SHARED_MEMORY_KEY = "ni-accept-shared-memory"
+LOAD_IN_FLIGHT_KEY = "ni-load-in-flight"
+LOAD_QUEUE_LENGTH_KEY = "ni-load-queue-length"
+LOAD_AVERAGE_LATENCY_MS_KEY = "ni-load-average-latency-ms"
+TRACEPARENT_KEY = "traceparent"
+REQUEST_CALL_STATS_KEY = "ni-request-call-stats"
+CALL_STATS_KEY = "ni-call-stats"
+CONTROL_TOKEN_KEY = "ni-control-token"
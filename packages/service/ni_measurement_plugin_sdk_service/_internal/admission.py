@@ -0,0 +1,210 @@
+"""Admission control for measurement service calls."""
+
+from __future__ import annotations
+
+import contextlib
+import itertools
+import threading
+import time
+from collections.abc import Generator
+
+
+class AdmissionRejectedError(Exception):
+    """The measurement call was rejected because the service is overloaded."""
+
+    def __init__(self, message: str, retry_after: float) -> None:
+        """Initialize the error."""
+        super().__init__(message)
+        self.retry_after = retry_after
+        """Suggested delay in seconds before the client retries the call."""
+
+
+class _Waiter:
+    """A measurement call that is waiting for an execution slot."""
+
+    def __init__(self, priority: int, enqueue_time: float, sequence_number: int) -> None:
+        self.priority = priority
+        self.enqueue_time = enqueue_time
+        self.sequence_number = sequence_number
+        self.is_admitted = False
+
+
+class AdmissionController:
+    """Limits the number of measurement calls that execute or wait at the same time.
+
+    Queued calls are admitted in priority order. To prevent starvation, the effective
+    priority of a queued call increases by one for every ``priority_aging_interval``
+    seconds that it waits.
+    """
+
+    # Smoothing factor for the exponentially weighted moving average of call durations.
+    _DURATION_SMOOTHING = 0.2
+
+    # Suggested retry delays in seconds. Clients that retry sooner than the minimum are
+    # likely to find the queue still full.
+    _DEFAULT_RETRY_AFTER = 1.0
+    _MIN_RETRY_AFTER = 0.1
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        max_queue_length: int = 0,
+        queue_timeout: float = -1.0,
+        priority_aging_interval: float = 10.0,
+    ) -> None:
+        """Initialize the admission controller.
+
+        Args:
+            max_in_flight: The maximum number of calls that execute at the same time.
+
+            max_queue_length: The maximum number of calls that wait for an execution
+                slot. Calls that arrive when the queue is full are rejected immediately.
+
+            queue_timeout: The maximum time in seconds that a call waits for an
+                execution slot. -1 means wait until the RPC deadline, if any.
+
+            priority_aging_interval: The time in seconds after which a queued call's
+                effective priority increases by one level.
+        """
+        if max_in_flight <= 0:
+            raise ValueError("The maximum number of in-flight calls must be positive.")
+        if max_queue_length < 0:
+            raise ValueError("The maximum queue length must not be negative.")
+        if priority_aging_interval <= 0.0:
+            raise ValueError("The priority aging interval must be positive.")
+        self._max_in_flight = max_in_flight
+        self._max_queue_length = max_queue_length
+        self._queue_timeout = queue_timeout
+        self._priority_aging_interval = priority_aging_interval
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._waiters: list[_Waiter] = []
+        self._sequence_numbers = itertools.count()
+        self._average_duration = 0.0
+        self._completed_calls = 0
+
+    @property
+    def max_in_flight(self) -> int:
+        """The maximum number of calls that execute at the same time."""
+        return self._max_in_flight
+
+    @property
+    def max_queue_length(self) -> int:
+        """The maximum number of calls that wait for an execution slot."""
+        return self._max_queue_length
+
+    @property
+    def in_flight(self) -> int:
+        """The number of calls that are currently executing."""
+        with self._condition:
+            return self._in_flight
+
+    @property
+    def queue_length(self) -> int:
+        """The number of calls that are currently waiting for an execution slot."""
+        with self._condition:
+            return len(self._waiters)
+
+    @contextlib.contextmanager
+    def admit(self, time_remaining: float | None = None, priority: int = 0) -> Generator[float]:
+        """Wait for an execution slot and hold it for the duration of the with-statement.
+
+        Args:
+            time_remaining: The time remaining before the RPC deadline, or None if the
+                RPC has no deadline. The call does not wait past the deadline.
+
+            priority: The priority of the call. Higher values are admitted first.
+
+        Returns:
+            A context manager that yields the time in seconds that the call spent
+            waiting in the queue.
+
+        Raises:
+            AdmissionRejectedError: If the queue is full or the call timed out while
+                waiting in the queue.
+        """
+        queue_wait_time = self._acquire(time_remaining, priority)
+        start_time = time.perf_counter()
+        try:
+            yield queue_wait_time
+        finally:
+            self._release(time.perf_counter() - start_time)
+
+    def _get_timeout(self, time_remaining: float | None) -> float | None:
+        timeout = None if self._queue_timeout < 0 else self._queue_timeout
+        if time_remaining is not None:
+            timeout = time_remaining if timeout is None else min(timeout, time_remaining)
+        return timeout
+
+    def _get_next_waiter(self) -> _Waiter:
+        now = time.perf_counter()
+        return max(
+            self._waiters,
+            key=lambda waiter: (
+                waiter.priority + (now - waiter.enqueue_time) / self._priority_aging_interval,
+                -waiter.sequence_number,
+            ),
+        )
+
+    def _admit_waiters(self) -> None:
+        # Hand off free execution slots to the waiters with the highest effective priority.
+        while self._in_flight < self._max_in_flight and self._waiters:
+            waiter = self._get_next_waiter()
+            self._waiters.remove(waiter)
+            waiter.is_admitted = True
+            self._in_flight += 1
+            self._condition.notify_all()
+
+    def _acquire(self, time_remaining: float | None, priority: int) -> float:
+        start_time = time.perf_counter()
+        with self._condition:
+            if self._in_flight < self._max_in_flight and not self._waiters:
+                self._in_flight += 1
+                return 0.0
+
+            if len(self._waiters) >= self._max_queue_length:
+                raise AdmissionRejectedError(
+                    f"The measurement service is busy. {self._in_flight} calls are in progress "
+                    f"and {len(self._waiters)} calls are queued.",
+                    self._get_retry_after(),
+                )
+
+            timeout = self._get_timeout(time_remaining)
+            deadline = None if timeout is None else start_time + timeout
+            waiter = _Waiter(priority, start_time, next(self._sequence_numbers))
+            self._waiters.append(waiter)
+            try:
+                while not waiter.is_admitted:
+                    remaining = None if deadline is None else deadline - time.perf_counter()
+                    if remaining is not None and remaining <= 0.0:
+                        raise AdmissionRejectedError(
+                            "The measurement call timed out while waiting in the queue "
+                            f"for {time.perf_counter() - start_time:.3f} seconds.",
+                            self._get_retry_after(),
+                        )
+                    self._condition.wait(remaining)
+            except BaseException:
+                if waiter.is_admitted:
+                    self._in_flight -= 1
+                    self._admit_waiters()
+                else:
+                    self._waiters.remove(waiter)
+                raise
+        return time.perf_counter() - start_time
+
+    def _release(self, duration: float) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            self._completed_calls += 1
+            self._average_duration += self._DURATION_SMOOTHING * (duration - self._average_duration)
+            self._admit_waiters()
+
+    def _get_retry_after(self) -> float:
+        if self._completed_calls == 0:
+            # There is no duration estimate until a call completes, so suggest waiting
+            # as long as a queued call would.
+            retry_after = self._queue_timeout if self._queue_timeout > 0.0 else 0.0
+            return max(retry_after, self._DEFAULT_RETRY_AFTER)
+        # Estimate how long it takes to drain the calls ahead of a new caller.
+        batches = len(self._waiters) // self._max_in_flight + 1
+        return max(batches * self._average_duration, self._MIN_RETRY_AFTER)
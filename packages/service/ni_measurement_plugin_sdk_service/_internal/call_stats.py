@@ -0,0 +1,228 @@
+"""Per-call resource accounting returned to clients in trailing metadata."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Generator, Iterable
+from typing import Any, Callable, NamedTuple
+
+import grpc
+
+from ni_measurement_plugin_sdk_service._grpc_metadata import (
+    CALL_STATS_KEY,
+    REQUEST_CALL_STATS_KEY,
+)
+from ni_measurement_plugin_sdk_service._internal.metrics import (
+    _CallMetrics,
+    _current_call_metrics,
+)
+
+
+class CallStats(NamedTuple):
+    """The server-side cost of a measurement call."""
+
+    duration: float = 0.0
+    """The wall time of the call in seconds, from receiving the request until the last
+    response was sent."""
+
+    queue_time: float = 0.0
+    """The time in seconds that the call waited for an execution slot."""
+
+    decode_time: float = 0.0
+    """The time in seconds spent deserializing the request and its parameters."""
+
+    measure_time: float = 0.0
+    """The time in seconds spent running the measurement function."""
+
+    encode_time: float = 0.0
+    """The time in seconds spent serializing the outputs and responses."""
+
+    reserve_time: float = 0.0
+    """The time in seconds spent waiting for and reserving sessions."""
+
+    cpu_time: float = 0.0
+    """The CPU time in seconds used by the thread that handled the call."""
+
+    bytes_received: int = 0
+    """The size of the serialized request in bytes."""
+
+    bytes_sent: int = 0
+    """The size of the serialized responses in bytes."""
+
+    response_count: int = 0
+    """The number of responses sent."""
+
+    def to_metadata_value(self) -> str:
+        """Format the statistics as a trailing metadata value."""
+        return ",".join(
+            f"{name}={value}" if isinstance(value, int) else f"{name}={value:.6f}"
+            for name, value in self._asdict().items()
+        )
+
+    @classmethod
+    def from_metadata_value(cls, value: str) -> CallStats:
+        """Parse statistics that were formatted with :any:`to_metadata_value`.
+
+        Unknown fields are ignored, so that newer services can add fields.
+        """
+        fields: dict[str, Any] = {}
+        for item in value.split(","):
+            name, _, field_value = item.partition("=")
+            default = cls._field_defaults.get(name)
+            if default is not None:
+                fields[name] = type(default)(field_value)
+        return cls(**fields)
+
+
+def get_call_stats(call: grpc.Call) -> CallStats | None:
+    """Get the server-side cost of a completed measurement call.
+
+    Args:
+        call: The completed call. Measurement calls must be made with gRPC metadata that
+            is created by :any:`create_call_metadata` with ``request_call_stats=True``.
+
+    Returns:
+        The call statistics, or None if the measurement service did not return them.
+    """
+    for key, value in call.trailing_metadata() or ():
+        if key == CALL_STATS_KEY and isinstance(value, str):
+            return CallStats.from_metadata_value(value)
+    return None
+
+
+class CallStatsInterceptor(grpc.ServerInterceptor):
+    """Server interceptor that returns the cost of measurement calls in trailing metadata.
+
+    Statistics are returned only to clients that request them with the
+    ``ni-request-call-stats`` metadata key. The phase times are the same as the ones
+    that are recorded in metrics. For unary calls, the response is serialized after
+    the trailing metadata is set, so its encoding time is not included.
+    """
+
+    def intercept_service(
+        self,
+        continuation: Callable[[grpc.HandlerCallDetails], grpc.RpcMethodHandler | None],
+        handler_call_details: grpc.HandlerCallDetails,
+    ) -> grpc.RpcMethodHandler | None:
+        """Wrap measurement call handlers to account for their cost."""
+        handler = continuation(handler_call_details)
+        if handler is None or not handler_call_details.method.endswith("/Measure"):
+            return handler
+        if not any(
+            key == REQUEST_CALL_STATS_KEY for key, _ in handler_call_details.invocation_metadata
+        ):
+            return handler
+        call = _AccountedCall()
+        if handler.unary_unary is not None:
+            return grpc.unary_unary_rpc_method_handler(
+                call.wrap_unary(handler.unary_unary),
+                request_deserializer=call.wrap_deserializer(handler.request_deserializer),
+                response_serializer=call.wrap_serializer(handler.response_serializer),
+            )
+        if handler.unary_stream is not None:
+            return grpc.unary_stream_rpc_method_handler(
+                call.wrap_stream(handler.unary_stream),
+                request_deserializer=call.wrap_deserializer(handler.request_deserializer),
+                response_serializer=call.wrap_serializer(handler.response_serializer),
+            )
+        return handler
+
+
+class _AccountedCall:
+    def __init__(self) -> None:
+        self._start_time = time.perf_counter()
+        # If metrics are enabled, the metrics interceptor records the call's phases, so
+        # read them from its call metrics. Otherwise, record them here.
+        self._own_call_metrics = _CallMetrics()
+        self._call_metrics = self._own_call_metrics
+        self._cpu_time = 0.0
+        self._bytes_received = 0
+        self._bytes_sent = 0
+        self._response_count = 0
+
+    def wrap_deserializer(self, deserializer: Callable[[bytes], Any] | None) -> Callable | None:
+        if deserializer is None:
+            return None
+
+        def wrapper(data: bytes) -> Any:
+            self._bytes_received += len(data)
+            start_time = time.perf_counter()
+            try:
+                return deserializer(data)
+            finally:
+                self._own_call_metrics.add("decode", time.perf_counter() - start_time)
+
+        return wrapper
+
+    def wrap_serializer(self, serializer: Callable[[Any], bytes] | None) -> Callable:
+        def wrapper(message: Any) -> bytes:
+            start_time = time.perf_counter()
+            try:
+                data = serializer(message) if serializer is not None else message
+            finally:
+                self._own_call_metrics.add("encode", time.perf_counter() - start_time)
+            self._bytes_sent += len(data)
+            self._response_count += 1
+            return data
+
+        return wrapper
+
+    def wrap_unary(self, behavior: Callable[[Any, grpc.ServicerContext], Any]) -> Callable:
+        def wrapper(request: Any, context: grpc.ServicerContext) -> Any:
+            response = self._run(behavior, request, context)
+            # gRPC serializes the response after the trailing metadata is set, so count
+            # it here. ByteSize() caches the size, so serialization does not repeat it.
+            self._bytes_sent += response.ByteSize()
+            self._response_count += 1
+            self._set_trailing_metadata(context)
+            return response
+
+        return wrapper
+
+    def wrap_stream(
+        self, behavior: Callable[[Any, grpc.ServicerContext], Iterable[Any]]
+    ) -> Callable:
+        def wrapper(request: Any, context: grpc.ServicerContext) -> Generator[Any]:
+            responses = iter(self._run(behavior, request, context))
+            while True:
+                try:
+                    response = self._run(next, responses)
+                except StopIteration:
+                    break
+                yield response
+            # gRPC serializes and sends each response before resuming the generator, so
+            # all responses have been sent.
+            self._set_trailing_metadata(context)
+
+        return wrapper
+
+    def _run(self, function: Callable[..., Any], *args: Any) -> Any:
+        current_call_metrics = _current_call_metrics.get()
+        token = None
+        if current_call_metrics is None:
+            token = _current_call_metrics.set(self._own_call_metrics)
+        else:
+            self._call_metrics = current_call_metrics
+        start_cpu_time = time.thread_time()
+        try:
+            return function(*args)
+        finally:
+            self._cpu_time += time.thread_time() - start_cpu_time
+            if token is not None:
+                _current_call_metrics.reset(token)
+
+    def _set_trailing_metadata(self, context: grpc.ServicerContext) -> None:
+        phase_durations = self._call_metrics.phase_durations
+        stats = CallStats(
+            duration=time.perf_counter() - self._start_time,
+            queue_time=phase_durations.get("queue", 0.0),
+            decode_time=phase_durations.get("decode", 0.0),
+            measure_time=phase_durations.get("measure", 0.0),
+            encode_time=phase_durations.get("encode", 0.0),
+            reserve_time=phase_durations.get("reserve", 0.0),
+            cpu_time=self._cpu_time,
+            bytes_received=self._bytes_received,
+            bytes_sent=self._bytes_sent,
+            response_count=self._response_count,
+        )
+        context.set_trailing_metadata(((CALL_STATS_KEY, stats.to_metadata_value()),))
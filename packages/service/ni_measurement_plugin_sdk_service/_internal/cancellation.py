@@ -0,0 +1,126 @@
+"""Cancellation and deadline token for measurement code."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable
+
+import grpc
+
+
+class CancellationToken:
+    """Reports when the current RPC is canceled or its deadline expires.
+
+    Measure functions can use the token instead of polling a ``threading.Event`` and
+    computing deadlines from ``time_remaining``. Waiting on the token returns as soon
+    as the RPC is canceled, without waiting for the next poll interval.
+    """
+
+    def __init__(
+        self,
+        time_remaining: float | None,
+        abort: Callable[[grpc.StatusCode, str], None],
+    ) -> None:
+        """Initialize the cancellation token.
+
+        Args:
+            time_remaining: The time in seconds until the RPC's deadline, or None if the
+                RPC does not have a deadline.
+
+            abort: A function that aborts the RPC with a status code and details.
+        """
+        self._deadline = time.monotonic() + time_remaining if time_remaining is not None else None
+        self._abort = abort
+        self._event = threading.Event()
+
+    @property
+    def is_cancelled(self) -> bool:
+        """Whether the RPC has been canceled."""
+        return self._event.is_set()
+
+    @property
+    def deadline(self) -> float | None:
+        """The RPC's deadline in ``time.monotonic()`` seconds, or None if it has none."""
+        return self._deadline
+
+    @property
+    def time_remaining(self) -> float | None:
+        """The time in seconds until the RPC's deadline, or None if it has none."""
+        if self._deadline is None:
+            return None
+        return max(self._deadline - time.monotonic(), 0.0)
+
+    def cancel(self) -> None:
+        """Mark the RPC as canceled and wake up any waiting threads."""
+        self._event.set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Wait until the RPC is canceled, its deadline expires, or the timeout elapses.
+
+        Args:
+            timeout: The maximum time in seconds to wait, or None to wait until the RPC
+                is canceled or its deadline expires.
+
+        Returns:
+            True if the RPC has been canceled.
+        """
+        time_remaining = self.time_remaining
+        if time_remaining is not None:
+            timeout = time_remaining if timeout is None else min(timeout, time_remaining)
+        return self._event.wait(timeout)
+
+    def raise_if_cancelled(self) -> None:
+        """Abort the RPC if it has been canceled or its deadline has expired.
+
+        Raises:
+            grpc.RpcError: With status code CANCELLED or DEADLINE_EXCEEDED.
+        """
+        if self._event.is_set():
+            self._abort(grpc.StatusCode.CANCELLED, "Client requested cancellation.")
+        if self._deadline is not None and time.monotonic() >= self._deadline:
+            self._abort(grpc.StatusCode.DEADLINE_EXCEEDED, "Deadline exceeded.")
+
+    def poll_until(
+        self,
+        predicate: Callable[[], bool],
+        interval: float = 1e-3,
+        backoff: float = 2.0,
+        max_interval: float = 0.1,
+        timeout: float | None = None,
+    ) -> None:
+        """Call a function until it returns True.
+
+        The time between calls starts at ``interval`` and is multiplied by ``backoff``
+        after each call, up to ``max_interval``. Fast operations are detected quickly,
+        and slow operations do not use CPU time polling. Cancellation interrupts the
+        wait between calls immediately.
+
+        Args:
+            predicate: The function to call, such as one that checks whether an
+                acquisition is complete.
+
+            interval: The initial time in seconds between calls.
+
+            backoff: The factor by which the time between calls increases.
+
+            max_interval: The maximum time in seconds between calls.
+
+            timeout: The maximum time in seconds to poll, or None to poll until the RPC
+                is canceled or its deadline expires.
+
+        Raises:
+            grpc.RpcError: With status code CANCELLED or DEADLINE_EXCEEDED.
+            TimeoutError: If the timeout elapses.
+        """
+        timeout_deadline = time.monotonic() + timeout if timeout is not None else None
+        while not predicate():
+            self.raise_if_cancelled()
+            wait_time = interval
+            if timeout_deadline is not None:
+                time_until_timeout = timeout_deadline - time.monotonic()
+                if time_until_timeout <= 0.0:
+                    raise TimeoutError("Timeout expired.")
+                wait_time = min(wait_time, time_until_timeout)
+            self.wait(wait_time)
+            interval = min(interval * backoff, max_interval)
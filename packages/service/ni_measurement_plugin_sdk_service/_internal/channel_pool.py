@@ -0,0 +1,47 @@
+"""gRPC channel pool that applies the configured transport options."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import grpc
+from ni_grpc_extensions.channelpool import GrpcChannelPool
+from ni_grpc_extensions.loggers import ClientLogger
+
+from ni_measurement_plugin_sdk_service import _configuration
+
+
+class _ConfiguredGrpcChannelPool(GrpcChannelPool):
+    """gRPC channel pool that creates channels with additional channel arguments."""
+
+    def __init__(self, options: Sequence[tuple[str, int]]) -> None:
+        super().__init__()
+        self._options = list(options)
+
+    def _create_channel(self, target: str) -> grpc.Channel:
+        options: list[tuple[str, int]] = [
+            ("grpc.max_receive_message_length", -1),
+            ("grpc.max_send_message_length", -1),
+            *self._options,
+        ]
+        if self._is_local(target):
+            options.append(("grpc.enable_http_proxy", 0))
+        channel = grpc.insecure_channel(target, options)
+        if ClientLogger.is_enabled():
+            channel = grpc.intercept_channel(channel, ClientLogger())
+        return channel
+
+
+def create_grpc_channel_pool() -> GrpcChannelPool:
+    """Create a gRPC channel pool that uses the configured gRPC transport options.
+
+    Returns:
+        A gRPC channel pool.
+
+    Raises:
+        ValueError: If the configured gRPC transport options are invalid.
+    """
+    options = _configuration.GRPC_TRANSPORT_OPTIONS.to_client_options()
+    if not options:
+        return GrpcChannelPool()
+    return _ConfiguredGrpcChannelPool(options)
@@ -0,0 +1,67 @@
+"""Concurrent reservation and initialization of sessions."""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import threading
+from collections.abc import Generator
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, ContextManager, TypeVar
+
+_T = TypeVar("_T")
+
+_executor_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+
+
+def submit(function: Callable[..., _T], *args: Any, **kwargs: Any) -> Future[_T]:
+    """Call a function in a worker thread.
+
+    The function runs in a copy of the caller's context, so it can use the measurement
+    context, metrics, and tracing of the current RPC.
+
+    Returns:
+        A future that completes with the function's return value.
+    """
+    context = contextvars.copy_context()
+    return _get_executor().submit(context.run, function, *args, **kwargs)
+
+
+@contextlib.contextmanager
+def enter_concurrently(*context_managers: ContextManager[Any]) -> Generator[tuple[Any, ...]]:
+    """Enter several context managers concurrently.
+
+    Each context manager is entered in a worker thread, so the time to enter all of
+    them is the time to enter the slowest one. When the ``with`` statement exits, the
+    context managers are exited in the calling thread in reverse order, as if they
+    were entered by nested ``with`` statements. If any context manager fails to enter,
+    the ones that were entered are exited and the first exception is raised.
+
+    Yields:
+        A tuple containing the value returned by each context manager's ``__enter__``
+        method.
+    """
+    futures = [submit(context_manager.__enter__) for context_manager in context_managers]
+    with contextlib.ExitStack() as stack:
+        values = []
+        error: BaseException | None = None
+        for context_manager, future in zip(context_managers, futures):
+            try:
+                values.append(future.result())
+            except BaseException as e:
+                if error is None:
+                    error = e
+                continue
+            stack.push(context_manager)
+        if error is not None:
+            raise error
+        yield tuple(values)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(thread_name_prefix="MeasurementPluginSessions")
+        return _executor
@@ -0,0 +1,244 @@
+"""Indexed view of the connections of a session reservation."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from typing import Union
+
+from ni.measurementlink.sessionmanagement.v1.client import (
+    SITE_SYSTEM_PINS,
+    Connection,
+    MultiSessionReservation,
+    SingleSessionReservation,
+)
+
+_Reservation = Union[SingleSessionReservation, MultiSessionReservation]
+_ConnectionsKey = tuple[tuple[str, ...], tuple[int, ...]]
+
+
+class ConnectionIndex:
+    """Looks up the connections of a reservation without searching or validating.
+
+    Measurements on large pin maps look up connections and build channel lists on every
+    call. The index builds a table of the reservation's connections by pin and site
+    once, and it remembers the result of each lookup and channel list, so repeated
+    lookups are dictionary accesses.
+
+    The table is stored with the reservation, so creating another index for the same
+    reservation is cheap. If the measurement service caches reservations, reservations
+    that are reused from the cache share the table.
+    """
+
+    def __init__(self, reservation: _Reservation) -> None:
+        """Initialize the connection index.
+
+        Args:
+            reservation: The reservation whose connections to index.
+        """
+        self._table = _get_connection_table(reservation)
+        self._session_cache = reservation._session_cache
+
+    def get_connection(
+        self, pin_or_relay_name: str, site: int = SITE_SYSTEM_PINS, instrument_type_id: str = ""
+    ) -> Connection:
+        """Get the connection for a pin or relay and site.
+
+        Args:
+            pin_or_relay_name: The pin or relay name.
+
+            site: The site number. System pins are found for any site.
+
+            instrument_type_id: The instrument type ID. Specify this if the pin is
+                connected to several instrument types.
+
+        Returns:
+            The connection, including the session if it has been initialized.
+
+        Raises:
+            ValueError: If no connection or more than one connection matched.
+        """
+        connections = self._table.connections_by_pin_and_site.get((pin_or_relay_name, site))
+        if connections is None:
+            connections = self._table.connections_by_pin_and_site.get(
+                (pin_or_relay_name, SITE_SYSTEM_PINS), []
+            )
+        if instrument_type_id:
+            connections = [
+                connection
+                for connection in connections
+                if connection.session_info.instrument_type_id == instrument_type_id
+            ]
+        if len(connections) != 1:
+            raise ValueError(
+                f"Expected a single reserved connection for pin or relay '{pin_or_relay_name}' "
+                f"and site {site}, got {len(connections)} connections."
+            )
+        return self._with_session(connections[0])
+
+    def get_connections(
+        self,
+        pin_or_relay_names: str | Iterable[str] | None = None,
+        sites: int | Iterable[int] | None = None,
+    ) -> Sequence[Connection]:
+        """Get the connections for pins or relays and sites.
+
+        The connections are sorted by site, then by pin, like the reservation's
+        get_connections() method.
+
+        Args:
+            pin_or_relay_names: The pins, pin groups, relays, or relay groups. By
+                default, this is all reserved pins and relays.
+
+            sites: The site numbers. By default, this is all reserved sites. System pins
+                are included for any site.
+
+        Returns:
+            The connections, including the sessions that have been initialized.
+
+        Raises:
+            ValueError: If a pin or relay does not match any connection.
+        """
+        connections = self._table.get_connections(pin_or_relay_names, sites)
+        return [self._with_session(connection) for connection in connections]
+
+    def get_channel_list(
+        self,
+        session_name: str,
+        pin_or_relay_names: str | Iterable[str] | None = None,
+        sites: int | Iterable[int] | None = None,
+    ) -> str:
+        """Get a comma-separated list of a session's channels for pins or relays and sites.
+
+        Args:
+            session_name: The session name.
+
+            pin_or_relay_names: The pins, pin groups, relays, or relay groups. By
+                default, this is all reserved pins and relays.
+
+            sites: The site numbers. By default, this is all reserved sites.
+
+        Returns:
+            The channel list, such as "0,1", in the same order as get_connections().
+        """
+        return self._table.get_channel_list(session_name, pin_or_relay_names, sites)
+
+    def _with_session(self, connection: Connection) -> Connection:
+        return connection._with_session(
+            self._session_cache.get(connection.session_info.session_name)
+        )
+
+
+def build_connection_table(reservation: _Reservation) -> None:
+    """Build the connection table of a reservation if it does not have one yet.
+
+    Shallow copies of the reservation that are made afterward share the table.
+
+    Args:
+        reservation: The reservation whose connections to index.
+    """
+    _get_connection_table(reservation)
+
+
+def _get_connection_table(reservation: _Reservation) -> _ConnectionTable:
+    table = getattr(reservation, "_connection_table", None)
+    if table is None:
+        table = _ConnectionTable(reservation)
+        setattr(reservation, "_connection_table", table)
+    return table
+
+
+class _ConnectionTable:
+    def __init__(self, reservation: _Reservation) -> None:
+        self.reserved_pin_or_relay_names = tuple(reservation._reserved_pin_or_relay_names)
+        self.reserved_sites = tuple(reservation._reserved_sites)
+        self.group_mappings = {
+            name: tuple(pin_or_relay_names)
+            for name, pin_or_relay_names in reservation._pin_or_relay_group_mappings.items()
+        }
+        self.connections_by_pin_and_site: dict[tuple[str, int], list[Connection]] = {}
+        for connection in reservation._connection_cache.values():
+            self.connections_by_pin_and_site.setdefault(
+                (connection.pin_or_relay_name, connection.site), []
+            ).append(connection)
+        # Lookups only add entries, so they are safe to share between threads.
+        self._connections: dict[_ConnectionsKey, tuple[Connection, ...]] = {}
+        self._channel_lists: dict[tuple[str, _ConnectionsKey], str] = {}
+
+    def get_connections(
+        self,
+        pin_or_relay_names: str | Iterable[str] | None,
+        sites: int | Iterable[int] | None,
+    ) -> tuple[Connection, ...]:
+        key = self._get_key(pin_or_relay_names, sites)
+        connections = self._connections.get(key)
+        if connections is None:
+            connections = self._find_connections(key, validate=pin_or_relay_names is not None)
+            self._connections[key] = connections
+        return connections
+
+    def get_channel_list(
+        self,
+        session_name: str,
+        pin_or_relay_names: str | Iterable[str] | None,
+        sites: int | Iterable[int] | None,
+    ) -> str:
+        key = (session_name, self._get_key(pin_or_relay_names, sites))
+        channel_list = self._channel_lists.get(key)
+        if channel_list is None:
+            channel_list = ",".join(
+                connection.channel_name
+                for connection in self.get_connections(pin_or_relay_names, sites)
+                if connection.session_info.session_name == session_name
+            )
+            self._channel_lists[key] = channel_list
+        return channel_list
+
+    def _get_key(
+        self,
+        pin_or_relay_names: str | Iterable[str] | None,
+        sites: int | Iterable[int] | None,
+    ) -> _ConnectionsKey:
+        if pin_or_relay_names is None:
+            pin_or_relay_names = self.reserved_pin_or_relay_names
+        elif isinstance(pin_or_relay_names, str):
+            pin_or_relay_names = (pin_or_relay_names,)
+        if sites is None:
+            sites = self.reserved_sites
+        elif isinstance(sites, int):
+            sites = (sites,)
+        return tuple(pin_or_relay_names), tuple(sites)
+
+    def _find_connections(self, key: _ConnectionsKey, validate: bool) -> tuple[Connection, ...]:
+        pin_or_relay_names, sites = key
+        resolved_pin_or_relay_names = list(
+            dict.fromkeys(
+                resolved_name
+                for pin_or_relay_name in pin_or_relay_names
+                for resolved_name in self.group_mappings.get(
+                    pin_or_relay_name, (pin_or_relay_name,)
+                )
+            )
+        )
+        if SITE_SYSTEM_PINS not in sites:
+            sites = sites + (SITE_SYSTEM_PINS,)
+        connections: list[Connection] = []
+        matching_pins: set[str] = set()
+        for site in sites:
+            for pin_or_relay_name in resolved_pin_or_relay_names:
+                for connection in self.connections_by_pin_and_site.get(
+                    (pin_or_relay_name, site), ()
+                ):
+                    connections.append(connection)
+                    matching_pins.add(pin_or_relay_name)
+        if validate:
+            unmatched_pins = [
+                pin_or_relay_name
+                for pin_or_relay_name in resolved_pin_or_relay_names
+                if pin_or_relay_name not in matching_pins
+            ]
+            if unmatched_pins:
+                raise ValueError(
+                    "No reserved connections matched pin or relay name(s) "
+                    f"{', '.join(repr(pin) for pin in unmatched_pins)}."
+                )
+        return tuple(connections)
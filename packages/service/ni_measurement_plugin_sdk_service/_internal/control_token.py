@@ -0,0 +1,76 @@
+"""Per-launch token that authorizes control calls from other local processes."""
+
+from __future__ import annotations
+
+import hmac
+import os
+import secrets
+import tempfile
+
+import grpc
+from ni.measurementlink.discovery.v1.client import ServiceInfo
+
+from ni_measurement_plugin_sdk_service._annotations import SERVICE_CONTROL_TOKEN_PATH_KEY
+from ni_measurement_plugin_sdk_service._grpc_metadata import CONTROL_TOKEN_KEY
+
+
+class ControlToken:
+    """A random token stored in a file that only the current user can read.
+
+    Control services, such as handover and on-demand profiling, require callers to
+    send the token in the call metadata. The service advertises the path of the
+    token file through the discovery service, so only processes that run as the
+    same user can call them.
+    """
+
+    def __init__(self) -> None:
+        """Create the token and write it to a new file."""
+        self._value = secrets.token_hex(32)
+        # mkstemp creates the file with permissions for the current user only.
+        fd, self._path = tempfile.mkstemp(prefix="ni-measurement-", suffix=".token")
+        with os.fdopen(fd, "w") as file:
+            file.write(self._value)
+
+    @property
+    def path(self) -> str:
+        """The path of the token file."""
+        return self._path
+
+    def is_authorized(self, context: grpc.ServicerContext) -> bool:
+        """Determine whether the call's metadata contains the token."""
+        for key, value in context.invocation_metadata() or ():
+            if key == CONTROL_TOKEN_KEY and isinstance(value, str):
+                return hmac.compare_digest(value, self._value)
+        return False
+
+    def close(self) -> None:
+        """Delete the token file."""
+        try:
+            os.remove(self._path)
+        except FileNotFoundError:
+            pass
+
+
+def read_control_token(service_info: ServiceInfo) -> str:
+    """Read the control token of a running measurement service.
+
+    Args:
+        service_info: Information about the service from the discovery service.
+
+    Returns:
+        The token, or an empty string if the service does not have one or the
+        current user cannot read it.
+    """
+    path = service_info.annotations.get(SERVICE_CONTROL_TOKEN_PATH_KEY, "")
+    if not path:
+        return ""
+    try:
+        with open(path) as file:
+            return file.read().strip()
+    except OSError:
+        return ""
+
+
+def create_control_metadata(token: str) -> tuple[tuple[str, str], ...]:
+    """Create the gRPC metadata for a control call."""
+    return ((CONTROL_TOKEN_KEY, token),) if token else ()
@@ -0,0 +1,200 @@
+"""Timing instrumentation for driver sessions used by measure functions."""
+
+from __future__ import annotations
+
+import enum
+import functools
+import time
+from collections.abc import Iterator
+from types import TracebackType
+from typing import Any, Callable
+
+from ni_measurement_plugin_sdk_service._internal.metrics import add_driver_call_time
+from ni_measurement_plugin_sdk_service._internal.tracing import (
+    is_tracing_enabled,
+    start_span,
+)
+
+
+def get_driver_name(session: object) -> str:
+    """Get the name of the driver that implements a session, such as "nidcpower"."""
+    return type(session).__module__.partition(".")[0]
+
+
+def instrument_session(session: Any) -> Any:
+    """Wrap a driver session to record the number and duration of its driver calls.
+
+    Method calls, attribute reads, and attribute writes are recorded in the metrics of
+    the current RPC. If tracing is enabled, method calls are also recorded as spans.
+    Objects that the session returns from the same driver package, such as repeated
+    capabilities and channel collections, are instrumented as well.
+
+    The wrapper passes ``isinstance`` checks for the session's type, so it can be cached
+    by the session reservation and returned by ``get_connection``.
+    """
+    if isinstance(session, InstrumentedSession):
+        return session
+    return InstrumentedSession(session, get_driver_name(session), "")
+
+
+class InstrumentedSession:
+    """Forwards attribute accesses and method calls to a driver object and times them."""
+
+    __slots__ = ("_wrapped", "_driver", "_path")
+
+    def __init__(self, wrapped: Any, driver: str, path: str) -> None:
+        """Initialize the instrumented session.
+
+        Args:
+            wrapped: The driver object to forward to.
+
+            driver: The name of the driver package, such as "nidcpower".
+
+            path: The attribute path of the wrapped object relative to the session,
+                such as "channels[]". This is used to name operations.
+        """
+        object.__setattr__(self, "_wrapped", wrapped)
+        object.__setattr__(self, "_driver", driver)
+        object.__setattr__(self, "_path", path)
+
+    @property  # type: ignore[misc]
+    def __class__(self) -> type:
+        """The type of the wrapped object, so that ``isinstance`` checks pass."""
+        return type(self._wrapped)
+
+    def __getattr__(self, name: str) -> Any:
+        """Get an attribute of the wrapped object, timing attribute reads."""
+        if name.startswith("_"):
+            return getattr(self._wrapped, name)
+        operation = self._operation_name(name)
+        start_time = time.perf_counter()
+        value = getattr(self._wrapped, name)
+        duration = time.perf_counter() - start_time
+        if callable(value):
+            return self._wrap_method(value, operation)
+        if self._is_driver_object(value):
+            return InstrumentedSession(value, self._driver, operation)
+        add_driver_call_time(self._driver, f"get {operation}", duration)
+        return value
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Set an attribute of the wrapped object and time it."""
+        if name.startswith("_"):
+            setattr(self._wrapped, name, value)
+            return
+        start_time = time.perf_counter()
+        try:
+            setattr(self._wrapped, name, value)
+        finally:
+            add_driver_call_time(
+                self._driver, f"set {self._operation_name(name)}", time.perf_counter() - start_time
+            )
+
+    # Python looks up special methods on the type, so __getattr__ does not forward
+    # them. Forward the container, comparison, and context-manager protocols here.
+    def __getitem__(self, key: Any) -> Any:
+        """Index the wrapped object, such as ``session.channels["0"]``."""
+        return self._instrument_item(self._wrapped[key])
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        """Set an item of the wrapped object."""
+        self._wrapped[key] = _unwrap(value)
+
+    def __delitem__(self, key: Any) -> None:
+        """Delete an item of the wrapped object."""
+        del self._wrapped[key]
+
+    def __len__(self) -> int:
+        """Return the length of the wrapped object."""
+        return len(self._wrapped)
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate over the wrapped object, instrumenting the driver objects it yields."""
+        return map(self._instrument_item, self._wrapped)
+
+    def __contains__(self, value: Any) -> bool:
+        """Determine whether the wrapped object contains a value."""
+        return _unwrap(value) in self._wrapped
+
+    def __bool__(self) -> bool:
+        """Return the truth value of the wrapped object."""
+        return bool(self._wrapped)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the wrapped object with another object or instrumented session."""
+        return bool(self._wrapped == _unwrap(other))
+
+    def __ne__(self, other: object) -> bool:
+        """Compare the wrapped object with another object or instrumented session."""
+        return bool(self._wrapped != _unwrap(other))
+
+    def __hash__(self) -> int:
+        """Return the hash of the wrapped object."""
+        return hash(self._wrapped)
+
+    def __enter__(self) -> Any:
+        """Enter the wrapped object's context and return this wrapper instead of it."""
+        value = self._wrapped.__enter__()
+        return self if value is self._wrapped else value
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> Any:
+        """Exit the wrapped object's context."""
+        return self._wrapped.__exit__(exc_type, exc_val, traceback)
+
+    def __repr__(self) -> str:
+        """Return the representation of the wrapped object."""
+        return repr(self._wrapped)
+
+    def __str__(self) -> str:
+        """Return the string representation of the wrapped object."""
+        return str(self._wrapped)
+
+    def _operation_name(self, name: str) -> str:
+        return f"{self._path}.{name}" if self._path else name
+
+    def _instrument_item(self, value: Any) -> Any:
+        if self._is_driver_object(value):
+            return InstrumentedSession(value, self._driver, f"{self._path}[]")
+        return value
+
+    def _is_driver_object(self, value: Any) -> bool:
+        return (
+            value is not None
+            and get_driver_name(value) == self._driver
+            and not isinstance(value, enum.Enum)
+        )
+
+    def _wrap_method(self, method: Callable[..., Any], operation: str) -> Callable[..., Any]:
+        driver = self._driver
+
+        @functools.wraps(method)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if is_tracing_enabled():
+                with start_span("driver_call", driver=driver, operation=operation):
+                    return _call(driver, operation, method, args, kwargs)
+            return _call(driver, operation, method, args, kwargs)
+
+        return wrapper
+
+
+def _unwrap(value: Any) -> Any:
+    return value._wrapped if type(value) is InstrumentedSession else value
+
+
+def _call(
+    driver: str,
+    operation: str,
+    method: Callable[..., Any],
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> Any:
+    start_time = time.perf_counter()
+    try:
+        return method(*args, **kwargs)
+    finally:
+        add_driver_call_time(driver, operation, time.perf_counter() - start_time)
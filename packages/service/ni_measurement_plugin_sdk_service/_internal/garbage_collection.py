@@ -0,0 +1,207 @@
+"""Garbage collection management and instrumentation for measurement services."""
+
+from __future__ import annotations
+
+import gc
+import logging
+import threading
+import time
+from typing import Any, Callable
+
+import grpc
+
+from ni_measurement_plugin_sdk_service._internal.metrics import (
+    MetricsRegistry,
+    add_phase_time,
+)
+
+_logger = logging.getLogger(__name__)
+
+
+class GarbageCollectionMonitor:
+    """Records the duration of garbage collection pauses using gc.callbacks.
+
+    Pauses that occur during an RPC are also added to the RPC's "gc" phase.
+    """
+
+    def __init__(self, registry: MetricsRegistry) -> None:
+        """Initialize the garbage collection monitor.
+
+        Args:
+            registry: The registry to record the metrics in.
+        """
+        self._registry = registry
+        self._start_time = 0.0
+        registry.describe(
+            "gc_pause_seconds", "histogram", "Garbage collection pauses by generation."
+        )
+
+    def start(self) -> None:
+        """Start recording garbage collection pauses."""
+        if self._callback not in gc.callbacks:
+            gc.callbacks.append(self._callback)
+
+    def stop(self) -> None:
+        """Stop recording garbage collection pauses."""
+        if self._callback in gc.callbacks:
+            gc.callbacks.remove(self._callback)
+
+    def _callback(self, phase: str, info: dict[str, int]) -> None:
+        # The garbage collector holds the GIL, so collections do not overlap.
+        if phase == "start":
+            self._start_time = time.perf_counter()
+            return
+        duration = time.perf_counter() - self._start_time
+        self._registry.observe(
+            "gc_pause_seconds", (("generation", str(info["generation"])),), duration
+        )
+        add_phase_time("gc", duration)
+
+
+class GarbageCollectionManager(grpc.ServerInterceptor):
+    """Server interceptor that defers garbage collection while measurement calls are active.
+
+    Automatic collection is disabled while any measurement call is active. After the
+    last active call completes, a background thread collects the young generations
+    if no other call has started, and a full collection runs at most once per
+    ``full_collection_interval``. If a call runs for a long time or calls keep
+    overlapping, the background thread collects the young generations every
+    ``max_deferral`` seconds until no calls are active.
+    """
+
+    def __init__(self, full_collection_interval: float = 60.0, max_deferral: float = 10.0) -> None:
+        """Initialize the garbage collection manager.
+
+        Args:
+            full_collection_interval: The minimum time in seconds between full
+                collections.
+
+            max_deferral: The maximum time in seconds to defer collection while
+                calls are active.
+        """
+        self._full_collection_interval = full_collection_interval
+        self._max_deferral = max_deferral
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._active_calls = 0
+        self._was_enabled = True
+        self._last_full_collection_time = time.monotonic()
+        self._pending_generation: int | None = None
+        self._deferral_deadline = 0.0
+        self._collector_thread: threading.Thread | None = None
+
+    def freeze(self) -> None:
+        """Move the objects that exist after startup to the permanent generation.
+
+        Service descriptors, metadata, and codecs live as long as the service, so
+        there is no need for the garbage collector to scan them again.
+        """
+        gc.collect()
+        gc.freeze()
+        _logger.debug("Froze %d objects after startup.", gc.get_freeze_count())
+
+    def close(self) -> None:
+        """Re-enable automatic garbage collection if calls are still active."""
+        with self._condition:
+            if self._active_calls > 0 and self._was_enabled:
+                gc.enable()
+            self._active_calls = 0
+            self._pending_generation = None
+            self._collector_thread = None
+            self._condition.notify_all()
+
+    def intercept_service(
+        self,
+        continuation: Callable[[grpc.HandlerCallDetails], grpc.RpcMethodHandler | None],
+        handler_call_details: grpc.HandlerCallDetails,
+    ) -> grpc.RpcMethodHandler | None:
+        """Wrap measurement call handlers to defer garbage collection."""
+        handler = continuation(handler_call_details)
+        if handler is None or not handler_call_details.method.endswith("/Measure"):
+            return handler
+        if handler.unary_unary is not None:
+            return grpc.unary_unary_rpc_method_handler(
+                self._wrap(handler.unary_unary),
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer,
+            )
+        if handler.unary_stream is not None:
+            return grpc.unary_stream_rpc_method_handler(
+                self._wrap(handler.unary_stream),
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer,
+            )
+        return handler
+
+    def _start_call(self) -> None:
+        with self._condition:
+            if self._active_calls == 0:
+                self._was_enabled = gc.isenabled()
+                gc.disable()
+                self._deferral_deadline = time.monotonic() + self._max_deferral
+                if self._collector_thread is None:
+                    self._collector_thread = threading.Thread(
+                        target=self._run_collector, name="MeasurementGarbageCollector", daemon=True
+                    )
+                    self._collector_thread.start()
+                self._condition.notify_all()
+            self._active_calls += 1
+
+    def _complete_call(self) -> None:
+        # This runs in gRPC's RPC completion callback, so it only schedules the
+        # collection for the collector thread.
+        with self._condition:
+            if self._active_calls == 0:
+                return  # closed
+            self._active_calls -= 1
+            if self._active_calls > 0:
+                return
+            now = time.monotonic()
+            if now - self._last_full_collection_time >= self._full_collection_interval:
+                generation = 2
+                self._last_full_collection_time = now
+            else:
+                generation = 1
+            self._pending_generation = max(self._pending_generation or 0, generation)
+            if self._was_enabled:
+                gc.enable()
+            self._condition.notify_all()
+
+    def _run_collector(self) -> None:
+        while True:
+            with self._condition:
+                generation = self._wait_for_collection()
+                if generation is None:
+                    return  # closed
+            # Collect outside the lock, so that new calls do not wait for the collection.
+            gc.collect(generation)
+
+    def _wait_for_collection(self) -> int | None:
+        # The caller must hold the lock.
+        while threading.current_thread() is self._collector_thread:
+            if self._active_calls == 0:
+                if self._pending_generation is not None:
+                    generation = self._pending_generation
+                    self._pending_generation = None
+                    return generation
+                self._condition.wait()
+                continue
+            # Collect the young generations periodically while calls are active. Pending
+            # collections wait until no calls are active.
+            timeout = self._deferral_deadline - time.monotonic()
+            if timeout <= 0.0:
+                self._deferral_deadline = time.monotonic() + self._max_deferral
+                return 1
+            self._condition.wait(timeout)
+        return None
+
+    def _wrap(self, behavior: Callable[[Any, grpc.ServicerContext], Any]) -> Callable:
+        def wrapper(request: Any, context: grpc.ServicerContext) -> Any:
+            self._start_call()
+            # Collect after the RPC completes, so that collection does not delay the
+            # response.
+            if not context.add_callback(self._complete_call):
+                self._complete_call()
+            return behavior(request, context)
+
+        return wrapper
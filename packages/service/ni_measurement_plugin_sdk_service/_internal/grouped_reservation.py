@@ -0,0 +1,232 @@
+"""Reservations of several groups of pins or relays in a single request."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any
+
+import session_pb2
+from ni.measurementlink.sessionmanagement.v1 import session_management_service_pb2
+from ni.measurementlink.sessionmanagement.v1.client import (
+    MultiplexerSessionInformation,
+    MultiSessionReservation,
+    PinMapContext,
+    SessionInformation,
+    SessionManagementClient,
+)
+
+
+class GroupedReservation(MultiSessionReservation):
+    """Manages sessions that were reserved together for several groups of pins or relays.
+
+    The reservation can be used like any other multi-session reservation. In addition,
+    :any:`groups` provides a reservation for each group that contains only the sessions
+    that are connected to the group's pins or relays. The grouped reservation and its
+    groups share their sessions, so a session that is initialized through one of them
+    is returned by the connections of all of them. Unreserving the grouped reservation
+    unreserves the sessions of all groups.
+    """
+
+    def __init__(
+        self,
+        session_management_client: SessionManagementClient,
+        reservation: MultiSessionReservation,
+        pin_or_relay_groups: Mapping[str, Sequence[str]],
+        reserved_sites: Iterable[int] | None = None,
+    ) -> None:
+        """Initialize the grouped reservation.
+
+        Args:
+            session_management_client: The session management client that reserved the
+                sessions.
+
+            reservation: The reservation of the pins or relays of all groups.
+
+            pin_or_relay_groups: The pins or relays that were reserved for each group.
+
+            reserved_sites: The sites that were reserved, or None for all sites.
+        """
+        reserved_pin_or_relay_names = _get_unique_names(pin_or_relay_groups.values())
+        group_mappings = _get_pin_or_relay_group_mappings(reservation, reserved_pin_or_relay_names)
+        session_infos = [_to_grpc_session_info(info) for info in reservation.session_info]
+        multiplexer_session_infos = [
+            _to_grpc_multiplexer_session_info(info) for info in reservation.multiplexer_session_info
+        ]
+        super().__init__(
+            session_management_client=session_management_client,
+            session_info=session_infos,
+            multiplexer_session_info=multiplexer_session_infos,
+            pin_or_relay_group_mappings=group_mappings,
+            reserved_pin_or_relay_names=reserved_pin_or_relay_names,
+            reserved_sites=reserved_sites,
+        )
+        self._reservation = reservation
+        self._groups = {
+            name: _GroupReservation(
+                self,
+                session_management_client=session_management_client,
+                session_info=_get_connected_session_infos(
+                    session_infos, self._get_resolved_pin_or_relay_names(pin_or_relay_names)
+                ),
+                multiplexer_session_info=multiplexer_session_infos,
+                pin_or_relay_group_mappings=group_mappings,
+                reserved_pin_or_relay_names=pin_or_relay_names,
+                reserved_sites=reserved_sites,
+            )
+            for name, pin_or_relay_names in pin_or_relay_groups.items()
+        }
+
+    @property
+    def groups(self) -> Mapping[str, MultiSessionReservation]:
+        """The reservation of each group of pins or relays, indexed by group name.
+
+        Each group's reservation contains the sessions that are connected to the
+        group's pins or relays. A session that is connected to several groups is
+        included in each of their reservations. Initialize it through only one of them;
+        initializing it again through another group raises RuntimeError. Group
+        reservations cannot be unreserved separately.
+        """
+        return self._groups
+
+    def unreserve(self) -> None:
+        """Unreserve the sessions of all groups."""
+        self._reservation.unreserve()
+
+
+class _GroupReservation(MultiSessionReservation):
+    def __init__(self, grouped_reservation: GroupedReservation, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        # Share the sessions with the grouped reservation and the other groups, so that
+        # a session that is connected to several groups is initialized only once.
+        self._session_cache = grouped_reservation._session_cache
+        self._multiplexer_session_container = grouped_reservation._multiplexer_session_container
+
+    def unreserve(self) -> None:
+        """Raise an error. Unreserve the grouped reservation instead."""
+        raise RuntimeError(
+            "The sessions of a group cannot be unreserved separately. Unreserve the grouped "
+            "reservation instead."
+        )
+
+
+def reserve_grouped_sessions(
+    session_management_client: SessionManagementClient,
+    context: PinMapContext,
+    pin_or_relay_groups: Mapping[str, str | Iterable[str]],
+    timeout: float | None = 0.0,
+) -> GroupedReservation:
+    """Reserve the sessions for several groups of pins or relays in a single request.
+
+    Reserving all of the sessions in one request avoids the round trip of each
+    additional request, and it avoids deadlocks between measurements that reserve the
+    same sessions in different orders.
+
+    Args:
+        session_management_client: The session management client.
+
+        context: The pin map context.
+
+        pin_or_relay_groups: The pins, pin groups, relays, or relay groups to reserve,
+            indexed by group name.
+
+        timeout: Timeout in seconds.
+
+    Returns:
+        The grouped reservation.
+    """
+    groups = {
+        name: (
+            [pin_or_relay_names]
+            if isinstance(pin_or_relay_names, str)
+            else list(pin_or_relay_names)
+        )
+        for name, pin_or_relay_names in pin_or_relay_groups.items()
+    }
+    for name, pin_or_relay_names in groups.items():
+        if not pin_or_relay_names:
+            raise ValueError(f"You must specify at least one pin or relay name for '{name}'.")
+    reservation = session_management_client.reserve_sessions(
+        context=context,
+        pin_or_relay_names=_get_unique_names(groups.values()),
+        timeout=timeout,
+    )
+    return GroupedReservation(session_management_client, reservation, groups, context.sites)
+
+
+def _get_unique_names(pin_or_relay_groups: Iterable[Sequence[str]]) -> list[str]:
+    return list(
+        dict.fromkeys(
+            pin_or_relay_name
+            for pin_or_relay_names in pin_or_relay_groups
+            for pin_or_relay_name in pin_or_relay_names
+        )
+    )
+
+
+def _get_connected_session_infos(
+    session_infos: Sequence[session_management_service_pb2.SessionInformation],
+    pin_or_relay_names: Iterable[str],
+) -> list[session_management_service_pb2.SessionInformation]:
+    pin_or_relay_names = set(pin_or_relay_names)
+    return [
+        session_info
+        for session_info in session_infos
+        if any(
+            channel_mapping.pin_or_relay_name in pin_or_relay_names
+            for channel_mapping in session_info.channel_mappings
+        )
+    ]
+
+
+def _get_pin_or_relay_group_mappings(
+    reservation: MultiSessionReservation, pin_or_relay_names: Iterable[str]
+) -> dict[str, list[str]]:
+    # The reservation resolves pin groups and relay groups to the pins or relays that
+    # they contain.
+    group_mappings: dict[str, list[str]] = {}
+    for pin_or_relay_name in pin_or_relay_names:
+        try:
+            connections = reservation.get_connections(object, pin_or_relay_names=pin_or_relay_name)
+        except ValueError:
+            continue  # not connected
+        resolved_names = list(
+            dict.fromkeys(connection.pin_or_relay_name for connection in connections)
+        )
+        if resolved_names != [pin_or_relay_name]:
+            group_mappings[pin_or_relay_name] = resolved_names
+    return group_mappings
+
+
+def _to_grpc_session_info(
+    session_info: SessionInformation,
+) -> session_management_service_pb2.SessionInformation:
+    return session_management_service_pb2.SessionInformation(
+        session=session_pb2.Session(name=session_info.session_name),
+        resource_name=session_info.resource_name,
+        channel_list=session_info.channel_list,
+        instrument_type_id=session_info.instrument_type_id,
+        session_exists=session_info.session_exists,
+        channel_mappings=[
+            session_management_service_pb2.ChannelMapping(
+                pin_or_relay_name=channel_mapping.pin_or_relay_name,
+                site=channel_mapping.site,
+                channel=channel_mapping.channel,
+                multiplexer_resource_name=channel_mapping.multiplexer_resource_name,
+                multiplexer_route=channel_mapping.multiplexer_route,
+            )
+            for channel_mapping in session_info.channel_mappings
+        ],
+        annotations=session_info.annotations or {},
+    )
+
+
+def _to_grpc_multiplexer_session_info(
+    multiplexer_session_info: MultiplexerSessionInformation,
+) -> session_management_service_pb2.MultiplexerSessionInformation:
+    return session_management_service_pb2.MultiplexerSessionInformation(
+        session=session_pb2.Session(name=multiplexer_session_info.session_name),
+        resource_name=multiplexer_session_info.resource_name,
+        multiplexer_type_id=multiplexer_session_info.multiplexer_type_id,
+        session_exists=multiplexer_session_info.session_exists,
+        annotations=multiplexer_session_info.annotations or {},
+    )
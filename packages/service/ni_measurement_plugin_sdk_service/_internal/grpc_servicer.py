@@ -5,7 +5,10 @@ from __future__ import annotations
 import collections.abc
 import contextlib
 import inspect
+import logging
 import pathlib
+import threading
+import time
 import warnings
 import weakref
 from collections.abc import Generator
@@ -25,12 +28,40 @@ from ni.measurementlink.measurement.v2 import (
 )
 from ni.measurementlink.sessionmanagement.v1.client import PinMapContext
 
+from ni_measurement_plugin_sdk_service._grpc_metadata import (
+    ACCEPT_SHARED_MEMORY_KEY,
+    PRIORITY_KEY,
+    RETRY_PUSHBACK_MS_KEY,
+)
+from ni_measurement_plugin_sdk_service._internal.admission import (
+    AdmissionController,
+    AdmissionRejectedError,
+)
+from ni_measurement_plugin_sdk_service._internal.cancellation import CancellationToken
+from ni_measurement_plugin_sdk_service._internal.metrics import (
+    add_phase_time,
+    get_current_registry,
+    phase_timer,
+)
 from ni_measurement_plugin_sdk_service._internal.parameter import decoder, encoder
 from ni_measurement_plugin_sdk_service._internal.parameter.metadata import (
     ParameterMetadata,
 )
+from ni_measurement_plugin_sdk_service._internal.shared_memory import (
+    SharedMemoryWriter,
+    is_local_peer,
+)
+from ni_measurement_plugin_sdk_service._internal.tracing import (
+    get_traceparent,
+    start_span,
+)
 from ni_measurement_plugin_sdk_service.measurement import WrongMessageTypeWarning
-from ni_measurement_plugin_sdk_service.measurement.info import MeasurementInfo
+from ni_measurement_plugin_sdk_service.measurement.info import (
+    MeasurementInfo,
+    MeasurementPriority,
+)
+
+_logger = logging.getLogger(__name__)
 
 
 class MeasurementServiceContext:
@@ -41,12 +72,18 @@ class MeasurementServiceContext:
         grpc_context: grpc.ServicerContext,
         pin_map_context: PinMapContext,
         owner: weakref.ReferenceType[object] | None,
+        queue_wait_time: float = 0.0,
+        priority: MeasurementPriority = MeasurementPriority.NORMAL,
     ) -> None:
         """Initialize the measurement service context."""
         self._grpc_context = grpc_context
         self._pin_map_context = pin_map_context
         self._is_complete = False
         self._owner = owner
+        self._queue_wait_time = queue_wait_time
+        self._priority = priority
+        self._cancellation_token_lock = threading.Lock()
+        self._cancellation_token: CancellationToken | None = None
 
     def mark_complete(self) -> None:
         """Mark the current RPC as complete."""
@@ -69,6 +106,16 @@ class MeasurementServiceContext:
         """Get the pin map context for the RPC."""
         return self._pin_map_context
 
+    @property
+    def queue_wait_time(self) -> float:
+        """The time in seconds that the RPC waited for admission before it started executing."""
+        return self._queue_wait_time
+
+    @property
+    def priority(self) -> MeasurementPriority:
+        """The scheduling priority of the RPC."""
+        return self._priority
+
     def add_cancel_callback(self, cancel_callback: Callable[[], None]) -> None:
         """Add a callback that is invoked when the RPC is canceled."""
 
@@ -83,6 +130,15 @@ class MeasurementServiceContext:
         if not self._is_complete:
             self._grpc_context.cancel()
 
+    @property
+    def cancellation_token(self) -> CancellationToken:
+        """Get a token that reports when the RPC is canceled or its deadline expires."""
+        with self._cancellation_token_lock:
+            if self._cancellation_token is None:
+                self._cancellation_token = CancellationToken(self.time_remaining, self.abort)
+                self.add_cancel_callback(self._cancellation_token.cancel)
+            return self._cancellation_token
+
     @property
     def time_remaining(self) -> float:
         """Get the time remaining for the RPC."""
@@ -140,11 +196,17 @@ def _get_mapping_by_parameter_name(
 def _serialize_outputs(
     output_metadata: dict[int, ParameterMetadata], outputs: Any, service_name: str
 ) -> any_pb2.Any:
+    return any_pb2.Any(
+        value=_encode_outputs(output_metadata, outputs, service_name),
+        type_url="type.googleapis.com/" + service_name,
+    )
+
+
+def _encode_outputs(
+    output_metadata: dict[int, ParameterMetadata], outputs: Any, service_name: str
+) -> bytes:
     if isinstance(outputs, collections.abc.Sequence):
-        return any_pb2.Any(
-            value=encoder.serialize_parameters(output_metadata, outputs, service_name),
-            type_url="type.googleapis.com/" + service_name,
-        )
+        return encoder.serialize_parameters(output_metadata, outputs, service_name)
     elif outputs is None:
         raise ValueError(f"Measurement function returned None")
     else:
@@ -153,6 +215,68 @@ def _serialize_outputs(
         )
 
 
+def _get_priority(context: grpc.ServicerContext) -> MeasurementPriority:
+    """Get the scheduling priority from the RPC's invocation metadata."""
+    for key, value in context.invocation_metadata() or ():
+        if key == PRIORITY_KEY:
+            assert isinstance(value, str)
+            try:
+                if value.isdigit():
+                    return MeasurementPriority(int(value))
+                return MeasurementPriority[value.upper()]
+            except (KeyError, ValueError):
+                _logger.warning("Ignoring invalid measurement priority %r.", value)
+    return MeasurementPriority.NORMAL
+
+
+def _accepts_shared_memory(context: grpc.ServicerContext) -> bool:
+    """Determine whether the client is local and accepts outputs in shared memory."""
+    for key, value in context.invocation_metadata() or ():
+        if key == ACCEPT_SHARED_MEMORY_KEY and value == "1":
+            return is_local_peer(context.peer())
+    return False
+
+
+@contextlib.contextmanager
+def _admit_measure_call(
+    admission_controller: AdmissionController | None,
+    context: grpc.ServicerContext,
+    priority: MeasurementPriority = MeasurementPriority.NORMAL,
+) -> Generator[float]:
+    """Wait for admission and yield the queue wait time, or abort the RPC if overloaded."""
+    registry = get_current_registry()
+    priority_labels = (("priority", priority.name),)
+    if admission_controller is None:
+        if registry is not None:
+            registry.observe("measure_queue_wait_seconds", priority_labels, 0.0)
+        yield 0.0
+        return
+
+    with contextlib.ExitStack() as stack:
+        try:
+            queue_wait_time = stack.enter_context(
+                admission_controller.admit(context.time_remaining(), priority)
+            )
+        except AdmissionRejectedError as e:
+            if registry is not None:
+                registry.increment("measure_calls_rejected_total", priority_labels)
+            retry_after_ms = max(1, round(e.retry_after * 1000))
+            context.set_trailing_metadata(((RETRY_PUSHBACK_MS_KEY, str(retry_after_ms)),))
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+        if registry is not None:
+            registry.observe("measure_queue_wait_seconds", priority_labels, queue_wait_time)
+        start_time = time.perf_counter()
+        try:
+            yield queue_wait_time
+        finally:
+            _logger.debug(
+                "Measure call with %s priority waited %.3f s in the queue and executed for %.3f s.",
+                priority.name,
+                queue_wait_time,
+                time.perf_counter() - start_time,
+            )
+
+
 def frame_metadata_dict(
     parameter_list: list[ParameterMetadata],
 ) -> dict[int, ParameterMetadata]:
@@ -174,6 +298,7 @@ class MeasurementServiceServicerV1(v1_measurement_service_pb2_grpc.MeasurementSe
         measure_function: Callable,
         owner: object,
         service_info: ServiceInfo,
+        admission_controller: AdmissionController | None = None,
     ) -> None:
         """Initialize the measurement v1 servicer."""
         super().__init__()
@@ -185,6 +310,7 @@ class MeasurementServiceServicerV1(v1_measurement_service_pb2_grpc.MeasurementSe
         self._service_info = service_info
         self._configuration_parameters_message_type = service_info.service_class + ".Configurations"
         self._outputs_message_type = service_info.service_class + ".Outputs"
+        self._admission_controller = admission_controller
 
     def GetMetadata(  # noqa: N802 - function name should be lowercase
         self, request: v1_measurement_service_pb2.GetMetadataRequest, context: grpc.ServicerContext
@@ -240,44 +366,64 @@ class MeasurementServiceServicerV1(v1_measurement_service_pb2_grpc.MeasurementSe
         self, request: v1_measurement_service_pb2.MeasureRequest, context: grpc.ServicerContext
     ) -> v1_measurement_service_pb2.MeasureResponse:
         """RPC API that executes the registered measurement method."""
-        self._validate_parameters(request)
-        mapping_by_id = decoder.deserialize_parameters(
-            self._configuration_metadata,
-            request.configuration_parameters.value,
-            self._configuration_parameters_message_type,
-        )
-        mapping_by_variable_name = _get_mapping_by_parameter_name(
-            mapping_by_id, self._measure_function
-        )
-        pin_map_context = PinMapContext._from_grpc(request.pin_map_context)
-        token = measurement_service_context.set(
-            MeasurementServiceContext(context, pin_map_context, self._owner)
-        )
-        try:
-            return_value = self._measure_function(**mapping_by_variable_name)
-            if isinstance(return_value, collections.abc.Generator):
-                with contextlib.closing(return_value) as output_iter:
-                    outputs = None
-                    try:
-                        while True:
-                            outputs = next(output_iter)
-                    except StopIteration as e:
-                        if e.value is not None:
-                            outputs = e.value
-                    return self._serialize_response(outputs)
-            else:
-                return self._serialize_response(return_value)
-        finally:
-            measurement_service_context.get().mark_complete()
-            measurement_service_context.reset(token)
+        priority = _get_priority(context)
+        with start_span(
+            "Measure",
+            get_traceparent(context.invocation_metadata()),
+            kind="server",
+            priority=priority.name,
+        ) as measure_span, _admit_measure_call(
+            self._admission_controller, context, priority
+        ) as queue_wait_time:
+            add_phase_time("queue", queue_wait_time)
+            measure_span.set_attribute("queue_wait_time", queue_wait_time)
+            self._validate_parameters(request)
+            with phase_timer("decode"), start_span("decode"):
+                mapping_by_id = decoder.deserialize_parameters(
+                    self._configuration_metadata,
+                    request.configuration_parameters.value,
+                    self._configuration_parameters_message_type,
+                )
+            with start_span("bind_arguments"):
+                mapping_by_variable_name = _get_mapping_by_parameter_name(
+                    mapping_by_id, self._measure_function
+                )
+            pin_map_context = PinMapContext._from_grpc(request.pin_map_context)
+            token = measurement_service_context.set(
+                MeasurementServiceContext(
+                    context, pin_map_context, self._owner, queue_wait_time, priority
+                )
+            )
+            try:
+                with phase_timer("measure"), start_span("measure"):
+                    return_value = self._measure_function(**mapping_by_variable_name)
+                if isinstance(return_value, collections.abc.Generator):
+                    with contextlib.closing(return_value) as output_iter:
+                        outputs = None
+                        try:
+                            while True:
+                                with phase_timer("measure"), start_span("yield"):
+                                    outputs = next(output_iter)
+                        except StopIteration as e:
+                            if e.value is not None:
+                                outputs = e.value
+                        return self._serialize_response(outputs)
+                else:
+                    return self._serialize_response(return_value)
+            finally:
+                measurement_service_context.get().mark_complete()
+                measurement_service_context.reset(token)
 
     def _serialize_response(
         self,
         outputs: Any,
     ) -> v1_measurement_service_pb2.MeasureResponse:
-        return v1_measurement_service_pb2.MeasureResponse(
-            outputs=_serialize_outputs(self._output_metadata, outputs, self._outputs_message_type)
-        )
+        with phase_timer("encode"), start_span("serialize"):
+            return v1_measurement_service_pb2.MeasureResponse(
+                outputs=_serialize_outputs(
+                    self._output_metadata, outputs, self._outputs_message_type
+                )
+            )
 
     def _validate_parameters(self, request: v1_measurement_service_pb2.MeasureRequest) -> None:
         expected_type = "type.googleapis.com/" + self._configuration_parameters_message_type
@@ -300,6 +446,8 @@ class MeasurementServiceServicerV2(v2_measurement_service_pb2_grpc.MeasurementSe
         measure_function: Callable,
         owner: object,
         service_info: ServiceInfo,
+        admission_controller: AdmissionController | None = None,
+        shared_memory_writer: SharedMemoryWriter | None = None,
     ) -> None:
         """Initialize the measurement v2 servicer."""
         super().__init__()
@@ -311,6 +459,8 @@ class MeasurementServiceServicerV2(v2_measurement_service_pb2_grpc.MeasurementSe
         self._service_info = service_info
         self._configuration_parameters_message_type = service_info.service_class + ".Configurations"
         self._outputs_message_type = service_info.service_class + ".Outputs"
+        self._admission_controller = admission_controller
+        self._shared_memory_writer = shared_memory_writer
 
     def GetMetadata(  # noqa: N802 - function name should be lowercase
         self, request: v2_measurement_service_pb2.GetMetadataRequest, context: grpc.ServicerContext
@@ -369,40 +519,80 @@ class MeasurementServiceServicerV2(v2_measurement_service_pb2_grpc.MeasurementSe
         self, request: v2_measurement_service_pb2.MeasureRequest, context: grpc.ServicerContext
     ) -> Generator[v2_measurement_service_pb2.MeasureResponse]:
         """RPC API that executes the registered measurement method."""
-        self._validate_parameters(request)
-        mapping_by_id = decoder.deserialize_parameters(
-            self._configuration_metadata,
-            request.configuration_parameters.value,
-            self._configuration_parameters_message_type,
-        )
-        mapping_by_variable_name = _get_mapping_by_parameter_name(
-            mapping_by_id, self._measure_function
-        )
-        pin_map_context = PinMapContext._from_grpc(request.pin_map_context)
-        token = measurement_service_context.set(
-            MeasurementServiceContext(context, pin_map_context, self._owner)
-        )
-        try:
-            return_value = self._measure_function(**mapping_by_variable_name)
-            if isinstance(return_value, collections.abc.Generator):
-                with contextlib.closing(return_value) as output_iter:
-                    try:
-                        while True:
-                            outputs = next(output_iter)
-                            yield self._serialize_response(outputs)
-                    except StopIteration as e:
-                        if e.value is not None:
-                            yield self._serialize_response(e.value)
-            else:
-                yield self._serialize_response(return_value)
-        finally:
-            measurement_service_context.get().mark_complete()
-            measurement_service_context.reset(token)
+        priority = _get_priority(context)
+        with start_span(
+            "Measure",
+            get_traceparent(context.invocation_metadata()),
+            kind="server",
+            priority=priority.name,
+        ) as measure_span, _admit_measure_call(
+            self._admission_controller, context, priority
+        ) as queue_wait_time:
+            add_phase_time("queue", queue_wait_time)
+            measure_span.set_attribute("queue_wait_time", queue_wait_time)
+            self._validate_parameters(request)
+            with phase_timer("decode"), start_span("decode"):
+                mapping_by_id = decoder.deserialize_parameters(
+                    self._configuration_metadata,
+                    request.configuration_parameters.value,
+                    self._configuration_parameters_message_type,
+                )
+            with start_span("bind_arguments"):
+                mapping_by_variable_name = _get_mapping_by_parameter_name(
+                    mapping_by_id, self._measure_function
+                )
+            pin_map_context = PinMapContext._from_grpc(request.pin_map_context)
+            shared_memory_writer = (
+                self._shared_memory_writer if _accepts_shared_memory(context) else None
+            )
+            token = measurement_service_context.set(
+                MeasurementServiceContext(
+                    context, pin_map_context, self._owner, queue_wait_time, priority
+                )
+            )
+            try:
+                with phase_timer("measure"), start_span("measure"):
+                    return_value = self._measure_function(**mapping_by_variable_name)
+                if isinstance(return_value, collections.abc.Generator):
+                    with contextlib.closing(return_value) as output_iter:
+                        try:
+                            while True:
+                                with phase_timer("measure"), start_span("yield"):
+                                    outputs = next(output_iter)
+                                yield from self._send_response(outputs, shared_memory_writer)
+                        except StopIteration as e:
+                            if e.value is not None:
+                                yield from self._send_response(e.value, shared_memory_writer)
+                else:
+                    yield from self._send_response(return_value, shared_memory_writer)
+            finally:
+                measurement_service_context.get().mark_complete()
+                measurement_service_context.reset(token)
+
+    def _send_response(
+        self, outputs: Any, shared_memory_writer: SharedMemoryWriter | None
+    ) -> Generator[v2_measurement_service_pb2.MeasureResponse]:
+        response = self._serialize_response(outputs, shared_memory_writer)
+        # gRPC resumes the generator after it sends the response.
+        with start_span("send"):
+            yield response
 
-    def _serialize_response(self, outputs: Any) -> v2_measurement_service_pb2.MeasureResponse:
-        return v2_measurement_service_pb2.MeasureResponse(
-            outputs=_serialize_outputs(self._output_metadata, outputs, self._outputs_message_type)
-        )
+    def _serialize_response(
+        self, outputs: Any, shared_memory_writer: SharedMemoryWriter | None = None
+    ) -> v2_measurement_service_pb2.MeasureResponse:
+        with phase_timer("encode"), start_span("serialize"):
+            if shared_memory_writer is None:
+                serialized_outputs = _serialize_outputs(
+                    self._output_metadata, outputs, self._outputs_message_type
+                )
+            else:
+                # Write the encoded outputs to shared memory without copying them into an
+                # Any message first.
+                serialized_outputs = shared_memory_writer.write(
+                    _encode_outputs(self._output_metadata, outputs, self._outputs_message_type),
+                    "type.googleapis.com/" + self._outputs_message_type,
+                )
+            return v2_measurement_service_pb2.MeasureResponse(outputs=serialized_outputs)
 
     def _validate_parameters(self, request: v2_measurement_service_pb2.MeasureRequest) -> None:
         expected_type = "type.googleapis.com/" + self._configuration_parameters_message_type
@@ -0,0 +1,162 @@
+"""Handover from running instances of a measurement service to a new instance."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections.abc import Collection
+from typing import Callable
+
+import grpc
+from google.protobuf import empty_pb2
+from ni.measurementlink.discovery.v1.client import DiscoveryClient, ServiceInfo
+
+from ni_measurement_plugin_sdk_service._annotations import (
+    SERVICE_ADDRESS_KEY,
+    SERVICE_CONTROL_TOKEN_PATH_KEY,
+)
+from ni_measurement_plugin_sdk_service._internal.control_token import (
+    ControlToken,
+    create_control_metadata,
+    read_control_token,
+)
+from ni_measurement_plugin_sdk_service._internal.service_address import (
+    _get_unix_socket_address,
+    _is_local_host,
+)
+from ni_measurement_plugin_sdk_service._internal.shared_memory import is_local_peer
+
+_logger = logging.getLogger(__name__)
+
+HANDOVER_SERVICE_NAME = "ni.measurementlink.measurement.Handover"
+
+
+class HandoverServicer:
+    """Implements the Drain method, which a new instance calls to replace this one.
+
+    Only clients on the same machine that send the service's control token may call
+    Drain.
+    """
+
+    def __init__(self, drain: Callable[[], None], control_token: ControlToken) -> None:
+        """Initialize the handover servicer.
+
+        Args:
+            drain: A function that unregisters the service, waits for in-flight
+                measurement calls to complete, and stops the service. It is called
+                in a separate thread.
+
+            control_token: The token that callers must send.
+        """
+        self._drain = drain
+        self._control_token = control_token
+        self._drain_thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def add_to_server(self, server: grpc.Server) -> None:
+        """Add the handover service to a gRPC server."""
+        handlers = {
+            "Drain": grpc.unary_unary_rpc_method_handler(
+                self.Drain,
+                request_deserializer=empty_pb2.Empty.FromString,
+                response_serializer=empty_pb2.Empty.SerializeToString,
+            ),
+        }
+        server.add_generic_rpc_handlers(
+            (grpc.method_handlers_generic_handler(HANDOVER_SERVICE_NAME, handlers),)
+        )
+
+    def Drain(  # noqa: N802 - function name should be lowercase
+        self, request: empty_pb2.Empty, context: grpc.ServicerContext
+    ) -> empty_pb2.Empty:
+        """Start draining the service and return immediately."""
+        if not is_local_peer(context.peer()) or not self._control_token.is_authorized(context):
+            context.abort(
+                grpc.StatusCode.PERMISSION_DENIED,
+                "Only clients on the same machine with the service's control token can drain "
+                "the measurement service.",
+            )
+        with self._lock:
+            if self._drain_thread is None:
+                _logger.info("Draining measurement service for handover to %s.", context.peer())
+                self._drain_thread = threading.Thread(
+                    target=self._drain, name="MeasurementServiceDrain", daemon=True
+                )
+                self._drain_thread.start()
+        return empty_pb2.Empty()
+
+
+def request_handover(
+    discovery_client: DiscoveryClient,
+    service_info: ServiceInfo,
+    own_addresses: Collection[str],
+    timeout: float | None = None,
+) -> int:
+    """Ask the other running instances of a measurement service to drain.
+
+    Args:
+        discovery_client: The client for the NI Discovery Service.
+
+        service_info: Information about the new instance, including its control
+            token path annotation.
+
+        own_addresses: The addresses of the new instance, which is not drained.
+
+        timeout: The timeout in seconds for each Drain call.
+
+    Only local instances with the same service class and versions as the new
+    instance, that were started with handover enabled, and whose control token the
+    current user can read, are drained. Instances of other versions of the service
+    keep running.
+
+    Returns:
+        The number of instances that started draining.
+    """
+    own_token_path = service_info.annotations.get(SERVICE_CONTROL_TOKEN_PATH_KEY, "")
+    targets: dict[str, str] = {}
+    for provided_interface in service_info.provided_interfaces:
+        for other_service_info in discovery_client.enumerate_services(provided_interface):
+            if other_service_info.service_class != service_info.service_class or set(
+                other_service_info.versions
+            ) != set(service_info.versions):
+                continue
+            # Each instance has its own control token, so skip the new instance even if
+            # it is registered with an address that is not in own_addresses.
+            if own_token_path and (
+                other_service_info.annotations.get(SERVICE_CONTROL_TOKEN_PATH_KEY) == own_token_path
+            ):
+                continue
+            address = other_service_info.annotations.get(SERVICE_ADDRESS_KEY, "")
+            if not _is_local_host(address.rpartition(":")[0]) and not address.startswith("unix:"):
+                continue
+            # The Unix domain socket path is unique to each process, so prefer it when
+            # instances share a TCP port.
+            target = _get_unix_socket_address(other_service_info) or address
+            if target in own_addresses or target in targets:
+                continue
+            token = read_control_token(other_service_info)
+            if not token:
+                _logger.warning(
+                    "Cannot drain measurement service at %s because it was not started with "
+                    "handover enabled or its control token is not readable.",
+                    target,
+                )
+                continue
+            targets[target] = token
+
+    drained = 0
+    for target, token in targets.items():
+        try:
+            with grpc.insecure_channel(target) as channel:
+                drain = channel.unary_unary(
+                    f"/{HANDOVER_SERVICE_NAME}/Drain",
+                    request_serializer=empty_pb2.Empty.SerializeToString,
+                    response_deserializer=empty_pb2.Empty.FromString,
+                )
+                drain(empty_pb2.Empty(), timeout=timeout, metadata=create_control_metadata(token))
+        except grpc.RpcError as e:
+            _logger.warning("Failed to drain measurement service at %s: %s", target, e.details())
+            continue
+        _logger.info("Measurement service at %s is draining.", target)
+        drained += 1
+    return drained
@@ -0,0 +1,306 @@
+"""gRPC health checking service with load reporting."""
+
+from __future__ import annotations
+
+import enum
+import threading
+import time
+from collections.abc import Generator, Iterable
+from typing import Any, Callable, NamedTuple
+
+import grpc
+from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
+
+from ni_measurement_plugin_sdk_service._grpc_metadata import (
+    LOAD_AVERAGE_LATENCY_MS_KEY,
+    LOAD_IN_FLIGHT_KEY,
+    LOAD_QUEUE_LENGTH_KEY,
+)
+
+HEALTH_SERVICE_NAME = "grpc.health.v1.Health"
+
+
+class ServingStatus(enum.IntEnum):
+    """The serving status of a gRPC service, as defined by grpc.health.v1."""
+
+    UNKNOWN = 0
+    SERVING = 1
+    NOT_SERVING = 2
+    SERVICE_UNKNOWN = 3
+
+
+def _create_health_message_classes() -> tuple[type[Any], type[Any]]:
+    # Build the grpc.health.v1 messages at run time so that hosting the health
+    # service does not require the grpcio-health-checking package. Use a private
+    # descriptor pool to avoid conflicts if that package is also imported.
+    file_descriptor = descriptor_pb2.FileDescriptorProto(
+        name="grpc/health/v1/health.proto", package="grpc.health.v1", syntax="proto3"
+    )
+    request = file_descriptor.message_type.add(name="HealthCheckRequest")
+    request.field.add(
+        name="service",
+        number=1,
+        type=descriptor_pb2.FieldDescriptorProto.TYPE_STRING,
+        label=descriptor_pb2.FieldDescriptorProto.LABEL_OPTIONAL,
+    )
+    response = file_descriptor.message_type.add(name="HealthCheckResponse")
+    serving_status = response.enum_type.add(name="ServingStatus")
+    for status in ServingStatus:
+        serving_status.value.add(name=status.name, number=status.value)
+    response.field.add(
+        name="status",
+        number=1,
+        type=descriptor_pb2.FieldDescriptorProto.TYPE_ENUM,
+        type_name=".grpc.health.v1.HealthCheckResponse.ServingStatus",
+        label=descriptor_pb2.FieldDescriptorProto.LABEL_OPTIONAL,
+    )
+    pool = descriptor_pool.DescriptorPool()
+    pool.Add(file_descriptor)
+    return (
+        message_factory.GetMessageClass(
+            pool.FindMessageTypeByName("grpc.health.v1.HealthCheckRequest")
+        ),
+        message_factory.GetMessageClass(
+            pool.FindMessageTypeByName("grpc.health.v1.HealthCheckResponse")
+        ),
+    )
+
+
+HealthCheckRequest, HealthCheckResponse = _create_health_message_classes()
+
+
+class LoadReport(NamedTuple):
+    """A snapshot of the load on a measurement service."""
+
+    in_flight: int
+    """The number of measurement calls that are executing."""
+
+    queue_length: int
+    """The number of measurement calls that are waiting for an execution slot."""
+
+    average_latency: float
+    """The recent average duration of measurement calls in seconds, including queueing."""
+
+
+class LoadMonitor(grpc.ServerInterceptor):
+    """Server interceptor that tracks in-flight measurement calls and their latency."""
+
+    # Smoothing factor for the exponentially weighted moving average of call latencies.
+    _LATENCY_SMOOTHING = 0.2
+
+    def __init__(self) -> None:
+        """Initialize the load monitor."""
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._average_latency = 0.0
+
+    @property
+    def in_flight(self) -> int:
+        """The number of measurement calls that are in progress, including queued calls."""
+        with self._lock:
+            return self._in_flight
+
+    @property
+    def average_latency(self) -> float:
+        """The recent average duration of measurement calls in seconds."""
+        with self._lock:
+            return self._average_latency
+
+    def intercept_service(
+        self,
+        continuation: Callable[[grpc.HandlerCallDetails], grpc.RpcMethodHandler | None],
+        handler_call_details: grpc.HandlerCallDetails,
+    ) -> grpc.RpcMethodHandler | None:
+        """Wrap measurement call handlers to track in-flight calls and latency."""
+        handler = continuation(handler_call_details)
+        if handler is None or not handler_call_details.method.endswith("/Measure"):
+            return handler
+        if handler.unary_unary is not None:
+            return grpc.unary_unary_rpc_method_handler(
+                self._wrap_unary(handler.unary_unary),
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer,
+            )
+        if handler.unary_stream is not None:
+            return grpc.unary_stream_rpc_method_handler(
+                self._wrap_stream(handler.unary_stream),
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer,
+            )
+        return handler
+
+    def _start_call(self) -> float:
+        with self._lock:
+            self._in_flight += 1
+        return time.perf_counter()
+
+    def _complete_call(self, start_time: float) -> None:
+        latency = time.perf_counter() - start_time
+        with self._lock:
+            self._in_flight -= 1
+            self._average_latency += self._LATENCY_SMOOTHING * (latency - self._average_latency)
+
+    def _wrap_unary(self, behavior: Callable[[Any, grpc.ServicerContext], Any]) -> Callable:
+        def wrapper(request: Any, context: grpc.ServicerContext) -> Any:
+            start_time = self._start_call()
+            try:
+                return behavior(request, context)
+            finally:
+                self._complete_call(start_time)
+
+        return wrapper
+
+    def _wrap_stream(
+        self, behavior: Callable[[Any, grpc.ServicerContext], Iterable[Any]]
+    ) -> Callable:
+        def wrapper(request: Any, context: grpc.ServicerContext) -> Generator[Any]:
+            start_time = self._start_call()
+            try:
+                yield from behavior(request, context)
+            finally:
+                self._complete_call(start_time)
+
+        return wrapper
+
+
+class HealthServicer:
+    """Implements the grpc.health.v1.Health service with load reporting.
+
+    The Check method returns the load report in the trailing metadata.
+
+    Each Watch stream holds a server worker thread until it ends, so the number of
+    concurrent Watch streams is limited. Streams above the limit are rejected with
+    RESOURCE_EXHAUSTED.
+    """
+
+    def __init__(
+        self,
+        service_names: Iterable[str],
+        get_load_report: Callable[[], LoadReport],
+        max_watchers: int = 2,
+    ) -> None:
+        """Initialize the health servicer.
+
+        Args:
+            service_names: The names of the services whose status is reported, in
+                addition to the overall server status ("").
+
+            get_load_report: A function that returns the current load report.
+
+            max_watchers: The maximum number of concurrent Watch streams.
+        """
+        if max_watchers < 0:
+            raise ValueError("The maximum number of watchers must not be negative.")
+        self._condition = threading.Condition()
+        self._statuses = {name: ServingStatus.NOT_SERVING for name in ("", *service_names)}
+        self._get_load_report = get_load_report
+        self._max_watchers = max_watchers
+        self._watchers = 0
+
+    @property
+    def max_watchers(self) -> int:
+        """The maximum number of concurrent Watch streams."""
+        return self._max_watchers
+
+    def set_serving_status(self, status: ServingStatus) -> None:
+        """Set the serving status of the server and all of its services."""
+        with self._condition:
+            for name in self._statuses:
+                self._statuses[name] = status
+            self._condition.notify_all()
+
+    def add_to_server(self, server: grpc.Server) -> None:
+        """Add the health service to a gRPC server."""
+        handlers = {
+            "Check": grpc.unary_unary_rpc_method_handler(
+                self.Check,
+                request_deserializer=HealthCheckRequest.FromString,
+                response_serializer=HealthCheckResponse.SerializeToString,
+            ),
+            "Watch": grpc.unary_stream_rpc_method_handler(
+                self.Watch,
+                request_deserializer=HealthCheckRequest.FromString,
+                response_serializer=HealthCheckResponse.SerializeToString,
+            ),
+        }
+        server.add_generic_rpc_handlers(
+            (grpc.method_handlers_generic_handler(HEALTH_SERVICE_NAME, handlers),)
+        )
+
+    def Check(  # noqa: N802 - function name should be lowercase
+        self, request: Any, context: grpc.ServicerContext
+    ) -> Any:
+        """Return the serving status of a service and the current load report."""
+        with self._condition:
+            status = self._statuses.get(request.service)
+        if status is None:
+            context.abort(grpc.StatusCode.NOT_FOUND, f"Unknown service: {request.service}")
+        load_report = self._get_load_report()
+        context.set_trailing_metadata(
+            (
+                (LOAD_IN_FLIGHT_KEY, str(load_report.in_flight)),
+                (LOAD_QUEUE_LENGTH_KEY, str(load_report.queue_length)),
+                (LOAD_AVERAGE_LATENCY_MS_KEY, f"{load_report.average_latency * 1000:.3f}"),
+            )
+        )
+        return HealthCheckResponse(status=status)
+
+    def Watch(  # noqa: N802 - function name should be lowercase
+        self, request: Any, context: grpc.ServicerContext
+    ) -> Generator[Any]:
+        """Stream the serving status of a service whenever it changes."""
+        with self._condition:
+            is_rejected = self._watchers >= self._max_watchers
+            if not is_rejected:
+                self._watchers += 1
+        if is_rejected:
+            context.abort(
+                grpc.StatusCode.RESOURCE_EXHAUSTED,
+                f"The maximum number of health watchers ({self._max_watchers}) are active.",
+            )
+        try:
+            last_status: ServingStatus | None = None
+            while context.is_active():
+                with self._condition:
+                    status = self._statuses.get(request.service, ServingStatus.SERVICE_UNKNOWN)
+                    if status == last_status:
+                        self._condition.wait(timeout=1.0)
+                        continue
+                last_status = status
+                yield HealthCheckResponse(status=status)
+        finally:
+            with self._condition:
+                self._watchers -= 1
+
+
+def check_health(
+    channel: grpc.Channel, service: str = "", timeout: float | None = None
+) -> tuple[ServingStatus, LoadReport | None]:
+    """Check the health and load of a measurement service.
+
+    Args:
+        channel: A gRPC channel to the measurement service.
+
+        service: The name of the service to check, or "" to check the server.
+
+        timeout: The timeout in seconds.
+
+    Returns:
+        A tuple containing the serving status and the load report, or None if the
+        service does not report its load.
+    """
+    check = channel.unary_unary(
+        f"/{HEALTH_SERVICE_NAME}/Check",
+        request_serializer=HealthCheckRequest.SerializeToString,
+        response_deserializer=HealthCheckResponse.FromString,
+    )
+    response, call = check.with_call(HealthCheckRequest(service=service), timeout=timeout)
+    metadata = dict(call.trailing_metadata() or ())
+    load_report = None
+    if LOAD_IN_FLIGHT_KEY in metadata:
+        load_report = LoadReport(
+            int(metadata[LOAD_IN_FLIGHT_KEY]),
+            int(metadata.get(LOAD_QUEUE_LENGTH_KEY, 0)),
+            float(metadata.get(LOAD_AVERAGE_LATENCY_MS_KEY, 0.0)) / 1000,
+        )
+    return ServingStatus(response.status), load_report
@@ -0,0 +1,463 @@
+"""Client-side load balancing across measurement service replicas."""
+
+from __future__ import annotations
+
+import functools
+import itertools
+import logging
+import random
+import threading
+import time
+import zlib
+from collections.abc import Sequence
+from typing import Any, Callable
+
+import grpc
+from ni.measurementlink.discovery.v1.client import DiscoveryClient
+from ni_grpc_extensions.channelpool import GrpcChannelPool
+
+from ni_measurement_plugin_sdk_service._internal.service_address import (
+    resolve_service_address,
+    resolve_service_addresses,
+)
+from ni_measurement_plugin_sdk_service.measurement.info import LoadBalancingPolicy
+
+_logger = logging.getLogger(__name__)
+
+# The time in seconds that a replica is skipped after it returns UNAVAILABLE.
+_DEFAULT_EJECTION_TIME = 30.0
+
+
+_Replicas = Sequence[tuple[str, grpc.Channel]]
+
+# The channel pool attribute that stores the load balanced channels created for the pool.
+_LOAD_BALANCED_CHANNELS_ATTRIBUTE = "_measurement_plugin_load_balanced_channels"
+_load_balanced_channels_lock = threading.Lock()
+
+# Channels that are connected to at least one replica report the most usable state.
+_CONNECTIVITY_ORDER = (
+    grpc.ChannelConnectivity.READY,
+    grpc.ChannelConnectivity.CONNECTING,
+    grpc.ChannelConnectivity.IDLE,
+    grpc.ChannelConnectivity.TRANSIENT_FAILURE,
+    grpc.ChannelConnectivity.SHUTDOWN,
+)
+
+
+class _ReplicaState:
+    """Load balancing state of a replica."""
+
+    def __init__(self) -> None:
+        self.outstanding_calls = 0
+        self.ejected_until = 0.0
+
+
+class _ConnectivitySubscription:
+    """Reports the combined connectivity of the replica channels to a callback."""
+
+    def __init__(
+        self,
+        channels: Sequence[grpc.Channel],
+        callback: Callable[[grpc.ChannelConnectivity], None],
+        try_to_connect: bool,
+    ) -> None:
+        self.callback = callback
+        self.try_to_connect = try_to_connect
+        self._lock = threading.Lock()
+        self._states: dict[int, grpc.ChannelConnectivity] = {}
+        self._reported_state: grpc.ChannelConnectivity | None = None
+        self._subscriptions = [
+            (channel, functools.partial(self._on_state_changed, index))
+            for index, channel in enumerate(channels)
+        ]
+        for channel, replica_callback in self._subscriptions:
+            channel.subscribe(replica_callback, try_to_connect)
+
+    def unsubscribe(self) -> None:
+        for channel, replica_callback in self._subscriptions:
+            channel.unsubscribe(replica_callback)
+
+    def _on_state_changed(self, index: int, state: grpc.ChannelConnectivity) -> None:
+        with self._lock:
+            self._states[index] = state
+            combined_state = min(self._states.values(), key=_CONNECTIVITY_ORDER.index)
+            if combined_state == self._reported_state:
+                return
+            self._reported_state = combined_state
+        self.callback(combined_state)
+
+
+def _get_pin_affinity_key(request: object) -> str:
+    pin_map_context = getattr(request, "pin_map_context", None)
+    if pin_map_context is None:
+        return ""
+    sites = ",".join(str(site) for site in sorted(pin_map_context.sites))
+    return f"{pin_map_context.pin_map_id}|{sites}"
+
+
+class LoadBalancedChannel(grpc.Channel):
+    """A gRPC channel that distributes calls across service replicas.
+
+    Replicas that fail a call with UNAVAILABLE are skipped for ``ejection_time``
+    seconds. If every replica is ejected, the replicas are resolved again, if
+    possible, and calls are distributed across all of them.
+
+    Closing this channel does not close the replica channels, which belong to the
+    channel pool.
+    """
+
+    def __init__(
+        self,
+        channels: _Replicas,
+        policy: LoadBalancingPolicy = LoadBalancingPolicy.ROUND_ROBIN,
+        ejection_time: float = _DEFAULT_EJECTION_TIME,
+        affinity_key: Callable[[object], str] = _get_pin_affinity_key,
+        resolve_replicas: Callable[[], _Replicas] | None = None,
+    ) -> None:
+        """Initialize the load balanced channel.
+
+        Args:
+            channels: The address and channel of each replica.
+
+            policy: The load balancing policy.
+
+            ejection_time: The time in seconds to skip a replica after it returns
+                UNAVAILABLE.
+
+            affinity_key: A function that returns the affinity key for a request.
+                Used with :any:`LoadBalancingPolicy.PIN_AFFINITY`.
+
+            resolve_replicas: A function that returns the current address and channel
+                of each replica. It is called when every replica is ejected.
+        """
+        if not channels:
+            raise ValueError("At least one replica channel must be specified.")
+        self._policy = policy
+        self._ejection_time = ejection_time
+        self._affinity_key = affinity_key
+        self._resolve_replicas = resolve_replicas
+        self._lock = threading.Lock()
+        self._addresses: list[str] = []
+        self._channels: dict[str, grpc.Channel] = {}
+        self._states: dict[str, _ReplicaState] = {}
+        self._subscriptions: dict[
+            Callable[[grpc.ChannelConnectivity], None], _ConnectivitySubscription
+        ] = {}
+        self._set_replicas(channels)
+        # Start at a random replica so that separate clients don't all pick the first one.
+        self._round_robin_counter = itertools.count(random.randrange(len(self._addresses)))
+
+    @property
+    def addresses(self) -> list[str]:
+        """The addresses of the replicas."""
+        with self._lock:
+            return list(self._addresses)
+
+    def _set_replicas(self, channels: _Replicas) -> None:
+        # Called with the lock held, or before the channel is shared.
+        self._addresses = [address for address, _ in channels]
+        self._channels = dict(channels)
+        # Keep the outstanding calls of replicas that are still registered, but give
+        # every replica another chance.
+        states = {address: self._states.get(address, _ReplicaState()) for address in self._channels}
+        for state in states.values():
+            state.ejected_until = 0.0
+        self._states = states
+
+    def _all_ejected(self, now: float) -> bool:
+        return all(self._states[address].ejected_until > now for address in self._addresses)
+
+    def _resolve_if_all_ejected(self) -> None:
+        if self._resolve_replicas is None:
+            return
+        with self._lock:
+            if not self._all_ejected(time.monotonic()):
+                return
+        try:
+            channels = self._resolve_replicas()
+        except Exception:
+            _logger.warning("Failed to resolve measurement service replicas.", exc_info=True)
+            return
+        if not channels:
+            return
+        with self._lock:
+            if not self._all_ejected(time.monotonic()):
+                return
+            _logger.debug("Resolved measurement service replicas: %s", list(dict(channels)))
+            self._set_replicas(channels)
+            previous_subscriptions = list(self._subscriptions.values())
+            for subscription in previous_subscriptions:
+                self._subscriptions[subscription.callback] = _ConnectivitySubscription(
+                    list(self._channels.values()),
+                    subscription.callback,
+                    subscription.try_to_connect,
+                )
+        for subscription in previous_subscriptions:
+            subscription.unsubscribe()
+
+    def _pick(self, request: object | None) -> tuple[str, grpc.Channel, _ReplicaState]:
+        self._resolve_if_all_ejected()
+        now = time.monotonic()
+        with self._lock:
+            candidates = [
+                address for address in self._addresses if self._states[address].ejected_until <= now
+            ] or self._addresses
+            if self._policy == LoadBalancingPolicy.LEAST_OUTSTANDING:
+                address = min(
+                    candidates, key=lambda address: self._states[address].outstanding_calls
+                )
+            elif self._policy == LoadBalancingPolicy.PIN_AFFINITY and request is not None:
+                # Rendezvous hashing moves only the affected keys when a replica is ejected.
+                key = self._affinity_key(request)
+                address = max(
+                    candidates, key=lambda address: zlib.crc32(f"{key}|{address}".encode())
+                )
+            else:
+                address = candidates[next(self._round_robin_counter) % len(candidates)]
+            state = self._states[address]
+            state.outstanding_calls += 1
+            return address, self._channels[address], state
+
+    def _complete(self, address: str, state: _ReplicaState, code: grpc.StatusCode | None) -> None:
+        with self._lock:
+            state.outstanding_calls -= 1
+            if code == grpc.StatusCode.UNAVAILABLE:
+                state.ejected_until = time.monotonic() + self._ejection_time
+                _logger.warning(
+                    "Ejecting unavailable measurement service replica %s for %.1f seconds.",
+                    address,
+                    self._ejection_time,
+                )
+
+    def _invoke(
+        self, request: object | None, method: Callable[[grpc.Channel], Any], blocking: bool
+    ) -> Any:
+        address, channel, state = self._pick(request)
+        try:
+            result = method(channel)
+        except grpc.RpcError as e:
+            self._complete(address, state, e.code() if hasattr(e, "code") else None)
+            raise
+        except BaseException:
+            self._complete(address, state, None)
+            raise
+        if blocking:
+            self._complete(address, state, grpc.StatusCode.OK)
+        else:
+            result.add_done_callback(lambda call: self._complete(address, state, call.code()))
+        return result
+
+    def subscribe(
+        self, callback: Callable[[grpc.ChannelConnectivity], None], try_to_connect: bool = False
+    ) -> None:
+        """Subscribe to the combined connectivity of the replica channels.
+
+        The callback receives the most usable state of any replica channel, such as
+        READY if at least one replica is connected.
+        """
+        with self._lock:
+            channels = list(self._channels.values())
+        subscription = _ConnectivitySubscription(channels, callback, try_to_connect)
+        with self._lock:
+            previous_subscription = self._subscriptions.pop(callback, None)
+            self._subscriptions[callback] = subscription
+        if previous_subscription is not None:
+            previous_subscription.unsubscribe()
+
+    def unsubscribe(self, callback: Callable[[grpc.ChannelConnectivity], None]) -> None:
+        """Unsubscribe from the connectivity of the replica channels."""
+        with self._lock:
+            subscription = self._subscriptions.pop(callback, None)
+        if subscription is not None:
+            subscription.unsubscribe()
+
+    def unary_unary(self, method: str, *args: Any, **kwargs: Any) -> grpc.UnaryUnaryMultiCallable:
+        """Create a unary-unary multi-callable that balances calls across replicas."""
+        return _UnaryUnaryMultiCallable(
+            self, lambda channel: channel.unary_unary(method, *args, **kwargs)
+        )
+
+    def unary_stream(self, method: str, *args: Any, **kwargs: Any) -> grpc.UnaryStreamMultiCallable:
+        """Create a unary-stream multi-callable that balances calls across replicas."""
+        return _UnaryStreamMultiCallable(
+            self, lambda channel: channel.unary_stream(method, *args, **kwargs)
+        )
+
+    def stream_unary(self, method: str, *args: Any, **kwargs: Any) -> grpc.StreamUnaryMultiCallable:
+        """Create a stream-unary multi-callable that balances calls across replicas."""
+        return _StreamUnaryMultiCallable(
+            self, lambda channel: channel.stream_unary(method, *args, **kwargs)
+        )
+
+    def stream_stream(
+        self, method: str, *args: Any, **kwargs: Any
+    ) -> grpc.StreamStreamMultiCallable:
+        """Create a stream-stream multi-callable that balances calls across replicas."""
+        return _StreamStreamMultiCallable(
+            self, lambda channel: channel.stream_stream(method, *args, **kwargs)
+        )
+
+    def close(self) -> None:
+        """Close the channel without closing the replica channels."""
+        with self._lock:
+            subscriptions = list(self._subscriptions.values())
+            self._subscriptions.clear()
+        for subscription in subscriptions:
+            subscription.unsubscribe()
+
+
+class _MultiCallable:
+    def __init__(
+        self,
+        channel: LoadBalancedChannel,
+        create_multi_callable: Callable[[grpc.Channel], Any],
+    ) -> None:
+        self._channel = channel
+        self._create_multi_callable = create_multi_callable
+
+
+class _UnaryUnaryMultiCallable(_MultiCallable, grpc.UnaryUnaryMultiCallable):
+    def __call__(self, request: Any, *args: Any, **kwargs: Any) -> Any:
+        return self._channel._invoke(
+            request,
+            lambda channel: self._create_multi_callable(channel)(request, *args, **kwargs),
+            blocking=True,
+        )
+
+    def with_call(self, request: Any, *args: Any, **kwargs: Any) -> Any:
+        return self._channel._invoke(
+            request,
+            lambda channel: self._create_multi_callable(channel).with_call(
+                request, *args, **kwargs
+            ),
+            blocking=True,
+        )
+
+    def future(self, request: Any, *args: Any, **kwargs: Any) -> Any:
+        return self._channel._invoke(
+            request,
+            lambda channel: self._create_multi_callable(channel).future(request, *args, **kwargs),
+            blocking=False,
+        )
+
+
+class _UnaryStreamMultiCallable(_MultiCallable, grpc.UnaryStreamMultiCallable):
+    def __call__(self, request: Any, *args: Any, **kwargs: Any) -> Any:
+        return self._channel._invoke(
+            request,
+            lambda channel: self._create_multi_callable(channel)(request, *args, **kwargs),
+            blocking=False,
+        )
+
+
+class _StreamUnaryMultiCallable(_MultiCallable, grpc.StreamUnaryMultiCallable):
+    def __call__(self, request_iterator: Any, *args: Any, **kwargs: Any) -> Any:
+        return self._channel._invoke(
+            None,
+            lambda channel: self._create_multi_callable(channel)(request_iterator, *args, **kwargs),
+            blocking=True,
+        )
+
+    def with_call(self, request_iterator: Any, *args: Any, **kwargs: Any) -> Any:
+        return self._channel._invoke(
+            None,
+            lambda channel: self._create_multi_callable(channel).with_call(
+                request_iterator, *args, **kwargs
+            ),
+            blocking=True,
+        )
+
+    def future(self, request_iterator: Any, *args: Any, **kwargs: Any) -> Any:
+        return self._channel._invoke(
+            None,
+            lambda channel: self._create_multi_callable(channel).future(
+                request_iterator, *args, **kwargs
+            ),
+            blocking=False,
+        )
+
+
+class _StreamStreamMultiCallable(_MultiCallable, grpc.StreamStreamMultiCallable):
+    def __call__(self, request_iterator: Any, *args: Any, **kwargs: Any) -> Any:
+        return self._channel._invoke(
+            None,
+            lambda channel: self._create_multi_callable(channel)(request_iterator, *args, **kwargs),
+            blocking=False,
+        )
+
+
+def get_service_channel(
+    discovery_client: DiscoveryClient,
+    channel_pool: GrpcChannelPool,
+    provided_interface: str,
+    service_class: str = "",
+    version: str = "",
+    load_balancing_policy: LoadBalancingPolicy | None = None,
+) -> grpc.Channel:
+    """Get a gRPC channel to a service, optionally balanced across its replicas.
+
+    Args:
+        discovery_client: The client for the NI Discovery Service.
+
+        channel_pool: The gRPC channel pool.
+
+        provided_interface: The gRPC full name of the service.
+
+        service_class: The service "class" that should be matched.
+
+        version: The version of the service to resolve. If not specified, the latest
+            version is resolved.
+
+        load_balancing_policy: The policy for distributing calls across the
+            registered replicas of the service. If not specified, all calls are sent
+            to the replica returned by the discovery service.
+
+    Returns:
+        A gRPC channel. Load balanced channels are cached in the channel pool, so
+        lookups of the same service and policy share the load balancing state.
+    """
+    if load_balancing_policy is None:
+        address = resolve_service_address(
+            discovery_client, provided_interface, service_class, version
+        )
+        return channel_pool.get_channel(address)
+
+    # Share the load balanced channel, like the replica channels, so that the policy state
+    # is kept across lookups.
+    load_balancing_policy = LoadBalancingPolicy(load_balancing_policy)
+    key = (provided_interface, service_class, version, load_balancing_policy)
+    with _load_balanced_channels_lock:
+        load_balanced_channels: dict[tuple[str, str, str, LoadBalancingPolicy], LoadBalancedChannel]
+        load_balanced_channels = getattr(channel_pool, _LOAD_BALANCED_CHANNELS_ATTRIBUTE, {})
+        setattr(channel_pool, _LOAD_BALANCED_CHANNELS_ATTRIBUTE, load_balanced_channels)
+        channel = load_balanced_channels.get(key)
+        if channel is not None and _uses_pooled_channels(channel, channel_pool):
+            return channel
+
+        def resolve_replicas() -> list[tuple[str, grpc.Channel]]:
+            addresses = resolve_service_addresses(
+                discovery_client, provided_interface, service_class, version
+            )
+            return [(address, channel_pool.get_channel(address)) for address in addresses]
+
+        replicas = resolve_replicas()
+        _logger.debug(
+            "Balancing calls to %s across %d replicas: %s",
+            service_class or provided_interface,
+            len(replicas),
+            [address for address, _ in replicas],
+        )
+        stale_channel = channel
+        channel = load_balanced_channels[key] = LoadBalancedChannel(
+            replicas, load_balancing_policy, resolve_replicas=resolve_replicas
+        )
+    if stale_channel is not None:
+        stale_channel.close()
+    return channel
+
+
+def _uses_pooled_channels(channel: LoadBalancedChannel, channel_pool: GrpcChannelPool) -> bool:
+    # Closing the channel pool closes the replica channels, so the pool creates new ones.
+    with channel._lock:
+        replicas = list(channel._channels.items())
+    return all(channel_pool.get_channel(address) is replica for address, replica in replicas)
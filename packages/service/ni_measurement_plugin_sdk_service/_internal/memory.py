@@ -0,0 +1,150 @@
+"""Per-call memory allocation tracking for measure functions."""
+
+from __future__ import annotations
+
+import functools
+import logging
+import threading
+import tracemalloc
+from collections.abc import Generator
+from typing import Any, Callable, NamedTuple
+
+from ni_measurement_plugin_sdk_service._internal.metrics import (
+    DEFAULT_SIZE_BUCKETS,
+    MetricsRegistry,
+)
+
+_logger = logging.getLogger(__name__)
+
+# Exclude allocations made by tracemalloc and by this module.
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+)
+
+
+class MemoryUsage(NamedTuple):
+    """The memory allocated by a measure call."""
+
+    peak_bytes: int
+    """The peak size of the memory that was allocated during the call."""
+
+    retained_bytes: int
+    """The size of the memory that was allocated during the call and not freed."""
+
+    top_allocations: list[tracemalloc.StatisticDiff]
+    """The allocation sites that retained the most memory, largest first."""
+
+
+class MemoryTracker:
+    """Tracks the memory that measure calls allocate, using tracemalloc.
+
+    tracemalloc traces the whole process, so only one call is tracked at a time.
+    Calls that start while another call is being tracked are not tracked.
+    """
+
+    def __init__(
+        self, top_allocation_count: int = 10, metrics_registry: MetricsRegistry | None = None
+    ) -> None:
+        """Initialize the memory tracker and start tracing memory allocations.
+
+        Args:
+            top_allocation_count: The number of allocation sites to log for each call.
+
+            metrics_registry: The registry to record the peak and retained memory of
+                each call in.
+        """
+        self._top_allocation_count = top_allocation_count
+        self._metrics_registry = metrics_registry
+        self._lock = threading.Lock()
+        if metrics_registry is not None:
+            metrics_registry.describe(
+                "measure_memory_peak_bytes",
+                "histogram",
+                "Peak memory allocated by a Measure call in bytes.",
+            )
+            metrics_registry.describe(
+                "measure_memory_retained_bytes",
+                "histogram",
+                "Memory allocated by a Measure call and not freed when the call completed.",
+            )
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def wrap(self, measure_function: Callable) -> Callable:
+        """Wrap a measure function to track the memory that each call allocates.
+
+        If the measure function returns a generator, the call completes when the
+        generator is exhausted or closed.
+        """
+
+        @functools.wraps(measure_function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not tracemalloc.is_tracing() or not self._lock.acquire(blocking=False):
+                return measure_function(*args, **kwargs)
+            try:
+                call = _TrackedCall()
+            except BaseException:
+                self._lock.release()
+                raise
+            try:
+                result = measure_function(*args, **kwargs)
+            except BaseException:
+                self._complete_call(call)
+                raise
+            if isinstance(result, Generator):
+                return self._wrap_generator(result, call)
+            self._complete_call(call)
+            return result
+
+        return wrapper
+
+    def _wrap_generator(self, generator: Generator, call: _TrackedCall) -> Generator:
+        try:
+            return (yield from generator)
+        finally:
+            generator.close()
+            self._complete_call(call)
+
+    def _complete_call(self, call: _TrackedCall) -> None:
+        try:
+            usage = call.complete(self._top_allocation_count)
+        finally:
+            self._lock.release()
+        if self._metrics_registry is not None:
+            self._metrics_registry.observe(
+                "measure_memory_peak_bytes", (), usage.peak_bytes, DEFAULT_SIZE_BUCKETS
+            )
+            self._metrics_registry.observe(
+                "measure_memory_retained_bytes",
+                (),
+                max(usage.retained_bytes, 0),
+                DEFAULT_SIZE_BUCKETS,
+            )
+        _logger.info(
+            "Measure call allocated %d bytes at peak and retained %d bytes. "
+            "Top allocation sites:\n%s",
+            usage.peak_bytes,
+            usage.retained_bytes,
+            "\n".join(f"  {statistic}" for statistic in usage.top_allocations),
+        )
+
+
+class _TrackedCall:
+    def __init__(self) -> None:
+        # Take the snapshot first so that its own memory is not counted as retained.
+        self._start_snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        tracemalloc.reset_peak()
+        self._start_bytes = tracemalloc.get_traced_memory()[0]
+
+    def complete(self, top_allocation_count: int) -> MemoryUsage:
+        end_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        end_snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        statistics = end_snapshot.compare_to(self._start_snapshot, "lineno")
+        return MemoryUsage(
+            peak_bytes=peak_bytes - self._start_bytes,
+            retained_bytes=end_bytes - self._start_bytes,
+            top_allocations=[statistic for statistic in statistics if statistic.size_diff][
+                :top_allocation_count
+            ],
+        )
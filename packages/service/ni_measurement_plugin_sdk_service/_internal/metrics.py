@@ -0,0 +1,534 @@
+"""Server metrics for measurement services, exported in the Prometheus text format."""
+
+from __future__ import annotations
+
+import bisect
+import contextlib
+import http.server
+import logging
+import threading
+import time
+from collections.abc import Generator, Iterable, Sequence
+from contextvars import ContextVar
+from typing import Any, Callable
+
+import grpc
+
+_logger = logging.getLogger(__name__)
+
+_METRIC_PREFIX = "measurement_plugin"
+
+# Bucket upper bounds in seconds. They cover fast calls that only read cached values
+# as well as long acquisitions.
+DEFAULT_LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+# Bucket upper bounds in bytes, from 1 KiB to 1 GiB.
+DEFAULT_SIZE_BUCKETS = tuple(float(4**exponent * 1024) for exponent in range(11))
+
+_Labels = tuple[tuple[str, str], ...]
+
+
+class _Histogram:
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+    """A thread-safe collection of counters, histograms, and gauges."""
+
+    def __init__(self, latency_buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        """Initialize the metrics registry."""
+        self._lock = threading.Lock()
+        self._latency_buckets = tuple(sorted(latency_buckets))
+        self._help: dict[str, tuple[str, str]] = {}
+        self._counters: dict[str, dict[_Labels, float]] = {}
+        self._histograms: dict[str, dict[_Labels, _Histogram]] = {}
+        self._gauges: dict[str, Callable[[], float]] = {}
+
+    def increment(self, name: str, labels: _Labels = (), value: float = 1.0) -> None:
+        """Increment a counter."""
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[labels] = series.get(labels, 0.0) + value
+
+    def observe(
+        self,
+        name: str,
+        labels: _Labels,
+        value: float,
+        buckets: Sequence[float] | None = None,
+    ) -> None:
+        """Record a value in a histogram.
+
+        Args:
+            name: The name of the histogram.
+
+            labels: The labels of the histogram series.
+
+            value: The value to record.
+
+            buckets: The bucket upper bounds, which are used when the series is
+                created. If not specified, the registry's latency buckets in seconds
+                are used.
+        """
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = _Histogram(
+                    self._latency_buckets if buckets is None else tuple(sorted(buckets))
+                )
+            histogram.observe(value)
+
+    def add_gauge(self, name: str, help: str, get_value: Callable[[], float]) -> None:
+        """Add a gauge whose value is read when the metrics are rendered."""
+        with self._lock:
+            self._help[name] = ("gauge", help)
+            self._gauges[name] = get_value
+
+    def describe(self, name: str, metric_type: str, help: str) -> None:
+        """Set the type and help text of a counter or histogram."""
+        with self._lock:
+            self._help[name] = (metric_type, help)
+
+    def get_counter(self, name: str, labels: _Labels = ()) -> float:
+        """Get the value of a counter."""
+        with self._lock:
+            return self._counters.get(name, {}).get(labels, 0.0)
+
+    def get_histogram(self, name: str, labels: _Labels = ()) -> tuple[int, float]:
+        """Get the number and sum of the values recorded in a histogram."""
+        with self._lock:
+            histogram = self._histograms.get(name, {}).get(labels)
+            if histogram is None:
+                return 0, 0.0
+            return histogram.count, histogram.sum
+
+    def render(self) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        lines: list[str] = []
+        with self._lock:
+            gauges = list(self._gauges.items())
+            for name, series in sorted(self._counters.items()):
+                self._render_help(lines, name)
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{_prefixed(name)}{_format_labels(labels)} {_format(value)}")
+            for name, histograms in sorted(self._histograms.items()):
+                self._render_help(lines, name)
+                for labels, histogram in sorted(histograms.items()):
+                    self._render_histogram(lines, name, labels, histogram)
+            help = dict(self._help)
+        for name, get_value in sorted(gauges):
+            metric_type, help_text = help[name]
+            lines.append(f"# HELP {_prefixed(name)} {help_text}")
+            lines.append(f"# TYPE {_prefixed(name)} {metric_type}")
+            try:
+                value = get_value()
+            except Exception:
+                _logger.exception("Failed to read gauge %s.", name)
+                continue
+            lines.append(f"{_prefixed(name)} {_format(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _render_help(self, lines: list[str], name: str) -> None:
+        metric_type, help_text = self._help.get(name, ("untyped", ""))
+        if help_text:
+            lines.append(f"# HELP {_prefixed(name)} {help_text}")
+        lines.append(f"# TYPE {_prefixed(name)} {metric_type}")
+
+    def _render_histogram(
+        self, lines: list[str], name: str, labels: _Labels, histogram: _Histogram
+    ) -> None:
+        cumulative_count = 0
+        for upper_bound, count in zip(
+            (*histogram.buckets, float("inf")), histogram.bucket_counts, strict=True
+        ):
+            cumulative_count += count
+            bucket_labels = labels + (("le", _format(upper_bound)),)
+            lines.append(
+                f"{_prefixed(name)}_bucket{_format_labels(bucket_labels)} {cumulative_count}"
+            )
+        lines.append(f"{_prefixed(name)}_sum{_format_labels(labels)} {_format(histogram.sum)}")
+        lines.append(f"{_prefixed(name)}_count{_format_labels(labels)} {histogram.count}")
+
+
+def _prefixed(name: str) -> str:
+    return f"{_METRIC_PREFIX}_{name}"
+
+
+def _format(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _format_labels(labels: _Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+class _CallMetrics:
+    """Phase durations and driver calls of a single RPC."""
+
+    def __init__(self, registry: MetricsRegistry | None = None) -> None:
+        self.registry = registry
+        self.phase_durations: dict[str, float] = {}
+        self.driver_calls: dict[tuple[str, str], tuple[int, float]] = {}
+        # Sessions may be reserved and initialized by worker threads.
+        self._lock = threading.Lock()
+
+    def add(self, phase: str, duration: float) -> None:
+        with self._lock:
+            self.phase_durations[phase] = self.phase_durations.get(phase, 0.0) + duration
+
+    def add_driver_call(self, driver: str, operation: str, duration: float) -> None:
+        with self._lock:
+            count, total_duration = self.driver_calls.get((driver, operation), (0, 0.0))
+            self.driver_calls[(driver, operation)] = (count + 1, total_duration + duration)
+        self.add("driver", duration)
+
+
+_current_call_metrics: ContextVar[_CallMetrics | None] = ContextVar(
+    "measurement_plugin_call_metrics", default=None
+)
+
+
+def get_current_registry() -> MetricsRegistry | None:
+    """Get the registry of the current RPC, or None if metrics are disabled."""
+    call_metrics = _current_call_metrics.get()
+    return call_metrics.registry if call_metrics is not None else None
+
+
+def add_phase_time(phase: str, duration: float) -> None:
+    """Add time in seconds to a phase of the current RPC, if metrics are enabled."""
+    call_metrics = _current_call_metrics.get()
+    if call_metrics is not None:
+        call_metrics.add(phase, duration)
+
+
+def add_driver_call_time(driver: str, operation: str, duration: float) -> None:
+    """Record a driver call made by the current RPC, if metrics are enabled.
+
+    The duration is also added to the RPC's "driver" phase.
+    """
+    call_metrics = _current_call_metrics.get()
+    if call_metrics is not None:
+        call_metrics.add_driver_call(driver, operation, duration)
+
+
+@contextlib.contextmanager
+def phase_timer(phase: str) -> Generator[None]:
+    """Time a phase of the current RPC, such as "decode", "measure", or "encode"."""
+    call_metrics = _current_call_metrics.get()
+    if call_metrics is None:
+        yield
+        return
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        call_metrics.add(phase, time.perf_counter() - start_time)
+
+
+class MetricsInterceptor(grpc.ServerInterceptor):
+    """Server interceptor that records per-method call counts, latencies, and sizes.
+
+    Each call's duration is split into phases: "decode" for deserializing the
+    request and its parameters, "measure" for running the measurement function,
+    "encode" for serializing the outputs and responses, and "send" for waiting
+    while the responses are sent. The servicer records its phases with
+    :any:`phase_timer`. The "gc" phase is the time spent in garbage collection
+    pauses, the "driver" phase is the time spent in instrumented driver calls, and the
+    "reserve" phase is the time spent reserving sessions. These overlap the phase in
+    which they occur.
+    """
+
+    def __init__(self, registry: MetricsRegistry, max_workers: int) -> None:
+        """Initialize the metrics interceptor.
+
+        Args:
+            registry: The registry to record the metrics in.
+
+            max_workers: The size of the server's worker thread pool.
+        """
+        self._registry = registry
+        self._lock = threading.Lock()
+        self._busy_workers = 0
+        registry.describe("rpc_calls_total", "counter", "Completed RPCs by method and status code.")
+        registry.describe("rpc_duration_seconds", "histogram", "RPC duration by method.")
+        registry.describe(
+            "rpc_phase_duration_seconds", "histogram", "Time spent in each phase of an RPC."
+        )
+        registry.describe("rpc_messages_sent_total", "counter", "Response messages sent.")
+        registry.describe("rpc_bytes_sent_total", "counter", "Serialized response bytes sent.")
+        registry.describe(
+            "driver_calls_total", "counter", "Instrumented driver calls by driver and operation."
+        )
+        registry.describe(
+            "driver_call_seconds_total",
+            "counter",
+            "Time spent in instrumented driver calls by driver and operation.",
+        )
+        registry.describe(
+            "reservation_duration_seconds",
+            "histogram",
+            "Time spent waiting for and reserving sessions by pin count and status code.",
+        )
+        registry.describe(
+            "reservation_failures_total",
+            "counter",
+            "Failed session reservations by pin count, status code, and holder service class.",
+        )
+        registry.describe(
+            "reservation_hold_seconds",
+            "histogram",
+            "Time that sessions were reserved by pin count.",
+        )
+        registry.describe(
+            "measure_queue_wait_seconds",
+            "histogram",
+            "Time that Measure calls waited for admission by priority.",
+        )
+        registry.describe(
+            "measure_calls_rejected_total",
+            "counter",
+            "Measure calls rejected by admission control by priority.",
+        )
+        registry.add_gauge(
+            "worker_pool_busy_threads",
+            "Worker threads that are handling RPCs.",
+            lambda: self.busy_workers,
+        )
+        registry.add_gauge(
+            "worker_pool_size", "Size of the worker thread pool.", lambda: max_workers
+        )
+
+    @property
+    def busy_workers(self) -> int:
+        """The number of worker threads that are handling RPCs."""
+        with self._lock:
+            return self._busy_workers
+
+    def intercept_service(
+        self,
+        continuation: Callable[[grpc.HandlerCallDetails], grpc.RpcMethodHandler | None],
+        handler_call_details: grpc.HandlerCallDetails,
+    ) -> grpc.RpcMethodHandler | None:
+        """Wrap the handler for the call to record its metrics."""
+        handler = continuation(handler_call_details)
+        if handler is None or handler.request_streaming:
+            return handler
+        call = _InstrumentedCall(self, handler_call_details.method, handler)
+        if handler.unary_unary is not None:
+            return grpc.unary_unary_rpc_method_handler(
+                call.wrap_unary(handler.unary_unary),
+                request_deserializer=call.wrap_deserializer(handler.request_deserializer),
+                response_serializer=call.wrap_serializer(handler.response_serializer),
+            )
+        if handler.unary_stream is not None:
+            return grpc.unary_stream_rpc_method_handler(
+                call.wrap_stream(handler.unary_stream),
+                request_deserializer=call.wrap_deserializer(handler.request_deserializer),
+                response_serializer=call.wrap_serializer(handler.response_serializer),
+            )
+        return handler
+
+    def _update_busy_workers(self, delta: int) -> None:
+        with self._lock:
+            self._busy_workers += delta
+
+
+class _InstrumentedCall:
+    def __init__(
+        self, interceptor: MetricsInterceptor, method: str, handler: grpc.RpcMethodHandler
+    ) -> None:
+        self._interceptor = interceptor
+        self._registry = interceptor._registry
+        self._method = method
+        self._start_time = time.perf_counter()
+        self._call_metrics = _CallMetrics(self._registry)
+        self._messages_sent = 0
+        self._bytes_sent = 0
+        self._raised = False
+
+    def wrap_deserializer(self, deserializer: Callable[[bytes], Any] | None) -> Callable | None:
+        if deserializer is None:
+            return None
+
+        def wrapper(data: bytes) -> Any:
+            start_time = time.perf_counter()
+            try:
+                return deserializer(data)
+            finally:
+                self._call_metrics.add("decode", time.perf_counter() - start_time)
+
+        return wrapper
+
+    def wrap_serializer(self, serializer: Callable[[Any], bytes] | None) -> Callable:
+        def wrapper(message: Any) -> bytes:
+            start_time = time.perf_counter()
+            try:
+                data = serializer(message) if serializer is not None else message
+            finally:
+                self._call_metrics.add("encode", time.perf_counter() - start_time)
+            self._messages_sent += 1
+            self._bytes_sent += len(data)
+            return data
+
+        return wrapper
+
+    def wrap_unary(self, behavior: Callable[[Any, grpc.ServicerContext], Any]) -> Callable:
+        def wrapper(request: Any, context: grpc.ServicerContext) -> Any:
+            self._begin(context)
+            token = _current_call_metrics.set(self._call_metrics)
+            try:
+                return behavior(request, context)
+            except Exception:
+                self._raised = True
+                raise
+            finally:
+                _current_call_metrics.reset(token)
+                self._interceptor._update_busy_workers(-1)
+
+        return wrapper
+
+    def wrap_stream(
+        self, behavior: Callable[[Any, grpc.ServicerContext], Iterable[Any]]
+    ) -> Callable:
+        def wrapper(request: Any, context: grpc.ServicerContext) -> Generator[Any]:
+            self._begin(context)
+            try:
+                try:
+                    responses = iter(behavior(request, context))
+                except Exception:
+                    self._raised = True
+                    raise
+                while True:
+                    token = _current_call_metrics.set(self._call_metrics)
+                    try:
+                        response = next(responses)
+                    except StopIteration:
+                        break
+                    except Exception:
+                        self._raised = True
+                        raise
+                    finally:
+                        _current_call_metrics.reset(token)
+                    encode_time = self._call_metrics.phase_durations.get("encode", 0.0)
+                    suspend_time = time.perf_counter()
+                    yield response
+                    # gRPC serializes and sends the response while this generator is
+                    # suspended, so the rest of that time is spent sending.
+                    encode_time = (
+                        self._call_metrics.phase_durations.get("encode", 0.0) - encode_time
+                    )
+                    self._call_metrics.add(
+                        "send", max(time.perf_counter() - suspend_time - encode_time, 0.0)
+                    )
+            finally:
+                self._interceptor._update_busy_workers(-1)
+
+        return wrapper
+
+    def _begin(self, context: grpc.ServicerContext) -> None:
+        self._interceptor._update_busy_workers(1)
+        context.add_callback(lambda: self._complete(context))
+
+    def _complete(self, context: grpc.ServicerContext) -> None:
+        # gRPC reports UNKNOWN for a behavior that raises without setting a code.
+        code = _get_code(context, grpc.StatusCode.UNKNOWN if self._raised else grpc.StatusCode.OK)
+        duration = time.perf_counter() - self._start_time
+        method_labels = (("method", self._method),)
+        registry = self._registry
+        registry.increment("rpc_calls_total", method_labels + (("code", code.name),))
+        registry.observe("rpc_duration_seconds", method_labels, duration)
+        for phase, phase_duration in self._call_metrics.phase_durations.items():
+            registry.observe(
+                "rpc_phase_duration_seconds", method_labels + (("phase", phase),), phase_duration
+            )
+        registry.increment("rpc_messages_sent_total", method_labels, self._messages_sent)
+        registry.increment("rpc_bytes_sent_total", method_labels, self._bytes_sent)
+        for (driver, operation), (count, total_duration) in self._call_metrics.driver_calls.items():
+            driver_labels = method_labels + (("driver", driver), ("operation", operation))
+            registry.increment("driver_calls_total", driver_labels, count)
+            registry.increment("driver_call_seconds_total", driver_labels, total_duration)
+
+
+def _get_code(context: grpc.ServicerContext, default: grpc.StatusCode) -> grpc.StatusCode:
+    # ServicerContext.code() is missing from the type stubs and from some test doubles.
+    get_code = getattr(context, "code", None)
+    code = get_code() if callable(get_code) else None
+    return code if isinstance(code, grpc.StatusCode) else default
+
+
+class MetricsHttpServer:
+    """Serves metrics in the Prometheus text format on a local HTTP port."""
+
+    def __init__(self, registry: MetricsRegistry, port: int, host: str = "localhost") -> None:
+        """Start serving metrics at http://<host>:<port>/metrics."""
+        render = registry.render
+
+        class _Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802 - function name should be lowercase
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                _logger.debug("Metrics request: " + format, *args)
+
+        self._server = http.server.ThreadingHTTPServer((host, port), _Handler)
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="MeasurementServiceMetrics", daemon=True
+        )
+        self._thread.start()
+        _logger.info(
+            "Measurement service metrics available at: http://%s:%d/metrics", host, self.port
+        )
+
+    @property
+    def port(self) -> int:
+        """The port that the metrics are served on."""
+        return self._server.server_address[1]
+
+    def close(self) -> None:
+        """Stop serving metrics."""
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
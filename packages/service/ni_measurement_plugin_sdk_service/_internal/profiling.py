@@ -0,0 +1,361 @@
+"""On-demand, sampled, and slow-call profiling of measure functions."""
+
+from __future__ import annotations
+
+import collections
+import contextlib
+import cProfile
+import functools
+import itertools
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Generator
+from types import FrameType
+from typing import Any, Callable
+
+import grpc
+from google.protobuf import wrappers_pb2
+
+from ni_measurement_plugin_sdk_service._configuration import ProfilingOptions
+from ni_measurement_plugin_sdk_service._internal.control_token import (
+    ControlToken,
+    create_control_metadata,
+)
+from ni_measurement_plugin_sdk_service._internal.shared_memory import is_local_peer
+
+_logger = logging.getLogger(__name__)
+
+PROFILING_SERVICE_NAME = "ni.measurementlink.measurement.Profiling"
+
+_PROFILERS = ("cprofile", "sampling")
+
+# The interval in seconds between stack samples taken by the sampling profiler.
+_SAMPLING_INTERVAL = 0.005
+
+
+class _StackSampler:
+    """Samples the stacks of the threads that are running profiled measure calls."""
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._recorders: dict[int, list[_SamplingRecorder]] = {}
+        self._thread: threading.Thread | None = None
+
+    def add(self, thread_id: int, recorder: _SamplingRecorder) -> None:
+        with self._condition:
+            self._recorders.setdefault(thread_id, []).append(recorder)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="MeasurementProfileSampler", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify_all()
+
+    def remove(self, thread_id: int, recorder: _SamplingRecorder) -> None:
+        with self._condition:
+            recorders = self._recorders[thread_id]
+            recorders.remove(recorder)
+            if not recorders:
+                del self._recorders[thread_id]
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._recorders:
+                    self._condition.wait()
+                recorders = {thread_id: list(items) for thread_id, items in self._recorders.items()}
+            frames = sys._current_frames()
+            for thread_id, items in recorders.items():
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stack = _get_stack(frame)
+                for recorder in items:
+                    recorder.add_sample(stack)
+            del frames
+            time.sleep(_SAMPLING_INTERVAL)
+
+
+def _get_stack(frame: FrameType | None) -> tuple[str, ...]:
+    stack: list[str] = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+_stack_sampler = _StackSampler()
+
+
+class _CProfileRecorder:
+    file_extension = ".prof"
+
+    def __init__(self) -> None:
+        self._profile = cProfile.Profile()
+
+    def start(self) -> bool:
+        try:
+            self._profile.enable()
+        except ValueError:
+            # Python 3.12 and later allow only one active cProfile profiler at a time.
+            return False
+        return True
+
+    def stop(self) -> None:
+        self._profile.disable()
+
+    def write(self, path: str) -> None:
+        self._profile.dump_stats(path)
+
+
+class _SamplingRecorder:
+    file_extension = ".txt"
+
+    def __init__(self) -> None:
+        # The sampler thread adds samples while the measure call's thread writes them.
+        self._lock = threading.Lock()
+        self.samples: collections.Counter[tuple[str, ...]] = collections.Counter()
+
+    def start(self) -> bool:
+        _stack_sampler.add(threading.get_ident(), self)
+        return True
+
+    def stop(self) -> None:
+        _stack_sampler.remove(threading.get_ident(), self)
+
+    def add_sample(self, stack: tuple[str, ...]) -> None:
+        with self._lock:
+            self.samples[stack] += 1
+
+    def write(self, path: str) -> None:
+        with self._lock:
+            samples = self.samples.most_common()
+        # Write the samples in the collapsed stack format, which flame graph tools accept.
+        with open(path, "w", encoding="utf-8") as file:
+            for stack, count in samples:
+                file.write(f"{';'.join(stack)} {count}\n")
+
+
+class MeasurementProfiler:
+    """Profiles measure function execution for a sample of calls, slow calls, or on demand."""
+
+    def __init__(self, service_class: str, options: ProfilingOptions = ProfilingOptions()) -> None:
+        """Initialize the profiler.
+
+        Args:
+            service_class: The service class, which is used to name profiles.
+
+            options: The profiling options.
+        """
+        profiler = options.profiler.lower()
+        if profiler not in _PROFILERS:
+            raise ValueError(
+                f"Unsupported profiler {profiler!r}. Supported profilers: {_PROFILERS}"
+            )
+        self._service_class = service_class
+        self._options = options._replace(profiler=profiler)
+        self._directory = options.directory or os.path.join(
+            tempfile.gettempdir(), "measurement_plugin_profiles"
+        )
+        self._lock = threading.Lock()
+        self._requested_calls = 0
+        self._call_numbers = itertools.count(1)
+
+    @property
+    def directory(self) -> str:
+        """The directory that profiles are written to."""
+        return self._directory
+
+    def profile_next_calls(self, count: int = 1) -> None:
+        """Profile the next measure calls, regardless of the sample rate.
+
+        Args:
+            count: The number of calls to profile.
+        """
+        with self._lock:
+            self._requested_calls += count
+
+    def wrap(self, measure_function: Callable) -> Callable:
+        """Wrap a measure function to profile its execution.
+
+        If the measure function returns a generator, the profile includes each step
+        of the generator, but not the time that the caller spends between steps.
+        """
+
+        @functools.wraps(measure_function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            keep_profile = self._should_profile()
+            if keep_profile is None:
+                return measure_function(*args, **kwargs)
+            call = _ProfiledCall(
+                self, self._create_recorder(), keep_profile, self._options.slow_call_threshold
+            )
+            try:
+                with call.active():
+                    result = measure_function(*args, **kwargs)
+            except BaseException:
+                call.finish()
+                raise
+            if isinstance(result, Generator):
+                return self._wrap_generator(result, call)
+            call.finish()
+            return result
+
+        return wrapper
+
+    def _should_profile(self) -> bool | None:
+        # Return True to keep the profile, False to keep it only if the call is slow,
+        # or None to skip profiling.
+        with self._lock:
+            if self._requested_calls > 0:
+                self._requested_calls -= 1
+                return True
+        if self._options.sample_rate > 0.0 and random.random() < self._options.sample_rate:
+            return True
+        if self._options.slow_call_threshold > 0.0:
+            return False
+        return None
+
+    def _create_recorder(self) -> _CProfileRecorder | _SamplingRecorder:
+        if self._options.profiler == "sampling":
+            return _SamplingRecorder()
+        return _CProfileRecorder()
+
+    @staticmethod
+    def _wrap_generator(generator: Generator, call: _ProfiledCall) -> Generator:
+        try:
+            while True:
+                try:
+                    with call.active():
+                        outputs = next(generator)
+                except StopIteration as e:
+                    return e.value
+                yield outputs
+        finally:
+            generator.close()
+            call.finish()
+
+    def _write_profile(
+        self, recorder: _CProfileRecorder | _SamplingRecorder, duration: float
+    ) -> None:
+        call_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(self._call_numbers)}"
+        path = os.path.join(
+            self._directory, f"{self._service_class}-{call_id}{recorder.file_extension}"
+        )
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            recorder.write(path)
+        except OSError as e:
+            _logger.warning("Failed to write measurement profile to %s: %s", path, e)
+            return
+        _logger.info("Wrote profile of measure call (%.3f s) to %s", duration, path)
+
+
+class _ProfiledCall:
+    def __init__(
+        self,
+        profiler: MeasurementProfiler,
+        recorder: _CProfileRecorder | _SamplingRecorder,
+        keep_profile: bool,
+        slow_call_threshold: float,
+    ) -> None:
+        self._profiler = profiler
+        self._recorder = recorder
+        self._keep_profile = keep_profile
+        self._slow_call_threshold = slow_call_threshold
+        self._recorded = False
+        self._duration = 0.0
+
+    @contextlib.contextmanager
+    def active(self) -> Generator[None]:
+        started = self._recorder.start()
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._duration += time.perf_counter() - start_time
+            if started:
+                self._recorder.stop()
+                self._recorded = True
+
+    def finish(self) -> None:
+        if not self._recorded:
+            return
+        if self._keep_profile or 0.0 < self._slow_call_threshold <= self._duration:
+            self._profiler._write_profile(self._recorder, self._duration)
+
+
+class ProfilingServicer:
+    """Implements the ProfileNextCalls method, which starts profiling on demand.
+
+    Only clients on the same machine that send the service's control token may call
+    ProfileNextCalls.
+    """
+
+    def __init__(self, profiler: MeasurementProfiler, control_token: ControlToken) -> None:
+        """Initialize the profiling servicer."""
+        self._profiler = profiler
+        self._control_token = control_token
+
+    def add_to_server(self, server: grpc.Server) -> None:
+        """Add the profiling service to a gRPC server."""
+        handlers = {
+            "ProfileNextCalls": grpc.unary_unary_rpc_method_handler(
+                self.ProfileNextCalls,
+                request_deserializer=wrappers_pb2.UInt32Value.FromString,
+                response_serializer=wrappers_pb2.StringValue.SerializeToString,
+            ),
+        }
+        server.add_generic_rpc_handlers(
+            (grpc.method_handlers_generic_handler(PROFILING_SERVICE_NAME, handlers),)
+        )
+
+    def ProfileNextCalls(  # noqa: N802 - function name should be lowercase
+        self, request: wrappers_pb2.UInt32Value, context: grpc.ServicerContext
+    ) -> wrappers_pb2.StringValue:
+        """Profile the next measure calls and return the profile directory."""
+        if not is_local_peer(context.peer()) or not self._control_token.is_authorized(context):
+            context.abort(
+                grpc.StatusCode.PERMISSION_DENIED,
+                "Only clients on the same machine with the service's control token can "
+                "profile the measurement service.",
+            )
+        self._profiler.profile_next_calls(request.value or 1)
+        return wrappers_pb2.StringValue(value=self._profiler.directory)
+
+
+def profile_next_calls(
+    channel: grpc.Channel, token: str, count: int = 1, timeout: float | None = None
+) -> str:
+    """Ask a measurement service to profile its next measure calls.
+
+    Args:
+        channel: A gRPC channel to the measurement service.
+
+        token: The service's control token. Use ``read_control_token()`` to read it.
+
+        count: The number of calls to profile.
+
+        timeout: The timeout in seconds.
+
+    Returns:
+        The directory that the measurement service writes profiles to.
+    """
+    profile = channel.unary_unary(
+        f"/{PROFILING_SERVICE_NAME}/ProfileNextCalls",
+        request_serializer=wrappers_pb2.UInt32Value.SerializeToString,
+        response_deserializer=wrappers_pb2.StringValue.FromString,
+    )
+    response = profile(
+        wrappers_pb2.UInt32Value(value=count),
+        timeout=timeout,
+        metadata=create_control_metadata(token),
+    )
+    return response.value
@@ -0,0 +1,333 @@
+"""Cache of session reservations that are kept reserved across measurement calls."""
+
+from __future__ import annotations
+
+import collections
+import logging
+import threading
+import time
+from collections.abc import Iterable
+from types import TracebackType
+from typing import Any, Callable, Literal, NamedTuple, TypeVar, cast
+
+from ni.measurementlink.sessionmanagement.v1.client import (
+    MultiSessionReservation,
+    PinMapContext,
+    SessionManagementClient,
+    SingleSessionReservation,
+)
+
+_logger = logging.getLogger(__name__)
+
+_TReservation = TypeVar("_TReservation", SingleSessionReservation, MultiSessionReservation)
+
+
+class _CacheKey(NamedTuple):
+    reservation_type: Literal["single", "multi"]
+    pin_map_id: str
+    sites: tuple[int, ...] | None
+    pin_or_relay_names: tuple[str, ...]
+    instrument_type_id: str | None
+
+
+class _HeldReservation:
+    __slots__ = ("key", "session_management_client", "reservation", "last_used", "discard")
+
+    def __init__(
+        self,
+        key: _CacheKey,
+        session_management_client: SessionManagementClient,
+        reservation: SingleSessionReservation | MultiSessionReservation,
+    ) -> None:
+        self.key = key
+        self.session_management_client = session_management_client
+        self.reservation = reservation
+        self.last_used = time.monotonic()
+        self.discard = False
+
+
+class ReservationCache:
+    """Keeps session reservations reserved between measurement calls.
+
+    When a measure function unreserves a reservation that it made through the cache, the
+    cache keeps the sessions reserved for the hold time instead of unreserving them. If a
+    measure function reserves the same pins or relays with the same pin map ID, sites, and
+    instrument type ID during that time, the cache returns the held reservation, including
+    its decoded session and connection information, without calling the session management
+    service. Reservations that are idle for longer than the hold time are unreserved in the
+    background.
+
+    Held reservations keep the instruments reserved, so other clients of the session
+    management service wait for up to the hold time to reserve them. If another call in
+    this process reserves the same pins while the held reservation is in use, the
+    reservation is unreserved when it is released instead of being held.
+
+    The session management service does not notify clients when a pin map is updated.
+    Call :any:`clear` with the pin map ID after updating a pin map so that later
+    reservations resolve the updated pin map.
+    """
+
+    def __init__(self, hold_time: float = 1.0, max_entries: int = 64) -> None:
+        """Initialize the reservation cache.
+
+        Args:
+            hold_time: The time in seconds that unreserved reservations are held for
+                reuse.
+
+            max_entries: The maximum number of held reservations. When the cache is
+                full, the least recently used reservation is unreserved.
+        """
+        self._hold_time = hold_time
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._idle_reservations: collections.OrderedDict[_CacheKey, _HeldReservation] = (
+            collections.OrderedDict()
+        )
+        self._reservations_in_use: dict[int, _HeldReservation] = {}
+        self._release_timer: threading.Timer | None = None
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def hits(self) -> int:
+        """The number of reservations that reused a held reservation."""
+        with self._lock:
+            return self._hits
+
+    @property
+    def misses(self) -> int:
+        """The number of reservations that called the session management service."""
+        with self._lock:
+            return self._misses
+
+    @property
+    def held_reservation_count(self) -> int:
+        """The number of reservations that are held for reuse and not in use."""
+        with self._lock:
+            return len(self._idle_reservations)
+
+    def clear(self, pin_map_id: str | None = None) -> None:
+        """Unreserve held reservations.
+
+        Idle reservations are unreserved immediately. Reservations that are in use are
+        unreserved when the measure function unreserves them.
+
+        Args:
+            pin_map_id: The pin map ID whose reservations to unreserve. If not
+                specified, all reservations are unreserved.
+        """
+        with self._lock:
+            keys = [
+                key
+                for key in self._idle_reservations
+                if pin_map_id is None or key.pin_map_id == pin_map_id
+            ]
+            reservations_to_unreserve = [self._idle_reservations.pop(key) for key in keys]
+            for held_reservation in self._reservations_in_use.values():
+                if pin_map_id is None or held_reservation.key.pin_map_id == pin_map_id:
+                    held_reservation.discard = True
+        for held_reservation in reservations_to_unreserve:
+            _unreserve(held_reservation)
+
+    def reserve_session(
+        self,
+        session_management_client: SessionManagementClient,
+        context: PinMapContext,
+        pin_or_relay_names: str | Iterable[str],
+        instrument_type_id: str | None = None,
+        timeout: float | None = 0.0,
+    ) -> SingleSessionReservation:
+        """Reserve a single session, like :any:`SessionManagementClient.reserve_session`."""
+        return self._reserve(
+            "single",
+            session_management_client.reserve_session,
+            session_management_client,
+            context,
+            pin_or_relay_names,
+            instrument_type_id,
+            timeout,
+        )
+
+    def reserve_sessions(
+        self,
+        session_management_client: SessionManagementClient,
+        context: PinMapContext,
+        pin_or_relay_names: str | Iterable[str],
+        instrument_type_id: str | None = None,
+        timeout: float | None = 0.0,
+    ) -> MultiSessionReservation:
+        """Reserve multiple sessions, like :any:`SessionManagementClient.reserve_sessions`."""
+        return self._reserve(
+            "multi",
+            session_management_client.reserve_sessions,
+            session_management_client,
+            context,
+            pin_or_relay_names,
+            instrument_type_id,
+            timeout,
+        )
+
+    def _reserve(
+        self,
+        reservation_type_name: Literal["single", "multi"],
+        reserve: Callable[..., _TReservation],
+        session_management_client: SessionManagementClient,
+        context: PinMapContext,
+        pin_or_relay_names: str | Iterable[str],
+        instrument_type_id: str | None,
+        timeout: float | None,
+    ) -> _TReservation:
+        if isinstance(pin_or_relay_names, str):
+            pin_or_relay_names = [pin_or_relay_names]
+        pin_or_relay_names = tuple(pin_or_relay_names)
+        key = _CacheKey(
+            reservation_type_name,
+            context.pin_map_id,
+            tuple(context.sites) if context.sites is not None else None,
+            pin_or_relay_names,
+            instrument_type_id,
+        )
+        with self._lock:
+            held_reservation = self._idle_reservations.pop(key, None)
+            if (
+                held_reservation is not None
+                and held_reservation.session_management_client is session_management_client
+            ):
+                self._hits += 1
+                self._reservations_in_use[id(held_reservation)] = held_reservation
+                return cast(_TReservation, _CachedReservation(self, held_reservation))
+            self._misses += 1
+            # Unreserve the reservation that this call is waiting for when it is released
+            # instead of holding it.
+            for reservation_in_use in self._reservations_in_use.values():
+                if reservation_in_use.key == key:
+                    reservation_in_use.discard = True
+        if held_reservation is not None:
+            _unreserve(held_reservation)
+
+        reservation = reserve(
+            context=context,
+            pin_or_relay_names=pin_or_relay_names,
+            instrument_type_id=instrument_type_id,
+            timeout=timeout,
+        )
+        held_reservation = _HeldReservation(key, session_management_client, reservation)
+        with self._lock:
+            self._reservations_in_use[id(held_reservation)] = held_reservation
+        return cast(_TReservation, _CachedReservation(self, held_reservation))
+
+    def _release(self, held_reservation: _HeldReservation) -> None:
+        reservations_to_unreserve = [held_reservation]
+        with self._lock:
+            self._reservations_in_use.pop(id(held_reservation), None)
+            if (
+                self._hold_time > 0
+                and not held_reservation.discard
+                and held_reservation.key not in self._idle_reservations
+            ):
+                reservations_to_unreserve.clear()
+                held_reservation.last_used = time.monotonic()
+                self._idle_reservations[held_reservation.key] = held_reservation
+                while len(self._idle_reservations) > self._max_entries:
+                    reservations_to_unreserve.append(self._idle_reservations.popitem(last=False)[1])
+                self._schedule_release()
+        for reservation in reservations_to_unreserve:
+            _unreserve(reservation)
+
+    def _schedule_release(self) -> None:
+        # The caller must hold the lock.
+        if self._release_timer is not None or not self._idle_reservations:
+            return
+        deadline = (
+            min(held_reservation.last_used for held_reservation in self._idle_reservations.values())
+            + self._hold_time
+        )
+        self._release_timer = threading.Timer(
+            max(deadline - time.monotonic(), 0.0), self._release_idle_reservations
+        )
+        self._release_timer.daemon = True
+        self._release_timer.start()
+
+    def _release_idle_reservations(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._release_timer = None
+            keys = [
+                key
+                for key, held_reservation in self._idle_reservations.items()
+                if now - held_reservation.last_used >= self._hold_time
+            ]
+            reservations_to_unreserve = [self._idle_reservations.pop(key) for key in keys]
+            self._schedule_release()
+        for held_reservation in reservations_to_unreserve:
+            _logger.debug("Unreserving idle reservation of %s.", held_reservation.key)
+            _unreserve(held_reservation)
+
+
+class _CachedReservation:
+    """Forwards to a held reservation and returns it to the cache when it is unreserved.
+
+    The wrapper passes ``isinstance`` checks for the reservation's type, like
+    ``InstrumentedSession``, so callers can use it in place of the reservation.
+    """
+
+    __slots__ = ("_cache", "_held_reservation", "_released")
+
+    def __init__(self, cache: ReservationCache, held_reservation: _HeldReservation) -> None:
+        """Initialize the cached reservation.
+
+        Args:
+            cache: The cache to return the reservation to.
+
+            held_reservation: The reservation to forward to.
+        """
+        object.__setattr__(self, "_cache", cache)
+        object.__setattr__(self, "_held_reservation", held_reservation)
+        object.__setattr__(self, "_released", False)
+
+    @property  # type: ignore[misc]
+    def __class__(self) -> type:
+        """The type of the reservation, so that ``isinstance`` checks pass."""
+        return type(self._held_reservation.reservation)
+
+    def __getattr__(self, name: str) -> Any:
+        """Get an attribute of the reservation."""
+        return getattr(self._held_reservation.reservation, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Set an attribute of the reservation."""
+        setattr(self._held_reservation.reservation, name, value)
+
+    def __enter__(self) -> Any:
+        """Context management protocol. Returns this wrapper."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> Literal[False]:
+        """Context management protocol. Calls unreserve()."""
+        self.unreserve()
+        return False
+
+    def __repr__(self) -> str:
+        """Return the representation of the reservation."""
+        return repr(self._held_reservation.reservation)
+
+    def unreserve(self) -> None:
+        """Return the reservation to the cache, which unreserves it when it is not reused."""
+        if self._released:
+            return
+        object.__setattr__(self, "_released", True)
+        self._cache._release(self._held_reservation)
+
+
+def _unreserve(held_reservation: _HeldReservation) -> None:
+    try:
+        held_reservation.reservation.unreserve()
+    except Exception:
+        _logger.warning(
+            "Failed to unreserve held reservation of %s.", held_reservation.key, exc_info=True
+        )
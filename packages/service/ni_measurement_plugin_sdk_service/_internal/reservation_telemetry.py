@@ -0,0 +1,238 @@
+"""Contention telemetry for session reservations."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import weakref
+from collections.abc import Iterable
+from types import TracebackType
+from typing import Any, Callable, Literal, NamedTuple, TypeVar, cast
+
+import grpc
+
+from ni_measurement_plugin_sdk_service import _configuration
+from ni_measurement_plugin_sdk_service._internal.metrics import (
+    MetricsRegistry,
+    add_phase_time,
+    get_current_registry,
+)
+from ni_measurement_plugin_sdk_service._internal.tracing import start_span
+
+_logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+class _ActiveReservation(NamedTuple):
+    service_class: str
+    pins: frozenset[str]
+    sites: frozenset[int] | None
+
+
+_lock = threading.Lock()
+_active_reservations: dict[int, _ActiveReservation] = {}
+
+
+def get_reservation_holders(pins: Iterable[str], sites: Iterable[int] | None) -> list[str]:
+    """Get the service classes of active reservations in this process that overlap.
+
+    Reservations overlap if they share a pin or relay name and a site. Pin and relay
+    groups are compared by name without expanding them.
+    """
+    pins = frozenset(pins)
+    sites = frozenset(sites) if sites is not None else None
+    with _lock:
+        return sorted(
+            {
+                reservation.service_class
+                for reservation in _active_reservations.values()
+                if reservation.pins & pins
+                and (reservation.sites is None or sites is None or reservation.sites & sites)
+            }
+        )
+
+
+def reserve_with_telemetry(
+    reserve: Callable[[], _T],
+    operation: str,
+    service_class: str,
+    pin_or_relay_names: str | Iterable[str],
+    sites: Iterable[int] | None,
+    timeout: float | None,
+) -> _T:
+    """Reserve sessions and record how long the reservation waits and is held.
+
+    The reservation is recorded as a trace span. If reservation telemetry is enabled,
+    the time spent reserving is also recorded in the "reserve" phase of the current
+    RPC and in the reservation_duration_seconds histogram. Failed reservations, such
+    as timeouts, are counted by status code and by the service classes that held
+    overlapping reservations in this process when the reservation started. The
+    returned reservation records the time that it was held in the
+    reservation_hold_seconds histogram when it is unreserved. Metrics are labeled by
+    the number of pins or relays rather than by their names, so that the number of
+    series stays bounded.
+
+    Args:
+        reserve: A function that reserves the sessions.
+
+        operation: The name of the operation, such as "reserve_session".
+
+        service_class: The service class of the measurement that is reserving sessions.
+
+        pin_or_relay_names: The pins or relays to reserve.
+
+        sites: The sites to reserve, or None for all sites.
+
+        timeout: The reservation timeout in seconds.
+
+    Returns:
+        The reservation.
+    """
+    pins = (
+        (pin_or_relay_names,) if isinstance(pin_or_relay_names, str) else tuple(pin_or_relay_names)
+    )
+    if not _configuration.RESERVATION_TELEMETRY_ENABLED:
+        with start_span(operation, pin_or_relay_names=",".join(pins)):
+            return reserve()
+
+    sites = tuple(sites) if sites is not None else None
+    pins_label = ",".join(pins)
+    count_label = ("pin_count", str(len(pins)))
+    holders = get_reservation_holders(pins, sites)
+    registry = get_current_registry()
+    with start_span(
+        operation,
+        pin_or_relay_names=pins_label,
+        sites=str(list(sites)) if sites is not None else "all",
+        timeout=timeout,
+        holders=",".join(holders),
+    ) as span:
+        start_time = time.perf_counter()
+        try:
+            reservation = reserve()
+        except grpc.RpcError as e:
+            duration = time.perf_counter() - start_time
+            add_phase_time("reserve", duration)
+            code = e.code().name if e.code() is not None else "UNKNOWN"
+            span.set_attribute("code", code)
+            if registry is not None:
+                registry.observe(
+                    "reservation_duration_seconds", (count_label, ("code", code)), duration
+                )
+                for holder in holders or [""]:
+                    registry.increment(
+                        "reservation_failures_total",
+                        (count_label, ("code", code), ("holder", holder)),
+                    )
+            _logger.warning(
+                "Failed to reserve %s for sites %s after %.3f s (%s: %s). "
+                "Overlapping reservations in this process: %s",
+                pins_label,
+                "all" if sites is None else list(sites),
+                duration,
+                code,
+                e.details(),
+                ", ".join(holders) or "none",
+            )
+            raise
+        duration = time.perf_counter() - start_time
+    add_phase_time("reserve", duration)
+    if registry is not None:
+        registry.observe("reservation_duration_seconds", (count_label, ("code", "OK")), duration)
+    return cast(
+        _T,
+        _TrackedReservation(
+            reservation,
+            _ActiveReservation(
+                service_class, frozenset(pins), frozenset(sites) if sites is not None else None
+            ),
+            count_label,
+            registry,
+        ),
+    )
+
+
+class _TrackedReservation:
+    """Forwards to a reservation and records how long it is held until it is unreserved.
+
+    The wrapper passes ``isinstance`` checks for the reservation's type, like
+    ``InstrumentedSession``, so callers can use it in place of the reservation.
+    """
+
+    __slots__ = ("_reservation", "_key", "_labels", "_registry", "_start_time")
+
+    def __init__(
+        self,
+        reservation: Any,
+        active_reservation: _ActiveReservation,
+        count_label: tuple[str, str],
+        registry: MetricsRegistry | None,
+    ) -> None:
+        """Initialize the tracked reservation and start tracking it as active.
+
+        Args:
+            reservation: The reservation to forward to.
+
+            active_reservation: The pins and sites that the reservation holds.
+
+            count_label: The pin count label of the reservation's metrics.
+
+            registry: The registry to record the hold time in, or None.
+        """
+        key = id(reservation)
+        object.__setattr__(self, "_reservation", reservation)
+        object.__setattr__(self, "_key", key)
+        object.__setattr__(self, "_labels", (count_label,))
+        object.__setattr__(self, "_registry", registry)
+        object.__setattr__(self, "_start_time", time.perf_counter())
+        with _lock:
+            _active_reservations[key] = active_reservation
+        # Stop tracking reservations that are garbage collected without being unreserved.
+        weakref.finalize(reservation, _active_reservations.pop, key, None)
+
+    @property  # type: ignore[misc]
+    def __class__(self) -> type:
+        """The type of the reservation, so that ``isinstance`` checks pass."""
+        return type(self._reservation)
+
+    def __getattr__(self, name: str) -> Any:
+        """Get an attribute of the reservation."""
+        return getattr(self._reservation, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Set an attribute of the reservation."""
+        setattr(self._reservation, name, value)
+
+    def __enter__(self) -> Any:
+        """Context management protocol. Returns this wrapper."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> Literal[False]:
+        """Context management protocol. Calls unreserve()."""
+        self.unreserve()
+        return False
+
+    def __repr__(self) -> str:
+        """Return the representation of the reservation."""
+        return repr(self._reservation)
+
+    def unreserve(self) -> None:
+        """Unreserve the sessions and record how long they were held."""
+        with _lock:
+            tracked = _active_reservations.pop(self._key, None) is not None
+        try:
+            self._reservation.unreserve()
+        finally:
+            if tracked and self._registry is not None:
+                self._registry.observe(
+                    "reservation_hold_seconds",
+                    self._labels,
+                    time.perf_counter() - self._start_time,
+                )
@@ -0,0 +1,195 @@
+"""Functions for advertising and resolving measurement service addresses."""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import ipaddress
+import logging
+import os
+import socket
+import tempfile
+
+import grpc
+from ni.measurementlink.discovery.v1.client import (
+    DiscoveryClient,
+    ServiceInfo,
+    ServiceLocation,
+)
+
+from ni_measurement_plugin_sdk_service._annotations import (
+    SERVICE_ADDRESS_KEY,
+    SERVICE_UNIX_SOCKET_PATH_KEY,
+)
+
+_logger = logging.getLogger(__name__)
+
+# In Unix-socket-only mode, the service is registered with this location and the
+# socket path as the insecure port, so ServiceLocation.insecure_address returns a
+# "unix:<path>" gRPC target.
+UNIX_SOCKET_LOCATION = "unix"
+
+_LOCAL_HOSTNAMES = ("localhost", "127.0.0.1", "::1", "[::1]")
+_WILDCARD_ADDRESSES = ("", "*", "0.0.0.0", "::", "[::]")
+
+
+def get_advertised_host(bind_address: str) -> str:
+    """Get the host name or address to register with the discovery service.
+
+    Args:
+        bind_address: The address that the gRPC server is bound to.
+
+    Returns:
+        "localhost" for loopback addresses, the fully qualified domain name of this
+        machine for wildcard addresses, or the bind address otherwise.
+    """
+    if bind_address in _WILDCARD_ADDRESSES:
+        return socket.getfqdn()
+    if bind_address.lower() == "localhost":
+        return "localhost"
+    try:
+        if ipaddress.ip_address(bind_address.strip("[]")).is_loopback:
+            return "localhost"
+    except ValueError:
+        pass
+    return bind_address
+
+
+@functools.lru_cache(maxsize=1)
+def _get_local_host_names() -> tuple[str, ...]:
+    return _LOCAL_HOSTNAMES + (socket.gethostname().lower(), socket.getfqdn().lower())
+
+
+def _is_local_host(host: str) -> bool:
+    return host.lower() in _get_local_host_names()
+
+
+def get_unix_socket_path(service_class: str, directory: str = "") -> str:
+    """Get a Unix domain socket path that is unique to this process and service.
+
+    Args:
+        service_class: The service class of the measurement service.
+
+        directory: The directory in which to create the socket. If not specified,
+            the system temporary directory is used.
+
+    Returns:
+        The Unix domain socket path.
+    """
+    # Unix domain socket paths are limited to about 100 characters, so hash the
+    # service class rather than using it directly.
+    service_class_hash = hashlib.sha1(service_class.encode()).hexdigest()[:8]
+    return os.path.join(
+        directory or tempfile.gettempdir(),
+        f"ni-measurement-{os.getpid()}-{service_class_hash}.sock",
+    )
+
+
+def get_preferred_address(
+    service_location: ServiceLocation, service_info: ServiceInfo | None = None
+) -> str:
+    """Get the preferred gRPC target for connecting to a measurement service.
+
+    If the service is running on the local machine and advertises a Unix domain
+    socket that exists, the Unix domain socket is preferred over TCP.
+
+    Args:
+        service_location: The location of the service.
+
+        service_info: Information about the service, including its annotations.
+
+    Returns:
+        The gRPC target.
+    """
+    if service_info is not None and _is_local_host(service_location.location):
+        unix_socket_address = _get_unix_socket_address(service_info)
+        if unix_socket_address:
+            return unix_socket_address
+    return service_location.insecure_address
+
+
+def _get_unix_socket_address(service_info: ServiceInfo) -> str:
+    unix_socket_path = service_info.annotations.get(SERVICE_UNIX_SOCKET_PATH_KEY, "")
+    if unix_socket_path and os.path.exists(unix_socket_path):
+        return f"unix:{unix_socket_path}"
+    return ""
+
+
+def resolve_service_address(
+    discovery_client: DiscoveryClient,
+    provided_interface: str,
+    service_class: str = "",
+    version: str = "",
+) -> str:
+    """Resolve the preferred gRPC target for connecting to a service.
+
+    Args:
+        discovery_client: The client for the NI Discovery Service.
+
+        provided_interface: The gRPC full name of the service.
+
+        service_class: The service "class" that should be matched.
+
+        version: The version of the service to resolve. If not specified, the latest
+            version is resolved.
+
+    Returns:
+        The gRPC target.
+    """
+    try:
+        service_location, service_info = discovery_client.resolve_service_with_information(
+            provided_interface=provided_interface, service_class=service_class, version=version
+        )
+    except grpc.RpcError as e:
+        if e.code() != grpc.StatusCode.UNIMPLEMENTED:
+            raise
+        # Older versions of the discovery service do not return service annotations.
+        _logger.debug("Discovery service does not support ResolveServiceWithInformation.")
+        service_location = discovery_client.resolve_service(
+            provided_interface=provided_interface, service_class=service_class, version=version
+        )
+        return service_location.insecure_address
+    return get_preferred_address(service_location, service_info)
+
+
+def resolve_service_addresses(
+    discovery_client: DiscoveryClient,
+    provided_interface: str,
+    service_class: str = "",
+    version: str = "",
+) -> list[str]:
+    """Resolve the preferred gRPC targets for all registered replicas of a service.
+
+    Args:
+        discovery_client: The client for the NI Discovery Service.
+
+        provided_interface: The gRPC full name of the service.
+
+        service_class: The service "class" that should be matched.
+
+        version: The version of the service to resolve. If not specified, replicas
+            of all versions are returned.
+
+    Returns:
+        The gRPC targets. If the registered services do not advertise their
+        addresses, this contains the single address returned by
+        :any:`resolve_service_address`.
+    """
+    addresses = []
+    for service_info in discovery_client.enumerate_services(provided_interface):
+        if service_class and service_info.service_class != service_class:
+            continue
+        if version and version not in service_info.versions:
+            continue
+        address = service_info.annotations.get(SERVICE_ADDRESS_KEY, "")
+        if not address:
+            continue
+        if _is_local_host(address.rpartition(":")[0]):
+            address = _get_unix_socket_address(service_info) or address
+        if address not in addresses:
+            addresses.append(address)
+    if not addresses:
+        addresses.append(
+            resolve_service_address(discovery_client, provided_interface, service_class, version)
+        )
+    return addresses
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import logging
+import os
+import threading
 from typing import Callable
 
 import grpc
@@ -20,21 +22,109 @@ from ni.measurementlink.measurement.v2 import (
 )
 from ni_grpc_extensions.loggers import ServerLogger
 
+from ni_measurement_plugin_sdk_service import _configuration
+from ni_measurement_plugin_sdk_service._annotations import (
+    SERVICE_ADDRESS_KEY,
+    SERVICE_CONTROL_TOKEN_PATH_KEY,
+    SERVICE_UNIX_SOCKET_PATH_KEY,
+)
+from ni_measurement_plugin_sdk_service._internal.admission import AdmissionController
+from ni_measurement_plugin_sdk_service._internal.call_stats import CallStatsInterceptor
+from ni_measurement_plugin_sdk_service._internal.control_token import ControlToken
+from ni_measurement_plugin_sdk_service._internal.garbage_collection import (
+    GarbageCollectionManager,
+    GarbageCollectionMonitor,
+)
 from ni_measurement_plugin_sdk_service._internal.grpc_servicer import (
     MeasurementServiceServicerV1,
     MeasurementServiceServicerV2,
 )
+from ni_measurement_plugin_sdk_service._internal.handover import (
+    HandoverServicer,
+    request_handover,
+)
+from ni_measurement_plugin_sdk_service._internal.health import (
+    HealthServicer,
+    LoadMonitor,
+    LoadReport,
+    ServingStatus,
+)
+from ni_measurement_plugin_sdk_service._internal.memory import MemoryTracker
+from ni_measurement_plugin_sdk_service._internal.metrics import (
+    MetricsHttpServer,
+    MetricsInterceptor,
+    MetricsRegistry,
+)
 from ni_measurement_plugin_sdk_service._internal.parameter.metadata import (
     ParameterMetadata,
 )
 from ni_measurement_plugin_sdk_service._internal.parameter.serialization_descriptors import (
     create_file_descriptor,
 )
+from ni_measurement_plugin_sdk_service._internal.profiling import (
+    MeasurementProfiler,
+    ProfilingOptions,
+    ProfilingServicer,
+)
+from ni_measurement_plugin_sdk_service._internal.service_address import (
+    UNIX_SOCKET_LOCATION,
+    get_advertised_host,
+    get_unix_socket_path,
+)
+from ni_measurement_plugin_sdk_service._internal.shared_memory import (
+    SharedMemoryWriter,
+)
 from ni_measurement_plugin_sdk_service.measurement.info import MeasurementInfo
 
 _logger = logging.getLogger(__name__)
 _V1_INTERFACE = "ni.measurementlink.measurement.v1.MeasurementService"
 _V2_INTERFACE = "ni.measurementlink.measurement.v2.MeasurementService"
+_DEFAULT_MAX_WORKERS = 10
+
+
+def _create_admission_controller() -> AdmissionController | None:
+    if _configuration.MAX_CONCURRENT_MEASUREMENTS <= 0:
+        return None
+    return AdmissionController(
+        _configuration.MAX_CONCURRENT_MEASUREMENTS,
+        _configuration.MAX_QUEUED_MEASUREMENTS,
+        _configuration.MEASUREMENT_QUEUE_TIMEOUT,
+        _configuration.MEASUREMENT_PRIORITY_AGING_INTERVAL,
+    )
+
+
+def _create_shared_memory_writer() -> SharedMemoryWriter | None:
+    if _configuration.SHARED_MEMORY_THRESHOLD <= 0:
+        return None
+    return SharedMemoryWriter(
+        _configuration.SHARED_MEMORY_THRESHOLD, _configuration.SHARED_MEMORY_LIFETIME
+    )
+
+
+def _create_metrics_registry(
+    admission_controller: AdmissionController | None,
+) -> MetricsRegistry:
+    registry = MetricsRegistry()
+    if admission_controller is not None:
+        registry.add_gauge(
+            "measure_calls_in_flight",
+            "Measure calls that are executing.",
+            lambda: admission_controller.in_flight,
+        )
+        registry.add_gauge(
+            "measure_queue_length",
+            "Measure calls that are waiting for an execution slot.",
+            lambda: admission_controller.queue_length,
+        )
+    return registry
+
+
+def _write_port_file(path: str, port: str) -> None:
+    # Replace the file atomically so that a reader never sees a partial port number.
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "w") as file:
+        file.write(port)
+    os.replace(temporary_path, path)
 
 
 class GrpcService:
@@ -46,6 +136,20 @@ class GrpcService:
         self._server: grpc.Server | None = None
         self._service_location: ServiceLocation | None = None
         self._registration_id = ""
+        self._unix_socket_path = ""
+        self._shared_memory_writer: SharedMemoryWriter | None = None
+        self._admission_controller: AdmissionController | None = None
+        self._load_monitor: LoadMonitor | None = None
+        self._health_servicer: HealthServicer | None = None
+        self._control_token: ControlToken | None = None
+        self._metrics_registry: MetricsRegistry | None = None
+        self._metrics_server: MetricsHttpServer | None = None
+        self._profiler: MeasurementProfiler | None = None
+        self._gc_manager: GarbageCollectionManager | None = None
+        self._gc_monitor: GarbageCollectionMonitor | None = None
+        self._stop_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._stopped.set()
 
     @property
     @deprecated(
@@ -89,23 +193,79 @@ class GrpcService:
         output_parameter_list: list[ParameterMetadata],
         measure_function: Callable,
         owner: object = None,
+        profiling_options: ProfilingOptions | None = None,
     ) -> str:
         """Start the gRPC server and register it with the discovery service.
 
+        Environment variables override the profiling options.
+
         Returns:
-            The insecure port.
+            The insecure port, or the Unix domain socket path if the service only
+            listens on a Unix domain socket.
         """
         interceptors: list[grpc.ServerInterceptor] = []
         if ServerLogger.is_enabled():
             interceptors.append(ServerLogger())
+        admission_controller = _create_admission_controller()
+        self._admission_controller = admission_controller
+        if _configuration.HEALTH_SERVICE_ENABLED:
+            self._load_monitor = LoadMonitor()
+            interceptors.append(self._load_monitor)
+        self._shared_memory_writer = _create_shared_memory_writer()
+        max_workers = _DEFAULT_MAX_WORKERS
+        max_concurrent_rpcs = _configuration.GRPC_TRANSPORT_OPTIONS.max_concurrent_rpcs
+        if admission_controller is not None:
+            # Queued calls wait in a worker thread, so make sure that admitted and queued
+            # calls don't wait in the thread pool's hidden queue. The default workers are
+            # spare threads that reject calls over the limit and handle other RPCs, such
+            # as GetMetadata and health checks, while the measurement slots are busy.
+            max_workers += (
+                admission_controller.max_in_flight + admission_controller.max_queue_length
+            )
+        if _configuration.HEALTH_SERVICE_ENABLED:
+            # Health watchers hold a worker thread for as long as they watch.
+            max_workers += _configuration.HEALTH_SERVICE_MAX_WATCHERS
+        if admission_controller is not None and max_concurrent_rpcs <= 0:
+            # If even the spare threads are busy, gRPC rejects calls with
+            # RESOURCE_EXHAUSTED instead of queueing them in the thread pool.
+            max_concurrent_rpcs = max_workers
+        self._metrics_registry = None
+        if _configuration.METRICS_ENABLED:
+            self._metrics_registry = _create_metrics_registry(admission_controller)
+            interceptors.append(MetricsInterceptor(self._metrics_registry, max_workers))
+            self._gc_monitor = GarbageCollectionMonitor(self._metrics_registry)
+            self._gc_monitor.start()
+        if _configuration.GC_MANAGEMENT_ENABLED:
+            self._gc_manager = GarbageCollectionManager(
+                _configuration.GC_FULL_COLLECTION_INTERVAL, _configuration.GC_MAX_DEFERRAL
+            )
+            interceptors.append(self._gc_manager)
+        interceptors.append(CallStatsInterceptor())
+        transport_options = _configuration.GRPC_TRANSPORT_OPTIONS
+        server_options = [
+            ("grpc.max_receive_message_length", -1),
+            ("grpc.max_send_message_length", -1),
+            *transport_options.to_server_options(),
+        ]
+        if _configuration.SERVICE_REUSE_PORT:
+            # Allow replicas in other processes to listen on the same port.
+            server_options.append(("grpc.so_reuseport", 1))
         self._server = grpc.server(
-            logging_pool.pool(max_workers=10),
+            logging_pool.pool(max_workers=max_workers),
             interceptors=interceptors,
-            options=[
-                ("grpc.max_receive_message_length", -1),
-                ("grpc.max_send_message_length", -1),
-            ],
+            options=server_options,
+            maximum_concurrent_rpcs=max_concurrent_rpcs or None,
         )
+        self._profiler = MeasurementProfiler(
+            service_info.service_class,
+            (profiling_options or ProfilingOptions()).update_from_config(),
+        )
+        if _configuration.MEMORY_TRACKING_ENABLED:
+            # Track memory inside the profiler so that profiling allocations are excluded.
+            measure_function = MemoryTracker(
+                _configuration.MEMORY_TRACKING_TOP_ALLOCATIONS, self._metrics_registry
+            ).wrap(measure_function)
+        measure_function = self._profiler.wrap(measure_function)
         create_file_descriptor(
             service_name=service_info.service_class,
             output_metadata=output_parameter_list,
@@ -121,6 +281,7 @@ class GrpcService:
                     measure_function,
                     owner,
                     service_info,
+                    admission_controller,
                 )
                 v1_measurement_service_pb2_grpc.add_MeasurementServiceServicer_to_server(
                     servicer_v1, self._server
@@ -133,6 +294,8 @@ class GrpcService:
                     measure_function,
                     owner,
                     service_info,
+                    admission_controller,
+                    self._shared_memory_writer,
                 )
                 v2_measurement_service_pb2_grpc.add_MeasurementServiceServicer_to_server(
                     servicer_v2, self._server
@@ -141,26 +304,180 @@ class GrpcService:
                 raise ValueError(
                     f"Unknown interface was provided in the .serviceconfig file: {interface}"
                 )
-        host = "[::1]"
-        port = str(self._server.add_insecure_port(f"{host}:0"))
-        address = f"http://{host}:{port}"
+        if _configuration.HEALTH_SERVICE_ENABLED:
+            self._health_servicer = HealthServicer(
+                service_info.provided_interfaces,
+                self._get_load_report,
+                _configuration.HEALTH_SERVICE_MAX_WATCHERS,
+            )
+            self._health_servicer.add_to_server(self._server)
+        if _configuration.SERVICE_HANDOVER or _configuration.PROFILING_SERVICE_ENABLED:
+            self._control_token = ControlToken()
+            if _configuration.SERVICE_HANDOVER:
+                HandoverServicer(self.drain, self._control_token).add_to_server(self._server)
+            if _configuration.PROFILING_SERVICE_ENABLED:
+                ProfilingServicer(self._profiler, self._control_token).add_to_server(self._server)
+        port = ""
+        if not _configuration.UNIX_SOCKET_ONLY:
+            host = _configuration.SERVICE_BIND_ADDRESS
+            port = str(self._server.add_insecure_port(f"{host}:{_configuration.SERVICE_BIND_PORT}"))
+            _logger.info("Measurement service listening on: http://%s:%s", host, port)
+        if _configuration.USE_UNIX_SOCKET or _configuration.UNIX_SOCKET_ONLY:
+            self._unix_socket_path = get_unix_socket_path(
+                service_info.service_class, _configuration.UNIX_SOCKET_DIRECTORY
+            )
+            if os.path.exists(self._unix_socket_path):
+                os.remove(self._unix_socket_path)
+            self._server.add_insecure_port(f"unix:{self._unix_socket_path}")
+            _logger.info("Measurement service listening on: unix:%s", self._unix_socket_path)
+            service_info = service_info._replace(
+                annotations={
+                    **service_info.annotations,
+                    SERVICE_UNIX_SOCKET_PATH_KEY: self._unix_socket_path,
+                }
+            )
         self._server.start()
-        _logger.info("Measurement service listening on: %s", address)
+        self._stopped.clear()
+        if port and _configuration.SERVICE_PORT_FILE:
+            _write_port_file(_configuration.SERVICE_PORT_FILE, port)
+        if self._metrics_registry is not None and _configuration.METRICS_PORT > 0:
+            self._metrics_server = MetricsHttpServer(
+                self._metrics_registry, _configuration.METRICS_PORT
+            )
 
-        self._service_location = ServiceLocation("localhost", port, "")
+        if port:
+            if _configuration.SERVICE_ADVERTISED_PORT > 0:
+                port = str(_configuration.SERVICE_ADVERTISED_PORT)
+            advertised_host = _configuration.SERVICE_ADVERTISED_HOST or get_advertised_host(host)
+            self._service_location = ServiceLocation(advertised_host, port, "")
+        else:
+            # ServiceLocation.insecure_address returns "unix:<path>", which is a valid
+            # gRPC target.
+            port = self._unix_socket_path
+            self._service_location = ServiceLocation(UNIX_SOCKET_LOCATION, port, "")
+        # Replicas of the same service class can only be distinguished by their
+        # annotations, because EnumerateServices does not return service locations.
+        annotations = {
+            **service_info.annotations,
+            SERVICE_ADDRESS_KEY: self._service_location.insecure_address,
+        }
+        if self._control_token is not None:
+            annotations[SERVICE_CONTROL_TOKEN_PATH_KEY] = self._control_token.path
+        service_info = service_info._replace(annotations=annotations)
         self._registration_id = self._discovery_client.register_service(
             service_info, self.service_location
         )
+        if self._health_servicer is not None:
+            self._health_servicer.set_serving_status(ServingStatus.SERVING)
+        if _configuration.SERVICE_HANDOVER:
+            own_addresses = [self._service_location.insecure_address]
+            if self._unix_socket_path:
+                own_addresses.append(f"unix:{self._unix_socket_path}")
+            request_handover(self._discovery_client, service_info, own_addresses)
+        if self._gc_manager is not None:
+            self._gc_manager.freeze()
         return port
 
-    def stop(self) -> None:
-        """Unregister and stop the gRPC server."""
+    def _get_load_report(self) -> LoadReport:
+        average_latency = self._load_monitor.average_latency if self._load_monitor else 0.0
+        if self._admission_controller is not None:
+            return LoadReport(
+                self._admission_controller.in_flight,
+                self._admission_controller.queue_length,
+                average_latency,
+            )
+        in_flight = self._load_monitor.in_flight if self._load_monitor else 0
+        return LoadReport(in_flight, 0, average_latency)
+
+    def get_metrics(self) -> str:
+        """Get the service's metrics in the Prometheus text format.
+
+        Returns:
+            The metrics, or an empty string if metrics are disabled.
+        """
+        if self._metrics_registry is None:
+            return ""
+        return self._metrics_registry.render()
+
+    def profile_next_calls(self, count: int = 1) -> str:
+        """Profile the next measure calls.
+
+        Args:
+            count: The number of calls to profile.
+
+        Returns:
+            The directory that profiles are written to.
+        """
+        if self._profiler is None:
+            raise RuntimeError("Measurement service not running")
+        self._profiler.profile_next_calls(count)
+        return self._profiler.directory
+
+    def drain(self, timeout: float | None = None) -> None:
+        """Unregister, wait for in-flight calls to complete, and stop the gRPC server.
+
+        Args:
+            timeout: The time in seconds to wait for in-flight calls to complete
+                before cancelling them. If not specified, the configured drain
+                timeout is used.
+        """
+        if timeout is None:
+            timeout = _configuration.SERVICE_DRAIN_TIMEOUT
+        with self._stop_lock:
+            self._unregister()
+            server = self._server
+        if server is not None:
+            # The server rejects new calls and waits for in-flight calls to complete.
+            server.stop(timeout).wait()
+        self.stop()
+
+    def wait_for_termination(self, timeout: float | None = None) -> bool:
+        """Wait until the gRPC server is stopped.
+
+        Args:
+            timeout: The time in seconds to wait. If not specified, wait indefinitely.
+
+        Returns:
+            True if the server is stopped, or False if the timeout expired.
+        """
+        return self._stopped.wait(timeout)
+
+    def _unregister(self) -> None:
+        if self._health_servicer is not None:
+            # Report NOT_SERVING while draining so that clients stop sending new calls.
+            self._health_servicer.set_serving_status(ServingStatus.NOT_SERVING)
         if self._registration_id:
             self._discovery_client.unregister_service(self._registration_id)
-        if self._server is not None:
-            self._server.stop(5)
+            self._registration_id = ""
 
-        self._registration_id = ""
-        self._server = None
-        self._service_location = None
+    def stop(self) -> None:
+        """Unregister and stop the gRPC server."""
+        with self._stop_lock:
+            self._unregister()
+            if self._server is not None:
+                self._server.stop(5)
+            if self._unix_socket_path and os.path.exists(self._unix_socket_path):
+                os.remove(self._unix_socket_path)
+            if self._shared_memory_writer is not None:
+                self._shared_memory_writer.close()
+            if self._metrics_server is not None:
+                self._metrics_server.close()
+            if self._gc_monitor is not None:
+                self._gc_monitor.stop()
+            if self._gc_manager is not None:
+                self._gc_manager.close()
+            if self._control_token is not None:
+                self._control_token.close()
+
+            self._unix_socket_path = ""
+            self._admission_controller = None
+            self._load_monitor = None
+            self._health_servicer = None
+            self._control_token = None
+            self._metrics_server = None
+            self._gc_monitor = None
+            self._gc_manager = None
+            self._server = None
+            self._service_location = None
+            self._stopped.set()
         _logger.info("Measurement service closed.")
@@ -0,0 +1,320 @@
+"""Pool of driver sessions that are kept open across measurement calls."""
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import logging
+import threading
+import time
+from collections.abc import Generator
+from typing import Any, Callable, ContextManager, NamedTuple
+
+from ni.measurementlink.sessionmanagement.v1.client import (
+    INSTRUMENT_TYPE_NI_DAQMX,
+    SessionInformation,
+)
+
+_logger = logging.getLogger(__name__)
+
+SessionConstructor = Callable[[SessionInformation], Any]
+ClosingFunction = Callable[[Any], ContextManager[Any]]
+HealthCheck = Callable[[Any], bool]
+
+# NI-DAQmx tasks accumulate channels and timing configuration, and measure functions
+# create them from scratch, so they are not pooled.
+_UNPOOLED_INSTRUMENT_TYPE_IDS = frozenset([INSTRUMENT_TYPE_NI_DAQMX])
+
+
+class _SessionKey(NamedTuple):
+    instrument_type_id: str
+    resource_name: str
+    session_name: str
+
+
+class _PooledSession:
+    __slots__ = (
+        "key",
+        "initialization_options",
+        "session",
+        "closing_function",
+        "last_used",
+        "discard",
+    )
+
+    def __init__(
+        self,
+        key: _SessionKey,
+        initialization_options: str,
+        session: Any,
+        closing_function: ClosingFunction,
+    ) -> None:
+        self.key = key
+        self.initialization_options = initialization_options
+        self.session = session
+        self.closing_function = closing_function
+        self.last_used = time.monotonic()
+        self.discard = False
+
+
+class SessionPool:
+    """Keeps driver sessions open between measurement calls.
+
+    When a measure function initializes a session through a reservation, the pool
+    returns the session that was initialized for the same instrument type, resource,
+    and session name with the same initialization options, such as reset, driver
+    options, and initialization behavior, by a previous call, if there is one. If the
+    options differ, the pooled session is closed and a new one is initialized. When
+    the measure function is done with the session, the pool keeps it open instead of
+    closing it.
+
+    Sessions are closed instead of returned to the pool if the measure function raises
+    an exception while using them. Sessions that are idle for longer than the idle
+    timeout are closed in the background.
+
+    Pooled sessions stay open after the reservation that initialized them is
+    unreserved, so other measurements that reserve the same instruments share or
+    conflict with them until they are closed. Use a short idle timeout or call
+    :any:`reset` before other measurements use the instruments.
+    """
+
+    def __init__(self, idle_timeout: float = 300.0) -> None:
+        """Initialize the session pool.
+
+        Args:
+            idle_timeout: The time in seconds after which idle sessions are closed. If
+                this is negative, idle sessions are kept open until the pool is reset.
+        """
+        self._idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._idle_sessions: dict[_SessionKey, _PooledSession] = {}
+        self._sessions_in_use: dict[int, _PooledSession] = {}
+        self._health_checks: dict[str, HealthCheck] = {}
+        self._eviction_timer: threading.Timer | None = None
+
+    @property
+    def idle_session_count(self) -> int:
+        """The number of open sessions that are not in use."""
+        with self._lock:
+            return len(self._idle_sessions)
+
+    def register_health_check(self, instrument_type_id: str, health_check: HealthCheck) -> None:
+        """Register a function that checks whether a pooled session is still usable.
+
+        The pool calls the health check before reusing a session of the specified
+        instrument type. If it returns False or raises an exception, the pool closes
+        the session and initializes a new one.
+
+        Args:
+            instrument_type_id: The instrument type ID of the sessions to check.
+
+            health_check: A function that takes a session and returns whether it is
+                usable.
+        """
+        with self._lock:
+            self._health_checks[instrument_type_id] = health_check
+
+    def pool_sessions(
+        self,
+        session_constructor: SessionConstructor,
+        closing_function: ClosingFunction | None,
+        initialization_options: str = "",
+    ) -> tuple[SessionConstructor, ClosingFunction]:
+        """Wrap the session constructor and closing function of a reservation.
+
+        Args:
+            session_constructor: The function that initializes a session.
+
+            closing_function: The function that returns a context manager that closes
+                the session, or None to use the session as a context manager.
+
+            initialization_options: The options that the session constructor
+                initializes sessions with, as returned by
+                :any:`get_initialization_options`. Pooled sessions are reused only by
+                constructors with the same options.
+
+        Returns:
+            A session constructor that reuses pooled sessions and a closing function
+            that returns sessions to the pool.
+        """
+        if closing_function is None:
+            closing_function = _closing_session
+
+        def pooled_session_constructor(session_info: SessionInformation) -> Any:
+            return self._acquire(
+                session_info, session_constructor, closing_function, initialization_options
+            )
+
+        def pooled_closing_function(session: Any) -> ContextManager[Any]:
+            with self._lock:
+                pooled_session = self._sessions_in_use.get(id(session))
+            if pooled_session is None:
+                return closing_function(session)
+            return self._returning_session(pooled_session)
+
+        return pooled_session_constructor, pooled_closing_function
+
+    def reset(self, instrument_type_id: str | None = None) -> None:
+        """Close pooled sessions.
+
+        Idle sessions are closed immediately. Sessions that are in use are closed when
+        the measure function is done with them.
+
+        Args:
+            instrument_type_id: The instrument type ID of the sessions to close. If not
+                specified, all sessions are closed.
+        """
+        with self._lock:
+            keys = [
+                key
+                for key in self._idle_sessions
+                if instrument_type_id is None or key.instrument_type_id == instrument_type_id
+            ]
+            sessions_to_close = [self._idle_sessions.pop(key) for key in keys]
+            for pooled_session in self._sessions_in_use.values():
+                if (
+                    instrument_type_id is None
+                    or pooled_session.key.instrument_type_id == instrument_type_id
+                ):
+                    pooled_session.discard = True
+        for pooled_session in sessions_to_close:
+            _close_pooled_session(pooled_session)
+
+    def _acquire(
+        self,
+        session_info: SessionInformation,
+        session_constructor: SessionConstructor,
+        closing_function: ClosingFunction,
+        initialization_options: str,
+    ) -> Any:
+        if session_info.instrument_type_id in _UNPOOLED_INSTRUMENT_TYPE_IDS:
+            return session_constructor(session_info)
+        key = _SessionKey(
+            session_info.instrument_type_id, session_info.resource_name, session_info.session_name
+        )
+        with self._lock:
+            pooled_session = self._idle_sessions.pop(key, None)
+            health_check = self._health_checks.get(key.instrument_type_id)
+        if pooled_session is not None and (
+            pooled_session.initialization_options != initialization_options
+            or not _is_healthy(pooled_session, health_check)
+        ):
+            # Close the session before initializing another one with the same name.
+            _close_pooled_session(pooled_session)
+            pooled_session = None
+        if pooled_session is None:
+            pooled_session = _PooledSession(
+                key, initialization_options, session_constructor(session_info), closing_function
+            )
+        with self._lock:
+            self._sessions_in_use[id(pooled_session.session)] = pooled_session
+        return pooled_session.session
+
+    @contextlib.contextmanager
+    def _returning_session(self, pooled_session: _PooledSession) -> Generator[Any]:
+        try:
+            yield pooled_session.session
+        except BaseException:
+            self._release(pooled_session, reuse=False)
+            raise
+        else:
+            self._release(pooled_session, reuse=True)
+
+    def _release(self, pooled_session: _PooledSession, reuse: bool) -> None:
+        with self._lock:
+            self._sessions_in_use.pop(id(pooled_session.session), None)
+            if (
+                reuse
+                and not pooled_session.discard
+                and pooled_session.key not in self._idle_sessions
+            ):
+                pooled_session.last_used = time.monotonic()
+                self._idle_sessions[pooled_session.key] = pooled_session
+                self._schedule_eviction()
+                return
+        _close_pooled_session(pooled_session)
+
+    def _schedule_eviction(self) -> None:
+        # The caller must hold the lock.
+        if self._idle_timeout < 0 or self._eviction_timer is not None or not self._idle_sessions:
+            return
+        deadline = (
+            min(pooled_session.last_used for pooled_session in self._idle_sessions.values())
+            + self._idle_timeout
+        )
+        self._eviction_timer = threading.Timer(
+            max(deadline - time.monotonic(), 0.0), self._evict_idle_sessions
+        )
+        self._eviction_timer.daemon = True
+        self._eviction_timer.start()
+
+    def _evict_idle_sessions(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._eviction_timer = None
+            keys = [
+                key
+                for key, pooled_session in self._idle_sessions.items()
+                if now - pooled_session.last_used >= self._idle_timeout
+            ]
+            sessions_to_close = [self._idle_sessions.pop(key) for key in keys]
+            self._schedule_eviction()
+        for pooled_session in sessions_to_close:
+            _logger.debug("Closing idle session '%s'.", pooled_session.key.session_name)
+            _close_pooled_session(pooled_session)
+
+
+def get_initialization_options(session_constructor: SessionConstructor) -> str:
+    """Get a key for the options that a session constructor initializes sessions with.
+
+    The session constructors of the driver-specific initialize methods store options
+    such as reset, driver options, and initialization behavior in attributes. Sessions
+    whose constructors have the same attributes are initialized the same way.
+
+    Args:
+        session_constructor: The session constructor.
+
+    Returns:
+        A string that is equal for constructors with the same options.
+    """
+    if isinstance(session_constructor, functools.partial):
+        return repr(
+            (session_constructor.func, session_constructor.args, session_constructor.keywords)
+        )
+    attributes = getattr(session_constructor, "__dict__", {})
+    return repr(
+        sorted(
+            (name, value)
+            for name, value in attributes.items()
+            # The gRPC channel is shared by all sessions and does not affect them.
+            if name != "_grpc_channel"
+        )
+    )
+
+
+def _closing_session(session: Any) -> ContextManager[Any]:
+    if not isinstance(session, contextlib.AbstractContextManager):
+        raise TypeError("Session must be a context manager.")
+    return session
+
+
+def _is_healthy(pooled_session: _PooledSession, health_check: HealthCheck | None) -> bool:
+    if health_check is None:
+        return True
+    try:
+        return bool(health_check(pooled_session.session))
+    except Exception:
+        _logger.warning(
+            "Health check failed for session '%s'.", pooled_session.key.session_name, exc_info=True
+        )
+        return False
+
+
+def _close_pooled_session(pooled_session: _PooledSession) -> None:
+    try:
+        with pooled_session.closing_function(pooled_session.session):
+            pass
+    except Exception:
+        _logger.warning(
+            "Failed to close session '%s'.", pooled_session.key.session_name, exc_info=True
+        )
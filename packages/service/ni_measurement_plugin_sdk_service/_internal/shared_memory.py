@@ -0,0 +1,245 @@
+"""Shared memory transport for large measurement outputs."""
+
+from __future__ import annotations
+
+import collections
+import ipaddress
+import logging
+import os
+import re
+import secrets
+import threading
+import time
+import urllib.parse
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+from google.protobuf import any_pb2, struct_pb2
+
+_logger = logging.getLogger(__name__)
+
+_NAME_FIELD = "shared_memory_name"
+_SIZE_FIELD = "size"
+_TYPE_URL_FIELD = "type_url"
+
+# Segment names are short enough for macOS, which limits them to 31 characters.
+_NAME_PREFIX = "nimp_"
+_NAME_PATTERN = re.compile(_NAME_PREFIX + "[0-9a-f]{16}")
+
+# The byte after the outputs, which the client sets after reading them.
+_READ = 1
+
+# The maximum time in seconds between checks for segments to release.
+_RELEASE_INTERVAL = 1.0
+
+
+def is_local_peer(peer: str) -> bool:
+    """Determine whether a gRPC peer string refers to the local machine.
+
+    Args:
+        peer: The peer string returned by grpc.ServicerContext.peer(), such as
+            "ipv4:127.0.0.1:1234", "ipv6:[::1]:1234", or "unix:/tmp/service.sock".
+
+    Returns:
+        True if the peer is connected through a Unix domain socket or a loopback address.
+    """
+    scheme, _, address = urllib.parse.unquote(peer).partition(":")
+    if scheme == "unix":
+        return True
+    if scheme not in ("ipv4", "ipv6"):
+        return False
+    host = address.rpartition(":")[0].strip("[]")
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _unlink(shared_memory: SharedMemory) -> None:
+    try:
+        shared_memory.unlink()
+    except FileNotFoundError:
+        # The other process already unlinked the segment, so stop tracking it.
+        if os.name == "posix":
+            name = shared_memory._name  # type: ignore[attr-defined]
+            resource_tracker.unregister(name, "shared_memory")
+
+
+class SharedMemoryWriter:
+    """Writes large measurement outputs to shared memory segments.
+
+    The client that reads a segment marks it as read and unlinks it, and the writer
+    releases segments that have been read. Segments that are not read are released
+    after ``lifetime`` seconds. A background timer checks for segments to release
+    while any exist, so an idle service does not keep them.
+    """
+
+    def __init__(self, threshold: int, lifetime: float = 60.0) -> None:
+        """Initialize the shared memory writer.
+
+        Args:
+            threshold: The minimum size in bytes of serialized outputs to write to
+                shared memory. Smaller outputs are sent in the response message.
+
+            lifetime: The time in seconds to keep a segment that has not been read
+                before releasing it.
+        """
+        if threshold <= 0:
+            raise ValueError("The shared memory threshold must be positive.")
+        self._threshold = threshold
+        self._lifetime = lifetime
+        self._lock = threading.Lock()
+        self._segments: collections.deque[tuple[float, SharedMemory, int]] = collections.deque()
+        self._timer: threading.Timer | None = None
+
+    @property
+    def threshold(self) -> int:
+        """The minimum size in bytes of serialized outputs to write to shared memory."""
+        return self._threshold
+
+    def write(self, value: bytes, type_url: str) -> any_pb2.Any:
+        """Write serialized outputs to shared memory if they are large enough.
+
+        The outputs are copied into the segment once. They are not written as raw
+        arrays, because the client decodes them with the outputs message type either
+        way, and parsing the bytes directly from the segment is slower than copying
+        them out first.
+
+        Args:
+            value: The serialized outputs message.
+
+            type_url: The type URL of the outputs message.
+
+        Returns:
+            A reference to the shared memory segment, or the serialized outputs if
+            they are smaller than the threshold.
+        """
+        self._release_segments()
+        size = len(value)
+        if size < self._threshold:
+            return any_pb2.Any(type_url=type_url, value=value)
+
+        # Reserve one byte after the outputs for the client to mark the segment as read.
+        shared_memory = SharedMemory(
+            name=_NAME_PREFIX + secrets.token_hex(8), create=True, size=size + 1
+        )
+        try:
+            assert shared_memory.buf is not None
+            shared_memory.buf[:size] = value
+            shared_memory.buf[size] = 0
+        except BaseException:
+            shared_memory.close()
+            _unlink(shared_memory)
+            raise
+        with self._lock:
+            self._segments.append((time.monotonic(), shared_memory, size))
+            self._start_timer()
+
+        reference = struct_pb2.Struct()
+        reference.update(
+            {
+                _NAME_FIELD: shared_memory.name,
+                _SIZE_FIELD: size,
+                _TYPE_URL_FIELD: type_url,
+            }
+        )
+        result = any_pb2.Any()
+        result.Pack(reference)
+        return result
+
+    def close(self) -> None:
+        """Release all shared memory segments."""
+        with self._lock:
+            segments = list(self._segments)
+            self._segments.clear()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        for _, shared_memory, _ in segments:
+            self._release(shared_memory)
+
+    def _start_timer(self) -> None:
+        # Called with the lock held.
+        if self._timer is None and self._segments:
+            self._timer = threading.Timer(
+                min(self._lifetime, _RELEASE_INTERVAL), self._on_timer_elapsed
+            )
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _on_timer_elapsed(self) -> None:
+        with self._lock:
+            self._timer = None
+        self._release_segments()
+        with self._lock:
+            self._start_timer()
+
+    def _release_segments(self) -> None:
+        released_segments = []
+        now = time.monotonic()
+        with self._lock:
+            remaining_segments: collections.deque[tuple[float, SharedMemory, int]] = (
+                collections.deque()
+            )
+            for segment in self._segments:
+                create_time, shared_memory, size = segment
+                if now - create_time >= self._lifetime or _is_read(shared_memory, size):
+                    released_segments.append(shared_memory)
+                else:
+                    remaining_segments.append(segment)
+            self._segments = remaining_segments
+        for shared_memory in released_segments:
+            self._release(shared_memory)
+
+    def _release(self, shared_memory: SharedMemory) -> None:
+        shared_memory.close()
+        _unlink(shared_memory)
+
+
+def _is_read(shared_memory: SharedMemory, size: int) -> bool:
+    assert shared_memory.buf is not None
+    return shared_memory.buf[size] == _READ
+
+
+def read_shared_memory_outputs(outputs: any_pb2.Any) -> any_pb2.Any:
+    """Read serialized outputs from shared memory if the response refers to it.
+
+    The shared memory segment is marked as read and released.
+
+    Args:
+        outputs: The outputs from the measurement response.
+
+    Returns:
+        The serialized outputs.
+
+    Raises:
+        ValueError: If the response refers to a shared memory segment that was not
+            created by a measurement service.
+    """
+    if not outputs.Is(struct_pb2.Struct.DESCRIPTOR):
+        return outputs
+
+    reference = struct_pb2.Struct()
+    outputs.Unpack(reference)
+    if _NAME_FIELD not in reference.fields:
+        return outputs
+
+    name = reference.fields[_NAME_FIELD].string_value
+    size = int(reference.fields[_SIZE_FIELD].number_value)
+    if not _NAME_PATTERN.fullmatch(name):
+        raise ValueError(f"Invalid shared memory segment name: {name!r}")
+    shared_memory = SharedMemory(name=name)
+    try:
+        assert shared_memory.buf is not None
+        if not 0 <= size < len(shared_memory.buf):
+            raise ValueError(
+                f"Invalid size for shared memory segment {name!r}: {size} "
+                f"(segment size {len(shared_memory.buf)})"
+            )
+        value = bytes(shared_memory.buf[:size])
+        shared_memory.buf[size] = _READ
+    finally:
+        shared_memory.close()
+        _unlink(shared_memory)
+    _logger.debug("Read %d bytes of outputs from shared memory segment %s.", size, name)
+    return any_pb2.Any(type_url=reference.fields[_TYPE_URL_FIELD].string_value, value=value)
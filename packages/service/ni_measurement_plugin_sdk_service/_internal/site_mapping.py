@@ -0,0 +1,72 @@
+"""Concurrent execution of measurement code for each site."""
+
+from __future__ import annotations
+
+import contextvars
+from collections.abc import Sequence
+from concurrent.futures import FIRST_EXCEPTION, Future, ThreadPoolExecutor, wait
+from typing import Callable, TypeVar
+
+_T = TypeVar("_T")
+
+
+def map_sites(
+    function: Callable[[int], _T],
+    sites: Sequence[int],
+    max_workers: int | None = None,
+    add_cancel_callback: Callable[[Callable[[], None]], None] | None = None,
+) -> list[_T]:
+    """Call a function for each site concurrently and return the results in site order.
+
+    Each call runs in a worker thread with a copy of the caller's context, so it can use
+    the measurement context, metrics, and tracing of the current RPC. If a call raises
+    an exception, the calls that have not started are canceled, and the exception of
+    the first site that failed is raised after the running calls complete.
+
+    Args:
+        function: The function to call with each site number.
+
+        sites: The site numbers.
+
+        max_workers: The maximum number of sites to run at the same time. By default,
+            all sites run at the same time.
+
+        add_cancel_callback: A function that registers a callback to invoke when the RPC
+            is canceled. When it is invoked, the calls that have not started are
+            canceled.
+
+    Returns:
+        The return value of each call, in the same order as ``sites``.
+    """
+    if not sites:
+        return []
+    with ThreadPoolExecutor(
+        max_workers=max_workers or len(sites), thread_name_prefix="MeasurementPluginSite"
+    ) as executor:
+        futures: list[Future[_T]] = [
+            executor.submit(contextvars.copy_context().run, function, site) for site in sites
+        ]
+        if add_cancel_callback is not None:
+            add_cancel_callback(lambda: _cancel_pending(futures))
+        wait(futures, return_when=FIRST_EXCEPTION)
+        if any(_get_exception(future) is not None for future in futures):
+            _cancel_pending(futures)
+    # Exiting the executor waits for the running calls, so every future is done or
+    # canceled. Raise the exception of a site that failed rather than the
+    # CancelledError of a site that was canceled because of it.
+    for future in futures:
+        exception = _get_exception(future)
+        if exception is not None:
+            raise exception
+    return [future.result() for future in futures]
+
+
+def _get_exception(future: Future[_T]) -> BaseException | None:
+    if not future.done() or future.cancelled():
+        return None
+    return future.exception()
+
+
+def _cancel_pending(futures: Sequence[Future[_T]]) -> None:
+    for future in futures:
+        future.cancel()
@@ -0,0 +1,457 @@
+"""Supervisor that runs multiple replicas of a measurement service.
+
+Usage::
+
+    python -m ni_measurement_plugin_sdk_service._internal.supervisor --workers 4 measurement.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Sequence
+from types import TracebackType
+from typing import TYPE_CHECKING, Literal, NamedTuple
+
+import grpc
+
+from ni_measurement_plugin_sdk_service import _configuration
+from ni_measurement_plugin_sdk_service._internal.health import (
+    LoadReport,
+    ServingStatus,
+    check_health,
+)
+from ni_measurement_plugin_sdk_service._internal.service_address import (
+    _WILDCARD_ADDRESSES,
+)
+
+if TYPE_CHECKING:
+    if sys.version_info >= (3, 11):
+        from typing import Self
+    else:
+        from typing_extensions import Self
+
+_logger = logging.getLogger(__name__)
+
+_ENV_PREFIX = "MEASUREMENT_PLUGIN"
+_HEALTH_CHECK_TIMEOUT = 1.0
+
+# Options that control a single process, which replicas must not inherit from the
+# supervisor's environment or a .env file. Setting them overrides the .env file.
+_PER_PROCESS_OPTIONS = {
+    # Replicas of the same service would drain each other.
+    f"{_ENV_PREFIX}_SERVICE_HANDOVER": "0",
+    # Replicas cannot share a port file or metrics port.
+    f"{_ENV_PREFIX}_SERVICE_PORT_FILE": "",
+    f"{_ENV_PREFIX}_METRICS_PORT": "0",
+}
+
+
+class WorkerHealth(NamedTuple):
+    """The health of a measurement service replica."""
+
+    replica_index: int
+    """The index of the replica."""
+
+    pid: int | None
+    """The process ID of the replica, or None if it is not running."""
+
+    restart_count: int
+    """The number of times that the replica has been restarted."""
+
+    status: ServingStatus
+    """The serving status of the replica, or UNKNOWN if it did not respond."""
+
+    load_report: LoadReport | None
+    """The load on the replica, or None if it did not report its load."""
+
+
+class _Worker:
+    def __init__(self, index: int, port: int, unix_socket_directory: str) -> None:
+        self.index = index
+        self.port = port
+        self.unix_socket_directory = unix_socket_directory
+        self.port_file = ""
+        self.process: subprocess.Popen[bytes] | None = None
+        self.channel: grpc.Channel | None = None
+        self.start_time = 0.0
+        self.restart_time = 0.0
+        self.restart_count = 0
+        self.consecutive_failures = 0
+
+
+class ReplicaSupervisor:
+    """Runs multiple replicas of a measurement service and restarts them if they exit.
+
+    Each replica is a separate process that runs ``command``. By default, each
+    replica listens on its own port and registers itself with the discovery
+    service. With ``reuse_port``, all replicas listen on the same port and the
+    operating system distributes connections between them.
+
+    Replicas are stopped by closing their standard input, which causes the
+    ``input()`` call in a typical measurement service script to return.
+    """
+
+    def __init__(
+        self,
+        command: Sequence[str],
+        worker_count: int,
+        port: int = 0,
+        reuse_port: bool = False,
+        restart_delay: float = 1.0,
+        max_restart_delay: float = 30.0,
+        shutdown_timeout: float = 10.0,
+    ) -> None:
+        """Initialize the supervisor.
+
+        Args:
+            command: The command that runs one replica of the measurement service.
+
+            worker_count: The number of replicas to run.
+
+            port: The port for the first replica. Other replicas use consecutive
+                ports, or the same port if ``reuse_port`` is True. If not specified,
+                each replica binds a free port when it starts and reports it to the
+                supervisor through a file.
+
+            reuse_port: Whether all replicas listen on the same port.
+
+            restart_delay: The time in seconds to wait before restarting a replica
+                that exits. The delay doubles each time the replica exits shortly
+                after starting.
+
+            max_restart_delay: The maximum time in seconds to wait before
+                restarting a replica.
+
+            shutdown_timeout: The time in seconds to wait for replicas to exit
+                before terminating them.
+        """
+        if worker_count < 1:
+            raise ValueError("The number of workers must be at least 1.")
+        if reuse_port and sys.platform == "win32":
+            raise ValueError("Sharing a port between replicas is not supported on Windows.")
+        if reuse_port and port <= 0:
+            raise ValueError("A port must be specified when sharing a port between replicas.")
+        self._command = list(command)
+        self._reuse_port = reuse_port
+        self._restart_delay = restart_delay
+        self._max_restart_delay = max_restart_delay
+        self._shutdown_timeout = shutdown_timeout
+        self._bind_address = _configuration.SERVICE_BIND_ADDRESS
+        self._lock = threading.Lock()
+        self._stopping = False
+        self._temporary_directory: tempfile.TemporaryDirectory[str] | None = None
+        self._workers = [_Worker(index, 0, "") for index in range(worker_count)]
+        self._first_port = port
+
+    @property
+    def worker_count(self) -> int:
+        """The number of replicas."""
+        return len(self._workers)
+
+    def start(self) -> None:
+        """Start all replicas."""
+        if self._reuse_port or self._first_port <= 0:
+            # Replicas that share a port can only be checked individually through
+            # their Unix domain sockets, and replicas that bind a free port report it
+            # in a file.
+            self._temporary_directory = tempfile.TemporaryDirectory(prefix="ni-measurement-")
+        for worker in self._workers:
+            if self._reuse_port:
+                assert self._temporary_directory is not None
+                worker.port = self._first_port
+                worker.unix_socket_directory = os.path.join(
+                    self._temporary_directory.name, f"worker-{worker.index}"
+                )
+                os.makedirs(worker.unix_socket_directory, exist_ok=True)
+            elif self._first_port > 0:
+                worker.port = self._first_port + worker.index
+            else:
+                # Let the replica bind port 0, so that no other process can take the
+                # port between choosing it and binding it.
+                assert self._temporary_directory is not None
+                worker.port_file = os.path.join(
+                    self._temporary_directory.name, f"worker-{worker.index}.port"
+                )
+        with self._lock:
+            self._stopping = False
+            for worker in self._workers:
+                self._start_worker(worker)
+
+    def poll(self) -> None:
+        """Restart replicas that have exited."""
+        now = time.monotonic()
+        with self._lock:
+            if self._stopping:
+                return
+            for worker in self._workers:
+                if worker.process is not None:
+                    exit_code = worker.process.poll()
+                    if exit_code is None:
+                        continue
+                    self._close_channel(worker)
+                    _close_stdin(worker.process)
+                    worker.process = None
+                    if now - worker.start_time >= self._max_restart_delay:
+                        worker.consecutive_failures = 0
+                    delay = min(
+                        self._restart_delay * 2**worker.consecutive_failures,
+                        self._max_restart_delay,
+                    )
+                    worker.consecutive_failures += 1
+                    worker.restart_time = now + delay
+                    _logger.warning(
+                        "Measurement service replica %d exited with code %d. "
+                        "Restarting in %.1f seconds.",
+                        worker.index,
+                        exit_code,
+                        delay,
+                    )
+                elif now >= worker.restart_time:
+                    worker.restart_count += 1
+                    self._start_worker(worker)
+
+    def get_health(self) -> list[WorkerHealth]:
+        """Check the health of each replica.
+
+        Returns:
+            The health of each replica.
+        """
+        with self._lock:
+            workers = [
+                (worker, worker.process, self._get_channel(worker)) for worker in self._workers
+            ]
+        health = []
+        for worker, process, channel in workers:
+            status, load_report = ServingStatus.NOT_SERVING, None
+            if process is not None and channel is not None:
+                try:
+                    status, load_report = check_health(channel, timeout=_HEALTH_CHECK_TIMEOUT)
+                except grpc.RpcError:
+                    status = ServingStatus.UNKNOWN
+            health.append(
+                WorkerHealth(
+                    worker.index,
+                    process.pid if process is not None else None,
+                    worker.restart_count,
+                    status,
+                    load_report,
+                )
+            )
+        return health
+
+    def run(
+        self, health_check_interval: float = 5.0, stop_event: threading.Event | None = None
+    ) -> None:
+        """Restart replicas that exit and log their health until stopped.
+
+        Args:
+            health_check_interval: The time in seconds between health checks.
+
+            stop_event: An event that stops the supervisor when it is set. If not
+                specified, the supervisor runs until it is interrupted.
+        """
+        stop_event = stop_event or threading.Event()
+        next_health_check = time.monotonic()
+        previous_summary = ""
+        while not stop_event.is_set():
+            self.poll()
+            if time.monotonic() >= next_health_check:
+                summary = _summarize_health(self.get_health())
+                # Only log changes so that an idle supervisor does not flood the log.
+                if summary != previous_summary:
+                    _logger.info("%s", summary)
+                    previous_summary = summary
+                next_health_check = time.monotonic() + health_check_interval
+            stop_event.wait(min(0.5, health_check_interval))
+
+    def stop(self) -> None:
+        """Stop all replicas."""
+        with self._lock:
+            self._stopping = True
+            processes = []
+            for worker in self._workers:
+                self._close_channel(worker)
+                if worker.process is not None:
+                    processes.append(worker.process)
+                    worker.process = None
+        for process in processes:
+            _close_stdin(process)
+        deadline = time.monotonic() + self._shutdown_timeout
+        for process in processes:
+            try:
+                process.wait(max(deadline - time.monotonic(), 0.0))
+            except subprocess.TimeoutExpired:
+                _logger.warning(
+                    "Measurement service replica with process ID %d did not exit. Terminating it.",
+                    process.pid,
+                )
+                process.kill()
+                process.wait()
+        if self._temporary_directory is not None:
+            self._temporary_directory.cleanup()
+            self._temporary_directory = None
+
+    def __enter__(self: Self) -> Self:
+        """Start all replicas."""
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> Literal[False]:
+        """Stop all replicas."""
+        self.stop()
+        return False
+
+    def _start_worker(self, worker: _Worker) -> None:
+        env = dict(os.environ)
+        env.update(_PER_PROCESS_OPTIONS)
+        env[f"{_ENV_PREFIX}_SERVICE_BIND_PORT"] = str(worker.port)
+        # The supervisor checks the health of each replica.
+        env[f"{_ENV_PREFIX}_HEALTH_SERVICE_ENABLED"] = "1"
+        if worker.port_file:
+            # The replica binds a new free port each time it starts.
+            worker.port = 0
+            if os.path.exists(worker.port_file):
+                os.remove(worker.port_file)
+            env[f"{_ENV_PREFIX}_SERVICE_PORT_FILE"] = worker.port_file
+        if self._reuse_port:
+            # Remove the socket of a replica that did not exit cleanly.
+            for socket_path in glob.glob(os.path.join(worker.unix_socket_directory, "*.sock")):
+                os.remove(socket_path)
+            env[f"{_ENV_PREFIX}_SERVICE_REUSE_PORT"] = "1"
+            env[f"{_ENV_PREFIX}_USE_UNIX_SOCKET"] = "1"
+            env[f"{_ENV_PREFIX}_UNIX_SOCKET_DIRECTORY"] = worker.unix_socket_directory
+        worker.process = subprocess.Popen(self._command, stdin=subprocess.PIPE, env=env)
+        worker.start_time = time.monotonic()
+        _logger.info(
+            "Started measurement service replica %d with process ID %d on %s.",
+            worker.index,
+            worker.process.pid,
+            f"port {worker.port}" if worker.port else "a free port",
+        )
+
+    def _get_channel(self, worker: _Worker) -> grpc.Channel | None:
+        if worker.channel is None and worker.process is not None:
+            target = self._get_health_check_target(worker)
+            if target:
+                worker.channel = grpc.insecure_channel(target)
+        return worker.channel
+
+    def _get_health_check_target(self, worker: _Worker) -> str:
+        if self._reuse_port:
+            socket_paths = glob.glob(os.path.join(worker.unix_socket_directory, "*.sock"))
+            return f"unix:{socket_paths[0]}" if socket_paths else ""
+        if worker.port_file and not worker.port:
+            worker.port = _read_port_file(worker.port_file)
+            if not worker.port:
+                return ""
+        host = "localhost" if self._bind_address in _WILDCARD_ADDRESSES else self._bind_address
+        return f"{host}:{worker.port}"
+
+    def _close_channel(self, worker: _Worker) -> None:
+        if worker.channel is not None:
+            worker.channel.close()
+            worker.channel = None
+
+
+def _close_stdin(process: subprocess.Popen[bytes]) -> None:
+    if process.stdin is not None:
+        try:
+            process.stdin.close()
+        except OSError:
+            # The process already exited.
+            pass
+
+
+def _read_port_file(path: str) -> int:
+    # The replica writes the file after it starts listening.
+    try:
+        with open(path) as file:
+            return int(file.read())
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def _summarize_health(health: Sequence[WorkerHealth]) -> str:
+    serving = sum(1 for worker in health if worker.status == ServingStatus.SERVING)
+    load_reports = [worker.load_report for worker in health if worker.load_report is not None]
+    in_flight = sum(load_report.in_flight for load_report in load_reports)
+    queue_length = sum(load_report.queue_length for load_report in load_reports)
+    return (
+        f"{serving} of {len(health)} measurement service replicas serving, "
+        f"{in_flight} calls in flight, {queue_length} calls queued."
+    )
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Run multiple replicas of a measurement service."""
+    parser = argparse.ArgumentParser(
+        description="Run multiple replicas of a measurement service and restart them if they exit."
+    )
+    parser.add_argument("script", help="The measurement service script to run.")
+    parser.add_argument(
+        "script_args", nargs=argparse.REMAINDER, help="Arguments to pass to the script."
+    )
+    parser.add_argument(
+        "-n",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="The number of replicas to run. Defaults to the number of CPUs.",
+    )
+    parser.add_argument(
+        "-p",
+        "--port",
+        type=int,
+        default=0,
+        help="The port for the first replica. Other replicas use consecutive ports.",
+    )
+    parser.add_argument(
+        "--reuse-port",
+        action="store_true",
+        help="Listen on the same port in all replicas. Not supported on Windows.",
+    )
+    parser.add_argument(
+        "--health-check-interval",
+        type=float,
+        default=5.0,
+        help="The time in seconds between health checks.",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose logging.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        format="%(asctime)s %(levelname)s: %(message)s",
+        level=logging.DEBUG if args.verbose else logging.INFO,
+    )
+    try:
+        supervisor = ReplicaSupervisor(
+            [sys.executable, args.script, *args.script_args],
+            args.workers,
+            args.port,
+            args.reuse_port,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    with supervisor:
+        try:
+            supervisor.run(args.health_check_interval)
+        except KeyboardInterrupt:
+            _logger.info("Stopping measurement service replicas.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""Trace spans for measurement calls, appended to a local file."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections.abc import Iterable
+from contextvars import ContextVar, Token
+from types import TracebackType
+from typing import IO, Any
+
+from ni_measurement_plugin_sdk_service._configuration import TRACE_FILE, TRACE_FORMAT
+from ni_measurement_plugin_sdk_service._grpc_metadata import TRACEPARENT_KEY
+
+_logger = logging.getLogger(__name__)
+
+# W3C Trace Context: version-trace_id-parent_id-trace_flags
+_TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+_TRACE_FORMATS = ("jsonl", "chrome")
+
+
+class _TraceWriter:
+    """Appends finished spans to a trace file, one event per line."""
+
+    def __init__(self, path: str, trace_format: str = "jsonl") -> None:
+        trace_format = trace_format.lower()
+        if trace_format not in _TRACE_FORMATS:
+            raise ValueError(
+                f"Unsupported trace format {trace_format!r}. Supported formats: {_TRACE_FORMATS}"
+            )
+        self._path = path
+        self._format = trace_format
+        self._file: IO[str] | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def write(self, span: Span, duration_ns: int) -> None:
+        if self._format == "chrome":
+            # The Chrome trace event format allows the closing bracket and a trailing
+            # comma to be omitted, so events can be appended to an unterminated array.
+            line = json.dumps(self._to_chrome_event(span, duration_ns)) + ",\n"
+        else:
+            line = json.dumps(self._to_json(span, duration_ns)) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = open(self._path, "a", encoding="utf-8", buffering=1)
+                if self._format == "chrome" and self._file.tell() == 0:
+                    self._file.write("[\n")
+            self._file.write(line)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    @staticmethod
+    def _to_json(span: Span, duration_ns: int) -> dict[str, Any]:
+        return {
+            "name": span.name,
+            "trace_id": span.trace_id,
+            "span_id": span.span_id,
+            "parent_span_id": span.parent_span_id,
+            "start_time_unix_nano": span.start_time_ns,
+            "duration_nano": duration_ns,
+            "pid": os.getpid(),
+            "tid": span.thread_id,
+            "attributes": span.attributes,
+        }
+
+    @staticmethod
+    def _to_chrome_event(span: Span, duration_ns: int) -> dict[str, Any]:
+        return {
+            "name": span.name,
+            "cat": "measurement",
+            "ph": "X",
+            "ts": span.start_time_ns / 1000,
+            "dur": duration_ns / 1000,
+            "pid": os.getpid(),
+            "tid": span.thread_id,
+            "args": {
+                "trace_id": span.trace_id,
+                "span_id": span.span_id,
+                "parent_span_id": span.parent_span_id,
+                **span.attributes,
+            },
+        }
+
+
+_trace_writer: _TraceWriter | None = _TraceWriter(TRACE_FILE, TRACE_FORMAT) if TRACE_FILE else None
+_current_span: ContextVar[Span | None] = ContextVar("_current_span", default=None)
+
+
+def configure_tracing(trace_file: str, trace_format: str = "jsonl") -> None:
+    """Start or stop appending trace spans to a file.
+
+    Args:
+        trace_file: The path of the trace file, or "" to disable tracing.
+
+        trace_format: "jsonl" to write one span per line, or "chrome" to write the
+            Chrome trace event format.
+    """
+    global _trace_writer
+    old_writer = _trace_writer
+    _trace_writer = _TraceWriter(trace_file, trace_format) if trace_file else None
+    if old_writer is not None:
+        old_writer.close()
+
+
+def is_tracing_enabled() -> bool:
+    """Determine whether trace spans are recorded."""
+    return _trace_writer is not None
+
+
+def _generate_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+class Span:
+    """A timed operation within a trace.
+
+    A span that is used as a context manager becomes the parent of spans that are
+    started within the ``with`` block, and ends when the block exits.
+    """
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_span_id",
+        "attributes",
+        "start_time_ns",
+        "thread_id",
+        "_start_perf_counter_ns",
+        "_writer",
+        "_token",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_span_id: str,
+        attributes: dict[str, Any],
+        writer: _TraceWriter | None,
+    ) -> None:
+        """Initialize and start the span."""
+        self.name = name
+        self.trace_id = trace_id
+        self.parent_span_id = parent_span_id
+        self.attributes = attributes
+        self._writer = writer
+        self._token: Token[Span | None] | None = None
+        if writer is None:
+            self.span_id = ""
+            self.thread_id = 0
+            self.start_time_ns = self._start_perf_counter_ns = 0
+            return
+        self.span_id = _generate_id(64)
+        self.thread_id = threading.get_ident()
+        self.start_time_ns = time.time_ns()
+        self._start_perf_counter_ns = time.perf_counter_ns()
+
+    @property
+    def is_recording(self) -> bool:
+        """Indicates whether the span is written to the trace file when it ends."""
+        return bool(self.span_id)
+
+    @property
+    def traceparent(self) -> str:
+        """The W3C trace context of this span, or "" if the span is not recording."""
+        if not self.span_id:
+            return ""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set an attribute of the span."""
+        if self._writer is not None:
+            self.attributes[key] = value
+
+    def end(self) -> None:
+        """End the span and write it to the trace file."""
+        writer, self._writer = self._writer, None
+        if writer is None:
+            return
+        duration_ns = time.perf_counter_ns() - self._start_perf_counter_ns
+        try:
+            writer.write(self, duration_ns)
+        except (OSError, TypeError, ValueError) as e:
+            _logger.warning("Failed to write trace span to %s: %s", writer.path, e)
+
+    def __enter__(self) -> Span:
+        """Make this span the current span."""
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Restore the previous current span and end this span."""
+        if self._token is not None:
+            _current_span.reset(self._token)
+            self._token = None
+        if exc_val is not None and not isinstance(exc_val, (StopIteration, GeneratorExit)):
+            self.set_attribute("error", f"{type(exc_val).__name__}: {exc_val}")
+        self.end()
+
+
+def start_span(name: str, traceparent: str = "", **attributes: Any) -> Span:
+    """Start a trace span.
+
+    Args:
+        name: The name of the span.
+
+        traceparent: The W3C trace context of a remote parent span, such as the
+            client span of a measurement call. If not specified, the parent is the
+            current span.
+
+        attributes: Attributes to record with the span.
+
+    Returns:
+        The span. If tracing is disabled, the span is not recorded.
+    """
+    writer = _trace_writer
+    if writer is None:
+        return Span(name, "", "", attributes, None)
+    match = _TRACEPARENT_PATTERN.match(traceparent) if traceparent else None
+    if match is not None:
+        trace_id, parent_span_id = match.group(1), match.group(2)
+    else:
+        parent = _current_span.get()
+        if parent is not None and parent.is_recording:
+            trace_id, parent_span_id = parent.trace_id, parent.span_id
+        else:
+            trace_id, parent_span_id = _generate_id(128), ""
+    return Span(name, trace_id, parent_span_id, attributes, writer)
+
+
+def get_traceparent(metadata: Iterable[tuple[str, str | bytes]] | None) -> str:
+    """Get the W3C trace context from gRPC metadata."""
+    for key, value in metadata or ():
+        if key == TRACEPARENT_KEY and isinstance(value, str):
+            return value
+    return ""
@@ -9,6 +9,22 @@ from typing import Any
 from google.protobuf.descriptor_pb2 import FieldDescriptorProto
 
 from ni_measurement_plugin_sdk_service._annotations import TYPE_SPECIALIZATION_KEY
+from ni_measurement_plugin_sdk_service._grpc_metadata import (
+    ACCEPT_SHARED_MEMORY_KEY,
+    PRIORITY_KEY,
+    REQUEST_CALL_STATS_KEY,
+    TRACEPARENT_KEY,
+)
+from ni_measurement_plugin_sdk_service._internal.call_stats import (
+    CallStats,
+    get_call_stats,
+)
+from ni_measurement_plugin_sdk_service._internal.channel_pool import (
+    create_grpc_channel_pool,
+)
+from ni_measurement_plugin_sdk_service._internal.load_balancing import (
+    get_service_channel,
+)
 from ni_measurement_plugin_sdk_service._internal.parameter.decoder import (
     deserialize_parameters as _internal_deserialize_parameters,
 )
@@ -21,16 +37,78 @@ from ni_measurement_plugin_sdk_service._internal.parameter.metadata import (
 from ni_measurement_plugin_sdk_service._internal.parameter.serialization_descriptors import (
     create_file_descriptor,
 )
-from ni_measurement_plugin_sdk_service.measurement.info import TypeSpecialization
+from ni_measurement_plugin_sdk_service._internal.service_address import (
+    resolve_service_address,
+)
+from ni_measurement_plugin_sdk_service._internal.shared_memory import (
+    read_shared_memory_outputs,
+)
+from ni_measurement_plugin_sdk_service._internal.tracing import start_span
+from ni_measurement_plugin_sdk_service.measurement.info import (
+    LoadBalancingPolicy,
+    MeasurementPriority,
+    TypeSpecialization,
+)
 
 __all__ = [
+    "CallStats",
+    "create_call_metadata",
     "create_file_descriptor",
+    "create_grpc_channel_pool",
     "deserialize_parameters",
+    "get_call_stats",
+    "get_service_channel",
+    "LoadBalancingPolicy",
+    "MeasurementPriority",
     "ParameterMetadata",
+    "read_shared_memory_outputs",
+    "resolve_service_address",
     "serialize_parameters",
+    "start_span",
 ]
 
 
+def create_call_metadata(
+    *,
+    priority: MeasurementPriority | None = None,
+    accept_shared_memory: bool = False,
+    traceparent: str = "",
+    request_call_stats: bool = False,
+) -> tuple[tuple[str, str], ...]:
+    """Create the gRPC metadata to send with a measurement call.
+
+    Args:
+        priority: The scheduling priority of the call. If not specified, the
+            measurement service uses :any:`MeasurementPriority.NORMAL`. The priority
+            has an effect only if the measurement service limits the number of
+            concurrent measurement calls.
+
+        accept_shared_memory: Specifies whether the client accepts large outputs in
+            shared memory. Clients that specify this must pass each response's
+            outputs to :any:`read_shared_memory_outputs`.
+
+        traceparent: The W3C trace context of the client span for the call, which
+            the measurement service uses as the parent of its spans.
+
+        request_call_stats: Specifies whether the measurement service returns the
+            server-side cost of the call in the trailing metadata. Pass the completed
+            call to :any:`get_call_stats` to read it.
+
+    Returns:
+        A tuple of gRPC metadata key/value pairs.
+    """
+    metadata: list[tuple[str, str]] = []
+    if priority is not None:
+        metadata.append((PRIORITY_KEY, MeasurementPriority(priority).name))
+    if accept_shared_memory:
+        metadata.append((ACCEPT_SHARED_MEMORY_KEY, "1"))
+    if traceparent:
+        metadata.append((TRACEPARENT_KEY, traceparent))
+    if request_call_stats:
+        metadata.append((REQUEST_CALL_STATS_KEY, "1"))
+    return tuple(metadata)
+
+
 def deserialize_parameters(
     parameter_metadata_dict: dict[int, ParameterMetadata],
     parameter_bytes: bytes,
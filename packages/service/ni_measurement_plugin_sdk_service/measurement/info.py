@@ -8,7 +8,14 @@ from typing import NamedTuple
 
 from ni.measurementlink.discovery.v1.client import ServiceInfo
 
-__all__ = ["ServiceInfo", "MeasurementInfo", "TypeSpecialization", "DataType"]
+__all__ = [
+    "ServiceInfo",
+    "MeasurementInfo",
+    "MeasurementPriority",
+    "LoadBalancingPolicy",
+    "TypeSpecialization",
+    "DataType",
+]
 
 
 class MeasurementInfo(NamedTuple):
@@ -25,6 +32,40 @@ class MeasurementInfo(NamedTuple):
     files)."""
 
 
+class MeasurementPriority(enum.IntEnum):
+    """Enum that represents the scheduling priority of a measurement call.
+
+    When the measurement service limits the number of concurrent measurement calls,
+    queued calls with a higher priority are admitted first.
+
+    Priority has no effect unless the measurement service sets
+    MEASUREMENT_PLUGIN_MAX_CONCURRENT_MEASUREMENTS to a value greater than 0. Otherwise,
+    every call starts immediately and the priority is only recorded in traces.
+    """
+
+    INTERACTIVE = 0
+    """Interactive use, such as debugging in InstrumentStudio."""
+
+    NORMAL = 1
+    """The default priority."""
+
+    PRODUCTION = 2
+    """Production test execution, such as a TestStand sequence."""
+
+
+class LoadBalancingPolicy(enum.Enum):
+    """Enum that represents how a client distributes calls across service replicas."""
+
+    ROUND_ROBIN = "round_robin"
+    """Send each call to the next replica in turn."""
+
+    LEAST_OUTSTANDING = "least_outstanding"
+    """Send each call to the replica with the fewest calls in progress."""
+
+    PIN_AFFINITY = "pin_affinity"
+    """Send calls with the same pin map and sites to the same replica."""
+
+
 class TypeSpecialization(enum.Enum):
     """Enum that represents the type specializations for measurement parameters."""
 
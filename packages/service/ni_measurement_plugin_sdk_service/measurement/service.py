@@ -6,7 +6,8 @@ import json
 import sys
 import threading
 import warnings
-from collections.abc import Iterable
+from collections.abc import Iterable, Mapping
+from concurrent.futures import Future
 from enum import Enum, EnumMeta
 from os import path
 from pathlib import Path
@@ -14,6 +15,7 @@ from types import TracebackType
 from typing import (
     Any,
     Callable,
+    ContextManager,
     Literal,
     TYPE_CHECKING,
     TypeVar,
@@ -41,13 +43,58 @@ from ni_measurement_plugin_sdk_service._annotations import (
     ENUM_VALUES_KEY,
     TYPE_SPECIALIZATION_KEY,
 )
+from ni_measurement_plugin_sdk_service._configuration import (
+    DRIVER_INSTRUMENTATION_ENABLED,
+    RESERVATION_CACHE_ENABLED,
+    RESERVATION_CACHE_HOLD_TIME,
+    SESSION_POOL_ENABLED,
+    SESSION_POOL_IDLE_TIMEOUT,
+)
 from ni_measurement_plugin_sdk_service._internal import grpc_servicer
+from ni_measurement_plugin_sdk_service._internal.cancellation import (  # re-export
+    CancellationToken,
+)
+from ni_measurement_plugin_sdk_service._internal.channel_pool import (
+    create_grpc_channel_pool,
+)
+from ni_measurement_plugin_sdk_service._internal.concurrent_sessions import (
+    enter_concurrently,
+    submit,
+)
+from ni_measurement_plugin_sdk_service._internal.connection_index import (  # re-export
+    ConnectionIndex,
+)
+from ni_measurement_plugin_sdk_service._internal.driver_instrumentation import (
+    instrument_session,
+)
+from ni_measurement_plugin_sdk_service._internal.grouped_reservation import (  # re-export
+    GroupedReservation,
+    reserve_grouped_sessions,
+)
 from ni_measurement_plugin_sdk_service._internal.parameter import (
     metadata as parameter_metadata,
 )
+from ni_measurement_plugin_sdk_service._internal.load_balancing import (
+    get_service_channel,
+)
+from ni_measurement_plugin_sdk_service._internal.profiling import ProfilingOptions
+from ni_measurement_plugin_sdk_service._internal.reservation_cache import ReservationCache
+from ni_measurement_plugin_sdk_service._internal.reservation_telemetry import (
+    reserve_with_telemetry,
+)
 from ni_measurement_plugin_sdk_service._internal.service_manager import GrpcService
+from ni_measurement_plugin_sdk_service._internal.session_pool import (
+    SessionPool,
+    get_initialization_options,
+)
+from ni_measurement_plugin_sdk_service._internal.site_mapping import map_sites
+from ni_measurement_plugin_sdk_service._internal.tracing import (
+    is_tracing_enabled,
+    start_span,
+)
 from ni_measurement_plugin_sdk_service.measurement.info import (
     DataType,
+    LoadBalancingPolicy,
     MeasurementInfo,
     TypeSpecialization,
 )
@@ -68,6 +115,9 @@ if TYPE_CHECKING:
     SupportedEnumType = Union[type[Enum], _EnumTypeWrapper]
 
 
+_T = TypeVar("_T")
+
+
 class MeasurementContext:
     """Proxy for the Measurement Service's context-local state."""
 
@@ -94,6 +144,20 @@ class MeasurementContext:
         """Get the time remaining for the RPC."""
         return grpc_servicer.measurement_service_context.get().time_remaining
 
+    @property
+    def cancellation_token(self) -> CancellationToken:
+        """Get a token that reports when the RPC is canceled or its deadline expires.
+
+        Use the token to wait for hardware without polling in a sleep loop, for example::
+
+            cancellation_token = measurement_service.context.cancellation_token
+            cancellation_token.poll_until(
+                lambda: session.acquisition_status() == niscope.AcquisitionStatus.COMPLETE,
+                timeout=timeout,
+            )
+        """
+        return grpc_servicer.measurement_service_context.get().cancellation_token
+
     def abort(self, code: grpc.StatusCode, details: str) -> None:
         """Aborts the RPC."""
         grpc_servicer.measurement_service_context.get().abort(code, details)
@@ -130,9 +194,30 @@ class MeasurementContext:
         """
         if not pin_or_relay_names:
             raise ValueError("You must specify at least one pin or relay name.")
-        return self._measurement_service.session_management_client.reserve_session(
-            context=self.pin_map_context, pin_or_relay_names=pin_or_relay_names, timeout=timeout
+        measurement_service = self._measurement_service
+        pin_map_context = self.pin_map_context
+        session_management_client = measurement_service.session_management_client
+        reservation_cache = measurement_service._reservation_cache
+
+        def reserve_session() -> SingleSessionReservation:
+            if reservation_cache is not None:
+                return reservation_cache.reserve_session(
+                    session_management_client, pin_map_context, pin_or_relay_names, timeout=timeout
+                )
+            return session_management_client.reserve_session(
+                context=pin_map_context, pin_or_relay_names=pin_or_relay_names, timeout=timeout
+            )
+
+        reservation = reserve_with_telemetry(
+            reserve_session,
+            "reserve_session",
+            measurement_service.service_info.service_class,
+            pin_or_relay_names,
+            pin_map_context.sites,
+            timeout,
         )
+        _wrap_session_initialization(reservation, measurement_service._session_pool)
+        return reservation
 
     def reserve_sessions(
         self,
@@ -160,9 +245,254 @@ class MeasurementContext:
         """
         if not pin_or_relay_names:
             raise ValueError("You must specify at least one pin or relay name.")
-        return self._measurement_service.session_management_client.reserve_sessions(
-            context=self.pin_map_context, pin_or_relay_names=pin_or_relay_names, timeout=timeout
+        measurement_service = self._measurement_service
+        pin_map_context = self.pin_map_context
+        session_management_client = measurement_service.session_management_client
+        reservation_cache = measurement_service._reservation_cache
+
+        def reserve_sessions() -> MultiSessionReservation:
+            if reservation_cache is not None:
+                return reservation_cache.reserve_sessions(
+                    session_management_client, pin_map_context, pin_or_relay_names, timeout=timeout
+                )
+            return session_management_client.reserve_sessions(
+                context=pin_map_context, pin_or_relay_names=pin_or_relay_names, timeout=timeout
+            )
+
+        reservation = reserve_with_telemetry(
+            reserve_sessions,
+            "reserve_sessions",
+            measurement_service.service_info.service_class,
+            pin_or_relay_names,
+            pin_map_context.sites,
+            timeout,
         )
+        _wrap_session_initialization(reservation, measurement_service._session_pool)
+        return reservation
+
+    def reserve(
+        self,
+        pin_or_relay_groups: Mapping[str, str | Iterable[str]],
+        timeout: float | None = 0.0,
+    ) -> GroupedReservation:
+        """Reserve the sessions for several groups of pins or relays in a single request.
+
+        Use this method instead of calling reserve_session() or reserve_sessions() once per
+        instrument. Reserving all of the sessions at once is faster, and it cannot deadlock
+        with other measurements that reserve the same sessions in a different order.
+
+        Args:
+            pin_or_relay_groups: The pins, pin groups, relays, or relay groups to use for
+                the measurement, indexed by a group name of your choice, such as
+                {"source": "Pin1", "measure": ["Pin2", "Pin3"]}.
+
+            timeout: Timeout in seconds.
+
+                Allowed values: 0 (non-blocking, fails immediately if resources cannot be
+                reserved), -1 (infinite timeout), or any other positive numeric value (wait for
+                that number of seconds)
+
+        Returns:
+            A reservation object with which you can query information about the sessions and
+            unreserve them. Its groups property provides a reservation for each group.
+        """
+        if not pin_or_relay_groups:
+            raise ValueError("You must specify at least one group of pins or relays.")
+        measurement_service = self._measurement_service
+        pin_map_context = self.pin_map_context
+        session_management_client = measurement_service.session_management_client
+        reservation = reserve_with_telemetry(
+            lambda: reserve_grouped_sessions(
+                session_management_client, pin_map_context, pin_or_relay_groups, timeout
+            ),
+            "reserve",
+            measurement_service.service_info.service_class,
+            [
+                pin_or_relay_name
+                for pin_or_relay_names in pin_or_relay_groups.values()
+                for pin_or_relay_name in (
+                    [pin_or_relay_names]
+                    if isinstance(pin_or_relay_names, str)
+                    else pin_or_relay_names
+                )
+            ],
+            pin_map_context.sites,
+            timeout,
+        )
+        _wrap_session_initialization(reservation, measurement_service._session_pool)
+        for group_reservation in reservation.groups.values():
+            _wrap_session_initialization(group_reservation, measurement_service._session_pool)
+        return reservation
+
+    def reserve_session_async(
+        self,
+        pin_or_relay_names: str | Iterable[str],
+        timeout: float | None = 0.0,
+    ) -> Future[SingleSessionReservation]:
+        """Start reserving a single session without blocking the measurement thread.
+
+        This method calls reserve_session() in a worker thread. To unreserve the session,
+        use the future's result in a ``with`` statement.
+
+        Args:
+            pin_or_relay_names: One or multiple pins, pin groups, relays, or relay groups to use
+                for the measurement.
+
+            timeout: Timeout in seconds. For allowed values, see reserve_session().
+
+        Returns:
+            A future that completes with the reservation.
+        """
+        return submit(self.reserve_session, pin_or_relay_names, timeout)
+
+    def reserve_sessions_async(
+        self,
+        pin_or_relay_names: str | Iterable[str],
+        timeout: float | None = 0.0,
+    ) -> Future[MultiSessionReservation]:
+        """Start reserving multiple sessions without blocking the measurement thread.
+
+        This method calls reserve_sessions() in a worker thread. To unreserve the sessions,
+        use the future's result in a ``with`` statement.
+
+        Args:
+            pin_or_relay_names: One or multiple pins, pin groups, relays, or relay groups to use
+                for the measurement.
+
+            timeout: Timeout in seconds. For allowed values, see reserve_sessions().
+
+        Returns:
+            A future that completes with the reservation.
+        """
+        return submit(self.reserve_sessions, pin_or_relay_names, timeout)
+
+    def initialize_concurrently(
+        self, *context_managers: ContextManager[Any]
+    ) -> ContextManager[tuple[Any, ...]]:
+        """Initialize several sessions at the same time.
+
+        Pass the context managers returned by the reservation's initialize_*_session(s)
+        and create_*_task(s) methods, for example::
+
+            with measurement_service.context.initialize_concurrently(
+                reservation.initialize_nidcpower_session(),
+                reservation.initialize_nidmm_session(),
+            ) as (dcpower_session_info, dmm_session_info):
+                ...
+
+        The sessions are initialized in worker threads, so the time to initialize all of
+        them is the time to initialize the slowest one. When the ``with`` statement exits,
+        the sessions are closed in reverse order. If any session fails to initialize, the
+        sessions that were initialized are closed and the first exception is raised.
+
+        Args:
+            context_managers: The context managers that initialize the sessions.
+
+        Returns:
+            A context manager that yields a tuple containing the session information
+            returned by each context manager.
+        """
+        return enter_concurrently(*context_managers)
+
+    def map_sites(
+        self,
+        function: Callable[[int], _T],
+        sites: Iterable[int] | None = None,
+        max_workers: int | None = None,
+    ) -> list[_T]:
+        """Run measurement code for each site concurrently.
+
+        The function is called with each site number in a worker thread, and it can use
+        the measurement context, for example to get connections for its site::
+
+            def measure_site(site: int) -> float:
+                connections = reservation.get_nidcpower_connections(pins, sites=site)
+                ...
+
+            currents = measurement_service.context.map_sites(measure_site)
+
+        If the function raises an exception for a site, the sites that have not started
+        are canceled, and the exception is raised after the running sites complete. If
+        the RPC is canceled, the sites that have not started are canceled and the
+        function can check the measurement context's gRPC context to stop early.
+
+        Args:
+            function: The function to call with each site number.
+
+            sites: The site numbers. By default, this is the sites of the pin map context.
+
+            max_workers: The maximum number of sites to run at the same time. By default,
+                all sites run at the same time.
+
+        Returns:
+            The return value of the function for each site, in the same order as the
+            sites.
+        """
+        if sites is None:
+            sites = self.pin_map_context.sites
+            if sites is None:
+                raise ValueError("You must specify the sites when the pin map context does not.")
+        return map_sites(function, list(sites), max_workers, self.add_cancel_callback)
+
+
+def _wrap_session_initialization(
+    reservation: SingleSessionReservation | MultiSessionReservation,
+    session_pool: SessionPool | None,
+) -> None:
+    # The reservation's initialize_*_session(s) and create_*_task(s) methods construct
+    # driver sessions through these methods, so wrap the session constructors passed to
+    # them in order to record a span for each driver session, to instrument the driver
+    # sessions, and to reuse pooled driver sessions.
+    instrument = is_tracing_enabled() or DRIVER_INSTRUMENTATION_ENABLED
+    if not instrument and session_pool is None:
+        return
+    for method_name in ("_initialize_session_core", "_initialize_sessions_core"):
+        method = getattr(reservation, method_name, None)
+        # Reservations that the reservation cache reuses are already wrapped.
+        if method is not None and not getattr(method, "_measurement_plugin_wrapped", False):
+            setattr(
+                reservation,
+                method_name,
+                _wrap_initialize_session_core(method, instrument, session_pool),
+            )
+
+
+def _wrap_initialize_session_core(
+    method: Callable[..., Any], instrument: bool, session_pool: SessionPool | None
+) -> Callable[..., Any]:
+    def wrapper(
+        session_constructor: Callable[[Any], Any],
+        instrument_type_id: str,
+        closing_function: Callable[[Any], Any] | None = None,
+    ) -> Any:
+        initialization_options = get_initialization_options(session_constructor)
+        if instrument:
+            session_constructor = _instrument_session_constructor(session_constructor)
+        if session_pool is not None:
+            session_constructor, closing_function = session_pool.pool_sessions(
+                session_constructor, closing_function, initialization_options
+            )
+        return method(session_constructor, instrument_type_id, closing_function)
+
+    setattr(wrapper, "_measurement_plugin_wrapped", True)
+    return wrapper
+
+
+def _instrument_session_constructor(
+    session_constructor: Callable[[Any], Any],
+) -> Callable[[Any], Any]:
+    def instrumented_session_constructor(session_info: Any) -> Any:
+        with start_span(
+            "initialize_session",
+            session_name=session_info.session_name,
+            instrument_type_id=session_info.instrument_type_id,
+        ):
+            session = session_constructor(session_info)
+        if DRIVER_INSTRUMENTATION_ENABLED:
+            session = instrument_session(session)
+        return session
+
+    return instrumented_session_constructor
 
 
 _F = TypeVar("_F", bound=Callable)
@@ -262,12 +592,19 @@ class MeasurementService:
         self._configuration_parameter_list: list[parameter_metadata.ParameterMetadata] = []
         self._output_parameter_list: list[parameter_metadata.ParameterMetadata] = []
         self._measure_function: Callable = self._raise_measurement_method_not_registered
+        self._profiling_options = ProfilingOptions().update_from_service_config(service)
 
         self._initialization_lock = threading.RLock()
         self._channel_pool: GrpcChannelPool | None = None
         self._discovery_client: DiscoveryClient | None = None
         self._grpc_service: GrpcService | None = None
         self._session_management_client: SessionManagementClient | None = None
+        self._reservation_cache = (
+            ReservationCache(RESERVATION_CACHE_HOLD_TIME) if RESERVATION_CACHE_ENABLED else None
+        )
+        self._session_pool = (
+            SessionPool(SESSION_POOL_IDLE_TIMEOUT) if SESSION_POOL_ENABLED else None
+        )
 
     def _raise_measurement_method_not_registered(self) -> Any:
         raise RuntimeError(
@@ -280,7 +617,7 @@ class MeasurementService:
         if self._channel_pool is None:
             with self._initialization_lock:
                 if self._channel_pool is None:
-                    self._channel_pool = GrpcChannelPool()
+                    self._channel_pool = create_grpc_channel_pool()
         return self._channel_pool
 
     @property
@@ -532,6 +869,7 @@ class MeasurementService:
                 self._output_parameter_list,
                 self._measure_function,
                 owner=self,
+                profiling_options=self._profiling_options,
             )
             return self
 
@@ -595,6 +933,8 @@ class MeasurementService:
         with self._initialization_lock:
             if self._grpc_service is not None:
                 self._grpc_service.stop()
+            if self._reservation_cache is not None:
+                self._reservation_cache.clear()
             if self._channel_pool is not None:
                 self._channel_pool.close()
 
@@ -602,6 +942,123 @@ class MeasurementService:
             self._channel_pool = None
             self._discovery_client = None
 
+        if self._session_pool is not None:
+            self._session_pool.reset()
+
+    def get_metrics(self) -> str:
+        """Get the measurement service's metrics in the Prometheus text format.
+
+        To collect metrics, set MEASUREMENT_PLUGIN_METRICS_ENABLED=1. To also serve
+        them on a local HTTP port, set MEASUREMENT_PLUGIN_METRICS_PORT.
+
+        Returns:
+            str: The metrics, or an empty string if the service is not running or
+            metrics are disabled.
+        """
+        with self._initialization_lock:
+            grpc_service = self._grpc_service
+        if grpc_service is None:
+            return ""
+        return grpc_service.get_metrics()
+
+    def profile_next_calls(self, count: int = 1) -> str:
+        """Profile the measure function for the next measurement calls.
+
+        Each profile is written to a file named by the service class and call ID.
+        To profile a sample of calls or calls that are slower than a threshold, use
+        the MEASUREMENT_PLUGIN_PROFILE_* environment variables or the "profiling"
+        object in the .serviceconfig file. Local clients can also start profiling
+        with the ni.measurementlink.measurement.Profiling service's ProfileNextCalls
+        method.
+
+        Args:
+            count (int): The number of calls to profile.
+
+        Returns:
+            str: The directory that profiles are written to.
+
+        Raises:
+            RuntimeError: If the service is not running.
+        """
+        with self._initialization_lock:
+            grpc_service = self._grpc_service
+        if grpc_service is None:
+            raise RuntimeError("Measurement service not running")
+        return grpc_service.profile_next_calls(count)
+
+    def clear_reservation_cache(self, pin_map_id: str | None = None) -> None:
+        """Discard the session reservations that are cached for reuse.
+
+        To cache reservations, set MEASUREMENT_PLUGIN_RESERVATION_CACHE_ENABLED=1.
+        Cached reservations are kept reserved and reused without asking the session
+        management service to resolve the pin map again, so call this method after
+        updating a pin map. Held reservations are unreserved immediately, and
+        reservations that are in use are unreserved when the measurement is done with
+        them.
+
+        Args:
+            pin_map_id (str | None): The pin map ID whose reservations to discard. If
+                not specified, all cached reservations are discarded.
+        """
+        if self._reservation_cache is not None:
+            self._reservation_cache.clear(pin_map_id)
+
+    def register_session_health_check(
+        self, instrument_type_id: str, health_check: Callable[[Any], bool]
+    ) -> None:
+        """Register a function that checks whether a pooled driver session is usable.
+
+        To keep driver sessions open between measurement calls, set
+        MEASUREMENT_PLUGIN_SESSION_POOL_ENABLED=1. Before reusing a pooled session of the
+        specified instrument type, the session pool calls the health check. If it
+        returns False or raises an exception, the session is closed and a new session
+        is initialized.
+
+        Args:
+            instrument_type_id (str): The instrument type ID of the sessions to check,
+                such as "niDCPower".
+
+            health_check (Callable[[Any], bool]): A function that takes a driver session
+                and returns whether it is usable.
+        """
+        if self._session_pool is not None:
+            self._session_pool.register_health_check(instrument_type_id, health_check)
+
+    def reset_session_pool(self, instrument_type_id: str | None = None) -> None:
+        """Close the driver sessions that are kept open between measurement calls.
+
+        Pooled sessions stay open after their reservations are unreserved. Call this
+        method to release the instruments for use by other measurements or
+        applications. Sessions that are in use are closed when the measure function is
+        done with them.
+
+        Args:
+            instrument_type_id (str | None): The instrument type ID of the sessions to
+                close. If not specified, all pooled sessions are closed.
+        """
+        if self._session_pool is not None:
+            self._session_pool.reset(instrument_type_id)
+
+    def wait_for_termination(self, timeout: float | None = None) -> bool:
+        """Wait until the gRPC measurement service is stopped.
+
+        The service stops when close_service() is called or when a new instance of the
+        service takes over from this one. To take over from running instances, set
+        MEASUREMENT_PLUGIN_SERVICE_HANDOVER=1 in the new instance's environment.
+
+        Args:
+            timeout (float | None): The time in seconds to wait. If not specified, wait
+                indefinitely.
+
+        Returns:
+            bool: True if the service is stopped, or False if the timeout expired.
+        """
+        with self._initialization_lock:
+            grpc_service = self._grpc_service
+        if grpc_service is None:
+            return True
+        return grpc_service.wait_for_termination(timeout)
+
     def __enter__(self: Self) -> Self:
         """Enter the runtime context related to the measurement service."""
         return self
@@ -616,14 +1073,27 @@ class MeasurementService:
         self.close_service()
         return False
 
-    def get_channel(self, provided_interface: str, service_class: str = "") -> grpc.Channel:
+    def get_channel(
+        self,
+        provided_interface: str,
+        service_class: str = "",
+        load_balancing_policy: LoadBalancingPolicy | None = None,
+    ) -> grpc.Channel:
         """Return gRPC channel to specified service.
 
+        If the service is running on the local machine and listens on a Unix domain
+        socket, the channel connects to the Unix domain socket.
+
         Args:
             provided_interface (str): The gRPC Full Name of the service.
 
             service_class (str): The service "class" that should be matched.
 
+            load_balancing_policy (LoadBalancingPolicy | None): The policy for
+                distributing calls across the registered replicas of the service. If
+                not specified, all calls are sent to the replica returned by the
+                discovery service.
+
         Returns:
             grpc.Channel: A channel to the gRPC service.
 
@@ -631,5 +1101,10 @@ class MeasurementService:
             Exception: If service_class is not specified and there is more than one matching service
                 registered.
         """
-        service_location = self.discovery_client.resolve_service(provided_interface, service_class)
-        return self.channel_pool.get_channel(service_location.insecure_address)
+        return get_service_channel(
+            self.discovery_client,
+            self.channel_pool,
+            provided_interface,
+            service_class,
+            load_balancing_policy=load_balancing_policy,
+        )
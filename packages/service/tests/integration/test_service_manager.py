@@ -2,10 +2,19 @@
 
 from __future__ import annotations
 
+import concurrent.futures
+import functools
+import json
+import os
+import socket
+import time
+import urllib.request
+from pathlib import Path
 from typing import cast
 
 import grpc
 import pytest
+from google.protobuf import any_pb2, empty_pb2
 from grpc import RpcError
 from ni.measurementlink.discovery.v1.client import DiscoveryClient
 from ni.measurementlink.discovery.v1.discovery_service_pb2_grpc import (
@@ -15,8 +24,35 @@ from ni.measurementlink.measurement.v1 import (
     measurement_service_pb2,
     measurement_service_pb2_grpc,
 )
+from ni.measurementlink.measurement.v2 import (
+    measurement_service_pb2 as v2_measurement_service_pb2,
+    measurement_service_pb2_grpc as v2_measurement_service_pb2_grpc,
+)
+from pytest_mock import MockerFixture
 
+from ni_measurement_plugin_sdk_service import _configuration
+from ni_measurement_plugin_sdk_service._annotations import (
+    SERVICE_ADDRESS_KEY,
+    SERVICE_UNIX_SOCKET_PATH_KEY,
+)
+from ni_measurement_plugin_sdk_service._configuration import GrpcTransportOptions
+from ni_measurement_plugin_sdk_service._internal.call_stats import get_call_stats
+from ni_measurement_plugin_sdk_service._internal.control_token import read_control_token
+from ni_measurement_plugin_sdk_service._internal.handover import HANDOVER_SERVICE_NAME
+from ni_measurement_plugin_sdk_service._internal.health import (
+    LoadReport,
+    ServingStatus,
+    check_health,
+)
+from ni_measurement_plugin_sdk_service._internal.profiling import (
+    ProfilingOptions,
+    profile_next_calls,
+)
 from ni_measurement_plugin_sdk_service._internal.service_manager import GrpcService
+from ni_measurement_plugin_sdk_service._internal.tracing import configure_tracing
+from ni_measurement_plugin_sdk_service.measurement.client_support import (
+    create_call_metadata,
+)
 from tests.utilities.fake_discovery_service import (
     FakeDiscoveryServiceError,
     FakeDiscoveryServiceStub,
@@ -127,6 +163,422 @@ def test___grpc_service_unknown_interface___start_service_and_check_v1___raises_
         )
 
 
+def test___unix_socket_enabled___start_service___service_hosted_on_tcp_and_unix_socket(
+    grpc_service: GrpcService,
+    discovery_service_stub: FakeDiscoveryServiceStub,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+):
+    monkeypatch.setattr(_configuration, "USE_UNIX_SOCKET", True)
+    monkeypatch.setattr(_configuration, "UNIX_SOCKET_DIRECTORY", str(tmp_path))
+
+    port_number = grpc_service.start(
+        loopback_measurement.measurement_service.measurement_info,
+        loopback_measurement.measurement_service.service_info,
+        loopback_measurement.measurement_service._configuration_parameter_list,
+        loopback_measurement.measurement_service._output_parameter_list,
+        loopback_measurement.measurement_service._measure_function,
+    )
+
+    unix_socket_path = discovery_service_stub.request.service_description.annotations[
+        SERVICE_UNIX_SOCKET_PATH_KEY
+    ]
+    assert Path(unix_socket_path).parent == tmp_path
+    _validate_if_service_running_by_making_rpc(port_number)
+    _validate_if_service_running_by_making_rpc_to_target(f"unix:{unix_socket_path}")
+
+
+def test___unix_socket_only___start_and_stop_service___socket_removed(
+    grpc_service: GrpcService,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+):
+    monkeypatch.setattr(_configuration, "UNIX_SOCKET_ONLY", True)
+    monkeypatch.setattr(_configuration, "UNIX_SOCKET_DIRECTORY", str(tmp_path))
+
+    unix_socket_path = grpc_service.start(
+        loopback_measurement.measurement_service.measurement_info,
+        loopback_measurement.measurement_service.service_info,
+        loopback_measurement.measurement_service._configuration_parameter_list,
+        loopback_measurement.measurement_service._output_parameter_list,
+        loopback_measurement.measurement_service._measure_function,
+    )
+    insecure_address = grpc_service.service_location.insecure_address
+    _validate_if_service_running_by_making_rpc_to_target(insecure_address)
+    grpc_service.stop()
+
+    assert insecure_address == f"unix:{unix_socket_path}"
+    assert not os.path.exists(unix_socket_path)
+
+
+def test___advertised_host_and_port___start_service___registers_advertised_location(
+    grpc_service: GrpcService,
+    discovery_service_stub: FakeDiscoveryServiceStub,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(_configuration, "SERVICE_BIND_ADDRESS", "127.0.0.1")
+    monkeypatch.setattr(_configuration, "SERVICE_ADVERTISED_HOST", "measurement-host.example.com")
+    monkeypatch.setattr(_configuration, "SERVICE_ADVERTISED_PORT", 12345)
+
+    grpc_service.start(
+        loopback_measurement.measurement_service.measurement_info,
+        loopback_measurement.measurement_service.service_info,
+        loopback_measurement.measurement_service._configuration_parameter_list,
+        loopback_measurement.measurement_service._output_parameter_list,
+        loopback_measurement.measurement_service._measure_function,
+    )
+
+    registered_location = discovery_service_stub.request.location
+    assert registered_location.location == "measurement-host.example.com"
+    assert registered_location.insecure_port == "12345"
+    registered_annotations = discovery_service_stub.request.service_description.annotations
+    assert registered_annotations[SERVICE_ADDRESS_KEY] == "measurement-host.example.com:12345"
+
+
+def test___grpc_transport_options___start_service___service_hosted(
+    grpc_service: GrpcService,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(
+        _configuration,
+        "GRPC_TRANSPORT_OPTIONS",
+        GrpcTransportOptions(
+            stream_lookahead_bytes=8388608,
+            keepalive_time_ms=30000,
+            min_ping_interval_without_data_ms=10000,
+            max_concurrent_streams=16,
+            max_concurrent_rpcs=8,
+        ),
+    )
+
+    port_number = grpc_service.start(
+        loopback_measurement.measurement_service.measurement_info,
+        loopback_measurement.measurement_service.service_info,
+        loopback_measurement.measurement_service._configuration_parameter_list,
+        loopback_measurement.measurement_service._output_parameter_list,
+        loopback_measurement.measurement_service._measure_function,
+    )
+
+    _validate_if_service_running_by_making_rpc(port_number)
+
+
+def test___health_service_enabled___start_service___health_service_reports_serving_and_load(
+    grpc_service: GrpcService,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(_configuration, "HEALTH_SERVICE_ENABLED", True)
+
+    port_number = grpc_service.start(
+        loopback_measurement.measurement_service.measurement_info,
+        loopback_measurement.measurement_service.service_info,
+        loopback_measurement.measurement_service._configuration_parameter_list,
+        loopback_measurement.measurement_service._output_parameter_list,
+        loopback_measurement.measurement_service._measure_function,
+    )
+
+    with grpc.insecure_channel("localhost:" + port_number) as channel:
+        server_status, load_report = check_health(channel)
+        service_status, _ = check_health(
+            channel, "ni.measurementlink.measurement.v2.MeasurementService"
+        )
+
+    assert server_status == ServingStatus.SERVING
+    assert service_status == ServingStatus.SERVING
+    assert load_report == LoadReport(in_flight=0, queue_length=0, average_latency=0.0)
+
+
+def test___port_file_configured___start_service___bound_port_written_to_file(
+    grpc_service: GrpcService,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+):
+    port_file = tmp_path / "service.port"
+    monkeypatch.setattr(_configuration, "SERVICE_PORT_FILE", str(port_file))
+
+    port_number = grpc_service.start(
+        loopback_measurement.measurement_service.measurement_info,
+        loopback_measurement.measurement_service.service_info,
+        loopback_measurement.measurement_service._configuration_parameter_list,
+        loopback_measurement.measurement_service._output_parameter_list,
+        loopback_measurement.measurement_service._measure_function,
+    )
+
+    assert port_file.read_text() == port_number
+
+
+def test___grpc_service___start_service___health_service_not_hosted(
+    grpc_service: GrpcService,
+):
+    port_number = grpc_service.start(
+        loopback_measurement.measurement_service.measurement_info,
+        loopback_measurement.measurement_service.service_info,
+        loopback_measurement.measurement_service._configuration_parameter_list,
+        loopback_measurement.measurement_service._output_parameter_list,
+        loopback_measurement.measurement_service._measure_function,
+    )
+
+    with grpc.insecure_channel("localhost:" + port_number) as channel:
+        with pytest.raises(RpcError) as exc_info:
+            check_health(channel)
+
+    assert exc_info.value.code() == grpc.StatusCode.UNIMPLEMENTED
+
+
+def test___handover_enabled___start_new_service___old_service_drained(
+    grpc_service: GrpcService,
+    discovery_service_stub: FakeDiscoveryServiceStub,
+    mocker: MockerFixture,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(_configuration, "SERVICE_HANDOVER", True)
+    old_port_number = grpc_service.start(
+        loopback_measurement.measurement_service.measurement_info,
+        loopback_measurement.measurement_service.service_info,
+        loopback_measurement.measurement_service._configuration_parameter_list,
+        loopback_measurement.measurement_service._output_parameter_list,
+        loopback_measurement.measurement_service._measure_function,
+    )
+    old_service_info = loopback_measurement.measurement_service.service_info._replace(
+        annotations=dict(discovery_service_stub.request.service_description.annotations)
+    )
+    new_discovery_client = mocker.create_autospec(DiscoveryClient)
+    new_discovery_client.enumerate_services.return_value = [old_service_info]
+    new_discovery_client.register_service.return_value = "new-registration-id"
+    new_grpc_service = GrpcService(new_discovery_client)
+
+    try:
+        new_port_number = new_grpc_service.start(
+            loopback_measurement.measurement_service.measurement_info,
+            loopback_measurement.measurement_service.service_info,
+            loopback_measurement.measurement_service._configuration_parameter_list,
+            loopback_measurement.measurement_service._output_parameter_list,
+            loopback_measurement.measurement_service._measure_function,
+        )
+
+        assert grpc_service.wait_for_termination(timeout=10.0)
+        _validate_if_service_running_by_making_rpc(new_port_number)
+        with pytest.raises(RpcError):
+            _validate_if_service_running_by_making_rpc(old_port_number)
+    finally:
+        new_grpc_service.stop()
+
+
+def test___metrics_enabled___call_service___metrics_served_on_port(
+    grpc_service: GrpcService,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        metrics_port = sock.getsockname()[1]
+    monkeypatch.setattr(_configuration, "METRICS_ENABLED", True)
+    monkeypatch.setattr(_configuration, "METRICS_PORT", metrics_port)
+    port_number = grpc_service.start(
+        loopback_measurement.measurement_service.measurement_info,
+        loopback_measurement.measurement_service.service_info,
+        loopback_measurement.measurement_service._configuration_parameter_list,
+        loopback_measurement.measurement_service._output_parameter_list,
+        loopback_measurement.measurement_service._measure_function,
+    )
+
+    _validate_if_service_running_by_making_rpc(port_number)
+    # The call is recorded when gRPC reports that it is complete.
+    deadline = time.monotonic() + 5.0
+    while "GetMetadata" not in grpc_service.get_metrics() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with urllib.request.urlopen(f"http://localhost:{metrics_port}/metrics") as response:
+        metrics = response.read().decode()
+
+    assert (
+        "measurement_plugin_rpc_calls_total{"
+        'method="/ni.measurementlink.measurement.v1.MeasurementService/GetMetadata",code="OK"} 1'
+    ) in metrics.splitlines()
+    assert "# TYPE measurement_plugin_rpc_phase_duration_seconds histogram" in metrics
+
+
+def test___tracing_enabled___call_measure_with_traceparent___spans_continue_client_trace(
+    grpc_service: GrpcService,
+    tmp_path: Path,
+):
+    trace_file = tmp_path / "trace.jsonl"
+    traceparent = "00-0123456789abcdef0123456789abcdef-0123456789abcdef-01"
+    service_class = loopback_measurement.measurement_service.service_info.service_class
+    port_number = grpc_service.start(
+        loopback_measurement.measurement_service.measurement_info,
+        loopback_measurement.measurement_service.service_info,
+        loopback_measurement.measurement_service._configuration_parameter_list,
+        loopback_measurement.measurement_service._output_parameter_list,
+        loopback_measurement.measurement_service._measure_function,
+    )
+
+    configure_tracing(str(trace_file))
+    try:
+        with grpc.insecure_channel(f"localhost:{port_number}") as channel:
+            stub = measurement_service_pb2_grpc.MeasurementServiceStub(channel)
+            stub.Measure(
+                measurement_service_pb2.MeasureRequest(
+                    configuration_parameters=any_pb2.Any(
+                        type_url=f"type.googleapis.com/{service_class}.Configurations"
+                    )
+                ),
+                metadata=(("traceparent", traceparent),),
+            )
+    finally:
+        configure_tracing("")
+
+    spans = {span["name"]: span for span in map(json.loads, trace_file.read_text().splitlines())}
+    assert spans.keys() == {"decode", "bind_arguments", "measure", "serialize", "Measure"}
+    assert {span["trace_id"] for span in spans.values()} == {"0123456789abcdef0123456789abcdef"}
+    assert spans["Measure"]["parent_span_id"] == "0123456789abcdef"
+    assert spans["measure"]["parent_span_id"] == spans["Measure"]["span_id"]
+
+
+def test___handover_disabled___call_drain___unimplemented(
+    grpc_service: GrpcService,
+):
+    port_number = grpc_service.start(
+        loopback_measurement.measurement_service.measurement_info,
+        loopback_measurement.measurement_service.service_info,
+        loopback_measurement.measurement_service._configuration_parameter_list,
+        loopback_measurement.measurement_service._output_parameter_list,
+        loopback_measurement.measurement_service._measure_function,
+    )
+
+    with grpc.insecure_channel(f"localhost:{port_number}") as channel:
+        drain = channel.unary_unary(
+            f"/{HANDOVER_SERVICE_NAME}/Drain",
+            request_serializer=empty_pb2.Empty.SerializeToString,
+            response_deserializer=empty_pb2.Empty.FromString,
+        )
+        with pytest.raises(RpcError) as exc_info:
+            drain(empty_pb2.Empty())
+
+    assert exc_info.value.code() == grpc.StatusCode.UNIMPLEMENTED
+
+
+def test___profiling_service_enabled___profile_next_calls_and_call_measure___profile_written(
+    grpc_service: GrpcService,
+    discovery_service_stub: FakeDiscoveryServiceStub,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+):
+    monkeypatch.setattr(_configuration, "PROFILING_SERVICE_ENABLED", True)
+    service_class = loopback_measurement.measurement_service.service_info.service_class
+    port_number = grpc_service.start(
+        loopback_measurement.measurement_service.measurement_info,
+        loopback_measurement.measurement_service.service_info,
+        loopback_measurement.measurement_service._configuration_parameter_list,
+        loopback_measurement.measurement_service._output_parameter_list,
+        loopback_measurement.measurement_service._measure_function,
+        profiling_options=ProfilingOptions(directory=str(tmp_path)),
+    )
+
+    registered_service_info = loopback_measurement.measurement_service.service_info._replace(
+        annotations=dict(discovery_service_stub.request.service_description.annotations)
+    )
+    token = read_control_token(registered_service_info)
+
+    with grpc.insecure_channel(f"localhost:{port_number}") as channel:
+        profile_directory = profile_next_calls(channel, token)
+        stub = measurement_service_pb2_grpc.MeasurementServiceStub(channel)
+        stub.Measure(
+            measurement_service_pb2.MeasureRequest(
+                configuration_parameters=any_pb2.Any(
+                    type_url=f"type.googleapis.com/{service_class}.Configurations"
+                )
+            )
+        )
+
+    assert profile_directory == str(tmp_path)
+    assert [path.suffix for path in tmp_path.iterdir()] == [".prof"]
+
+
+def test___admission_limit___call_measure_over_limit___calls_rejected_quickly(
+    grpc_service: GrpcService,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(_configuration, "MAX_CONCURRENT_MEASUREMENTS", 10)
+    monkeypatch.setattr(_configuration, "MAX_QUEUED_MEASUREMENTS", 0)
+    service_class = loopback_measurement.measurement_service.service_info.service_class
+    measure_function = loopback_measurement.measurement_service._measure_function
+
+    @functools.wraps(measure_function)
+    def slow_measure(**kwargs):
+        time.sleep(2.0)
+        return measure_function(**kwargs)
+
+    port_number = grpc_service.start(
+        loopback_measurement.measurement_service.measurement_info,
+        loopback_measurement.measurement_service.service_info,
+        loopback_measurement.measurement_service._configuration_parameter_list,
+        loopback_measurement.measurement_service._output_parameter_list,
+        slow_measure,
+    )
+    request = v2_measurement_service_pb2.MeasureRequest(
+        configuration_parameters=any_pb2.Any(
+            type_url=f"type.googleapis.com/{service_class}.Configurations"
+        )
+    )
+
+    def call_measure() -> tuple[grpc.StatusCode, float, dict[str, str | bytes]]:
+        start_time = time.monotonic()
+        call = stub.Measure(request)
+        try:
+            list(call)
+            code = grpc.StatusCode.OK
+        except RpcError:
+            code = call.code()
+        return code, time.monotonic() - start_time, dict(call.trailing_metadata() or ())
+
+    with grpc.insecure_channel(f"localhost:{port_number}") as channel:
+        stub = v2_measurement_service_pb2_grpc.MeasurementServiceStub(channel)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=14) as executor:
+            futures = [executor.submit(call_measure) for _ in range(14)]
+            time.sleep(0.5)
+            metadata_start_time = time.monotonic()
+            _validate_if_service_running_by_making_rpc(port_number)
+            metadata_duration = time.monotonic() - metadata_start_time
+            results = [future.result() for future in futures]
+
+    rejected = [result for result in results if result[0] == grpc.StatusCode.RESOURCE_EXHAUSTED]
+    assert [result[0] for result in results].count(grpc.StatusCode.OK) == 10
+    assert len(rejected) == 4
+    assert all(duration < 1.0 for _, duration, _ in rejected)
+    assert all("grpc-retry-pushback-ms" in metadata for _, _, metadata in rejected)
+    assert metadata_duration < 1.0
+
+
+def test___grpc_service___call_measure_requesting_call_stats___call_stats_returned(
+    grpc_service: GrpcService,
+):
+    service_class = loopback_measurement.measurement_service.service_info.service_class
+    port_number = grpc_service.start(
+        loopback_measurement.measurement_service.measurement_info,
+        loopback_measurement.measurement_service.service_info,
+        loopback_measurement.measurement_service._configuration_parameter_list,
+        loopback_measurement.measurement_service._output_parameter_list,
+        loopback_measurement.measurement_service._measure_function,
+    )
+
+    with grpc.insecure_channel(f"localhost:{port_number}") as channel:
+        stub = v2_measurement_service_pb2_grpc.MeasurementServiceStub(channel)
+        call = stub.Measure(
+            v2_measurement_service_pb2.MeasureRequest(
+                configuration_parameters=any_pb2.Any(
+                    type_url=f"type.googleapis.com/{service_class}.Configurations"
+                )
+            ),
+            metadata=create_call_metadata(request_call_stats=True),
+        )
+        responses = list(call)
+        call_stats = get_call_stats(call)
+
+    assert call_stats is not None
+    assert call_stats.response_count == len(responses) == 1
+    assert call_stats.bytes_sent == responses[0].ByteSize()
+    assert call_stats.bytes_received > 0
+    assert 0.0 < call_stats.measure_time <= call_stats.duration
+
+
 @pytest.fixture
 def grpc_service(discovery_client: DiscoveryClient) -> GrpcService:
     """Create a GrpcService."""
@@ -160,6 +612,10 @@ def _validate_if_service_running_by_making_rpc(port_number):
 
     Throws exception during RPC if service not hosted.
     """
-    with grpc.insecure_channel("localhost:" + port_number) as channel:
+    _validate_if_service_running_by_making_rpc_to_target("localhost:" + port_number)
+
+
+def _validate_if_service_running_by_making_rpc_to_target(target: str) -> None:
+    with grpc.insecure_channel(target) as channel:
         stub = measurement_service_pb2_grpc.MeasurementServiceStub(channel)
         stub.GetMetadata(measurement_service_pb2.GetMetadataRequest())  # RPC call
@@ -9,7 +9,7 @@ from unittest.mock import Mock
 
 import grpc
 import pytest
-from ni.measurementlink.discovery.v1.client import DiscoveryClient
+from ni.measurementlink.discovery.v1.client import DiscoveryClient, ServiceInfo
 from ni.measurementlink.sessionmanagement.v1.client import (
     MultiSessionReservation,
     SessionManagementClient,
@@ -69,6 +69,9 @@ def measurement_service(
     mock.channel_pool = grpc_channel_pool
     mock.discovery_client = discovery_client
     mock.session_management_client = session_management_client
+    mock.service_info = ServiceInfo(service_class="TestService", description_url="")
+    mock._reservation_cache = None
+    mock._session_pool = None
     return mock
 
 
@@ -1,10 +1,23 @@
 from __future__ import annotations
 
+import json
+from pathlib import Path
 from unittest.mock import Mock
 
 import pytest
-
+from ni.measurementlink.sessionmanagement.v1.client import (
+    MultiSessionReservation,
+    PinMapContext,
+)
+from pytest_mock import MockerFixture
+
+from ni_measurement_plugin_sdk_service._internal.reservation_cache import ReservationCache
+from ni_measurement_plugin_sdk_service._internal.session_pool import SessionPool
+from ni_measurement_plugin_sdk_service._internal.tracing import configure_tracing
+from ni_measurement_plugin_sdk_service.measurement import service
 from ni_measurement_plugin_sdk_service.measurement.service import MeasurementContext
+from tests.unit._reservation_utils import construct_session, create_grpc_session_infos
+from tests.utilities import fake_driver
 
 pytestmark = pytest.mark.usefixtures("measurement_service_context")
 
@@ -117,3 +130,186 @@ def test___timeout___reserve_sessions___timeout_specified(
     session_management_client.reserve_sessions.assert_called_once_with(
         context=measurement_service_context.pin_map_context, pin_or_relay_names="Pin1", timeout=10.0
     )
+
+
+def test___tracing_enabled___reserve_sessions_and_initialize_sessions___spans_written(
+    session_management_client: Mock,
+    tmp_path: Path,
+) -> None:
+    session_management_client.reserve_sessions.return_value = MultiSessionReservation(
+        session_management_client, create_grpc_session_infos("nifake", 2)
+    )
+    measurement_context = MeasurementContext()
+    trace_file = tmp_path / "trace.jsonl"
+
+    configure_tracing(str(trace_file))
+    try:
+        reservation = measurement_context.reserve_sessions(["Pin1", "Pin2"])
+        with reservation.initialize_sessions(construct_session, "nifake") as session_infos:
+            assert len(session_infos) == 2
+    finally:
+        configure_tracing("")
+
+    spans = [json.loads(line) for line in trace_file.read_text().splitlines()]
+    assert [span["name"] for span in spans] == [
+        "reserve_sessions",
+        "initialize_session",
+        "initialize_session",
+    ]
+    assert [span["attributes"].get("session_name") for span in spans[1:]] == [
+        "MySession0",
+        "MySession1",
+    ]
+
+
+def test___driver_instrumentation_enabled___initialize_session___session_instrumented(
+    session_management_client: Mock,
+    mocker: MockerFixture,
+) -> None:
+    mocker.patch.object(service, "DRIVER_INSTRUMENTATION_ENABLED", True)
+    session_management_client.reserve_session.return_value = MultiSessionReservation(
+        session_management_client, create_grpc_session_infos("nifake", 1)
+    )
+    measurement_context = MeasurementContext()
+
+    reservation = measurement_context.reserve_session("Pin1")
+    with reservation.initialize_session(construct_session, "nifake") as session_info:
+        assert type(session_info.session).__name__ == "InstrumentedSession"
+        assert isinstance(session_info.session, fake_driver.Session)
+
+    assert session_info.session.is_closed
+
+
+def test___reservation_cache_enabled___reserve_sessions_twice___held_reservation_reused(
+    measurement_service: Mock,
+    measurement_service_context: Mock,
+    session_management_client: Mock,
+) -> None:
+    measurement_service._reservation_cache = ReservationCache()
+    session_management_client.reserve_sessions.return_value = MultiSessionReservation(
+        session_management_client, session_info=create_grpc_session_infos("nifake", 2)
+    )
+    measurement_context = MeasurementContext()
+
+    measurement_context.reserve_sessions(["Pin1", "Pin2"]).unreserve()
+    reservation = measurement_context.reserve_sessions(["Pin1", "Pin2"])
+
+    session_management_client.reserve_sessions.assert_called_once_with(
+        context=measurement_service_context.pin_map_context,
+        pin_or_relay_names=("Pin1", "Pin2"),
+        instrument_type_id=None,
+        timeout=0.0,
+    )
+    session_management_client._unreserve_sessions.assert_not_called()
+    assert [info.session_name for info in reservation.session_info] == [
+        "MySession0",
+        "MySession1",
+    ]
+    assert measurement_service._reservation_cache.hits == 1
+
+
+def test___cache_and_pool_enabled___reserve_sessions_twice___initialization_wrapped_once(
+    measurement_service: Mock,
+    session_management_client: Mock,
+) -> None:
+    measurement_service._reservation_cache = ReservationCache()
+    measurement_service._session_pool = SessionPool()
+    session_management_client.reserve_sessions.return_value = MultiSessionReservation(
+        session_management_client, session_info=create_grpc_session_infos("nifake", 2)
+    )
+    measurement_context = MeasurementContext()
+    first = measurement_context.reserve_sessions(["Pin1", "Pin2"])
+    initialize_sessions_core = first._initialize_sessions_core
+    first.unreserve()
+
+    second = measurement_context.reserve_sessions(["Pin1", "Pin2"])
+
+    assert second._initialize_sessions_core is initialize_sessions_core
+
+
+def test___pin_groups___reserve___sessions_reserved_in_one_request(
+    measurement_service_context: Mock,
+    session_management_client: Mock,
+) -> None:
+    session_management_client.reserve_sessions.return_value = MultiSessionReservation(
+        session_management_client, session_info=create_grpc_session_infos("nifake", 2)
+    )
+    measurement_context = MeasurementContext()
+
+    reservation = measurement_context.reserve({"source": "Pin1", "measure": ["Pin2", "Pin3"]})
+
+    session_management_client.reserve_sessions.assert_called_once_with(
+        context=measurement_service_context.pin_map_context,
+        pin_or_relay_names=["Pin1", "Pin2", "Pin3"],
+        timeout=0.0,
+    )
+    assert list(reservation.groups) == ["source", "measure"]
+
+
+def test___no_groups___reserve___value_error_raised(
+    session_management_client: Mock,
+) -> None:
+    measurement_context = MeasurementContext()
+
+    with pytest.raises(ValueError):
+        _ = measurement_context.reserve({})
+
+    session_management_client.reserve_sessions.assert_not_called()
+
+
+def test___single_pin___reserve_session_async___session_reserved(
+    measurement_service_context: Mock,
+    session_management_client: Mock,
+    single_session_reservation: Mock,
+) -> None:
+    measurement_context = MeasurementContext()
+
+    future = measurement_context.reserve_session_async("Pin1")
+
+    assert future.result(timeout=5.0) is single_session_reservation
+    session_management_client.reserve_session.assert_called_once_with(
+        context=measurement_service_context.pin_map_context, pin_or_relay_names="Pin1", timeout=0.0
+    )
+
+
+def test___multiple_sessions___initialize_concurrently___sessions_initialized_and_closed(
+    session_management_client: Mock,
+) -> None:
+    reservation = MultiSessionReservation(
+        session_management_client,
+        create_grpc_session_infos("nifake", 1) + create_grpc_session_infos("nifoo", 2)[1:],
+    )
+    measurement_context = MeasurementContext()
+
+    with measurement_context.initialize_concurrently(
+        reservation.initialize_session(construct_session, "nifake"),
+        reservation.initialize_sessions(construct_session, "nifoo"),
+    ) as (session_info, session_infos):
+        assert session_info.session_name == "MySession0"
+        assert [info.session_name for info in session_infos] == ["MySession1"]
+
+    assert session_info.session.is_closed
+    assert all(info.session.is_closed for info in session_infos)
+
+
+def test___pin_map_context_sites___map_sites___measurement_context_available_for_each_site(
+    measurement_service_context: Mock,
+) -> None:
+    measurement_service_context.pin_map_context = PinMapContext(pin_map_id="", sites=[0, 1])
+    measurement_context = MeasurementContext()
+
+    results = measurement_context.map_sites(
+        lambda site: (site, measurement_context.pin_map_context.sites)
+    )
+
+    assert results == [(0, [0, 1]), (1, [0, 1])]
+
+
+def test___no_sites___map_sites___value_error_raised(
+    measurement_service_context: Mock,
+) -> None:
+    measurement_service_context.pin_map_context = PinMapContext(pin_map_id="", sites=None)
+    measurement_context = MeasurementContext()
+
+    with pytest.raises(ValueError):
+        _ = measurement_context.map_sites(lambda site: site)
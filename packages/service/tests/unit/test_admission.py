@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Generator
+from unittest.mock import Mock
+
+import grpc
+import pytest
+from pytest_mock import MockerFixture
+
+from ni_measurement_plugin_sdk_service._grpc_metadata import RETRY_PUSHBACK_MS_KEY
+from ni_measurement_plugin_sdk_service._internal import metrics
+from ni_measurement_plugin_sdk_service._internal.admission import (
+    AdmissionController,
+    AdmissionRejectedError,
+)
+from ni_measurement_plugin_sdk_service._internal.grpc_servicer import (
+    _admit_measure_call,
+    _get_priority,
+)
+from ni_measurement_plugin_sdk_service._internal.metrics import MetricsRegistry
+from ni_measurement_plugin_sdk_service.measurement.info import MeasurementPriority
+
+
+def test___slot_available___admit___admitted_without_waiting() -> None:
+    controller = AdmissionController(max_in_flight=1)
+
+    with controller.admit() as queue_wait_time:
+        assert controller.in_flight == 1
+
+    assert queue_wait_time == 0.0
+    assert controller.in_flight == 0
+
+
+def test___no_slot_available_and_no_queue___admit___rejected() -> None:
+    controller = AdmissionController(max_in_flight=1, max_queue_length=0)
+
+    with controller.admit():
+        with pytest.raises(AdmissionRejectedError):
+            with controller.admit():
+                pass
+
+
+def test___no_slot_available___admit_with_queue_timeout___rejected_after_timeout() -> None:
+    controller = AdmissionController(max_in_flight=1, max_queue_length=1, queue_timeout=0.01)
+
+    with controller.admit():
+        with pytest.raises(AdmissionRejectedError):
+            with controller.admit():
+                pass
+
+    assert controller.queue_length == 0
+
+
+def test___no_slot_available___admit_with_time_remaining___rejected_at_deadline() -> None:
+    controller = AdmissionController(max_in_flight=1, max_queue_length=1)
+
+    with controller.admit():
+        with pytest.raises(AdmissionRejectedError):
+            with controller.admit(time_remaining=0.01):
+                pass
+
+
+def test___slot_released___queued_call___admitted_after_waiting() -> None:
+    controller = AdmissionController(max_in_flight=1, max_queue_length=1, queue_timeout=10.0)
+    queue_wait_times: list[float] = []
+    first_call_admitted = threading.Event()
+    release_first_call = threading.Event()
+
+    def first_call() -> None:
+        with controller.admit():
+            first_call_admitted.set()
+            release_first_call.wait()
+
+    def second_call() -> None:
+        with controller.admit() as queue_wait_time:
+            queue_wait_times.append(queue_wait_time)
+
+    first_thread = threading.Thread(target=first_call)
+    first_thread.start()
+    first_call_admitted.wait()
+    second_thread = threading.Thread(target=second_call)
+    second_thread.start()
+    while controller.queue_length == 0:
+        second_thread.join(0.001)
+    release_first_call.set()
+    first_thread.join()
+    second_thread.join()
+
+    assert len(queue_wait_times) == 1
+    assert queue_wait_times[0] > 0.0
+    assert controller.in_flight == 0
+    assert controller.queue_length == 0
+
+
+def test___queued_calls_with_different_priorities___slot_released___higher_priority_admitted_first() -> (
+    None
+):
+    controller = AdmissionController(max_in_flight=1, max_queue_length=2, queue_timeout=10.0)
+    admission_order: list[int] = []
+    threads: list[threading.Thread] = []
+
+    def queued_call(priority: int) -> None:
+        with controller.admit(priority=priority):
+            admission_order.append(priority)
+
+    with controller.admit():
+        for priority in [MeasurementPriority.INTERACTIVE, MeasurementPriority.PRODUCTION]:
+            thread = threading.Thread(target=queued_call, args=(priority,))
+            thread.start()
+            threads.append(thread)
+            while controller.queue_length < len(threads):
+                thread.join(0.001)
+    for thread in threads:
+        thread.join()
+
+    assert admission_order == [MeasurementPriority.PRODUCTION, MeasurementPriority.INTERACTIVE]
+
+
+def test___queued_call_waited_longer_than_aging_interval___slot_released___older_call_admitted_first() -> (
+    None
+):
+    controller = AdmissionController(
+        max_in_flight=1, max_queue_length=2, queue_timeout=10.0, priority_aging_interval=0.01
+    )
+    admission_order: list[int] = []
+    threads: list[threading.Thread] = []
+
+    def queued_call(priority: int) -> None:
+        with controller.admit(priority=priority):
+            admission_order.append(priority)
+
+    with controller.admit():
+        for priority in [MeasurementPriority.INTERACTIVE, MeasurementPriority.PRODUCTION]:
+            thread = threading.Thread(target=queued_call, args=(priority,))
+            thread.start()
+            threads.append(thread)
+            while controller.queue_length < len(threads):
+                thread.join(0.001)
+            # Wait long enough for the first call to age past the second call's priority.
+            time.sleep(0.1)
+    for thread in threads:
+        thread.join()
+
+    assert admission_order == [MeasurementPriority.INTERACTIVE, MeasurementPriority.PRODUCTION]
+
+
+@pytest.mark.parametrize(
+    "metadata,expected_priority",
+    [
+        ((), MeasurementPriority.NORMAL),
+        ((("ni-measurement-priority", "production"),), MeasurementPriority.PRODUCTION),
+        ((("ni-measurement-priority", "INTERACTIVE"),), MeasurementPriority.INTERACTIVE),
+        ((("ni-measurement-priority", "2"),), MeasurementPriority.PRODUCTION),
+        ((("ni-measurement-priority", "bogus"),), MeasurementPriority.NORMAL),
+        ((("other-key", "production"),), MeasurementPriority.NORMAL),
+    ],
+)
+def test___invocation_metadata___get_priority___returns_priority(
+    grpc_servicer_context: Mock,
+    metadata: tuple[tuple[str, str], ...],
+    expected_priority: MeasurementPriority,
+) -> None:
+    grpc_servicer_context.invocation_metadata.return_value = metadata
+
+    assert _get_priority(grpc_servicer_context) == expected_priority
+
+
+@pytest.mark.parametrize("max_in_flight", [0, -1])
+def test___invalid_max_in_flight___construct___raises_value_error(max_in_flight: int) -> None:
+    with pytest.raises(ValueError):
+        _ = AdmissionController(max_in_flight)
+
+
+def test___no_completed_calls___rejected___retry_after_is_queue_timeout() -> None:
+    controller = AdmissionController(max_in_flight=1, max_queue_length=0, queue_timeout=5.0)
+
+    with controller.admit():
+        with pytest.raises(AdmissionRejectedError) as exc_info:
+            with controller.admit():
+                pass
+
+    assert exc_info.value.retry_after == 5.0
+
+
+def test___no_completed_calls_and_no_queue_timeout___rejected___default_retry_after() -> None:
+    controller = AdmissionController(max_in_flight=1, max_queue_length=0)
+
+    with controller.admit():
+        with pytest.raises(AdmissionRejectedError) as exc_info:
+            with controller.admit():
+                pass
+
+    assert exc_info.value.retry_after == AdmissionController._DEFAULT_RETRY_AFTER
+
+
+def test___fast_completed_calls___rejected___retry_after_at_least_minimum() -> None:
+    controller = AdmissionController(max_in_flight=1, max_queue_length=0)
+    with controller.admit():
+        pass
+
+    with controller.admit():
+        with pytest.raises(AdmissionRejectedError) as exc_info:
+            with controller.admit():
+                pass
+
+    assert exc_info.value.retry_after == AdmissionController._MIN_RETRY_AFTER
+
+
+def test___no_admission_controller___admit_measure_call___yields_zero(
+    grpc_servicer_context: Mock,
+) -> None:
+    with _admit_measure_call(None, grpc_servicer_context) as queue_wait_time:
+        pass
+
+    assert queue_wait_time == 0.0
+
+
+def test___service_busy___admit_measure_call___aborts_with_resource_exhausted(
+    grpc_servicer_context: Mock,
+) -> None:
+    controller = AdmissionController(max_in_flight=1, max_queue_length=0)
+
+    with controller.admit():
+        with pytest.raises(Exception):
+            with _admit_measure_call(controller, grpc_servicer_context):
+                pass
+
+    grpc_servicer_context.abort.assert_called_once()
+    assert grpc_servicer_context.abort.call_args.args[0] == grpc.StatusCode.RESOURCE_EXHAUSTED
+    trailing_metadata = grpc_servicer_context.set_trailing_metadata.call_args.args[0]
+    assert trailing_metadata[0][0] == RETRY_PUSHBACK_MS_KEY
+
+
+def test___metrics_enabled___admit_measure_call___queue_wait_recorded_by_priority(
+    grpc_servicer_context: Mock, registry: MetricsRegistry
+) -> None:
+    controller = AdmissionController(max_in_flight=1)
+
+    with _admit_measure_call(controller, grpc_servicer_context, MeasurementPriority.PRODUCTION):
+        pass
+
+    labels = (("priority", "PRODUCTION"),)
+    assert registry.get_histogram("measure_queue_wait_seconds", labels)[0] == 1
+
+
+def test___metrics_enabled___service_busy___rejection_recorded_by_priority(
+    grpc_servicer_context: Mock, registry: MetricsRegistry
+) -> None:
+    controller = AdmissionController(max_in_flight=1, max_queue_length=0)
+
+    with controller.admit():
+        with pytest.raises(Exception):
+            with _admit_measure_call(
+                controller, grpc_servicer_context, MeasurementPriority.INTERACTIVE
+            ):
+                pass
+
+    labels = (("priority", "INTERACTIVE"),)
+    assert registry.get_counter("measure_calls_rejected_total", labels) == 1
+    assert registry.get_histogram("measure_queue_wait_seconds", labels)[0] == 0
+
+
+@pytest.fixture
+def registry() -> Generator[MetricsRegistry]:
+    """Record admission metrics in the registry of a fake RPC."""
+    registry = MetricsRegistry()
+    token = metrics._current_call_metrics.set(metrics._CallMetrics(registry))
+    yield registry
+    metrics._current_call_metrics.reset(token)
+
+
+@pytest.fixture
+def grpc_servicer_context(mocker: MockerFixture) -> Mock:
+    """Test fixture that creates a mock grpc.ServicerContext."""
+    mock = mocker.create_autospec(grpc.ServicerContext)
+    mock.time_remaining.return_value = None
+    mock.abort.side_effect = Exception()
+    return mock
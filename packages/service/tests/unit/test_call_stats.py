@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import time
+from typing import Any
+from unittest.mock import Mock
+
+import grpc
+import pytest
+from google.protobuf import wrappers_pb2
+from pytest_mock import MockerFixture
+
+from ni_measurement_plugin_sdk_service._internal.call_stats import (
+    CallStats,
+    CallStatsInterceptor,
+    get_call_stats,
+)
+from ni_measurement_plugin_sdk_service._internal.metrics import (
+    MetricsInterceptor,
+    MetricsRegistry,
+    add_phase_time,
+    phase_timer,
+)
+
+_METHOD = "/ni.measurementlink.measurement.v2.MeasurementService/Measure"
+_REQUEST_METADATA = (("ni-request-call-stats", "1"),)
+
+
+def test___call_stats___to_and_from_metadata_value___round_trips() -> None:
+    stats = CallStats(duration=1.5, measure_time=0.25, bytes_sent=100, response_count=2)
+
+    assert CallStats.from_metadata_value(stats.to_metadata_value()) == stats
+
+
+def test___unknown_fields___from_metadata_value___ignores_unknown_fields() -> None:
+    stats = CallStats.from_metadata_value("duration=2.0,gpu_time=1.0,response_count=3")
+
+    assert stats == CallStats(duration=2.0, response_count=3)
+
+
+def test___call_with_call_stats___get_call_stats___returns_call_stats() -> None:
+    call = Mock(spec=grpc.Call)
+    call.trailing_metadata.return_value = (("ni-call-stats", "duration=2.0,response_count=3"),)
+
+    assert get_call_stats(call) == CallStats(duration=2.0, response_count=3)
+
+
+def test___call_without_call_stats___get_call_stats___returns_none() -> None:
+    call = Mock(spec=grpc.Call)
+    call.trailing_metadata.return_value = None
+
+    assert get_call_stats(call) is None
+
+
+def test___call_stats_not_requested___intercept___handler_not_wrapped() -> None:
+    handler: grpc.RpcMethodHandler = grpc.unary_stream_rpc_method_handler(
+        lambda request, context: iter(())
+    )
+
+    assert _intercept(CallStatsInterceptor(), handler, metadata=()) is handler
+
+
+def test___streaming_call___intercept___sets_call_stats_in_trailing_metadata(
+    servicer_context: Mock,
+) -> None:
+    def behavior(request: bytes, context: grpc.ServicerContext):
+        add_phase_time("queue", 0.5)
+        with phase_timer("measure"):
+            time.sleep(0.01)
+        for i in range(3):
+            yield b"x" * (i + 1)
+
+    handler = _intercept(CallStatsInterceptor(), _create_stream_handler(behavior))
+
+    request = handler.request_deserializer(b"request")
+    for response in handler.unary_stream(request, servicer_context):
+        handler.response_serializer(response)
+
+    stats = _get_trailing_call_stats(servicer_context)
+    assert stats.queue_time == 0.5
+    assert 0.01 <= stats.measure_time <= stats.duration
+    assert stats.bytes_received == len(b"request")
+    assert stats.bytes_sent == 6
+    assert stats.response_count == 3
+
+
+def test___unary_call___intercept___counts_response_in_trailing_metadata(
+    servicer_context: Mock,
+) -> None:
+    response = wrappers_pb2.StringValue(value="response")
+
+    def behavior(request: bytes, context: grpc.ServicerContext) -> wrappers_pb2.StringValue:
+        with phase_timer("measure"):
+            time.sleep(0.01)
+        return response
+
+    handler = _intercept(
+        CallStatsInterceptor(),
+        grpc.unary_unary_rpc_method_handler(
+            behavior,
+            request_deserializer=lambda data: data,
+            response_serializer=wrappers_pb2.StringValue.SerializeToString,
+        ),
+    )
+
+    handler.unary_unary(handler.request_deserializer(b"request"), servicer_context)
+
+    stats = _get_trailing_call_stats(servicer_context)
+    assert 0.01 <= stats.measure_time <= stats.duration
+    assert stats.bytes_received == len(b"request")
+    assert stats.bytes_sent == len(response.SerializeToString())
+    assert stats.response_count == 1
+
+
+def test___metrics_enabled___intercept___returns_phases_recorded_in_metrics(
+    servicer_context: Mock,
+) -> None:
+    def behavior(request: bytes, context: grpc.ServicerContext):
+        add_phase_time("reserve", 0.25)
+        yield b"x"
+
+    handler = _create_stream_handler(behavior)
+    handler = _intercept(CallStatsInterceptor(), handler)
+    handler = _intercept(MetricsInterceptor(MetricsRegistry(), max_workers=4), handler)
+
+    for response in handler.unary_stream(handler.request_deserializer(b""), servicer_context):
+        handler.response_serializer(response)
+
+    stats = _get_trailing_call_stats(servicer_context)
+    assert stats.reserve_time == 0.25
+    assert stats.response_count == 1
+
+
+def _create_stream_handler(behavior: Any) -> grpc.RpcMethodHandler:
+    return grpc.unary_stream_rpc_method_handler(
+        behavior, request_deserializer=lambda data: data, response_serializer=lambda data: data
+    )
+
+
+def _intercept(
+    interceptor: grpc.ServerInterceptor,
+    handler: grpc.RpcMethodHandler,
+    metadata: tuple[tuple[str, str], ...] = _REQUEST_METADATA,
+) -> Any:
+    handler_call_details = Mock(spec=grpc.HandlerCallDetails)
+    handler_call_details.method = _METHOD
+    handler_call_details.invocation_metadata = metadata
+    return interceptor.intercept_service(lambda _: handler, handler_call_details)
+
+
+def _get_trailing_call_stats(servicer_context: Mock) -> CallStats:
+    servicer_context.set_trailing_metadata.assert_called_once()
+    ((key, value),) = servicer_context.set_trailing_metadata.call_args.args[0]
+    assert key == "ni-call-stats"
+    return CallStats.from_metadata_value(value)
+
+
+@pytest.fixture
+def servicer_context(mocker: MockerFixture) -> Mock:
+    """Create a mock gRPC servicer context."""
+    context = mocker.create_autospec(grpc.ServicerContext)
+    context.code = Mock(return_value=None)
+    return context
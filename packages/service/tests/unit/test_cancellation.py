@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import threading
+import time
+from unittest.mock import Mock
+
+import grpc
+import pytest
+
+from ni_measurement_plugin_sdk_service._internal.cancellation import CancellationToken
+from ni_measurement_plugin_sdk_service._internal.grpc_servicer import MeasurementServiceContext
+from tests.utilities.fake_rpc_error import FakeRpcError
+
+
+def test___waiting_on_token___cancel___wait_returns_immediately() -> None:
+    token = CancellationToken(None, Mock())
+    timer = threading.Timer(0.05, token.cancel)
+    timer.start()
+
+    start_time = time.monotonic()
+    cancelled = token.wait(10.0)
+
+    assert cancelled
+    assert time.monotonic() - start_time < 5.0
+    assert token.is_cancelled
+
+
+def test___deadline___wait_without_timeout___returns_at_deadline() -> None:
+    token = CancellationToken(0.05, Mock())
+
+    cancelled = token.wait()
+
+    assert not cancelled
+    assert token.time_remaining == 0.0
+
+
+def test___cancelled_token___raise_if_cancelled___aborts_with_cancelled() -> None:
+    token = CancellationToken(None, _abort)
+    token.cancel()
+
+    with pytest.raises(grpc.RpcError) as exc_info:
+        token.raise_if_cancelled()
+
+    assert exc_info.value.code() == grpc.StatusCode.CANCELLED
+
+
+def test___expired_deadline___raise_if_cancelled___aborts_with_deadline_exceeded() -> None:
+    token = CancellationToken(0.0, _abort)
+
+    with pytest.raises(grpc.RpcError) as exc_info:
+        token.raise_if_cancelled()
+
+    assert exc_info.value.code() == grpc.StatusCode.DEADLINE_EXCEEDED
+
+
+def test___predicate_becomes_true___poll_until___returns_with_backoff() -> None:
+    token = CancellationToken(None, _abort)
+    results = iter([False, False, False, True])
+    predicate = Mock(side_effect=lambda: next(results))
+
+    token.poll_until(predicate, interval=1e-3, backoff=2.0)
+
+    assert predicate.call_count == 4
+
+
+def test___cancelled_while_polling___poll_until___aborts_with_cancelled() -> None:
+    token = CancellationToken(None, _abort)
+    timer = threading.Timer(0.05, token.cancel)
+    timer.start()
+
+    with pytest.raises(grpc.RpcError) as exc_info:
+        token.poll_until(lambda: False, interval=10.0)
+
+    assert exc_info.value.code() == grpc.StatusCode.CANCELLED
+
+
+def test___timeout___poll_until___timeout_error_raised() -> None:
+    token = CancellationToken(None, _abort)
+
+    with pytest.raises(TimeoutError):
+        token.poll_until(lambda: False, timeout=0.01)
+
+
+def test___measurement_service_context___cancel_rpc___cancellation_token_cancelled() -> None:
+    grpc_context = Mock()
+    grpc_context.time_remaining.return_value = None
+    context = MeasurementServiceContext(grpc_context, Mock(), None)
+
+    token = context.cancellation_token
+    grpc_context.add_callback.call_args.args[0]()
+
+    assert context.cancellation_token is token
+    assert token.is_cancelled
+    grpc_context.add_callback.assert_called_once()
+
+
+def _abort(code: grpc.StatusCode, details: str) -> None:
+    raise FakeRpcError(code, details)
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from unittest.mock import Mock
+
+import pytest
+from ni_grpc_extensions.channelpool import GrpcChannelPool
+from pytest_mock import MockerFixture
+
+from ni_measurement_plugin_sdk_service import _configuration
+from ni_measurement_plugin_sdk_service._configuration import GrpcTransportOptions
+from ni_measurement_plugin_sdk_service._internal.channel_pool import (
+    _ConfiguredGrpcChannelPool,
+    create_grpc_channel_pool,
+)
+
+
+def test___no_transport_options___create_grpc_channel_pool___returns_default_channel_pool() -> None:
+    channel_pool = create_grpc_channel_pool()
+
+    assert type(channel_pool) is GrpcChannelPool
+
+
+def test___transport_options___get_channel___creates_channel_with_options(
+    monkeypatch: pytest.MonkeyPatch, insecure_channel: Mock
+) -> None:
+    monkeypatch.setattr(
+        _configuration,
+        "GRPC_TRANSPORT_OPTIONS",
+        GrpcTransportOptions(stream_lookahead_bytes=8388608, keepalive_time_ms=30000),
+    )
+    channel_pool = create_grpc_channel_pool()
+
+    _ = channel_pool.get_channel("localhost:1234")
+
+    assert isinstance(channel_pool, _ConfiguredGrpcChannelPool)
+    insecure_channel.assert_called_once_with(
+        "localhost:1234",
+        [
+            ("grpc.max_receive_message_length", -1),
+            ("grpc.max_send_message_length", -1),
+            ("grpc.http2.lookahead_bytes", 8388608),
+            ("grpc.keepalive_time_ms", 30000),
+            ("grpc.enable_http_proxy", 0),
+        ],
+    )
+
+
+def test___invalid_transport_options___create_grpc_channel_pool___raises_value_error(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(
+        _configuration, "GRPC_TRANSPORT_OPTIONS", GrpcTransportOptions(max_frame_size=1)
+    )
+
+    with pytest.raises(ValueError):
+        _ = create_grpc_channel_pool()
+
+
+@pytest.fixture
+def insecure_channel(mocker: MockerFixture) -> Mock:
+    """Test fixture that mocks grpc.insecure_channel."""
+    return mocker.patch("grpc.insecure_channel")
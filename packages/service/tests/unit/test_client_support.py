@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import pytest
+
+from ni_measurement_plugin_sdk_service.measurement.client_support import (
+    MeasurementPriority,
+    create_call_metadata,
+)
+
+
+def test___no_options___create_call_metadata___returns_empty_metadata() -> None:
+    assert create_call_metadata() == ()
+
+
+@pytest.mark.parametrize(
+    "priority,expected_value",
+    [
+        (MeasurementPriority.INTERACTIVE, "INTERACTIVE"),
+        (MeasurementPriority.PRODUCTION, "PRODUCTION"),
+        (2, "PRODUCTION"),
+    ],
+)
+def test___priority___create_call_metadata___returns_priority_metadata(
+    priority: MeasurementPriority, expected_value: str
+) -> None:
+    assert create_call_metadata(priority=priority) == (("ni-measurement-priority", expected_value),)
+
+
+def test___accept_shared_memory___create_call_metadata___returns_shared_memory_metadata() -> None:
+    assert create_call_metadata(accept_shared_memory=True) == (("ni-accept-shared-memory", "1"),)
+
+
+def test___request_call_stats___create_call_metadata___returns_call_stats_metadata() -> None:
+    assert create_call_metadata(request_call_stats=True) == (("ni-request-call-stats", "1"),)
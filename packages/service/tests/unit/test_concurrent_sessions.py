@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import threading
+from collections.abc import Generator
+
+import pytest
+
+from ni_measurement_plugin_sdk_service._internal.concurrent_sessions import (
+    enter_concurrently,
+    submit,
+)
+
+_test_context_var: contextvars.ContextVar[str] = contextvars.ContextVar("test_context_var")
+
+
+def test___context_var_set___submit___function_sees_context_var() -> None:
+    token = _test_context_var.set("MyValue")
+    try:
+        future = submit(_test_context_var.get)
+    finally:
+        _test_context_var.reset(token)
+
+    assert future.result(timeout=5.0) == "MyValue"
+
+
+def test___context_managers___enter_concurrently___entered_at_same_time() -> None:
+    barrier = threading.Barrier(2, timeout=5.0)
+    events: list[str] = []
+
+    with enter_concurrently(
+        _waiting_context_manager(barrier, "A", events),
+        _waiting_context_manager(barrier, "B", events),
+    ) as values:
+        assert values == ("A", "B")
+        assert sorted(events) == ["enter A", "enter B"]
+
+    assert events[2:] == ["exit B", "exit A"]
+
+
+def test___context_manager_fails___enter_concurrently___entered_context_managers_exited() -> None:
+    events: list[str] = []
+
+    with pytest.raises(RuntimeError) as exc_info:
+        with enter_concurrently(
+            _waiting_context_manager(None, "A", events),
+            _failing_context_manager(),
+            _waiting_context_manager(None, "C", events),
+        ):
+            pass
+
+    assert exc_info.value.args[0] == "Initialization failed."
+    assert sorted(events[:2]) == ["enter A", "enter C"]
+    assert events[2:] == ["exit C with RuntimeError", "exit A with RuntimeError"]
+
+
+def test___exception_raised___enter_concurrently___context_managers_see_exception() -> None:
+    events: list[str] = []
+
+    with pytest.raises(ValueError):
+        with enter_concurrently(_waiting_context_manager(None, "A", events)):
+            raise ValueError("Measurement failed.")
+
+    assert events == ["enter A", "exit A with ValueError"]
+
+
+@contextlib.contextmanager
+def _waiting_context_manager(
+    barrier: threading.Barrier | None, name: str, events: list[str]
+) -> Generator[str]:
+    if barrier is not None:
+        barrier.wait()
+    events.append(f"enter {name}")
+    try:
+        yield name
+    except BaseException as e:
+        events.append(f"exit {name} with {type(e).__name__}")
+        raise
+    events.append(f"exit {name}")
+
+
+@contextlib.contextmanager
+def _failing_context_manager() -> Generator[None]:
+    raise RuntimeError("Initialization failed.")
+    yield
@@ -7,8 +7,10 @@ import pytest
 from pytest_mock import MockerFixture
 
 from ni_measurement_plugin_sdk_service._configuration import (
+    GrpcTransportOptions,
     MIDriverOptions,
     NISwitchOptions,
+    ProfilingOptions,
 )
 
 
@@ -60,6 +62,87 @@ def test___niswitch_options___update_from_config___reads_config(config: Mock) ->
     assert options.topology == "5678/Independent"
 
 
+def test___grpc_transport_options___update_from_config___reads_config(config: Mock) -> None:
+    config_options = {
+        "MEASUREMENT_PLUGIN_GRPC_STREAM_LOOKAHEAD_BYTES": 8388608,
+        "MEASUREMENT_PLUGIN_GRPC_KEEPALIVE_TIME_MS": 30000,
+        "MEASUREMENT_PLUGIN_GRPC_MAX_CONCURRENT_STREAMS": 16,
+    }
+    config.side_effect = lambda option, default=None, cast=None: config_options.get(option, default)
+
+    options = GrpcTransportOptions().update_from_config()
+
+    assert options.stream_lookahead_bytes == 8388608
+    assert options.keepalive_time_ms == 30000
+    assert options.max_concurrent_streams == 16
+    assert options.bdp_probe
+
+
+def test___profiling_options___update_from_config___reads_config(config: Mock) -> None:
+    config_options = {
+        "MEASUREMENT_PLUGIN_PROFILE_SAMPLE_RATE": 0.0,
+        "MEASUREMENT_PLUGIN_PROFILE_DIRECTORY": "",
+    }
+    config.side_effect = lambda option, default=None, cast=None: config_options.get(option, default)
+
+    options = ProfilingOptions(
+        sample_rate=0.5, slow_call_threshold=2.0, profiler="sampling", directory="profiles"
+    ).update_from_config()
+
+    assert options == ProfilingOptions(
+        sample_rate=0.0, slow_call_threshold=2.0, profiler="sampling", directory=""
+    )
+
+
+@pytest.mark.parametrize(
+    "options,expected_client_options,expected_server_options",
+    [
+        (GrpcTransportOptions(), [], []),
+        (
+            GrpcTransportOptions(stream_lookahead_bytes=8388608, bdp_probe=False),
+            [("grpc.http2.lookahead_bytes", 8388608), ("grpc.http2.bdp_probe", 0)],
+            [("grpc.http2.lookahead_bytes", 8388608), ("grpc.http2.bdp_probe", 0)],
+        ),
+        (
+            GrpcTransportOptions(
+                keepalive_time_ms=30000,
+                min_ping_interval_without_data_ms=10000,
+                max_concurrent_streams=16,
+            ),
+            [("grpc.keepalive_time_ms", 30000)],
+            [
+                ("grpc.keepalive_time_ms", 30000),
+                ("grpc.http2.min_ping_interval_without_data_ms", 10000),
+                ("grpc.max_concurrent_streams", 16),
+            ],
+        ),
+    ],
+)
+def test___grpc_transport_options___to_options___returns_channel_arguments(
+    options: GrpcTransportOptions,
+    expected_client_options: list[tuple[str, int]],
+    expected_server_options: list[tuple[str, int]],
+) -> None:
+    assert options.to_client_options() == expected_client_options
+    assert options.to_server_options() == expected_server_options
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        GrpcTransportOptions(keepalive_time_ms=-1),
+        GrpcTransportOptions(stream_lookahead_bytes=2**31),
+        GrpcTransportOptions(max_frame_size=1024),
+        GrpcTransportOptions(max_frame_size=2**24),
+    ],
+)
+def test___invalid_grpc_transport_options___validate___raises_value_error(
+    options: GrpcTransportOptions,
+) -> None:
+    with pytest.raises(ValueError):
+        options.validate()
+
+
 @pytest.fixture
 def config(mocker: MockerFixture) -> Mock:
     """Test fixture that creates a mock decouple config."""
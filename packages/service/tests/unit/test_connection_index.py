@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import functools
+from unittest.mock import Mock
+
+import pytest
+from ni.measurementlink.sessionmanagement.v1 import session_management_service_pb2
+from ni.measurementlink.sessionmanagement.v1.client import MultiSessionReservation
+
+from ni_measurement_plugin_sdk_service._internal.connection_index import ConnectionIndex
+from tests.unit._reservation_utils import construct_session, create_grpc_session_infos
+
+create_nifake_session_infos = functools.partial(create_grpc_session_infos, "nifake")
+
+
+def test___reservation___get_connection___returns_same_connection_as_reservation(
+    session_management_client: Mock,
+) -> None:
+    reservation = _create_reservation(session_management_client)
+    index = ConnectionIndex(reservation)
+
+    connection = index.get_connection("Pin2", 1)
+
+    assert connection == reservation.get_connection(object, "Pin2", 1)
+    assert connection.channel_name == "3"
+
+
+def test___system_pin___get_connection_for_site___system_connection_returned(
+    session_management_client: Mock,
+) -> None:
+    reservation = _create_reservation(session_management_client)
+    index = ConnectionIndex(reservation)
+
+    connection = index.get_connection("SystemPin", 1)
+
+    assert connection.site == -1
+    assert connection.channel_name == "4"
+
+
+def test___reservation___get_connections___returns_same_connections_as_reservation(
+    session_management_client: Mock,
+) -> None:
+    reservation = _create_reservation(session_management_client)
+    index = ConnectionIndex(reservation)
+
+    connections = index.get_connections(["Pin2", "Pin1"], [1, 0])
+
+    assert connections == reservation.get_connections(object, ["Pin2", "Pin1"], [1, 0])
+    assert index.get_connections() == reservation.get_connections(object)
+
+
+def test___pin_group___get_connections___group_resolved(
+    session_management_client: Mock,
+) -> None:
+    reservation = _create_reservation(
+        session_management_client, group_mappings={"MyGroup": ["Pin1", "Pin2"]}
+    )
+    index = ConnectionIndex(reservation)
+
+    connections = index.get_connections("MyGroup", 0)
+
+    assert [connection.pin_or_relay_name for connection in connections] == ["Pin1", "Pin2"]
+
+
+def test___unknown_pin___get_connections___value_error_raised(
+    session_management_client: Mock,
+) -> None:
+    reservation = _create_reservation(session_management_client)
+    index = ConnectionIndex(reservation)
+
+    with pytest.raises(ValueError) as exc_info:
+        _ = index.get_connections(["Pin1", "Pin9"])
+
+    assert "'Pin9'" in exc_info.value.args[0]
+
+
+def test___reservation___get_channel_list___channels_joined_by_session(
+    session_management_client: Mock,
+) -> None:
+    reservation = _create_reservation(session_management_client)
+    index = ConnectionIndex(reservation)
+
+    assert index.get_channel_list("MySession0") == "0,2"
+    assert index.get_channel_list("MySession0", "Pin1", 1) == "2"
+    assert index.get_channel_list("MySession1", ["Pin1", "Pin2"]) == "1,3"
+
+
+def test___initialized_session___get_connection___connection_has_session(
+    session_management_client: Mock,
+) -> None:
+    reservation = _create_reservation(session_management_client)
+    index = ConnectionIndex(reservation)
+    _ = index.get_connection("Pin1", 0)
+
+    with reservation.initialize_session(construct_session, "nifoo") as session_info:
+        connection = index.get_connection("SystemPin")
+
+    assert connection.session is session_info.session
+
+
+def test___existing_index___create_index_for_same_reservation___table_shared(
+    session_management_client: Mock,
+) -> None:
+    reservation = _create_reservation(session_management_client)
+
+    first = ConnectionIndex(reservation)
+    second = ConnectionIndex(reservation)
+
+    assert second._table is first._table
+
+
+def _create_reservation(
+    session_management_client: Mock, group_mappings: dict[str, list[str]] | None = None
+) -> MultiSessionReservation:
+    grpc_session_infos = create_nifake_session_infos(2)
+    grpc_session_infos[0].channel_mappings.add(pin_or_relay_name="Pin1", site=0, channel="0")
+    grpc_session_infos[1].channel_mappings.add(pin_or_relay_name="Pin2", site=0, channel="1")
+    grpc_session_infos[0].channel_mappings.add(pin_or_relay_name="Pin1", site=1, channel="2")
+    grpc_session_infos[1].channel_mappings.add(pin_or_relay_name="Pin2", site=1, channel="3")
+    system_session_info = session_management_service_pb2.SessionInformation(
+        session=grpc_session_infos[0].session, resource_name="Dev9", instrument_type_id="nifoo"
+    )
+    system_session_info.session.name = "MySystemSession"
+    system_session_info.channel_mappings.add(pin_or_relay_name="SystemPin", site=-1, channel="4")
+    return MultiSessionReservation(
+        session_management_client,
+        grpc_session_infos + [system_session_info],
+        pin_or_relay_group_mappings=group_mappings,
+    )
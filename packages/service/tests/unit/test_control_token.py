@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import os
+from collections.abc import Generator
+from unittest.mock import Mock
+
+import grpc
+import pytest
+from ni.measurementlink.discovery.v1.client import ServiceInfo
+from pytest_mock import MockerFixture
+
+from ni_measurement_plugin_sdk_service._annotations import SERVICE_CONTROL_TOKEN_PATH_KEY
+from ni_measurement_plugin_sdk_service._grpc_metadata import CONTROL_TOKEN_KEY
+from ni_measurement_plugin_sdk_service._internal.control_token import (
+    ControlToken,
+    create_control_metadata,
+    read_control_token,
+)
+
+
+def test___control_token___read_control_token___returns_token(
+    control_token: ControlToken,
+) -> None:
+    service_info = _create_service_info(control_token.path)
+
+    token = read_control_token(service_info)
+
+    assert token == control_token._value
+
+
+def test___token_metadata___is_authorized___returns_true(
+    control_token: ControlToken, servicer_context: Mock
+) -> None:
+    servicer_context.invocation_metadata.return_value = create_control_metadata(
+        read_control_token(_create_service_info(control_token.path))
+    )
+
+    assert control_token.is_authorized(servicer_context)
+
+
+@pytest.mark.parametrize(
+    "metadata",
+    [(), ((CONTROL_TOKEN_KEY, "wrong"),), (("other-key", "value"),)],
+)
+def test___missing_or_wrong_token___is_authorized___returns_false(
+    control_token: ControlToken,
+    servicer_context: Mock,
+    metadata: tuple[tuple[str, str], ...],
+) -> None:
+    servicer_context.invocation_metadata.return_value = metadata
+
+    assert not control_token.is_authorized(servicer_context)
+
+
+def test___closed_token___read_control_token___returns_empty_string() -> None:
+    control_token = ControlToken()
+    control_token.close()
+
+    token = read_control_token(_create_service_info(control_token.path))
+
+    assert token == ""
+    assert not os.path.exists(control_token.path)
+
+
+def test___no_token_path___read_control_token___returns_empty_string() -> None:
+    assert read_control_token(_create_service_info("")) == ""
+
+
+def test___empty_token___create_control_metadata___returns_empty_metadata() -> None:
+    assert create_control_metadata("") == ()
+
+
+@pytest.fixture
+def control_token() -> Generator[ControlToken]:
+    control_token = ControlToken()
+    yield control_token
+    control_token.close()
+
+
+@pytest.fixture
+def servicer_context(mocker: MockerFixture) -> Mock:
+    return mocker.create_autospec(grpc.ServicerContext)
+
+
+def _create_service_info(token_path: str) -> ServiceInfo:
+    annotations = {SERVICE_CONTROL_TOKEN_PATH_KEY: token_path} if token_path else {}
+    return ServiceInfo(
+        service_class="ni.tests.LoopbackMeasurement_Python",
+        description_url="",
+        annotations=annotations,
+    )
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Generator
+from pathlib import Path
+
+import pytest
+
+from ni_measurement_plugin_sdk_service._internal import metrics
+from ni_measurement_plugin_sdk_service._internal.driver_instrumentation import (
+    InstrumentedSession,
+    get_driver_name,
+    instrument_session,
+)
+from ni_measurement_plugin_sdk_service._internal.tracing import configure_tracing
+from tests.utilities import fake_driver
+
+
+class _Channels:
+    def __init__(self, session: _FakeSession) -> None:
+        self._session = session
+
+    def __getitem__(self, key: str) -> _FakeSession:
+        return self._session
+
+
+class _ChannelList(list):
+    pass
+
+
+class _FakeSession(fake_driver.Session):
+    voltage_level = 0.0
+
+    @property
+    def channels(self) -> _Channels:
+        return _Channels(self)
+
+
+def test___session___get_driver_name___returns_top_level_package() -> None:
+    session = fake_driver.Session("Dev1")
+
+    assert get_driver_name(session) == "tests"
+
+
+def test___instrumented_session___isinstance___returns_true() -> None:
+    session = instrument_session(fake_driver.Session("Dev1"))
+
+    assert isinstance(session, fake_driver.Session)
+    assert instrument_session(session) is session
+
+
+def test___instrumented_session___call_methods___records_driver_calls(
+    call_metrics: metrics._CallMetrics,
+) -> None:
+    session = instrument_session(fake_driver.Session("Dev1"))
+
+    session.configure(fake_driver.MeasurementType.VOLTAGE, 10.0)
+    with session.initiate():
+        value = session.read()
+        value = session.read()
+
+    assert value == 0.0
+    assert call_metrics.driver_calls.keys() == {
+        ("tests", "configure"),
+        ("tests", "initiate"),
+        ("tests", "read"),
+    }
+    assert call_metrics.driver_calls[("tests", "read")][0] == 2
+    assert call_metrics.phase_durations["driver"] == pytest.approx(
+        sum(duration for _, duration in call_metrics.driver_calls.values())
+    )
+
+
+def test___instrumented_session___access_attributes___records_reads_and_writes(
+    call_metrics: metrics._CallMetrics,
+) -> None:
+    wrapped = _FakeSession("Dev1")
+    session = instrument_session(wrapped)
+
+    session.channels["0"].voltage_level = 1.5
+    voltage_level = session.channels["0"].voltage_level
+
+    assert voltage_level == 1.5
+    assert wrapped.voltage_level == 1.5
+    assert call_metrics.driver_calls.keys() == {
+        ("tests", "set channels[].voltage_level"),
+        ("tests", "get channels[].voltage_level"),
+    }
+
+
+def test___instrumented_session___use_as_context_manager___yields_instrumented_session() -> None:
+    wrapped = fake_driver.Session("Dev1")
+    session = instrument_session(wrapped)
+
+    with session as entered_session:
+        assert entered_session is session
+
+    assert wrapped.is_closed
+
+
+def test___instrumented_collection___use_container_protocol___forwards_to_wrapped(
+    call_metrics: metrics._CallMetrics,
+) -> None:
+    first_session = _FakeSession("Dev1")
+    second_session = _FakeSession("Dev2")
+    wrapped = _ChannelList([first_session])
+    channels = instrument_session(wrapped)
+
+    channels.append(second_session)
+    channels[1] = second_session
+    items = list(channels)
+
+    assert len(channels) == 2
+    assert bool(channels)
+    assert first_session in channels
+    assert channels[0] in channels
+    assert items == [first_session, second_session]
+    assert all(type(item) is InstrumentedSession for item in items)
+    items[0].voltage_level = 1.5
+    assert first_session.voltage_level == 1.5
+    del channels[1]
+    assert wrapped == [first_session]
+    assert ("tests", "set [].voltage_level") in call_metrics.driver_calls
+
+
+def test___instrumented_session___compare_and_hash___uses_wrapped_object() -> None:
+    wrapped = fake_driver.Session("Dev1")
+    session = instrument_session(wrapped)
+
+    assert session == wrapped
+    assert wrapped == session
+    assert session == instrument_session(wrapped)
+    assert session != fake_driver.Session("Dev1")
+    assert hash(session) == hash(wrapped)
+    assert {session: 1}[wrapped] == 1
+    assert str(session) == str(wrapped)
+
+
+def test___empty_collection___bool___returns_false() -> None:
+    channels = instrument_session(_ChannelList())
+
+    assert not channels
+    assert len(channels) == 0
+    assert list(channels) == []
+
+
+def test___method_raises___call_method___records_driver_call(
+    call_metrics: metrics._CallMetrics,
+) -> None:
+    wrapped = fake_driver.Session("Dev1")
+    session = instrument_session(wrapped)
+
+    with pytest.raises(TypeError):
+        session.configure()
+
+    assert call_metrics.driver_calls[("tests", "configure")][0] == 1
+
+
+def test___tracing_enabled___call_method___span_written(tmp_path: Path) -> None:
+    session = instrument_session(fake_driver.Session("Dev1"))
+    trace_file = tmp_path / "trace.jsonl"
+
+    configure_tracing(str(trace_file))
+    try:
+        session.abort()
+    finally:
+        configure_tracing("")
+
+    spans = [json.loads(line) for line in trace_file.read_text().splitlines()]
+    assert [span["name"] for span in spans] == ["driver_call"]
+    assert spans[0]["attributes"] == {"driver": "tests", "operation": "abort"}
+
+
+@pytest.fixture
+def call_metrics() -> Generator[metrics._CallMetrics]:
+    """Record driver calls in the metrics of a fake RPC."""
+    call_metrics = metrics._CallMetrics()
+    token = metrics._current_call_metrics.set(call_metrics)
+    yield call_metrics
+    metrics._current_call_metrics.reset(token)
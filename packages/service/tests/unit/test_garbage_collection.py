@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import gc
+import threading
+from collections.abc import Generator
+from typing import Any, Callable
+from unittest.mock import Mock
+
+import grpc
+import pytest
+from pytest_mock import MockerFixture
+
+from ni_measurement_plugin_sdk_service._internal.garbage_collection import (
+    GarbageCollectionManager,
+    GarbageCollectionMonitor,
+)
+from ni_measurement_plugin_sdk_service._internal.metrics import MetricsRegistry
+
+
+def test___gc_monitor_started___collect___pause_recorded() -> None:
+    registry = MetricsRegistry()
+    monitor = GarbageCollectionMonitor(registry)
+
+    monitor.start()
+    try:
+        gc.collect()
+    finally:
+        monitor.stop()
+    gc.collect()
+
+    count, duration = registry.get_histogram("gc_pause_seconds", (("generation", "2"),))
+    assert count == 1
+    assert duration > 0.0
+
+
+def test___gc_manager___measure_call_in_progress___collection_deferred(
+    servicer_context: Mock,
+) -> None:
+    gc_manager = GarbageCollectionManager()
+    enabled_during_call = []
+    handler = _intercept(
+        gc_manager,
+        "/Service/Measure",
+        lambda request, context: enabled_during_call.append(gc.isenabled()),
+    )
+
+    handler.unary_unary(None, servicer_context)
+    enabled_before_completion = gc.isenabled()
+    _complete_rpc(servicer_context)
+
+    assert enabled_during_call == [False]
+    assert not enabled_before_completion
+    assert gc.isenabled()
+
+
+def test___gc_manager___overlapping_measure_calls___collection_deferred_until_last_completes(
+    mocker: MockerFixture,
+) -> None:
+    gc_manager = GarbageCollectionManager()
+    handler = _intercept(gc_manager, "/Service/Measure", lambda request, context: None)
+    first_context = mocker.create_autospec(grpc.ServicerContext)
+    second_context = mocker.create_autospec(grpc.ServicerContext)
+
+    handler.unary_unary(None, first_context)
+    handler.unary_unary(None, second_context)
+    _complete_rpc(first_context)
+    enabled_after_first_call = gc.isenabled()
+    _complete_rpc(second_context)
+
+    assert not enabled_after_first_call
+    assert gc.isenabled()
+
+
+def test___gc_manager___measure_call_completes___young_generations_collected(
+    servicer_context: Mock, mocker: MockerFixture
+) -> None:
+    gc_manager = GarbageCollectionManager(full_collection_interval=3600.0)
+    handler = _intercept(gc_manager, "/Service/Measure", lambda request, context: None)
+    collected = threading.Event()
+    collect = mocker.patch("gc.collect", side_effect=lambda generation=2: collected.set())
+
+    handler.unary_unary(None, servicer_context)
+    _complete_rpc(servicer_context)
+
+    assert collected.wait(5.0)
+    collect.assert_called_once_with(1)
+
+
+def test___gc_manager___measure_call_completes___collects_on_collector_thread_outside_lock(
+    servicer_context: Mock, mocker: MockerFixture
+) -> None:
+    gc_manager = GarbageCollectionManager()
+    handler = _intercept(gc_manager, "/Service/Measure", lambda request, context: None)
+    collections: list[tuple[str, bool]] = []
+    collected = threading.Event()
+
+    def collect(generation: int = 2) -> None:
+        collections.append((threading.current_thread().name, gc_manager._lock.locked()))
+        collected.set()
+
+    mocker.patch("gc.collect", side_effect=collect)
+
+    handler.unary_unary(None, servicer_context)
+    _complete_rpc(servicer_context)
+
+    assert collected.wait(5.0)
+    assert collections == [("MeasurementGarbageCollector", False)]
+
+
+def test___gc_manager___long_measure_call___young_generations_collected_after_max_deferral(
+    servicer_context: Mock, mocker: MockerFixture
+) -> None:
+    gc_manager = GarbageCollectionManager(max_deferral=0.05)
+    handler = _intercept(gc_manager, "/Service/Measure", lambda request, context: None)
+    collected = threading.Event()
+    collect = mocker.patch("gc.collect", side_effect=lambda generation=2: collected.set())
+
+    handler.unary_unary(None, servicer_context)
+    try:
+        assert collected.wait(5.0)
+        collect.assert_called_with(1)
+        assert not gc.isenabled()
+    finally:
+        _complete_rpc(servicer_context)
+
+
+def test___gc_manager_closed___measure_call_in_progress___collection_enabled(
+    servicer_context: Mock,
+) -> None:
+    gc_manager = GarbageCollectionManager()
+    handler = _intercept(gc_manager, "/Service/Measure", lambda request, context: None)
+
+    handler.unary_unary(None, servicer_context)
+    gc_manager.close()
+    _complete_rpc(servicer_context)
+
+    assert gc.isenabled()
+
+
+def test___gc_manager___other_call___handler_not_wrapped() -> None:
+    gc_manager = GarbageCollectionManager()
+    behavior = Mock()
+
+    handler = _intercept(gc_manager, "/Service/GetMetadata", behavior)
+
+    assert handler.unary_unary is behavior
+
+
+def test___gc_manager___freeze___objects_frozen() -> None:
+    gc_manager = GarbageCollectionManager()
+
+    gc_manager.freeze()
+
+    assert gc.get_freeze_count() > 0
+
+
+@pytest.fixture(autouse=True)
+def restore_gc_state() -> Generator[None]:
+    """Re-enable and unfreeze the garbage collector after each test."""
+    yield
+    gc.enable()
+    gc.unfreeze()
+
+
+@pytest.fixture
+def servicer_context(mocker: MockerFixture) -> Mock:
+    """Create a mock gRPC servicer context."""
+    return mocker.create_autospec(grpc.ServicerContext)
+
+
+def _intercept(gc_manager: GarbageCollectionManager, method: str, behavior: Any) -> Any:
+    handler: grpc.RpcMethodHandler = grpc.unary_unary_rpc_method_handler(behavior)
+    handler_call_details = Mock(spec=grpc.HandlerCallDetails)
+    handler_call_details.method = method
+    intercepted_handler = gc_manager.intercept_service(lambda _: handler, handler_call_details)
+    assert intercepted_handler is not None
+    return intercepted_handler
+
+
+def _complete_rpc(servicer_context: Mock) -> None:
+    callback: Callable[[], None] = servicer_context.add_callback.call_args.args[0]
+    callback()
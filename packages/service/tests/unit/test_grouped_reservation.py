@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from unittest.mock import Mock
+
+import pytest
+from ni.measurementlink.sessionmanagement.v1 import session_management_service_pb2
+from ni.measurementlink.sessionmanagement.v1.client import (
+    MultiSessionReservation,
+    PinMapContext,
+)
+
+from ni_measurement_plugin_sdk_service._internal.grouped_reservation import (
+    reserve_grouped_sessions,
+)
+from tests.unit._reservation_utils import construct_session, create_grpc_session_infos
+
+
+def test___pin_groups___reserve_grouped_sessions___sessions_reserved_in_one_request(
+    session_management_client: Mock,
+) -> None:
+    context = PinMapContext(pin_map_id="MyPinMap", sites=[0])
+    _set_reserve_response(session_management_client)
+
+    reservation = reserve_grouped_sessions(
+        session_management_client, context, {"source": "Pin1", "measure": ["Pin2", "Pin1"]}
+    )
+
+    session_management_client.reserve_sessions.assert_called_once_with(
+        context=context, pin_or_relay_names=["Pin1", "Pin2"], timeout=0.0
+    )
+    assert [info.session_name for info in reservation.session_info] == [
+        "MySession0",
+        "MySession1",
+    ]
+
+
+def test___grouped_reservation___get_group___group_contains_connected_sessions(
+    session_management_client: Mock,
+) -> None:
+    context = PinMapContext(pin_map_id="MyPinMap", sites=[0])
+    _set_reserve_response(session_management_client)
+
+    reservation = reserve_grouped_sessions(
+        session_management_client, context, {"source": "Pin1", "measure": ["Pin2"]}
+    )
+
+    assert list(reservation.groups) == ["source", "measure"]
+    source = reservation.groups["source"]
+    assert [info.session_name for info in source.session_info] == ["MySession0"]
+    assert source.get_connection(object).pin_or_relay_name == "Pin1"
+    measure = reservation.groups["measure"]
+    assert [info.session_name for info in measure.session_info] == ["MySession1"]
+    assert measure.get_connection(object).pin_or_relay_name == "Pin2"
+
+
+def test___pin_group_name___get_group___group_contains_sessions_for_resolved_pins(
+    session_management_client: Mock,
+) -> None:
+    context = PinMapContext(pin_map_id="MyPinMap", sites=[0])
+    _set_reserve_response(session_management_client, {"MyGroup": ["Pin1", "Pin2"]})
+
+    reservation = reserve_grouped_sessions(session_management_client, context, {"all": "MyGroup"})
+
+    assert [info.session_name for info in reservation.groups["all"].session_info] == [
+        "MySession0",
+        "MySession1",
+    ]
+
+
+def test___grouped_reservation___unreserve___sessions_unreserved_once(
+    session_management_client: Mock,
+) -> None:
+    context = PinMapContext(pin_map_id="MyPinMap", sites=[0])
+    grpc_session_infos = _set_reserve_response(session_management_client)
+
+    with reserve_grouped_sessions(
+        session_management_client, context, {"source": "Pin1", "measure": "Pin2"}
+    ) as reservation:
+        source = reservation.groups["source"]
+        with source.initialize_session(construct_session, "nifake") as session_info:
+            assert session_info.session_name == "MySession0"
+
+    session_management_client._unreserve_sessions.assert_called_once_with(grpc_session_infos)
+
+
+def test___grouped_reservation___unreserve_group___raises_runtime_error(
+    session_management_client: Mock,
+) -> None:
+    context = PinMapContext(pin_map_id="MyPinMap", sites=[0])
+    _set_reserve_response(session_management_client)
+    reservation = reserve_grouped_sessions(
+        session_management_client, context, {"source": "Pin1", "measure": "Pin2"}
+    )
+
+    with pytest.raises(RuntimeError):
+        reservation.groups["source"].unreserve()
+
+    session_management_client._unreserve_sessions.assert_not_called()
+
+
+def test___session_shared_by_groups___initialize_through_group___session_shared(
+    session_management_client: Mock,
+) -> None:
+    context = PinMapContext(pin_map_id="MyPinMap", sites=[0])
+    grpc_session_infos = create_grpc_session_infos("nifake", 1)
+    grpc_session_infos[0].channel_mappings.add(pin_or_relay_name="Pin1", site=0, channel="0")
+    grpc_session_infos[0].channel_mappings.add(pin_or_relay_name="Pin2", site=0, channel="1")
+    session_management_client.reserve_sessions.return_value = MultiSessionReservation(
+        session_management_client, session_info=grpc_session_infos
+    )
+    reservation = reserve_grouped_sessions(
+        session_management_client, context, {"source": "Pin1", "measure": "Pin2"}
+    )
+    source = reservation.groups["source"]
+    measure = reservation.groups["measure"]
+
+    with source.initialize_session(construct_session, "nifake") as session_info:
+        assert measure.get_connection(object).session is session_info.session
+        assert reservation.get_connection(object, "Pin2").session is session_info.session
+        with pytest.raises(RuntimeError):
+            with measure.initialize_session(construct_session, "nifake"):
+                pass
+
+
+def test___empty_group___reserve_grouped_sessions___value_error_raised(
+    session_management_client: Mock,
+) -> None:
+    context = PinMapContext(pin_map_id="MyPinMap", sites=[0])
+
+    with pytest.raises(ValueError) as exc_info:
+        _ = reserve_grouped_sessions(
+            session_management_client, context, {"source": "Pin1", "measure": []}
+        )
+
+    assert "for 'measure'" in exc_info.value.args[0]
+    session_management_client.reserve_sessions.assert_not_called()
+
+
+def _set_reserve_response(
+    session_management_client: Mock, pin_or_relay_group_mappings: dict[str, list[str]] | None = None
+) -> list[session_management_service_pb2.SessionInformation]:
+    grpc_session_infos = create_grpc_session_infos("nifake", 2)
+    grpc_session_infos[0].channel_mappings.add(pin_or_relay_name="Pin1", site=0, channel="0")
+    grpc_session_infos[1].channel_mappings.add(pin_or_relay_name="Pin2", site=0, channel="0")
+    session_management_client.reserve_sessions.return_value = MultiSessionReservation(
+        session_management_client,
+        session_info=grpc_session_infos,
+        pin_or_relay_group_mappings=pin_or_relay_group_mappings,
+    )
+    return grpc_session_infos
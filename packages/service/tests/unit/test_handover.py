@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Generator
+from unittest.mock import Mock
+
+import grpc
+import pytest
+from google.protobuf import empty_pb2
+from ni.measurementlink.discovery.v1.client import DiscoveryClient, ServiceInfo
+from pytest_mock import MockerFixture
+
+from ni_measurement_plugin_sdk_service._annotations import (
+    SERVICE_ADDRESS_KEY,
+    SERVICE_CONTROL_TOKEN_PATH_KEY,
+)
+from ni_measurement_plugin_sdk_service._grpc_metadata import CONTROL_TOKEN_KEY
+from ni_measurement_plugin_sdk_service._internal import handover
+from ni_measurement_plugin_sdk_service._internal.control_token import ControlToken
+from ni_measurement_plugin_sdk_service._internal.handover import (
+    HandoverServicer,
+    request_handover,
+)
+from tests.utilities.fake_rpc_error import FakeRpcError
+
+_INTERFACE = "ni.measurementlink.measurement.v2.MeasurementService"
+_SERVICE_CLASS = "ni.tests.LoopbackMeasurement_Python"
+
+
+def test___local_peer_with_token___drain___calls_drain_once(
+    servicer_context: Mock, control_token: ControlToken
+) -> None:
+    drained = threading.Event()
+    drain = Mock(side_effect=drained.set)
+    servicer = HandoverServicer(drain, control_token)
+    servicer_context.peer.return_value = "ipv6:%5B::1%5D:50000"
+    servicer_context.invocation_metadata.return_value = ((CONTROL_TOKEN_KEY, control_token._value),)
+
+    servicer.Drain(empty_pb2.Empty(), servicer_context)
+    servicer.Drain(empty_pb2.Empty(), servicer_context)
+
+    assert drained.wait(5.0)
+    drain.assert_called_once_with()
+
+
+def test___remote_peer___drain___aborts_with_permission_denied(
+    servicer_context: Mock, control_token: ControlToken
+) -> None:
+    drain = Mock()
+    servicer = HandoverServicer(drain, control_token)
+    servicer_context.peer.return_value = "ipv4:10.1.2.3:50000"
+    servicer_context.invocation_metadata.return_value = ((CONTROL_TOKEN_KEY, control_token._value),)
+    servicer_context.abort.side_effect = FakeRpcError(grpc.StatusCode.PERMISSION_DENIED, "")
+
+    with pytest.raises(FakeRpcError):
+        servicer.Drain(empty_pb2.Empty(), servicer_context)
+
+    assert servicer_context.abort.call_args.args[0] == grpc.StatusCode.PERMISSION_DENIED
+    drain.assert_not_called()
+
+
+def test___local_peer_without_token___drain___aborts_with_permission_denied(
+    servicer_context: Mock, control_token: ControlToken
+) -> None:
+    drain = Mock()
+    servicer = HandoverServicer(drain, control_token)
+    servicer_context.peer.return_value = "unix:/tmp/service.sock"
+    servicer_context.invocation_metadata.return_value = ((CONTROL_TOKEN_KEY, "0123"),)
+    servicer_context.abort.side_effect = FakeRpcError(grpc.StatusCode.PERMISSION_DENIED, "")
+
+    with pytest.raises(FakeRpcError):
+        servicer.Drain(empty_pb2.Empty(), servicer_context)
+
+    assert servicer_context.abort.call_args.args[0] == grpc.StatusCode.PERMISSION_DENIED
+    drain.assert_not_called()
+
+
+def test___other_instances_registered___request_handover___drains_local_instances_of_same_class(
+    discovery_client: Mock, insecure_channel: Mock, control_token: ControlToken
+) -> None:
+    discovery_client.enumerate_services.return_value = [
+        _create_service_info(_SERVICE_CLASS, "localhost:1000", control_token.path),
+        _create_service_info(_SERVICE_CLASS, "localhost:2000", control_token.path),
+        _create_service_info(_SERVICE_CLASS, "remote-host:3000", control_token.path),
+        _create_service_info("ni.tests.OtherMeasurement_Python", "localhost:4000"),
+    ]
+
+    drained = request_handover(
+        discovery_client, _create_service_info(_SERVICE_CLASS, ""), ["localhost:2000"]
+    )
+
+    assert drained == 1
+    insecure_channel.assert_called_once_with("localhost:1000")
+    drain = insecure_channel.return_value.__enter__.return_value.unary_unary.return_value
+    assert drain.call_args.kwargs["metadata"] == ((CONTROL_TOKEN_KEY, control_token._value),)
+
+
+def test___other_versions_registered___request_handover___drains_instances_of_same_version(
+    discovery_client: Mock, insecure_channel: Mock, control_token: ControlToken
+) -> None:
+    discovery_client.enumerate_services.return_value = [
+        _create_service_info(_SERVICE_CLASS, "localhost:1000", control_token.path, ["1.0.0"]),
+        _create_service_info(_SERVICE_CLASS, "localhost:2000", control_token.path, ["2.0.0"]),
+        _create_service_info(_SERVICE_CLASS, "localhost:3000", control_token.path, []),
+    ]
+
+    drained = request_handover(
+        discovery_client,
+        _create_service_info(_SERVICE_CLASS, "", versions=["1.0.0"]),
+        ["localhost:4000"],
+    )
+
+    assert drained == 1
+    insecure_channel.assert_called_once_with("localhost:1000")
+
+
+def test___own_instance_registered_at_other_address___request_handover___not_drained(
+    discovery_client: Mock, insecure_channel: Mock, control_token: ControlToken
+) -> None:
+    discovery_client.enumerate_services.return_value = [
+        _create_service_info(_SERVICE_CLASS, "127.0.0.1:1000", control_token.path)
+    ]
+
+    drained = request_handover(
+        discovery_client,
+        _create_service_info(_SERVICE_CLASS, "localhost:1000", control_token.path),
+        ["localhost:1000"],
+    )
+
+    assert drained == 0
+    insecure_channel.assert_not_called()
+
+
+def test___instance_without_token___request_handover___instance_not_drained(
+    discovery_client: Mock, insecure_channel: Mock
+) -> None:
+    discovery_client.enumerate_services.return_value = [
+        _create_service_info(_SERVICE_CLASS, "localhost:1000")
+    ]
+
+    drained = request_handover(
+        discovery_client, _create_service_info(_SERVICE_CLASS, ""), ["localhost:2000"]
+    )
+
+    assert drained == 0
+    insecure_channel.assert_not_called()
+
+
+def test___drain_fails___request_handover___returns_zero(
+    discovery_client: Mock, insecure_channel: Mock, control_token: ControlToken
+) -> None:
+    discovery_client.enumerate_services.return_value = [
+        _create_service_info(_SERVICE_CLASS, "localhost:1000", control_token.path)
+    ]
+    channel = insecure_channel.return_value.__enter__.return_value
+    channel.unary_unary.return_value.side_effect = FakeRpcError(
+        grpc.StatusCode.UNAVAILABLE, "Connection refused"
+    )
+
+    drained = request_handover(
+        discovery_client, _create_service_info(_SERVICE_CLASS, ""), ["localhost:2000"]
+    )
+
+    assert drained == 0
+
+
+def _create_service_info(
+    service_class: str, address: str, token_path: str = "", versions: list[str] | None = None
+) -> ServiceInfo:
+    annotations = {SERVICE_ADDRESS_KEY: address} if address else {}
+    if token_path:
+        annotations[SERVICE_CONTROL_TOKEN_PATH_KEY] = token_path
+    return ServiceInfo(
+        service_class=service_class,
+        description_url="",
+        provided_interfaces=[_INTERFACE],
+        annotations=annotations,
+        versions=versions if versions is not None else [],
+    )
+
+
+@pytest.fixture
+def control_token() -> Generator[ControlToken]:
+    """Create a control token."""
+    control_token = ControlToken()
+    yield control_token
+    control_token.close()
+
+
+@pytest.fixture
+def discovery_client(mocker: MockerFixture) -> Mock:
+    """Create a mock DiscoveryClient."""
+    return mocker.create_autospec(DiscoveryClient)
+
+
+@pytest.fixture
+def insecure_channel(mocker: MockerFixture) -> Mock:
+    """Patch grpc.insecure_channel in the handover module."""
+    return mocker.patch.object(handover.grpc, "insecure_channel")
+
+
+@pytest.fixture
+def servicer_context(mocker: MockerFixture) -> Mock:
+    """Create a mock gRPC servicer context."""
+    return mocker.create_autospec(grpc.ServicerContext)
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+from typing import Any
+from unittest.mock import Mock
+
+import grpc
+import pytest
+from pytest_mock import MockerFixture
+
+from ni_measurement_plugin_sdk_service._grpc_metadata import (
+    LOAD_AVERAGE_LATENCY_MS_KEY,
+    LOAD_IN_FLIGHT_KEY,
+    LOAD_QUEUE_LENGTH_KEY,
+)
+from ni_measurement_plugin_sdk_service._internal.health import (
+    HealthCheckRequest,
+    HealthCheckResponse,
+    HealthServicer,
+    LoadMonitor,
+    LoadReport,
+    ServingStatus,
+    check_health,
+)
+from tests.utilities.fake_rpc_error import FakeRpcError
+
+_SERVICE_NAME = "ni.measurementlink.measurement.v2.MeasurementService"
+
+
+def test___new_health_servicer___check___returns_not_serving(
+    health_servicer: HealthServicer, servicer_context: Mock
+) -> None:
+    response = health_servicer.Check(HealthCheckRequest(service=_SERVICE_NAME), servicer_context)
+
+    assert response.status == ServingStatus.NOT_SERVING
+
+
+def test___serving_status_set___check___returns_serving_status(
+    health_servicer: HealthServicer, servicer_context: Mock
+) -> None:
+    health_servicer.set_serving_status(ServingStatus.SERVING)
+
+    server_response = health_servicer.Check(HealthCheckRequest(), servicer_context)
+    service_response = health_servicer.Check(
+        HealthCheckRequest(service=_SERVICE_NAME), servicer_context
+    )
+
+    assert server_response.status == ServingStatus.SERVING
+    assert service_response.status == ServingStatus.SERVING
+
+
+def test___health_servicer___check___sets_load_report_in_trailing_metadata(
+    health_servicer: HealthServicer, servicer_context: Mock
+) -> None:
+    health_servicer.Check(HealthCheckRequest(), servicer_context)
+
+    servicer_context.set_trailing_metadata.assert_called_once_with(
+        (
+            (LOAD_IN_FLIGHT_KEY, "2"),
+            (LOAD_QUEUE_LENGTH_KEY, "3"),
+            (LOAD_AVERAGE_LATENCY_MS_KEY, "12.500"),
+        )
+    )
+
+
+def test___unknown_service___check___aborts_with_not_found(
+    health_servicer: HealthServicer, servicer_context: Mock
+) -> None:
+    servicer_context.abort.side_effect = FakeRpcError(grpc.StatusCode.NOT_FOUND, "")
+
+    with pytest.raises(FakeRpcError):
+        health_servicer.Check(HealthCheckRequest(service="Unknown.Service"), servicer_context)
+
+    servicer_context.abort.assert_called_once()
+    assert servicer_context.abort.call_args.args[0] == grpc.StatusCode.NOT_FOUND
+
+
+def test___health_servicer___watch___yields_status_changes(
+    health_servicer: HealthServicer, servicer_context: Mock
+) -> None:
+    servicer_context.is_active.return_value = True
+    responses = health_servicer.Watch(HealthCheckRequest(), servicer_context)
+
+    first_response = next(responses)
+    health_servicer.set_serving_status(ServingStatus.SERVING)
+    second_response = next(responses)
+
+    assert first_response.status == ServingStatus.NOT_SERVING
+    assert second_response.status == ServingStatus.SERVING
+
+
+def test___max_watchers_active___watch___aborts_with_resource_exhausted(
+    servicer_context: Mock,
+) -> None:
+    health_servicer = HealthServicer([_SERVICE_NAME], lambda: LoadReport(0, 0, 0.0), max_watchers=1)
+    servicer_context.is_active.return_value = True
+    servicer_context.abort.side_effect = FakeRpcError(grpc.StatusCode.RESOURCE_EXHAUSTED, "")
+    first_watcher = health_servicer.Watch(HealthCheckRequest(), servicer_context)
+    _ = next(first_watcher)
+
+    with pytest.raises(FakeRpcError):
+        _ = next(health_servicer.Watch(HealthCheckRequest(), servicer_context))
+
+    assert servicer_context.abort.call_args.args[0] == grpc.StatusCode.RESOURCE_EXHAUSTED
+
+
+def test___watcher_ended___watch___new_watcher_accepted(servicer_context: Mock) -> None:
+    health_servicer = HealthServicer([_SERVICE_NAME], lambda: LoadReport(0, 0, 0.0), max_watchers=1)
+    servicer_context.is_active.return_value = True
+    first_watcher = health_servicer.Watch(HealthCheckRequest(), servicer_context)
+    _ = next(first_watcher)
+    first_watcher.close()
+
+    response = next(health_servicer.Watch(HealthCheckRequest(), servicer_context))
+
+    assert response.status == ServingStatus.NOT_SERVING
+    servicer_context.abort.assert_not_called()
+
+
+def test___load_monitor___measure_call_in_progress___in_flight_counts_call(
+    servicer_context: Mock,
+) -> None:
+    load_monitor = LoadMonitor()
+    in_flight_during_call = []
+    handler = _intercept(
+        load_monitor,
+        "/Service/Measure",
+        lambda request, context: in_flight_during_call.append(load_monitor.in_flight),
+    )
+
+    handler.unary_unary(None, servicer_context)
+
+    assert in_flight_during_call == [1]
+    assert load_monitor.in_flight == 0
+    assert load_monitor.average_latency > 0.0
+
+
+def test___load_monitor___streaming_measure_call_raises___in_flight_decremented(
+    servicer_context: Mock,
+) -> None:
+    load_monitor = LoadMonitor()
+
+    def measure(request: object, context: grpc.ServicerContext):
+        yield 1
+        raise RuntimeError("Measurement failed")
+
+    handler = _intercept(load_monitor, "/Service/Measure", measure, streaming=True)
+    responses = handler.unary_stream(None, servicer_context)
+
+    assert next(responses) == 1
+    assert load_monitor.in_flight == 1
+    with pytest.raises(RuntimeError):
+        next(responses)
+    assert load_monitor.in_flight == 0
+
+
+def test___load_monitor___other_call___handler_not_wrapped(servicer_context: Mock) -> None:
+    load_monitor = LoadMonitor()
+    behavior = Mock()
+
+    handler = _intercept(load_monitor, "/Service/GetMetadata", behavior)
+
+    assert handler.unary_unary is behavior
+
+
+def test___load_report_in_trailing_metadata___check_health___returns_status_and_load_report(
+    mocker: MockerFixture,
+) -> None:
+    channel = mocker.create_autospec(grpc.Channel)
+    call = mocker.create_autospec(grpc.Call)
+    call.trailing_metadata.return_value = (
+        (LOAD_IN_FLIGHT_KEY, "2"),
+        (LOAD_QUEUE_LENGTH_KEY, "3"),
+        (LOAD_AVERAGE_LATENCY_MS_KEY, "12.500"),
+    )
+    channel.unary_unary.return_value.with_call.return_value = (
+        HealthCheckResponse(status=ServingStatus.SERVING),
+        call,
+    )
+
+    status, load_report = check_health(channel, _SERVICE_NAME)
+
+    assert status == ServingStatus.SERVING
+    assert load_report == LoadReport(in_flight=2, queue_length=3, average_latency=0.0125)
+
+
+def test___no_load_report_in_trailing_metadata___check_health___returns_none_load_report(
+    mocker: MockerFixture,
+) -> None:
+    channel = mocker.create_autospec(grpc.Channel)
+    call = mocker.create_autospec(grpc.Call)
+    call.trailing_metadata.return_value = None
+    channel.unary_unary.return_value.with_call.return_value = (
+        HealthCheckResponse(status=ServingStatus.NOT_SERVING),
+        call,
+    )
+
+    status, load_report = check_health(channel)
+
+    assert status == ServingStatus.NOT_SERVING
+    assert load_report is None
+
+
+def _intercept(
+    load_monitor: LoadMonitor, method: str, behavior: Any, streaming: bool = False
+) -> Any:
+    handler: grpc.RpcMethodHandler
+    if streaming:
+        handler = grpc.unary_stream_rpc_method_handler(behavior)
+    else:
+        handler = grpc.unary_unary_rpc_method_handler(behavior)
+    handler_call_details = Mock(spec=grpc.HandlerCallDetails)
+    handler_call_details.method = method
+    intercepted_handler = load_monitor.intercept_service(lambda _: handler, handler_call_details)
+    assert intercepted_handler is not None
+    return intercepted_handler
+
+
+@pytest.fixture
+def health_servicer() -> HealthServicer:
+    """Create a health servicer with a fixed load report."""
+    return HealthServicer([_SERVICE_NAME], lambda: LoadReport(2, 3, 0.0125))
+
+
+@pytest.fixture
+def servicer_context(mocker: MockerFixture) -> Mock:
+    """Create a mock gRPC servicer context."""
+    return mocker.create_autospec(grpc.ServicerContext)
@@ -0,0 +1,376 @@
+from __future__ import annotations
+
+from typing import cast
+from unittest.mock import Mock
+
+import grpc
+import pytest
+from ni.measurementlink.discovery.v1.client import (
+    DiscoveryClient,
+    ServiceInfo,
+    ServiceLocation,
+)
+from ni.measurementlink.measurement.v2 import measurement_service_pb2
+from ni.measurementlink import pin_map_context_pb2
+from ni_grpc_extensions.channelpool import GrpcChannelPool
+from pytest_mock import MockerFixture
+
+from ni_measurement_plugin_sdk_service._annotations import SERVICE_ADDRESS_KEY
+from ni_measurement_plugin_sdk_service._internal.load_balancing import (
+    LoadBalancedChannel,
+    get_service_channel,
+)
+from ni_measurement_plugin_sdk_service._internal.service_address import (
+    resolve_service_addresses,
+)
+from ni_measurement_plugin_sdk_service.measurement.info import LoadBalancingPolicy
+from tests.utilities.fake_rpc_error import FakeRpcError
+
+_ADDRESSES = ["host1:1000", "host2:2000", "host3:3000"]
+
+
+def test___round_robin___call_repeatedly___calls_each_replica_in_turn(
+    replica_channels: dict[str, Mock],
+) -> None:
+    channel = LoadBalancedChannel(list(replica_channels.items()), LoadBalancingPolicy.ROUND_ROBIN)
+    measure = channel.unary_unary("/Service/Measure")
+
+    for _ in range(len(_ADDRESSES) * 2):
+        measure(_create_request("PinMap1", [0]))
+
+    for replica_channel in replica_channels.values():
+        assert replica_channel.unary_unary.return_value.call_count == 2
+
+
+def test___least_outstanding_with_call_in_progress___call___calls_idle_replica(
+    replica_channels: dict[str, Mock],
+) -> None:
+    channel = LoadBalancedChannel(
+        list(replica_channels.items())[:2], LoadBalancingPolicy.LEAST_OUTSTANDING
+    )
+    measure = channel.unary_stream("/Service/Measure")
+
+    first_call = measure(_create_request("PinMap1", [0]))
+    second_call = measure(_create_request("PinMap1", [0]))
+
+    assert first_call is not second_call
+    first_replica = replica_channels[_ADDRESSES[0]].unary_stream.return_value
+    second_replica = replica_channels[_ADDRESSES[1]].unary_stream.return_value
+    assert first_replica.call_count == 1
+    assert second_replica.call_count == 1
+
+
+def test___least_outstanding_with_call_completed___call___reuses_replica(
+    replica_channels: dict[str, Mock],
+) -> None:
+    channel = LoadBalancedChannel(
+        list(replica_channels.items())[:2], LoadBalancingPolicy.LEAST_OUTSTANDING
+    )
+    measure = channel.unary_stream("/Service/Measure")
+
+    first_call = measure(_create_request("PinMap1", [0]))
+    _complete_call(cast(Mock, first_call), grpc.StatusCode.OK)
+    second_call = measure(_create_request("PinMap1", [0]))
+
+    assert first_call is second_call
+
+
+def test___pin_affinity___call_with_same_pins___calls_same_replica(
+    replica_channels: dict[str, Mock],
+) -> None:
+    channel = LoadBalancedChannel(list(replica_channels.items()), LoadBalancingPolicy.PIN_AFFINITY)
+    measure = channel.unary_unary("/Service/Measure")
+
+    for _ in range(5):
+        measure(_create_request("PinMap1", [0, 1]))
+
+    call_counts = sorted(
+        replica_channel.unary_unary.return_value.call_count
+        for replica_channel in replica_channels.values()
+    )
+    assert call_counts == [0, 0, 5]
+
+
+def test___replica_unavailable___call___replica_ejected(
+    replica_channels: dict[str, Mock],
+) -> None:
+    unavailable_replica = replica_channels[_ADDRESSES[0]].unary_unary.return_value
+    unavailable_replica.side_effect = FakeRpcError(grpc.StatusCode.UNAVAILABLE, "Unavailable")
+    channel = LoadBalancedChannel(list(replica_channels.items()), LoadBalancingPolicy.ROUND_ROBIN)
+    measure = channel.unary_unary("/Service/Measure")
+
+    errors = 0
+    for _ in range(len(_ADDRESSES) * 3):
+        try:
+            measure(_create_request("PinMap1", [0]))
+        except grpc.RpcError:
+            errors += 1
+
+    assert errors == 1
+    assert unavailable_replica.call_count == 1
+
+
+def test___all_replicas_ejected___call___calls_ejected_replica(
+    replica_channels: dict[str, Mock],
+) -> None:
+    replica = replica_channels[_ADDRESSES[0]].unary_unary.return_value
+    replica.side_effect = [FakeRpcError(grpc.StatusCode.UNAVAILABLE, "Unavailable"), "response"]
+    channel = LoadBalancedChannel(list(replica_channels.items())[:1])
+    measure = channel.unary_unary("/Service/Measure")
+
+    with pytest.raises(grpc.RpcError):
+        measure(_create_request("PinMap1", [0]))
+    response = measure(_create_request("PinMap1", [0]))
+
+    assert response == "response"
+
+
+def test___all_replicas_ejected___call___replicas_resolved_again(
+    replica_channels: dict[str, Mock],
+) -> None:
+    replicas = list(replica_channels.items())
+    replica = replicas[0][1].unary_unary.return_value
+    replica.side_effect = FakeRpcError(grpc.StatusCode.UNAVAILABLE, "Unavailable")
+    resolve_replicas = Mock(return_value=replicas[1:2])
+    channel = LoadBalancedChannel(replicas[:1], resolve_replicas=resolve_replicas)
+    measure = channel.unary_unary("/Service/Measure")
+
+    with pytest.raises(grpc.RpcError):
+        measure(_create_request("PinMap1", [0]))
+    _ = measure(_create_request("PinMap1", [0]))
+
+    resolve_replicas.assert_called_once_with()
+    assert channel.addresses == [_ADDRESSES[1]]
+    replicas[1][1].unary_unary.return_value.assert_called_once()
+
+
+def test___replica_ejected_by_one_channel___other_channel___replica_not_ejected(
+    replica_channels: dict[str, Mock],
+) -> None:
+    replicas = list(replica_channels.items())[:1]
+    replica = replicas[0][1].unary_unary.return_value
+    replica.side_effect = FakeRpcError(grpc.StatusCode.UNAVAILABLE, "Unavailable")
+    first_channel = LoadBalancedChannel(replicas)
+    second_channel = LoadBalancedChannel(replicas)
+
+    with pytest.raises(grpc.RpcError):
+        first_channel.unary_unary("/Service/Measure")(_create_request("PinMap1", [0]))
+
+    assert first_channel._states[_ADDRESSES[0]].ejected_until > 0.0
+    assert second_channel._states[_ADDRESSES[0]].ejected_until == 0.0
+
+
+def test___replica_channels___subscribe___callback_receives_combined_connectivity(
+    replica_channels: dict[str, Mock],
+) -> None:
+    channel = LoadBalancedChannel(list(replica_channels.items()))
+    callback = Mock()
+
+    channel.subscribe(callback, try_to_connect=True)
+    replica_callbacks = [
+        replica_channel.subscribe.call_args.args[0] for replica_channel in replica_channels.values()
+    ]
+    replica_callbacks[0](grpc.ChannelConnectivity.TRANSIENT_FAILURE)
+    replica_callbacks[1](grpc.ChannelConnectivity.READY)
+    replica_callbacks[2](grpc.ChannelConnectivity.CONNECTING)
+
+    for replica_channel in replica_channels.values():
+        assert replica_channel.subscribe.call_args.args[1] is True
+    assert [call.args[0] for call in callback.call_args_list] == [
+        grpc.ChannelConnectivity.TRANSIENT_FAILURE,
+        grpc.ChannelConnectivity.READY,
+    ]
+
+
+def test___subscribed_callback___unsubscribe___replica_channels_unsubscribed(
+    replica_channels: dict[str, Mock],
+) -> None:
+    channel = LoadBalancedChannel(list(replica_channels.items()))
+    callback = Mock()
+    channel.subscribe(callback)
+
+    channel.unsubscribe(callback)
+
+    for replica_channel in replica_channels.values():
+        replica_channel.unsubscribe.assert_called_once_with(
+            replica_channel.subscribe.call_args.args[0]
+        )
+
+
+def test___replicas_with_addresses___resolve_service_addresses___returns_addresses(
+    discovery_client: Mock,
+) -> None:
+    discovery_client.enumerate_services.return_value = [
+        _create_service_info("MyService", _ADDRESSES[0]),
+        _create_service_info("OtherService", _ADDRESSES[1]),
+        _create_service_info("MyService", _ADDRESSES[2]),
+        _create_service_info("MyService", _ADDRESSES[2]),
+    ]
+
+    addresses = resolve_service_addresses(discovery_client, "my.Interface", "MyService")
+
+    assert addresses == [_ADDRESSES[0], _ADDRESSES[2]]
+
+
+def test___replicas_without_addresses___resolve_service_addresses___returns_resolved_address(
+    discovery_client: Mock,
+) -> None:
+    discovery_client.enumerate_services.return_value = [_create_service_info("MyService", "")]
+    discovery_client.resolve_service_with_information.return_value = (
+        ServiceLocation("localhost", "1234", ""),
+        _create_service_info("MyService", ""),
+    )
+
+    addresses = resolve_service_addresses(discovery_client, "my.Interface", "MyService")
+
+    assert addresses == ["localhost:1234"]
+
+
+def test___round_robin___get_service_channel_repeatedly___calls_each_replica_in_turn(
+    discovery_client: Mock, channel_pool: Mock, replica_channels: dict[str, Mock]
+) -> None:
+    _set_registered_replicas(discovery_client, channel_pool, replica_channels)
+
+    channels = []
+    for _ in _ADDRESSES:
+        channel = _get_service_channel(
+            discovery_client, channel_pool, LoadBalancingPolicy.ROUND_ROBIN
+        )
+        channel.unary_unary("/Service/Measure")(_create_request("PinMap1", [0]))
+        channels.append(channel)
+
+    assert all(channel is channels[0] for channel in channels)
+    for replica_channel in replica_channels.values():
+        replica_channel.unary_unary.return_value.assert_called_once()
+    discovery_client.enumerate_services.assert_called_once()
+
+
+def test___replica_unavailable___get_service_channel_again___replica_ejected(
+    discovery_client: Mock, channel_pool: Mock, replica_channels: dict[str, Mock]
+) -> None:
+    _set_registered_replicas(discovery_client, channel_pool, replica_channels)
+    first_channel = _get_service_channel(
+        discovery_client, channel_pool, LoadBalancingPolicy.LEAST_OUTSTANDING
+    )
+    replica = replica_channels[_ADDRESSES[0]].unary_unary.return_value
+    replica.side_effect = FakeRpcError(grpc.StatusCode.UNAVAILABLE, "Unavailable")
+    with pytest.raises(grpc.RpcError):
+        first_channel.unary_unary("/Service/Measure")(_create_request("PinMap1", [0]))
+
+    second_channel = _get_service_channel(
+        discovery_client, channel_pool, LoadBalancingPolicy.LEAST_OUTSTANDING
+    )
+    response = second_channel.unary_unary("/Service/Measure")(_create_request("PinMap1", [0]))
+
+    assert second_channel is first_channel
+    assert response is replica_channels[_ADDRESSES[1]].unary_unary.return_value.return_value
+    replica.assert_called_once()
+
+
+def test___different_policy___get_service_channel___returns_different_channel(
+    discovery_client: Mock, channel_pool: Mock, replica_channels: dict[str, Mock]
+) -> None:
+    _set_registered_replicas(discovery_client, channel_pool, replica_channels)
+
+    round_robin_channel = _get_service_channel(
+        discovery_client, channel_pool, LoadBalancingPolicy.ROUND_ROBIN
+    )
+    pin_affinity_channel = _get_service_channel(
+        discovery_client, channel_pool, LoadBalancingPolicy.PIN_AFFINITY
+    )
+
+    assert round_robin_channel is not pin_affinity_channel
+
+
+def test___channel_pool_closed___get_service_channel___returns_channel_with_new_replicas(
+    discovery_client: Mock,
+    channel_pool: Mock,
+    replica_channels: dict[str, Mock],
+    mocker: MockerFixture,
+) -> None:
+    _set_registered_replicas(discovery_client, channel_pool, replica_channels)
+    first_channel = _get_service_channel(
+        discovery_client, channel_pool, LoadBalancingPolicy.ROUND_ROBIN
+    )
+    new_replica_channels = {
+        address: mocker.create_autospec(grpc.Channel) for address in replica_channels
+    }
+    channel_pool.get_channel.side_effect = new_replica_channels.__getitem__
+
+    second_channel = _get_service_channel(
+        discovery_client, channel_pool, LoadBalancingPolicy.ROUND_ROBIN
+    )
+    second_channel.unary_unary("/Service/Measure")(_create_request("PinMap1", [0]))
+
+    assert second_channel is not first_channel
+    assert sum(channel.unary_unary.call_count for channel in new_replica_channels.values()) == 1
+    assert all(channel.unary_unary.call_count == 0 for channel in replica_channels.values())
+
+
+@pytest.fixture
+def replica_channels(mocker: MockerFixture) -> dict[str, Mock]:
+    """Test fixture that creates a mock gRPC channel for each replica."""
+    channels = {}
+    for address in _ADDRESSES:
+        channel = mocker.create_autospec(grpc.Channel)
+        channel.unary_unary.return_value = Mock()
+        channel.unary_stream.return_value = Mock()
+        channel.unary_stream.return_value.return_value = Mock()
+        channels[address] = channel
+    return channels
+
+
+@pytest.fixture
+def discovery_client(mocker: MockerFixture) -> Mock:
+    """Test fixture that creates a mock DiscoveryClient."""
+    return mocker.create_autospec(DiscoveryClient)
+
+
+@pytest.fixture
+def channel_pool(mocker: MockerFixture) -> Mock:
+    """Test fixture that creates a mock GrpcChannelPool."""
+    return mocker.create_autospec(GrpcChannelPool, instance=True)
+
+
+def _set_registered_replicas(
+    discovery_client: Mock, channel_pool: Mock, replica_channels: dict[str, Mock]
+) -> None:
+    discovery_client.enumerate_services.return_value = [
+        _create_service_info("MyService", address) for address in replica_channels
+    ]
+    channel_pool.get_channel.side_effect = replica_channels.__getitem__
+
+
+def _get_service_channel(
+    discovery_client: Mock, channel_pool: Mock, load_balancing_policy: LoadBalancingPolicy
+) -> LoadBalancedChannel:
+    channel = get_service_channel(
+        discovery_client,
+        channel_pool,
+        "my.Interface",
+        "MyService",
+        load_balancing_policy=load_balancing_policy,
+    )
+    assert isinstance(channel, LoadBalancedChannel)
+    return channel
+
+
+def _create_request(pin_map_id: str, sites: list[int]) -> measurement_service_pb2.MeasureRequest:
+    return measurement_service_pb2.MeasureRequest(
+        pin_map_context=pin_map_context_pb2.PinMapContext(pin_map_id=pin_map_id, sites=sites)
+    )
+
+
+def _complete_call(call: Mock, code: grpc.StatusCode) -> None:
+    call.code.return_value = code
+    for args in call.add_done_callback.call_args_list:
+        args.args[0](call)
+
+
+def _create_service_info(service_class: str, address: str) -> ServiceInfo:
+    return ServiceInfo(
+        service_class=service_class,
+        description_url="",
+        provided_interfaces=["my.Interface"],
+        annotations={SERVICE_ADDRESS_KEY: address} if address else {},
+    )
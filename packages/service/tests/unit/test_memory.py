@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import logging
+import tracemalloc
+from collections.abc import Generator
+from typing import cast
+
+import pytest
+
+from ni_measurement_plugin_sdk_service._internal.memory import MemoryTracker
+from ni_measurement_plugin_sdk_service._internal.metrics import MetricsRegistry
+
+_retained: list[bytes] = []
+
+
+def test___measure_function_retains_memory___call_measure_function___usage_logged(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    tracker = MemoryTracker(top_allocation_count=3)
+
+    with caplog.at_level(logging.INFO):
+        result = tracker.wrap(_retain)(1_000_000)
+
+    assert result == 1_000_000
+    record = caplog.records[-1]
+    peak_bytes, retained_bytes = cast(tuple[int, int], record.args)[:2]
+    assert peak_bytes >= 1_000_000
+    assert retained_bytes >= 1_000_000
+    assert "test_memory.py" in record.getMessage()
+
+
+def test___streaming_measure_function___exhaust_generator___usage_recorded_in_metrics() -> None:
+    registry = MetricsRegistry()
+    tracker = MemoryTracker(metrics_registry=registry)
+
+    outputs = list(tracker.wrap(_allocate_and_yield)(3, 1_000_000))
+
+    assert outputs == [1_000_000] * 3
+    peak_count, peak_sum = registry.get_histogram("measure_memory_peak_bytes")
+    assert peak_count == 1
+    assert peak_sum >= 1_000_000
+    assert registry.get_histogram("measure_memory_retained_bytes")[0] == 1
+    assert "# TYPE measurement_plugin_measure_memory_peak_bytes histogram" in registry.render()
+
+
+def test___measure_function_raises___call_measure_function___next_call_tracked() -> None:
+    registry = MetricsRegistry()
+    measure = MemoryTracker(metrics_registry=registry).wrap(_retain)
+
+    with pytest.raises(ValueError):
+        measure(-1)
+    measure(10)
+
+    assert registry.get_histogram("measure_memory_peak_bytes")[0] == 2
+
+
+def test___tracking_in_progress___call_measure_function___call_not_tracked() -> None:
+    registry = MetricsRegistry()
+    measure = MemoryTracker(metrics_registry=registry).wrap(_allocate_and_yield)
+
+    first_call = measure(1, 10)
+    next(first_call)
+    list(measure(1, 10))
+    first_call.close()
+
+    assert registry.get_histogram("measure_memory_peak_bytes")[0] == 1
+
+
+@pytest.fixture(autouse=True)
+def stop_tracemalloc() -> Generator[None]:
+    """Stop tracing memory allocations after each test."""
+    yield
+    _retained.clear()
+    tracemalloc.stop()
+
+
+def _retain(size: int) -> int:
+    data = bytes(size)
+    _retained.append(data)
+    return len(data)
+
+
+def _allocate_and_yield(count: int, size: int) -> Generator[int]:
+    for _ in range(count):
+        data = bytes(size)
+        yield len(data)
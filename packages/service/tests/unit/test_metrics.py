@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import time
+from typing import Any
+from unittest.mock import Mock
+
+import grpc
+import pytest
+from pytest_mock import MockerFixture
+
+from ni_measurement_plugin_sdk_service._internal.metrics import (
+    MetricsInterceptor,
+    MetricsRegistry,
+    add_driver_call_time,
+    add_phase_time,
+    phase_timer,
+)
+
+_METHOD = "/ni.measurementlink.measurement.v2.MeasurementService/Measure"
+_METHOD_LABELS = (("method", _METHOD),)
+
+
+def test___counter_and_histogram___render___returns_prometheus_text() -> None:
+    registry = MetricsRegistry(latency_buckets=[0.1, 1.0])
+    registry.describe("calls_total", "counter", "Calls.")
+    registry.describe("duration_seconds", "histogram", "Duration.")
+    registry.increment("calls_total", (("method", "/A/B"),), 2)
+    registry.observe("duration_seconds", (("method", "/A/B"),), 0.05)
+    registry.observe("duration_seconds", (("method", "/A/B"),), 0.5)
+    registry.add_gauge("queue_length", "Queue length.", lambda: 3)
+
+    text = registry.render()
+
+    assert text.splitlines() == [
+        "# HELP measurement_plugin_calls_total Calls.",
+        "# TYPE measurement_plugin_calls_total counter",
+        'measurement_plugin_calls_total{method="/A/B"} 2',
+        "# HELP measurement_plugin_duration_seconds Duration.",
+        "# TYPE measurement_plugin_duration_seconds histogram",
+        'measurement_plugin_duration_seconds_bucket{method="/A/B",le="0.1"} 1',
+        'measurement_plugin_duration_seconds_bucket{method="/A/B",le="1"} 2',
+        'measurement_plugin_duration_seconds_bucket{method="/A/B",le="+Inf"} 2',
+        'measurement_plugin_duration_seconds_sum{method="/A/B"} 0.55',
+        'measurement_plugin_duration_seconds_count{method="/A/B"} 2',
+        "# HELP measurement_plugin_queue_length Queue length.",
+        "# TYPE measurement_plugin_queue_length gauge",
+        "measurement_plugin_queue_length 3",
+    ]
+
+
+def test___histogram_with_buckets___render___uses_buckets() -> None:
+    registry = MetricsRegistry()
+    registry.observe("size_bytes", (), 2048, buckets=[1024, 4096])
+
+    text = registry.render()
+
+    assert 'measurement_plugin_size_bytes_bucket{le="1024"} 0' in text.splitlines()
+    assert 'measurement_plugin_size_bytes_bucket{le="4096"} 1' in text.splitlines()
+
+
+def test___label_with_special_characters___render___escapes_label() -> None:
+    registry = MetricsRegistry()
+    registry.increment("calls_total", (("method", 'a"b\\c'),))
+
+    text = registry.render()
+
+    assert 'measurement_plugin_calls_total{method="a\\"b\\\\c"} 1' in text
+
+
+def test___no_current_call___phase_timer___does_nothing() -> None:
+    with phase_timer("measure"):
+        pass
+    add_phase_time("queue", 1.0)
+
+
+def test___unary_call___intercept___records_call_metrics(
+    registry: MetricsRegistry, servicer_context: Mock
+) -> None:
+    def behavior(request: bytes, context: grpc.ServicerContext) -> bytes:
+        with phase_timer("measure"):
+            time.sleep(0.01)
+        return b"response"
+
+    handler = _intercept(registry, behavior)
+
+    request = handler.request_deserializer(b"request")
+    response = handler.unary_unary(request, servicer_context)
+    handler.response_serializer(response)
+    _complete_call(servicer_context)
+
+    assert registry.get_counter("rpc_calls_total", _METHOD_LABELS + (("code", "OK"),)) == 1
+    assert registry.get_counter("rpc_messages_sent_total", _METHOD_LABELS) == 1
+    assert registry.get_counter("rpc_bytes_sent_total", _METHOD_LABELS) == len(b"response")
+    assert registry.get_histogram("rpc_duration_seconds", _METHOD_LABELS)[0] == 1
+    measure_count, measure_time = registry.get_histogram(
+        "rpc_phase_duration_seconds", _METHOD_LABELS + (("phase", "measure"),)
+    )
+    assert measure_count == 1
+    assert measure_time >= 0.01
+    for phase in ("decode", "encode"):
+        labels = _METHOD_LABELS + (("phase", phase),)
+        assert registry.get_histogram("rpc_phase_duration_seconds", labels)[0] == 1
+
+
+def test___streaming_call___intercept___records_messages_and_send_time(
+    registry: MetricsRegistry, servicer_context: Mock
+) -> None:
+    def behavior(request: bytes, context: grpc.ServicerContext):
+        for i in range(3):
+            yield b"x" * (i + 1)
+
+    handler = _intercept(registry, behavior, streaming=True)
+
+    for response in handler.unary_stream(b"", servicer_context):
+        handler.response_serializer(response)
+        time.sleep(0.01)
+    _complete_call(servicer_context)
+
+    assert registry.get_counter("rpc_messages_sent_total", _METHOD_LABELS) == 3
+    assert registry.get_counter("rpc_bytes_sent_total", _METHOD_LABELS) == 6
+    send_count, send_time = registry.get_histogram(
+        "rpc_phase_duration_seconds", _METHOD_LABELS + (("phase", "send"),)
+    )
+    assert send_count == 1
+    assert send_time >= 0.03
+
+
+def test___driver_calls___intercept___records_driver_metrics(
+    registry: MetricsRegistry, servicer_context: Mock
+) -> None:
+    def behavior(request: bytes, context: grpc.ServicerContext) -> None:
+        add_driver_call_time("nidcpower", "initiate", 0.25)
+        add_driver_call_time("nidcpower", "initiate", 0.5)
+
+    handler = _intercept(registry, behavior)
+
+    handler.unary_unary(b"", servicer_context)
+    _complete_call(servicer_context)
+
+    labels = _METHOD_LABELS + (("driver", "nidcpower"), ("operation", "initiate"))
+    assert registry.get_counter("driver_calls_total", labels) == 2
+    assert registry.get_counter("driver_call_seconds_total", labels) == 0.75
+    assert registry.get_histogram(
+        "rpc_phase_duration_seconds", _METHOD_LABELS + (("phase", "driver"),)
+    ) == (1, 0.75)
+
+
+def test___aborted_call___intercept___records_status_code(
+    registry: MetricsRegistry, servicer_context: Mock
+) -> None:
+    servicer_context.code.return_value = grpc.StatusCode.RESOURCE_EXHAUSTED
+    handler = _intercept(registry, lambda request, context: None)
+
+    handler.unary_unary(b"", servicer_context)
+    _complete_call(servicer_context)
+
+    labels = _METHOD_LABELS + (("code", "RESOURCE_EXHAUSTED"),)
+    assert registry.get_counter("rpc_calls_total", labels) == 1
+
+
+def test___unary_call_raises___intercept___records_unknown_status_code(
+    registry: MetricsRegistry, servicer_context: Mock
+) -> None:
+    def behavior(request: bytes, context: grpc.ServicerContext) -> None:
+        raise RuntimeError("measurement failed")
+
+    handler = _intercept(registry, behavior)
+
+    with pytest.raises(RuntimeError):
+        handler.unary_unary(b"", servicer_context)
+    _complete_call(servicer_context)
+
+    assert registry.get_counter("rpc_calls_total", _METHOD_LABELS + (("code", "UNKNOWN"),)) == 1
+    assert registry.get_counter("rpc_calls_total", _METHOD_LABELS + (("code", "OK"),)) == 0
+
+
+def test___streaming_call_raises___intercept___records_unknown_status_code(
+    registry: MetricsRegistry, servicer_context: Mock
+) -> None:
+    def behavior(request: bytes, context: grpc.ServicerContext):
+        yield b"x"
+        raise RuntimeError("measurement failed")
+
+    handler = _intercept(registry, behavior, streaming=True)
+
+    with pytest.raises(RuntimeError):
+        for response in handler.unary_stream(b"", servicer_context):
+            handler.response_serializer(response)
+    _complete_call(servicer_context)
+
+    assert registry.get_counter("rpc_calls_total", _METHOD_LABELS + (("code", "UNKNOWN"),)) == 1
+
+
+def test___call_in_progress___render___reports_busy_worker(
+    registry: MetricsRegistry, servicer_context: Mock
+) -> None:
+    busy_workers_during_call = []
+
+    def behavior(request: bytes, context: grpc.ServicerContext) -> None:
+        busy_workers_during_call.append(_get_sample(registry, "worker_pool_busy_threads"))
+
+    handler = _intercept(registry, behavior)
+
+    handler.unary_unary(b"", servicer_context)
+
+    assert busy_workers_during_call == ["1"]
+    assert _get_sample(registry, "worker_pool_busy_threads") == "0"
+    assert _get_sample(registry, "worker_pool_size") == "4"
+
+
+def _intercept(registry: MetricsRegistry, behavior: Any, streaming: bool = False) -> Any:
+    create_handler = (
+        grpc.unary_stream_rpc_method_handler if streaming else grpc.unary_unary_rpc_method_handler
+    )
+    handler = create_handler(
+        behavior, request_deserializer=lambda data: data, response_serializer=lambda data: data
+    )
+    handler_call_details = Mock(spec=grpc.HandlerCallDetails)
+    handler_call_details.method = _METHOD
+    interceptor = MetricsInterceptor(registry, max_workers=4)
+    return interceptor.intercept_service(lambda _: handler, handler_call_details)
+
+
+def _complete_call(servicer_context: Mock) -> None:
+    for call in servicer_context.add_callback.call_args_list:
+        call.args[0]()
+
+
+def _get_sample(registry: MetricsRegistry, name: str) -> str:
+    for line in registry.render().splitlines():
+        if line.startswith(f"measurement_plugin_{name} "):
+            return line.split(" ")[1]
+    raise AssertionError(f"Metric {name} not found.")
+
+
+@pytest.fixture
+def registry() -> MetricsRegistry:
+    """Create a metrics registry."""
+    return MetricsRegistry()
+
+
+@pytest.fixture
+def servicer_context(mocker: MockerFixture) -> Mock:
+    """Create a mock gRPC servicer context."""
+    context = mocker.create_autospec(grpc.ServicerContext)
+    context.code = Mock(return_value=None)
+    return context
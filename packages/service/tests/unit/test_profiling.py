@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import pstats
+import threading
+import time
+from collections.abc import Generator
+from pathlib import Path
+from unittest.mock import Mock
+
+import grpc
+import pytest
+from google.protobuf import wrappers_pb2
+from pytest_mock import MockerFixture
+
+from ni_measurement_plugin_sdk_service._grpc_metadata import CONTROL_TOKEN_KEY
+from ni_measurement_plugin_sdk_service._internal.control_token import ControlToken
+from ni_measurement_plugin_sdk_service._internal.profiling import (
+    MeasurementProfiler,
+    ProfilingOptions,
+    ProfilingServicer,
+    _SamplingRecorder,
+)
+from tests.utilities.fake_rpc_error import FakeRpcError
+
+_SERVICE_CLASS = "ni.tests.LoopbackMeasurement_Python"
+
+
+def test___profiling_disabled___call_measure_function___no_profile_written(
+    tmp_path: Path,
+) -> None:
+    profiler = MeasurementProfiler(_SERVICE_CLASS, ProfilingOptions(directory=str(tmp_path)))
+
+    result = profiler.wrap(_measure)(1.0, 2.0)
+
+    assert result == 3.0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test___profile_next_calls___call_measure_function___cprofile_profile_written(
+    tmp_path: Path,
+) -> None:
+    profiler = MeasurementProfiler(_SERVICE_CLASS, ProfilingOptions(directory=str(tmp_path)))
+    measure = profiler.wrap(_measure)
+
+    profiler.profile_next_calls(1)
+    measure(1.0, 2.0)
+    measure(1.0, 2.0)
+
+    profiles = list(tmp_path.iterdir())
+    assert len(profiles) == 1
+    assert profiles[0].name.startswith(f"{_SERVICE_CLASS}-")
+    assert profiles[0].suffix == ".prof"
+    stats = pstats.Stats(str(profiles[0]))
+    assert "_measure" in stats.get_stats_profile().func_profiles
+
+
+def test___sample_rate_and_sampling_profiler___call_streaming_measure_function___stacks_written(
+    tmp_path: Path,
+) -> None:
+    profiler = MeasurementProfiler(
+        _SERVICE_CLASS,
+        ProfilingOptions(sample_rate=1.0, profiler="sampling", directory=str(tmp_path)),
+    )
+
+    outputs = list(profiler.wrap(_streaming_measure)(3, 0.02))
+
+    assert outputs == [0, 1, 2]
+    profiles = list(tmp_path.iterdir())
+    assert len(profiles) == 1
+    assert profiles[0].suffix == ".txt"
+    assert "_streaming_measure (test_profiling.py:" in profiles[0].read_text()
+
+
+def test___samples_added_concurrently___write___samples_snapshot_written(
+    tmp_path: Path,
+) -> None:
+    recorder = _SamplingRecorder()
+    stop = threading.Event()
+
+    def add_samples() -> None:
+        stack_number = 0
+        while not stop.is_set():
+            recorder.add_sample((f"stack{stack_number % 1000}",))
+            stack_number += 1
+
+    thread = threading.Thread(target=add_samples)
+    thread.start()
+    try:
+        for _ in range(20):
+            recorder.write(str(tmp_path / "samples.txt"))
+    finally:
+        stop.set()
+        thread.join()
+
+    lines = (tmp_path / "samples.txt").read_text().splitlines()
+    assert 0 < len(lines) <= 1000
+    assert all(line.startswith("stack") for line in lines)
+
+
+def test___slow_call_threshold___call_fast_and_slow_measure_functions___slow_profile_written(
+    tmp_path: Path,
+) -> None:
+    profiler = MeasurementProfiler(
+        _SERVICE_CLASS,
+        ProfilingOptions(slow_call_threshold=0.05, profiler="sampling", directory=str(tmp_path)),
+    )
+    measure = profiler.wrap(_streaming_measure)
+
+    list(measure(1, 0.0))
+    list(measure(2, 0.05))
+
+    profiles = list(tmp_path.iterdir())
+    assert len(profiles) == 1
+
+
+def test___measure_function_raises___call_measure_function___profile_written_and_error_raised(
+    tmp_path: Path,
+) -> None:
+    profiler = MeasurementProfiler(
+        _SERVICE_CLASS, ProfilingOptions(sample_rate=1.0, directory=str(tmp_path))
+    )
+
+    with pytest.raises(ZeroDivisionError):
+        profiler.wrap(_measure)(1.0, None)
+
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test___unsupported_profiler___create_profiler___raises_value_error() -> None:
+    with pytest.raises(ValueError):
+        MeasurementProfiler(_SERVICE_CLASS, ProfilingOptions(profiler="yappi"))
+
+
+def test___service_config_with_profiling___update_from_service_config___options_updated() -> None:
+    service = {"profiling": {"sampleRate": 0.5, "profiler": "sampling"}}
+
+    options = ProfilingOptions(slow_call_threshold=2.0).update_from_service_config(service)
+
+    assert options == ProfilingOptions(
+        sample_rate=0.5, slow_call_threshold=2.0, profiler="sampling"
+    )
+
+
+def test___local_peer_with_token___profile_next_calls___returns_profile_directory(
+    servicer_context: Mock, control_token: ControlToken, tmp_path: Path
+) -> None:
+    profiler = MeasurementProfiler(_SERVICE_CLASS, ProfilingOptions(directory=str(tmp_path)))
+    servicer = ProfilingServicer(profiler, control_token)
+    servicer_context.peer.return_value = "ipv4:127.0.0.1:50000"
+    servicer_context.invocation_metadata.return_value = ((CONTROL_TOKEN_KEY, control_token._value),)
+
+    response = servicer.ProfileNextCalls(wrappers_pb2.UInt32Value(value=2), servicer_context)
+    profiler.wrap(_measure)(1.0, 2.0)
+
+    assert response.value == str(tmp_path)
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test___remote_peer___profile_next_calls___aborts_with_permission_denied(
+    servicer_context: Mock, control_token: ControlToken
+) -> None:
+    servicer = ProfilingServicer(MeasurementProfiler(_SERVICE_CLASS), control_token)
+    servicer_context.peer.return_value = "ipv4:10.1.2.3:50000"
+    servicer_context.invocation_metadata.return_value = ((CONTROL_TOKEN_KEY, control_token._value),)
+    servicer_context.abort.side_effect = FakeRpcError(grpc.StatusCode.PERMISSION_DENIED, "")
+
+    with pytest.raises(FakeRpcError):
+        servicer.ProfileNextCalls(wrappers_pb2.UInt32Value(value=1), servicer_context)
+
+    assert servicer_context.abort.call_args.args[0] == grpc.StatusCode.PERMISSION_DENIED
+
+
+def test___local_peer_without_token___profile_next_calls___aborts_with_permission_denied(
+    servicer_context: Mock, control_token: ControlToken
+) -> None:
+    servicer = ProfilingServicer(MeasurementProfiler(_SERVICE_CLASS), control_token)
+    servicer_context.peer.return_value = "ipv4:127.0.0.1:50000"
+    servicer_context.invocation_metadata.return_value = ()
+    servicer_context.abort.side_effect = FakeRpcError(grpc.StatusCode.PERMISSION_DENIED, "")
+
+    with pytest.raises(FakeRpcError):
+        servicer.ProfileNextCalls(wrappers_pb2.UInt32Value(value=1), servicer_context)
+
+    assert servicer_context.abort.call_args.args[0] == grpc.StatusCode.PERMISSION_DENIED
+
+
+@pytest.fixture
+def control_token() -> Generator[ControlToken]:
+    """Create a control token."""
+    control_token = ControlToken()
+    yield control_token
+    control_token.close()
+
+
+@pytest.fixture
+def servicer_context(mocker: MockerFixture) -> Mock:
+    """Create a mock grpc.ServicerContext."""
+    return mocker.create_autospec(grpc.ServicerContext)
+
+
+def _measure(a: float, b: float | None) -> float:
+    if b is None:
+        return a / 0
+    return a + b
+
+
+def _streaming_measure(count: int, delay: float) -> Generator[int]:
+    for i in range(count):
+        time.sleep(delay)
+        yield i
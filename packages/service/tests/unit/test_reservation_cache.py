@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import functools
+import time
+from typing import Any
+from unittest.mock import Mock
+
+from ni.measurementlink.sessionmanagement.v1.client import (
+    MultiSessionReservation,
+    PinMapContext,
+    SingleSessionReservation,
+)
+
+from ni_measurement_plugin_sdk_service._internal.reservation_cache import ReservationCache
+from tests.unit._reservation_utils import create_grpc_session_infos
+
+create_nifake_session_infos = functools.partial(create_grpc_session_infos, "nifake")
+
+
+def test___unreserved_reservation___reserve_sessions_again___reuses_held_reservation(
+    session_management_client: Mock,
+) -> None:
+    cache = ReservationCache()
+    context = PinMapContext(pin_map_id="MyPinMap", sites=[0, 1])
+    _set_reserve_side_effect(session_management_client, 2)
+    with cache.reserve_sessions(session_management_client, context, ["Pin1"]) as first:
+        pass
+
+    with cache.reserve_sessions(session_management_client, context, ["Pin1"]) as second:
+        assert isinstance(second, MultiSessionReservation)
+        assert [info.session_name for info in second.session_info] == ["MySession0", "MySession1"]
+        assert second._connection_cache is first._connection_cache
+
+    assert (cache.hits, cache.misses) == (1, 1)
+    session_management_client.reserve_sessions.assert_called_once()
+    session_management_client._unreserve_sessions.assert_not_called()
+    assert cache.held_reservation_count == 1
+
+
+def test___unreserved_reservation___reserve_different_sites_pins_or_type___calls_service(
+    session_management_client: Mock,
+) -> None:
+    cache = ReservationCache()
+    _set_reserve_side_effect(session_management_client, 1)
+    cache.reserve_session(
+        session_management_client, PinMapContext(pin_map_id="MyPinMap", sites=[0]), "Pin1"
+    ).unreserve()
+
+    cache.reserve_session(
+        session_management_client, PinMapContext(pin_map_id="MyPinMap", sites=[1]), "Pin1"
+    ).unreserve()
+    cache.reserve_session(
+        session_management_client, PinMapContext(pin_map_id="MyPinMap", sites=[0]), "Pin2"
+    ).unreserve()
+    cache.reserve_session(
+        session_management_client,
+        PinMapContext(pin_map_id="MyPinMap", sites=[0]),
+        "Pin1",
+        instrument_type_id="nifake",
+    ).unreserve()
+
+    assert (cache.hits, cache.misses) == (0, 4)
+    assert session_management_client.reserve_session.call_count == 4
+
+
+def test___reservation_in_use___reserve_session___calls_service(
+    session_management_client: Mock,
+) -> None:
+    cache = ReservationCache()
+    context = PinMapContext(pin_map_id="MyPinMap", sites=[0])
+    _set_reserve_side_effect(session_management_client, 1)
+    first = cache.reserve_session(session_management_client, context, "Pin1")
+
+    second = cache.reserve_session(session_management_client, context, "Pin1")
+    first.unreserve()
+    second.unreserve()
+
+    assert isinstance(second, SingleSessionReservation)
+    assert (cache.hits, cache.misses) == (0, 2)
+    # The first reservation is unreserved so that the second call can reserve the sessions.
+    session_management_client._unreserve_sessions.assert_called_once()
+    assert cache.held_reservation_count == 1
+
+
+def test___held_reservation___hold_time_elapses___reservation_unreserved(
+    session_management_client: Mock,
+) -> None:
+    cache = ReservationCache(hold_time=0.01)
+    context = PinMapContext(pin_map_id="MyPinMap", sites=[0])
+    _set_reserve_side_effect(session_management_client, 1)
+    cache.reserve_session(session_management_client, context, "Pin1").unreserve()
+
+    deadline = time.monotonic() + 5.0
+    while cache.held_reservation_count > 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert cache.held_reservation_count == 0
+    session_management_client._unreserve_sessions.assert_called_once()
+
+
+def test___held_reservation___clear_pin_map___reservation_unreserved(
+    session_management_client: Mock,
+) -> None:
+    cache = ReservationCache()
+    context = PinMapContext(pin_map_id="MyPinMap", sites=[0])
+    _set_reserve_side_effect(session_management_client, 1)
+    cache.reserve_session(session_management_client, context, "Pin1").unreserve()
+
+    cache.clear("OtherPinMap")
+    session_management_client._unreserve_sessions.assert_not_called()
+    cache.clear("MyPinMap")
+    session_management_client._unreserve_sessions.assert_called_once()
+    cache.reserve_session(session_management_client, context, "Pin1").unreserve()
+
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test___reservation_in_use___clear___reservation_unreserved_when_released(
+    session_management_client: Mock,
+) -> None:
+    cache = ReservationCache()
+    context = PinMapContext(pin_map_id="MyPinMap", sites=[0])
+    _set_reserve_side_effect(session_management_client, 1)
+    reservation = cache.reserve_session(session_management_client, context, "Pin1")
+
+    cache.clear()
+    session_management_client._unreserve_sessions.assert_not_called()
+    reservation.unreserve()
+    reservation.unreserve()
+
+    session_management_client._unreserve_sessions.assert_called_once()
+    assert cache.held_reservation_count == 0
+
+
+def test___full_cache___release_reservation___least_recently_used_unreserved(
+    session_management_client: Mock,
+) -> None:
+    cache = ReservationCache(max_entries=2)
+    context = PinMapContext(pin_map_id="MyPinMap", sites=[0])
+    _set_reserve_side_effect(session_management_client, 1)
+    for pin in ["Pin1", "Pin2", "Pin1", "Pin3", "Pin1", "Pin2"]:
+        cache.reserve_sessions(session_management_client, context, pin).unreserve()
+
+    assert (cache.hits, cache.misses) == (2, 4)
+    assert session_management_client._unreserve_sessions.call_count == 2
+
+
+def _set_reserve_side_effect(session_management_client: Mock, session_count: int) -> None:
+    def reserve(reservation_type: type, **kwargs: Any) -> Any:
+        return reservation_type(
+            session_management_client,
+            session_info=create_nifake_session_infos(session_count),
+            reserved_pin_or_relay_names=kwargs["pin_or_relay_names"],
+            reserved_sites=kwargs["context"].sites,
+        )
+
+    session_management_client.reserve_session.side_effect = functools.partial(
+        reserve, SingleSessionReservation
+    )
+    session_management_client.reserve_sessions.side_effect = functools.partial(
+        reserve, MultiSessionReservation
+    )
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Generator
+from unittest.mock import Mock
+
+import grpc
+import pytest
+from ni.measurementlink.sessionmanagement.v1.client import SingleSessionReservation
+
+from ni_measurement_plugin_sdk_service import _configuration
+from ni_measurement_plugin_sdk_service._internal import metrics
+from ni_measurement_plugin_sdk_service._internal.metrics import MetricsRegistry
+from ni_measurement_plugin_sdk_service._internal.reservation_telemetry import (
+    get_reservation_holders,
+    reserve_with_telemetry,
+)
+from tests.utilities.fake_rpc_error import FakeRpcError
+
+
+def test___reservation___reserve_with_telemetry___records_duration_and_phase(
+    call_metrics: metrics._CallMetrics, registry: MetricsRegistry
+) -> None:
+    reservation = Mock()
+
+    result = reserve_with_telemetry(
+        lambda: reservation, "reserve_session", "ServiceA", ["Pin1", "Pin2"], [0], 0.0
+    )
+
+    assert result._reservation is reservation
+    labels = (("pin_count", "2"), ("code", "OK"))
+    assert registry.get_histogram("reservation_duration_seconds", labels)[0] == 1
+    assert "reserve" in call_metrics.phase_durations
+    result.unreserve()
+
+
+def test___active_reservation___get_reservation_holders___returns_overlapping_holders() -> None:
+    reservation = reserve_with_telemetry(
+        lambda: Mock(), "reserve_session", "ServiceA", ["Pin1", "Pin2"], [0, 1], 0.0
+    )
+
+    try:
+        assert get_reservation_holders(["Pin2"], [1]) == ["ServiceA"]
+        assert get_reservation_holders(["Pin2"], None) == ["ServiceA"]
+        assert get_reservation_holders(["Pin3"], [1]) == []
+        assert get_reservation_holders(["Pin2"], [2]) == []
+    finally:
+        reservation.unreserve()
+
+
+def test___unreserved_reservation___get_reservation_holders___returns_no_holders(
+    registry: MetricsRegistry, call_metrics: metrics._CallMetrics
+) -> None:
+    wrapped_unreserve = Mock()
+    reservation = Mock(unreserve=wrapped_unreserve)
+    reservation = reserve_with_telemetry(
+        lambda: reservation, "reserve_sessions", "ServiceA", "Pin1", None, 0.0
+    )
+
+    reservation.unreserve()
+    reservation.unreserve()
+
+    assert get_reservation_holders(["Pin1"], None) == []
+    assert wrapped_unreserve.call_count == 2
+    assert registry.get_histogram("reservation_hold_seconds", (("pin_count", "1"),))[0] == 1
+
+
+def test___reservation___reserve_with_telemetry___wraps_reservation_without_modifying_it(
+    registry: MetricsRegistry, call_metrics: metrics._CallMetrics
+) -> None:
+    session_management_client = Mock()
+    wrapped = SingleSessionReservation(session_management_client, session_info=[])
+
+    with reserve_with_telemetry(
+        lambda: wrapped, "reserve_session", "ServiceA", "Pin1", None, 0.0
+    ) as reservation:
+        assert isinstance(reservation, SingleSessionReservation)
+        assert reservation is not wrapped
+        assert get_reservation_holders(["Pin1"], None) == ["ServiceA"]
+
+    assert "unreserve" not in vars(wrapped)
+    session_management_client._unreserve_sessions.assert_called_once_with([])
+    assert get_reservation_holders(["Pin1"], None) == []
+    assert registry.get_histogram("reservation_hold_seconds", (("pin_count", "1"),))[0] == 1
+
+
+def test___telemetry_disabled___reserve_with_telemetry___returns_reservation_without_metrics(
+    registry: MetricsRegistry, call_metrics: metrics._CallMetrics, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(_configuration, "RESERVATION_TELEMETRY_ENABLED", False)
+    reservation = Mock()
+
+    result = reserve_with_telemetry(
+        lambda: reservation, "reserve_session", "ServiceA", "Pin1", None, 0.0
+    )
+
+    assert result is reservation
+    assert get_reservation_holders(["Pin1"], None) == []
+    labels = (("pin_count", "1"), ("code", "OK"))
+    assert registry.get_histogram("reservation_duration_seconds", labels)[0] == 0
+    assert "reserve" not in call_metrics.phase_durations
+
+
+def test___contended_reservation_times_out___reserve_with_telemetry___records_failure(
+    call_metrics: metrics._CallMetrics,
+    registry: MetricsRegistry,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    holder = reserve_with_telemetry(lambda: Mock(), "reserve_session", "ServiceA", "Pin1", [0], 0.0)
+
+    def reserve() -> Mock:
+        raise FakeRpcError(grpc.StatusCode.DEADLINE_EXCEEDED, "Timed out.")
+
+    try:
+        with caplog.at_level(logging.WARNING), pytest.raises(FakeRpcError):
+            reserve_with_telemetry(reserve, "reserve_session", "ServiceB", "Pin1", [0], 1.0)
+    finally:
+        holder.unreserve()
+
+    labels = (("pin_count", "1"), ("code", "DEADLINE_EXCEEDED"), ("holder", "ServiceA"))
+    assert registry.get_counter("reservation_failures_total", labels) == 1
+    assert "Overlapping reservations in this process: ServiceA" in caplog.text
+    assert "reserve" in call_metrics.phase_durations
+
+
+@pytest.fixture(autouse=True)
+def reservation_telemetry_enabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Enable reservation telemetry."""
+    monkeypatch.setattr(_configuration, "RESERVATION_TELEMETRY_ENABLED", True)
+
+
+@pytest.fixture
+def registry() -> MetricsRegistry:
+    """Create a metrics registry."""
+    return MetricsRegistry()
+
+
+@pytest.fixture
+def call_metrics(registry: MetricsRegistry) -> Generator[metrics._CallMetrics]:
+    """Record reservations in the metrics of a fake RPC."""
+    call_metrics = metrics._CallMetrics(registry)
+    token = metrics._current_call_metrics.set(call_metrics)
+    yield call_metrics
+    metrics._current_call_metrics.reset(token)
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import socket
+from pathlib import Path
+from unittest.mock import Mock
+
+import grpc
+import pytest
+from ni.measurementlink.discovery.v1.client import (
+    DiscoveryClient,
+    ServiceInfo,
+    ServiceLocation,
+)
+from pytest_mock import MockerFixture
+
+from ni_measurement_plugin_sdk_service._annotations import SERVICE_UNIX_SOCKET_PATH_KEY
+from ni_measurement_plugin_sdk_service._internal.service_address import (
+    get_advertised_host,
+    get_preferred_address,
+    get_unix_socket_path,
+    resolve_service_address,
+)
+from tests.utilities.fake_rpc_error import FakeRpcError
+
+
+def test___service_class___get_unix_socket_path___returns_short_path_in_directory(
+    tmp_path: Path,
+) -> None:
+    unix_socket_path = get_unix_socket_path("a" * 256, str(tmp_path))
+
+    assert Path(unix_socket_path).parent == tmp_path
+    assert len(Path(unix_socket_path).name) < 64
+
+
+def test___different_service_classes___get_unix_socket_path___returns_different_paths() -> None:
+    assert get_unix_socket_path("Service1") != get_unix_socket_path("Service2")
+
+
+def test___local_service_with_unix_socket___get_preferred_address___returns_unix_socket(
+    tmp_path: Path,
+) -> None:
+    unix_socket_path = tmp_path / "service.sock"
+    unix_socket_path.touch()
+    service_info = _create_service_info({SERVICE_UNIX_SOCKET_PATH_KEY: str(unix_socket_path)})
+
+    address = get_preferred_address(ServiceLocation("localhost", "1234", ""), service_info)
+
+    assert address == f"unix:{unix_socket_path}"
+
+
+@pytest.mark.parametrize("location", ["localhost", "remotehost"])
+def test___unix_socket_not_usable___get_preferred_address___returns_insecure_address(
+    tmp_path: Path, location: str
+) -> None:
+    unix_socket_path = tmp_path / "service.sock"
+    if location != "localhost":
+        unix_socket_path.touch()
+    service_info = _create_service_info({SERVICE_UNIX_SOCKET_PATH_KEY: str(unix_socket_path)})
+
+    address = get_preferred_address(ServiceLocation(location, "1234", ""), service_info)
+
+    assert address == f"{location}:1234"
+
+
+def test___service_on_local_host_name_with_unix_socket___get_preferred_address___returns_unix_socket(
+    tmp_path: Path,
+) -> None:
+    unix_socket_path = tmp_path / "service.sock"
+    unix_socket_path.touch()
+    service_info = _create_service_info({SERVICE_UNIX_SOCKET_PATH_KEY: str(unix_socket_path)})
+    service_location = ServiceLocation(socket.gethostname(), "1234", "")
+
+    address = get_preferred_address(service_location, service_info)
+
+    assert address == f"unix:{unix_socket_path}"
+
+
+@pytest.mark.parametrize(
+    "bind_address,expected_host",
+    [
+        ("[::1]", "localhost"),
+        ("127.0.0.1", "localhost"),
+        ("localhost", "localhost"),
+        ("192.168.1.10", "192.168.1.10"),
+        ("[2001:db8::1]", "[2001:db8::1]"),
+        ("myhost.example.com", "myhost.example.com"),
+    ],
+)
+def test___bind_address___get_advertised_host___returns_host(
+    bind_address: str, expected_host: str
+) -> None:
+    assert get_advertised_host(bind_address) == expected_host
+
+
+@pytest.mark.parametrize("bind_address", ["[::]", "0.0.0.0"])
+def test___wildcard_bind_address___get_advertised_host___returns_fully_qualified_domain_name(
+    bind_address: str,
+) -> None:
+    assert get_advertised_host(bind_address) == socket.getfqdn()
+
+
+def test___service_without_unix_socket___get_preferred_address___returns_insecure_address() -> None:
+    address = get_preferred_address(
+        ServiceLocation("localhost", "1234", ""), _create_service_info()
+    )
+
+    assert address == "localhost:1234"
+
+
+def test___discovery_service_without_service_information___resolve_service_address___falls_back_to_resolve_service(
+    discovery_client: Mock,
+) -> None:
+    discovery_client.resolve_service_with_information.side_effect = FakeRpcError(
+        grpc.StatusCode.UNIMPLEMENTED, "Method not implemented"
+    )
+    discovery_client.resolve_service.return_value = ServiceLocation("localhost", "1234", "")
+
+    address = resolve_service_address(discovery_client, "my.Interface", "MyService")
+
+    assert address == "localhost:1234"
+    discovery_client.resolve_service.assert_called_once_with(
+        provided_interface="my.Interface", service_class="MyService", version=""
+    )
+
+
+def test___discovery_service_error___resolve_service_address___raises_error(
+    discovery_client: Mock,
+) -> None:
+    discovery_client.resolve_service_with_information.side_effect = FakeRpcError(
+        grpc.StatusCode.NOT_FOUND, "Service not found"
+    )
+
+    with pytest.raises(grpc.RpcError):
+        _ = resolve_service_address(discovery_client, "my.Interface", "MyService")
+
+    discovery_client.resolve_service.assert_not_called()
+
+
+@pytest.fixture
+def discovery_client(mocker: MockerFixture) -> Mock:
+    """Test fixture that creates a mock DiscoveryClient."""
+    return mocker.create_autospec(DiscoveryClient)
+
+
+def _create_service_info(annotations: dict[str, str] | None = None) -> ServiceInfo:
+    return ServiceInfo(
+        service_class="MyService",
+        description_url="",
+        provided_interfaces=["my.Interface"],
+        annotations=annotations or {},
+    )
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import functools
+import time
+from typing import Any
+from unittest.mock import Mock
+
+import pytest
+from ni.measurementlink.sessionmanagement.v1.client import (
+    INSTRUMENT_TYPE_NI_DAQMX,
+    MultiSessionReservation,
+)
+from ni.measurementlink.sessionmanagement.v1.session_management_service_pb2 import (
+    SessionInformation,
+)
+
+from ni_measurement_plugin_sdk_service._internal.session_pool import (
+    SessionPool,
+    get_initialization_options,
+)
+from ni_measurement_plugin_sdk_service.measurement import service
+from tests.unit._reservation_utils import construct_session, create_grpc_session_infos
+
+create_nifake_session_infos = functools.partial(create_grpc_session_infos, "nifake")
+
+
+def test___pooled_session___initialize_session_again___session_reused() -> None:
+    pool = SessionPool()
+
+    with _create_reservation(pool).initialize_session(construct_session, "nifake") as first:
+        pass
+    with _create_reservation(pool).initialize_session(construct_session, "nifake") as second:
+        pass
+
+    assert second.session is first.session
+    assert not first.session.is_closed
+    assert pool.idle_session_count == 1
+
+
+def test___pooled_sessions___initialize_sessions_again___sessions_reused() -> None:
+    pool = SessionPool()
+
+    with _create_reservation(pool, 2).initialize_sessions(construct_session, "nifake") as first:
+        pass
+    with _create_reservation(pool, 2).initialize_sessions(construct_session, "nifake") as second:
+        pass
+
+    assert [info.session for info in second] == [info.session for info in first]
+    assert pool.idle_session_count == 2
+
+
+def test___exception_raised___initialize_session___session_closed() -> None:
+    pool = SessionPool()
+
+    with pytest.raises(RuntimeError):
+        with _create_reservation(pool).initialize_session(construct_session, "nifake") as first:
+            raise RuntimeError("Measurement failed.")
+    with _create_reservation(pool).initialize_session(construct_session, "nifake") as second:
+        pass
+
+    assert first.session.is_closed
+    assert second.session is not first.session
+
+
+def test___unhealthy_session___initialize_session_again___new_session_initialized() -> None:
+    pool = SessionPool()
+    health_check = Mock(return_value=False)
+    pool.register_health_check("nifake", health_check)
+
+    with _create_reservation(pool).initialize_session(construct_session, "nifake") as first:
+        pass
+    with _create_reservation(pool).initialize_session(construct_session, "nifake") as second:
+        pass
+
+    health_check.assert_called_once_with(first.session)
+    assert first.session.is_closed
+    assert second.session is not first.session
+
+
+def test___pooled_session___reset___session_closed() -> None:
+    pool = SessionPool()
+    with _create_reservation(pool).initialize_session(construct_session, "nifake") as first:
+        pass
+
+    pool.reset()
+
+    assert first.session.is_closed
+    assert pool.idle_session_count == 0
+
+
+def test___session_in_use___reset___session_closed_after_use() -> None:
+    pool = SessionPool()
+
+    with _create_reservation(pool).initialize_session(construct_session, "nifake") as first:
+        pool.reset()
+        assert not first.session.is_closed
+
+    assert first.session.is_closed
+    assert pool.idle_session_count == 0
+
+
+def test___idle_timeout___session_idle___session_closed() -> None:
+    pool = SessionPool(idle_timeout=0.01)
+
+    with _create_reservation(pool).initialize_session(construct_session, "nifake") as first:
+        pass
+    deadline = time.monotonic() + 5.0
+    while not first.session.is_closed and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert first.session.is_closed
+    assert pool.idle_session_count == 0
+
+
+def test___different_options___initialize_session_again___new_session_initialized() -> None:
+    pool = SessionPool()
+
+    with _create_reservation(pool).initialize_session(
+        _SessionConstructor(reset=False), "nifake"
+    ) as first:
+        pass
+    with _create_reservation(pool).initialize_session(
+        _SessionConstructor(reset=True), "nifake"
+    ) as second:
+        pass
+    with _create_reservation(pool).initialize_session(
+        _SessionConstructor(reset=True), "nifake"
+    ) as third:
+        pass
+
+    assert first.session.is_closed
+    assert second.session is not first.session
+    assert third.session is second.session
+    assert pool.idle_session_count == 1
+
+
+def test___session_constructors___get_initialization_options___ignores_grpc_channel() -> None:
+    first = _SessionConstructor(reset=True, options={"simulate": True})
+    second = _SessionConstructor(reset=True, options={"simulate": True})
+    second._grpc_channel = Mock()
+
+    assert get_initialization_options(first) == get_initialization_options(second)
+    assert get_initialization_options(first) != get_initialization_options(
+        _SessionConstructor(reset=True, options={"simulate": False})
+    )
+
+
+def test___daqmx_task___initialize_session___task_not_pooled() -> None:
+    pool = SessionPool()
+    reservation = _create_reservation(
+        pool, session_infos=create_grpc_session_infos(INSTRUMENT_TYPE_NI_DAQMX, 1)
+    )
+
+    with reservation.initialize_session(construct_session, INSTRUMENT_TYPE_NI_DAQMX) as first:
+        pass
+
+    assert first.session.is_closed
+    assert pool.idle_session_count == 0
+
+
+class _SessionConstructor:
+    def __init__(self, reset: bool, options: dict[str, Any] | None = None) -> None:
+        self._grpc_channel: Any = None
+        self._reset = reset
+        self._options = options or {}
+
+    def __call__(self, session_info: Any) -> Any:
+        return construct_session(session_info)
+
+
+def _create_reservation(
+    pool: SessionPool,
+    session_count: int = 1,
+    session_infos: list[SessionInformation] | None = None,
+) -> MultiSessionReservation:
+    reservation = MultiSessionReservation(
+        Mock(), session_infos or create_nifake_session_infos(session_count)
+    )
+    service._wrap_session_initialization(reservation, pool)
+    return reservation
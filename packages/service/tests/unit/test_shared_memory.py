@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import time
+from multiprocessing.shared_memory import SharedMemory
+from unittest.mock import Mock
+
+import grpc
+import pytest
+from google.protobuf import any_pb2, struct_pb2
+from pytest_mock import MockerFixture
+
+from ni_measurement_plugin_sdk_service._internal.grpc_servicer import (
+    _accepts_shared_memory,
+)
+from ni_measurement_plugin_sdk_service._internal.shared_memory import (
+    SharedMemoryWriter,
+    is_local_peer,
+    read_shared_memory_outputs,
+)
+
+_TYPE_URL = "type.googleapis.com/MyService.Outputs"
+
+
+@pytest.mark.parametrize(
+    "peer,expected_result",
+    [
+        ("ipv4:127.0.0.1:1234", True),
+        ("ipv6:[::1]:1234", True),
+        ("ipv6:%5B::1%5D:1234", True),
+        ("unix:/tmp/service.sock", True),
+        ("ipv4:192.168.1.10:1234", False),
+        ("ipv6:[2001:db8::1]:1234", False),
+        ("", False),
+    ],
+)
+def test___peer___is_local_peer___returns_result(peer: str, expected_result: bool) -> None:
+    assert is_local_peer(peer) == expected_result
+
+
+def test___small_outputs___write___returns_outputs() -> None:
+    writer = SharedMemoryWriter(threshold=1024)
+
+    result = writer.write(b"small", _TYPE_URL)
+
+    assert result == any_pb2.Any(type_url=_TYPE_URL, value=b"small")
+
+
+def test___large_outputs___write_and_read___outputs_round_trip() -> None:
+    writer = SharedMemoryWriter(threshold=1024)
+    outputs = any_pb2.Any(type_url=_TYPE_URL, value=bytes(range(256)) * 16)
+
+    reference = writer.write(outputs.value, outputs.type_url)
+    result = read_shared_memory_outputs(reference)
+    writer.close()
+
+    assert reference.Is(struct_pb2.Struct.DESCRIPTOR)
+    assert len(reference.value) < len(outputs.value)
+    assert result == outputs
+
+
+def test___outputs_read___read_again___raises_file_not_found_error() -> None:
+    writer = SharedMemoryWriter(threshold=1)
+    reference = writer.write(b"data", _TYPE_URL)
+    _ = read_shared_memory_outputs(reference)
+
+    with pytest.raises(FileNotFoundError):
+        _ = read_shared_memory_outputs(reference)
+
+    writer.close()
+
+
+def test___outputs_not_read___close___segment_released() -> None:
+    writer = SharedMemoryWriter(threshold=1)
+    reference = writer.write(b"data", _TYPE_URL)
+    name = _get_shared_memory_name(reference)
+
+    writer.close()
+
+    with pytest.raises(FileNotFoundError):
+        _ = SharedMemory(name=name)
+
+
+def test___outputs_not_read_within_lifetime___write___expired_segment_released() -> None:
+    writer = SharedMemoryWriter(threshold=1, lifetime=10.0)
+    reference = writer.write(b"data", _TYPE_URL)
+    name = _get_shared_memory_name(reference)
+    writer._lifetime = 0.0
+
+    _ = writer.write(b"", _TYPE_URL)
+
+    with pytest.raises(FileNotFoundError):
+        _ = SharedMemory(name=name)
+    writer.close()
+
+
+def test___outputs_not_read_within_lifetime___idle___expired_segment_released() -> None:
+    writer = SharedMemoryWriter(threshold=1, lifetime=0.01)
+    reference = writer.write(b"data", _TYPE_URL)
+    name = _get_shared_memory_name(reference)
+
+    # The timer removes the segment from the writer before unlinking it, so wait for both.
+    deadline = time.monotonic() + 5.0
+    while (writer._segments or _shared_memory_exists(name)) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert not writer._segments
+    with pytest.raises(FileNotFoundError):
+        _ = SharedMemory(name=name)
+    writer.close()
+
+
+def test___outputs_read___write___read_segment_released() -> None:
+    writer = SharedMemoryWriter(threshold=1)
+    reference = writer.write(b"data", _TYPE_URL)
+    _ = read_shared_memory_outputs(reference)
+
+    _ = writer.write(b"", _TYPE_URL)
+
+    assert not writer._segments
+    writer.close()
+
+
+@pytest.mark.parametrize("name", ["psm_12345678", "nimp_../../etc", ""])
+def test___unexpected_segment_name___read_shared_memory_outputs___raises_value_error(
+    name: str,
+) -> None:
+    reference = struct_pb2.Struct()
+    reference.update({"shared_memory_name": name, "size": 4, "type_url": _TYPE_URL})
+    outputs = any_pb2.Any()
+    outputs.Pack(reference)
+
+    with pytest.raises(ValueError) as exc_info:
+        _ = read_shared_memory_outputs(outputs)
+
+    assert "Invalid shared memory segment name" in exc_info.value.args[0]
+
+
+def test___outputs_not_in_shared_memory___read_shared_memory_outputs___returns_outputs() -> None:
+    outputs = any_pb2.Any(type_url=_TYPE_URL, value=b"data")
+
+    assert read_shared_memory_outputs(outputs) is outputs
+
+
+@pytest.mark.parametrize(
+    "metadata,peer,expected_result",
+    [
+        ((("ni-accept-shared-memory", "1"),), "ipv6:[::1]:1234", True),
+        ((("ni-accept-shared-memory", "1"),), "ipv4:192.168.1.10:1234", False),
+        ((), "ipv6:[::1]:1234", False),
+    ],
+)
+def test___invocation_metadata_and_peer___accepts_shared_memory___returns_result(
+    grpc_servicer_context: Mock,
+    metadata: tuple[tuple[str, str], ...],
+    peer: str,
+    expected_result: bool,
+) -> None:
+    grpc_servicer_context.invocation_metadata.return_value = metadata
+    grpc_servicer_context.peer.return_value = peer
+
+    assert _accepts_shared_memory(grpc_servicer_context) == expected_result
+
+
+@pytest.fixture
+def grpc_servicer_context(mocker: MockerFixture) -> Mock:
+    """Test fixture that creates a mock grpc.ServicerContext."""
+    return mocker.create_autospec(grpc.ServicerContext)
+
+
+def _get_shared_memory_name(reference: any_pb2.Any) -> str:
+    struct = struct_pb2.Struct()
+    reference.Unpack(struct)
+    return struct.fields["shared_memory_name"].string_value
+
+
+def _shared_memory_exists(name: str) -> bool:
+    try:
+        shared_memory = SharedMemory(name=name)
+    except FileNotFoundError:
+        return False
+    shared_memory.close()
+    return True
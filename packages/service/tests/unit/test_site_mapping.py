@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import contextvars
+import threading
+from concurrent.futures import CancelledError
+from typing import Callable
+
+import pytest
+
+from ni_measurement_plugin_sdk_service._internal.site_mapping import map_sites
+
+_test_context_var: contextvars.ContextVar[str] = contextvars.ContextVar("test_context_var")
+
+
+def test___multiple_sites___map_sites___sites_run_at_same_time() -> None:
+    barrier = threading.Barrier(4, timeout=5.0)
+
+    def measure_site(site: int) -> int:
+        barrier.wait()
+        return site * 10
+
+    results = map_sites(measure_site, [3, 0, 2, 1])
+
+    assert results == [30, 0, 20, 10]
+
+
+def test___context_var_set___map_sites___sites_see_context_var() -> None:
+    token = _test_context_var.set("MyValue")
+    try:
+        results = map_sites(lambda site: f"{_test_context_var.get()}{site}", [0, 1])
+    finally:
+        _test_context_var.reset(token)
+
+    assert results == ["MyValue0", "MyValue1"]
+
+
+def test___sites_fail___map_sites___exception_of_first_failed_site_raised() -> None:
+    def measure_site(site: int) -> int:
+        if site > 0:
+            raise RuntimeError(f"Site {site} failed.")
+        return site
+
+    with pytest.raises(RuntimeError) as exc_info:
+        map_sites(measure_site, [0, 2, 1])
+
+    assert exc_info.value.args[0] == "Site 2 failed."
+
+
+def test___rpc_canceled___map_sites___pending_sites_canceled() -> None:
+    cancel_callbacks: list[Callable[[], None]] = []
+
+    def measure_site(site: int) -> int:
+        for cancel_callback in cancel_callbacks:
+            cancel_callback()
+        return site
+
+    with pytest.raises(CancelledError):
+        map_sites(
+            measure_site, [0, 1, 2], max_workers=1, add_cancel_callback=cancel_callbacks.append
+        )
+
+
+def test___no_sites___map_sites___empty_list_returned() -> None:
+    assert map_sites(lambda site: site, []) == []
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from ni_measurement_plugin_sdk_service._internal.health import (
+    LoadReport,
+    ServingStatus,
+)
+from ni_measurement_plugin_sdk_service._internal.supervisor import (
+    ReplicaSupervisor,
+    WorkerHealth,
+    _summarize_health,
+)
+
+_WAIT_FOR_STDIN = [sys.executable, "-c", "import sys; sys.stdin.read()"]
+_EXIT_IMMEDIATELY = [sys.executable, "-c", "import sys; sys.exit(3)"]
+
+
+def test___supervisor___start___starts_workers() -> None:
+    with ReplicaSupervisor(_WAIT_FOR_STDIN, 3, shutdown_timeout=5.0) as supervisor:
+        health = supervisor.get_health()
+
+    assert [worker.replica_index for worker in health] == [0, 1, 2]
+    assert all(worker.pid is not None for worker in health)
+    assert len({worker.pid for worker in health}) == 3
+
+
+def test___supervisor_with_port___start___workers_use_consecutive_ports(tmp_path: Path) -> None:
+    command = [
+        sys.executable,
+        "-c",
+        "import os, sys; "
+        "open(os.path.join(sys.argv[1], str(os.getpid())), 'w')"
+        ".write(os.environ['MEASUREMENT_PLUGIN_SERVICE_BIND_PORT']); "
+        "sys.stdin.read()",
+        str(tmp_path),
+    ]
+
+    with ReplicaSupervisor(command, 2, port=50100, shutdown_timeout=5.0) as supervisor:
+        pids = [worker.pid for worker in supervisor.get_health()]
+        _wait_until(lambda: len(list(tmp_path.iterdir())) == 2)
+
+    assert [(tmp_path / str(pid)).read_text() for pid in pids] == ["50100", "50101"]
+
+
+def test___supervisor_without_port___start___workers_report_bound_port() -> None:
+    command = [
+        sys.executable,
+        "-c",
+        "import os, sys; "
+        "assert os.environ['MEASUREMENT_PLUGIN_SERVICE_BIND_PORT'] == '0'; "
+        "open(os.environ['MEASUREMENT_PLUGIN_SERVICE_PORT_FILE'], 'w').write('50200'); "
+        "sys.stdin.read()",
+    ]
+
+    with ReplicaSupervisor(command, 1, shutdown_timeout=5.0) as supervisor:
+        worker = supervisor._workers[0]
+        _wait_until(lambda: bool(supervisor._get_health_check_target(worker)))
+
+        assert worker.port == 50200
+        assert supervisor._get_health_check_target(worker).endswith(":50200")
+
+
+def test___per_process_options_set___start___workers_do_not_inherit_them(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("MEASUREMENT_PLUGIN_SERVICE_HANDOVER", "1")
+    monkeypatch.setenv("MEASUREMENT_PLUGIN_METRICS_PORT", "9464")
+    monkeypatch.setenv("MEASUREMENT_PLUGIN_SERVICE_PORT_FILE", str(tmp_path / "port.txt"))
+    monkeypatch.setenv("MEASUREMENT_PLUGIN_SERVICE_DRAIN_TIMEOUT", "5.0")
+    command = [
+        sys.executable,
+        "-c",
+        "import os, sys; "
+        "open(os.path.join(sys.argv[1], 'env.txt'), 'w').write(' '.join("
+        "os.environ[f'MEASUREMENT_PLUGIN_{name}'] for name in "
+        "['SERVICE_HANDOVER', 'METRICS_PORT', 'SERVICE_PORT_FILE', 'SERVICE_DRAIN_TIMEOUT'])); "
+        "sys.stdin.read()",
+        str(tmp_path),
+    ]
+
+    with ReplicaSupervisor(command, 1, port=50300, shutdown_timeout=5.0):
+        _wait_until(lambda: (tmp_path / "env.txt").exists())
+
+    assert (tmp_path / "env.txt").read_text() == "0 0  5.0"
+
+
+def test___worker_exits___poll___restarts_worker() -> None:
+    with ReplicaSupervisor(
+        _EXIT_IMMEDIATELY, 1, restart_delay=0.0, shutdown_timeout=5.0
+    ) as supervisor:
+        first_pid = supervisor.get_health()[0].pid
+
+        def restarted() -> bool:
+            supervisor.poll()
+            return supervisor.get_health()[0].restart_count > 0
+
+        _wait_until(restarted)
+        health = supervisor.get_health()[0]
+
+    assert health.pid is not None
+    assert health.pid != first_pid
+
+
+def test___supervisor_started___stop___workers_exit() -> None:
+    supervisor = ReplicaSupervisor(_WAIT_FOR_STDIN, 2, shutdown_timeout=5.0)
+    supervisor.start()
+    processes = [worker.process for worker in supervisor._workers]
+
+    supervisor.stop()
+
+    assert all(process is not None and process.poll() == 0 for process in processes)
+    assert all(worker.pid is None for worker in supervisor.get_health())
+
+
+def test___worker_not_listening___get_health___returns_unknown_status() -> None:
+    with ReplicaSupervisor(_WAIT_FOR_STDIN, 1, port=50300, shutdown_timeout=5.0) as supervisor:
+        health = supervisor.get_health()[0]
+
+    assert health.status == ServingStatus.UNKNOWN
+    assert health.load_report is None
+
+
+def test___worker_port_not_reported___get_health___returns_not_serving_status() -> None:
+    with ReplicaSupervisor(_WAIT_FOR_STDIN, 1, shutdown_timeout=5.0) as supervisor:
+        health = supervisor.get_health()[0]
+
+    assert health.status == ServingStatus.NOT_SERVING
+    assert health.pid is not None
+
+
+def test___worker_health___summarize_health___totals_load() -> None:
+    health = [
+        WorkerHealth(0, 100, 0, ServingStatus.SERVING, LoadReport(2, 1, 0.1)),
+        WorkerHealth(1, 101, 1, ServingStatus.SERVING, LoadReport(3, 0, 0.2)),
+        WorkerHealth(2, None, 2, ServingStatus.NOT_SERVING, None),
+    ]
+
+    summary = _summarize_health(health)
+
+    assert summary == (
+        "2 of 3 measurement service replicas serving, 5 calls in flight, 1 calls queued."
+    )
+
+
+@pytest.mark.parametrize("worker_count, port, reuse_port", [(0, 0, False), (2, 0, True)])
+def test___invalid_arguments___create_supervisor___raises_value_error(
+    worker_count: int, port: int, reuse_port: bool
+) -> None:
+    with pytest.raises(ValueError):
+        ReplicaSupervisor(_WAIT_FOR_STDIN, worker_count, port, reuse_port)
+
+
+def _wait_until(condition: Callable[[], bool], timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out waiting for condition."
+        time.sleep(0.05)
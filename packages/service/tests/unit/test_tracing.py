@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Generator
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from ni_measurement_plugin_sdk_service._internal import tracing
+from ni_measurement_plugin_sdk_service._internal.tracing import (
+    configure_tracing,
+    get_traceparent,
+    start_span,
+)
+from ni_measurement_plugin_sdk_service.measurement.client_support import (
+    create_call_metadata,
+)
+
+_TRACEPARENT = "00-0123456789abcdef0123456789abcdef-0123456789abcdef-01"
+
+
+def test___tracing_disabled___start_span___span_not_recorded() -> None:
+    configure_tracing("")
+
+    with start_span("Measure") as span:
+        pass
+
+    assert not span.is_recording
+    assert span.traceparent == ""
+
+
+def test___nested_spans___end_spans___spans_written_with_parent(trace_file: Path) -> None:
+    with start_span("Measure", kind="server") as parent:
+        with start_span("decode"):
+            pass
+
+    spans = _read_jsonl(trace_file)
+    assert [span["name"] for span in spans] == ["decode", "Measure"]
+    assert spans[0]["trace_id"] == parent.trace_id
+    assert spans[0]["parent_span_id"] == parent.span_id
+    assert spans[1]["parent_span_id"] == ""
+    assert spans[1]["attributes"] == {"kind": "server"}
+    assert spans[1]["duration_nano"] >= spans[0]["duration_nano"]
+
+
+def test___remote_traceparent___start_span___span_continues_remote_trace(
+    trace_file: Path,
+) -> None:
+    with start_span("Measure", _TRACEPARENT) as span:
+        pass
+
+    assert span.trace_id == "0123456789abcdef0123456789abcdef"
+    assert span.parent_span_id == "0123456789abcdef"
+    assert span.traceparent == f"00-{span.trace_id}-{span.span_id}-01"
+
+
+def test___invalid_traceparent___start_span___span_starts_new_trace(trace_file: Path) -> None:
+    with start_span("Measure", "invalid") as span:
+        pass
+
+    assert len(span.trace_id) == 32
+    assert span.parent_span_id == ""
+
+
+def test___exception_in_span___end_span___error_attribute_written(trace_file: Path) -> None:
+    with pytest.raises(ValueError):
+        with start_span("measure"):
+            raise ValueError("Invalid input")
+
+    spans = _read_jsonl(trace_file)
+    assert spans[0]["attributes"] == {"error": "ValueError: Invalid input"}
+
+
+def test___chrome_format___end_spans___complete_events_written(tmp_path: Path) -> None:
+    trace_file = tmp_path / "trace.json"
+    configure_tracing(str(trace_file), "chrome")
+    try:
+        with start_span("Measure"):
+            pass
+        with start_span("Measure"):
+            pass
+    finally:
+        configure_tracing("")
+
+    # Close the unterminated array to parse the file.
+    events = json.loads(trace_file.read_text().rstrip().rstrip(",") + "]")
+    assert [event["ph"] for event in events] == ["X", "X"]
+    assert events[0]["args"]["trace_id"] != events[1]["args"]["trace_id"]
+
+
+def test___unsupported_format___configure_tracing___raises_value_error(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        configure_tracing(str(tmp_path / "trace.txt"), "xml")
+
+
+def test___traceparent_metadata___get_traceparent___returns_traceparent() -> None:
+    metadata = [("ni-measurement-priority", "NORMAL"), ("traceparent", _TRACEPARENT)]
+
+    assert get_traceparent(metadata) == _TRACEPARENT
+    assert get_traceparent(None) == ""
+
+
+def test___client_span___create_call_metadata___returns_traceparent_metadata(
+    trace_file: Path,
+) -> None:
+    span = start_span("Measure", kind="client")
+
+    metadata = create_call_metadata(traceparent=span.traceparent)
+
+    assert metadata == (("traceparent", span.traceparent),)
+
+
+@pytest.fixture
+def trace_file(tmp_path: Path) -> Generator[Path]:
+    """Enable tracing to a JSONL file in a temporary directory."""
+    trace_file = tmp_path / "trace.jsonl"
+    configure_tracing(str(trace_file))
+    yield trace_file
+    configure_tracing("")
+    assert tracing._trace_writer is None
+
+
+def _read_jsonl(path: Path) -> list[dict[str, Any]]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
@@ -9,6 +9,12 @@ class FakeRegistrationResponse:
     registration_id: str
 
 
+class FakeEnumerateServicesResponse:
+    """Fake Enumerate Services Response."""
+
+    available_services: list = []
+
+
 class FakeDiscoveryServiceStub:
     """Fake Registry Service Stub."""
 
@@ -24,6 +30,10 @@ class FakeDiscoveryServiceStub:
         """Fake gRPC un-registration call to discovery service."""
         pass
 
+    def EnumerateServices(self, request):  # noqa: N802 - function name should be lowercase
+        """Fake gRPC enumeration call to discovery service."""
+        return FakeEnumerateServicesResponse()
+
 
 class FakeDiscoveryServiceStubError(FakeDiscoveryServiceStub):
     """Fake Registry Service Stub that throws error to mimic unavailability of discovery service."""